@@ -1,12 +1,14 @@
 """
 API dependencies for authentication and database access.
 """
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+import secrets
+from typing import AsyncGenerator, Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import SessionLocal
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
 from app.db.models import User
 from app.core.security import verify_token
 from app.services.auth_service import get_user_by_id
@@ -15,23 +17,20 @@ from app.services.auth_service import get_user_by_id
 security = HTTPBearer()
 
 
-def get_db() -> Generator:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency for getting database session.
 
     Yields:
-        Database session
+        Async database session
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Dependency for getting current authenticated user from JWT token.
@@ -65,7 +64,7 @@ async def get_current_user(
         raise credentials_exception
 
     # Get user from database
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id(db, user_id)
     if user is None:
         raise credentials_exception
 
@@ -76,3 +75,18 @@ async def get_current_user(
         )
 
     return user
+
+
+def require_admin(x_admin_key: Optional[str] = Header(None)) -> None:
+    """
+    Dependency guarding admin routes with the ADMIN_API_KEY shared secret.
+
+    Raises:
+        HTTPException: 403 if admin routes are disabled or the key is wrong
+    """
+    if not settings.ADMIN_API_KEY or not x_admin_key or \
+            not secrets.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
@@ -10,7 +10,9 @@ from app.api.v1.endpoints import (
     phonetics,
     progress,
     achievements,
-    llm_config
+    llm_config,
+    admin,
+    media
 )
 
 api_router = APIRouter()
@@ -27,3 +29,5 @@ api_router.include_router(phonetics.router, prefix="/phonetics", tags=["phonetic
 api_router.include_router(progress.router, prefix="/progress", tags=["progress"])
 api_router.include_router(achievements.router, prefix="/achievements", tags=["achievements"])
 api_router.include_router(llm_config.router, prefix="/llm-config", tags=["llm-config"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(media.router, prefix="/media", tags=["media"])
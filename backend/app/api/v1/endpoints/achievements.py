@@ -3,7 +3,7 @@ Achievements endpoints for tracking and displaying user achievements.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict
 
 from app.api.deps import get_db, get_current_user
@@ -12,6 +12,7 @@ from app.services.achievements_service import (
     get_user_achievements,
     mark_achievements_viewed
 )
+from app.services.answer_events import settle_answer_events
 
 router = APIRouter()
 
@@ -19,7 +20,7 @@ router = APIRouter()
 @router.get("/")
 async def list_achievements(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Dict:
     """
     Get all achievements for the current user.
@@ -30,7 +31,8 @@ async def list_achievements(
     - new_count: Number of unviewed unlocked achievements
     """
     try:
-        return get_user_achievements(current_user.id, db)
+        await settle_answer_events(current_user, db)
+        return await get_user_achievements(current_user.id, db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get achievements: {str(e)}")
 
@@ -38,13 +40,14 @@ async def list_achievements(
 @router.post("/mark-viewed")
 async def mark_viewed(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Mark all user's achievements as viewed (clear NEW badges).
     """
     try:
-        success = mark_achievements_viewed(current_user.id, db)
+        await settle_answer_events(current_user, db)
+        success = await mark_achievements_viewed(current_user.id, db)
         return {"success": success, "message": "Achievements marked as viewed"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to mark achievements as viewed: {str(e)}")
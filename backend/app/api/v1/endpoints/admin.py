@@ -0,0 +1,42 @@
+"""
+Admin/diagnostic endpoints (require the X-Admin-Key header).
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, require_admin
+from app.core.llm_usage import flush_usage_recorder
+from app.schemas.admin import LLMUsageReport
+from app.services.llm_usage_service import get_llm_usage_report
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/llm-usage", response_model=LLMUsageReport)
+async def llm_usage(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    group_by: List[str] = Query(["module", "stage"]),
+    user_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Tokens, latency, retries and cost of LLM, STT and image calls.
+
+    Group by any of service, provider, model, module, stage and user
+    (repeat the parameter), e.g. ?group_by=module&group_by=stage.
+    """
+    # Include this worker's buffered calls; other workers flush on their own schedule
+    await flush_usage_recorder()
+    try:
+        return await get_llm_usage_report(
+            db,
+            since=datetime.utcnow() - timedelta(hours=hours),
+            group_by=group_by,
+            user_id=user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.api.deps import get_db, get_current_user
@@ -27,14 +28,14 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserLoginResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegisterRequest, db: Session = Depends(get_db)):
+async def register(user_data: UserRegisterRequest, db: AsyncSession = Depends(get_db)):
     """
     Register a new user with username and password.
 
     Returns JWT token and user information.
     """
     # Register user
-    user = register_user(db, user_data)
+    user = await register_user(db, user_data)
 
     if user is None:
         raise HTTPException(
@@ -54,12 +55,12 @@ async def register(user_data: UserRegisterRequest, db: Session = Depends(get_db)
 
 
 @router.post("/login", response_model=UserLoginResponse)
-async def login(credentials: UserLoginRequest, db: Session = Depends(get_db)):
+async def login(credentials: UserLoginRequest, db: AsyncSession = Depends(get_db)):
     """
     Authenticate user and return JWT token.
     """
     # Authenticate user
-    user = authenticate_user(db, credentials.username, credentials.password)
+    user = await authenticate_user(db, credentials.username, credentials.password)
 
     if user is None:
         raise HTTPException(
@@ -91,12 +92,12 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 async def update_language(
     language_data: UserUpdateLanguageRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update current user's target language.
     """
-    user = update_user_language(db, current_user.id, language_data.target_language)
+    user = await update_user_language(db, current_user.id, language_data.target_language)
 
     if user is None:
         raise HTTPException(
@@ -111,12 +112,12 @@ async def update_language(
 async def update_level(
     level_data: UserUpdateLevelRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Manually set current user's proficiency level (skips placement test).
     """
-    user = update_user_level(db, current_user.id, level_data.level)
+    user = await update_user_level(db, current_user.id, level_data.level)
 
     if user is None:
         raise HTTPException(
@@ -126,8 +127,8 @@ async def update_level(
 
     # Mark placement test as completed if manually setting level
     user.placement_test_completed = True
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     return UserResponse.from_orm(user)
 
@@ -135,12 +136,12 @@ async def update_level(
 @router.get("/me/progress", response_model=List[UserProgressResponse])
 async def get_my_progress(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get current user's progress across all modules.
     """
-    progress_records = db.query(UserProgress).filter(UserProgress.user_id == current_user.id).all()
+    progress_records = (await db.scalars(select(UserProgress).where(UserProgress.user_id == current_user.id))).all()
 
     return [
         UserProgressResponse(
@@ -155,10 +156,10 @@ async def get_my_progress(
 
 # Legacy endpoints for backward compatibility
 @router.post("/users", response_model=UserResponse)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Create a new user (legacy endpoint)."""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.external_id == user.external_id).first()
+    existing_user = await db.scalar(select(User).where(User.external_id == user.external_id))
     if existing_user:
         raise HTTPException(status_code=400, detail="User already exists")
 
@@ -172,16 +173,16 @@ async def create_user(user: UserCreate, db: Session = Depends(get_db)):
         is_active=True
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return UserResponse.from_orm(new_user)
 
 
 @router.get("/users/{external_id}", response_model=UserResponse)
-async def get_user(external_id: str, db: Session = Depends(get_db)):
+async def get_user(external_id: str, db: AsyncSession = Depends(get_db)):
     """Get user by external ID (legacy endpoint)."""
-    user = db.query(User).filter(User.external_id == external_id).first()
+    user = await db.scalar(select(User).where(User.external_id == external_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -189,13 +190,13 @@ async def get_user(external_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/users/{external_id}/progress", response_model=List[UserProgressResponse])
-async def get_user_progress(external_id: str, db: Session = Depends(get_db)):
+async def get_user_progress(external_id: str, db: AsyncSession = Depends(get_db)):
     """Get user progress across all modules (legacy endpoint)."""
-    user = db.query(User).filter(User.external_id == external_id).first()
+    user = await db.scalar(select(User).where(User.external_id == external_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    progress_records = db.query(UserProgress).filter(UserProgress.user_id == user.id).all()
+    progress_records = (await db.scalars(select(UserProgress).where(UserProgress.user_id == user.id))).all()
 
     return [
         UserProgressResponse(
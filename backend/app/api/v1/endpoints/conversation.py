@@ -1,5 +1,9 @@
+import json
+from typing import AsyncIterator, Dict, Any, Tuple
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_current_user
 from app.db.models import User
@@ -9,7 +13,7 @@ from app.schemas.conversation import (
     ConversationMessageRequest,
     ConversationMessageResponse
 )
-from app.services.conversation import start_conversation, send_message
+from app.services.conversation import start_conversation, send_message, stream_message
 
 router = APIRouter()
 
@@ -18,7 +22,7 @@ router = APIRouter()
 async def start_conversation_endpoint(
     request: ConversationStartRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Start a new conversation session for authenticated user."""
     if not current_user.target_language:
@@ -38,7 +42,7 @@ async def send_message_endpoint(
     session_id: str,
     request: ConversationMessageRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Send a message in a conversation session."""
     try:
@@ -47,3 +51,36 @@ async def send_message_endpoint(
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _format_sse(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> AsyncIterator[str]:
+    """Serialize (event, data) pairs as Server-Sent Events frames."""
+    async for event, data in events:
+        yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/{session_id}/message/stream")
+async def stream_message_endpoint(
+    session_id: str,
+    request: ConversationMessageRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Send a message and stream the tutor reply as Server-Sent Events.
+
+    Events: token (reply chunks), reply (final text after checking),
+    corrections (feedback on the user's message), done, or error.
+    """
+    try:
+        events = await stream_message(session_id, current_user, request, db)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return StreamingResponse(
+        _format_sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from app.api.deps import get_db, get_current_user
@@ -14,7 +14,7 @@ router = APIRouter()
 async def get_question(
     topic: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get grammar question for authenticated user."""
     if not current_user.target_language:
@@ -33,7 +33,7 @@ async def get_question(
 async def submit_answer(
     request: GrammarAnswerRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit grammar answer."""
     try:
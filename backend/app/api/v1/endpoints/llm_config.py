@@ -1,16 +1,25 @@
 from pathlib import Path
 from typing import Dict, List
+import json
 import os
 
-import httpx
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
-from app.services.ai_services import reset_llm_client
+from app.core.cache import get_llm_response_cache
+from app.core.singleflight import get_single_flight_stats
+from app.core.rate_governor import get_rate_governor_stats
+from app.core.hedging import get_hedging_stats
+from app.core.circuit_breaker import get_circuit_breaker_stats
+from app.core.http_pool import get_http_client, get_http_pool_stats
+from app.core.fake_provider import FAKE_PROVIDER_BASE_URL, get_fake_provider_stats
+from app.core.llm_usage import get_usage_recorder
+from app.services.ai_services import OPENAI_COMPATIBLE_PROVIDERS, reset_llm_client
 
 from app.services.image_client import reset_image_client
 from app.services.stt_client import reset_stt_client
+from app.services.validation_policy import get_validation_policy
 
 
 router = APIRouter()
@@ -26,6 +35,12 @@ class ModelListResponse(BaseModel):
     models: List[str]
 
 
+class FallbackProviderRequest(BaseModel):
+    provider: str = Field(..., min_length=2)
+    api_key: str = Field(..., min_length=8)
+    model: str = Field(..., min_length=1)
+
+
 class ApplyConfigRequest(BaseModel):
     provider: str = Field(..., min_length=2)
     api_key: str = Field(..., min_length=8)
@@ -36,6 +51,8 @@ class ApplyConfigRequest(BaseModel):
     stt_provider: str | None = None
     stt_api_key: str | None = None
     stt_model: str | None = None
+    # Ordered fallback chain for text generation; None keeps the current one, [] clears it
+    fallback_providers: List[FallbackProviderRequest] | None = None
 
 
 PROVIDER_CONFIG: Dict[str, Dict[str, str]] = {
@@ -58,6 +75,11 @@ PROVIDER_CONFIG: Dict[str, Dict[str, str]] = {
         "base_url": "https://api.groq.com/openai/v1",
         "models_url": "https://api.groq.com/openai/v1/models",
         "auth": "bearer"
+    },
+    "fake": {
+        "base_url": FAKE_PROVIDER_BASE_URL,
+        "models_url": f"{FAKE_PROVIDER_BASE_URL}/models",
+        "auth": "bearer"
     }
 }
 
@@ -72,7 +94,7 @@ def _extract_models(provider: str, payload: Dict) -> List[str]:
     if provider == "gemini":
         models = payload.get("models", [])
         return [_normalize_model_name(provider, model.get("name", "")) for model in models if model.get("name")]
-    if provider in {"openai", "gpt", "groq"}:
+    if provider in OPENAI_COMPATIBLE_PROVIDERS:
         models = payload.get("data", [])
         return [model.get("id", "") for model in models if model.get("id")]
     return []
@@ -122,7 +144,7 @@ async def list_models(payload: ModelListRequest) -> ModelListResponse:
         headers["x-api-key"] = payload.api_key
         headers["anthropic-version"] = "2023-06-01"
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
+    async with get_http_client(timeout=15.0, provider=provider) as client:
         response = await client.get(provider_config["models_url"], headers=headers, params=params)
 
     if response.status_code >= 400:
@@ -177,6 +199,22 @@ async def apply_config(payload: ApplyConfigRequest) -> Dict[str, str]:
             "STT_MODEL": payload.stt_model.strip()
         })
 
+    fallback_providers = None
+    if payload.fallback_providers is not None:
+        fallback_providers = []
+        for fallback in payload.fallback_providers:
+            fallback_provider = fallback.provider.lower().strip()
+            fallback_config = PROVIDER_CONFIG.get(fallback_provider)
+            if not fallback_config:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported fallback provider")
+            fallback_providers.append({
+                "provider": fallback_provider,
+                "api_key": fallback.api_key,
+                "base_url": fallback_config["base_url"],
+                "model": _normalize_model_name(fallback_provider, fallback.model.strip())
+            })
+        updates["LLM_FALLBACK_PROVIDERS"] = json.dumps(fallback_providers)
+
     env_path = Path(__file__).resolve().parents[4] / ".env"
     _update_env_file(env_path, updates)
 
@@ -190,6 +228,8 @@ async def apply_config(payload: ApplyConfigRequest) -> Dict[str, str]:
         settings.LLM_IMAGE_API_KEY = updates["LLM_IMAGE_API_KEY"]
         settings.LLM_IMAGE_API_BASE_URL = updates["LLM_IMAGE_API_BASE_URL"]
         settings.LLM_IMAGE_MODEL = updates["LLM_IMAGE_MODEL"]
+    if fallback_providers is not None:
+        settings.LLM_FALLBACK_PROVIDERS = fallback_providers
     if "STT_PROVIDER" in updates:
         settings.STT_PROVIDER = updates["STT_PROVIDER"]
         settings.STT_API_KEY = updates["STT_API_KEY"]
@@ -204,4 +244,21 @@ async def apply_config(payload: ApplyConfigRequest) -> Dict[str, str]:
         "status": "ok",
         "provider": provider,
         "model": model_name
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/metrics")
+async def get_metrics() -> Dict:
+    """Upstream request coalescing, rate governor, hedging, circuit breaker, connection pool, usage recorder, fake provider, validation sampling and response cache counters for this worker."""
+    response_cache = get_llm_response_cache()
+    return {
+        "single_flight": get_single_flight_stats(),
+        "rate_governors": get_rate_governor_stats(),
+        "hedging": get_hedging_stats(),
+        "circuit_breakers": get_circuit_breaker_stats(),
+        "http_pool": get_http_pool_stats(),
+        "usage_recorder": dict(get_usage_recorder().stats),
+        "fake_provider": get_fake_provider_stats(),
+        "validation_sampling": get_validation_policy().snapshot(),
+        "response_cache": dict(response_cache.stats) if response_cache else None
+    }
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.blob_store import get_blob_store, guess_media_type, is_blob_digest
+
+router = APIRouter()
+
+# A digest always names the same bytes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{digest}")
+async def get_media(digest: str, request: Request):
+    """
+    Serve a stored blob (flashcard images) by its SHA-256 digest.
+
+    Public, like any static asset: image tags can't send the bearer token,
+    and a digest can only be known from a response that referenced it.
+    Supports conditional GET via If-None-Match; unknown digests are a 404
+    either way, so a missing blob is never cached as immutable.
+    """
+    if not is_blob_digest(digest):
+        raise HTTPException(status_code=404, detail="Media not found")
+    store = get_blob_store()
+
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        if not await store.exists(digest):
+            raise HTTPException(status_code=404, detail="Media not found")
+        return Response(status_code=304, headers=headers)
+
+    data = await store.get(digest)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    return Response(content=data, media_type=guess_media_type(data), headers=headers)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_current_user
 from app.db.models import User
@@ -29,7 +29,7 @@ async def evaluate_audio(
         target_phrase: str = Form(...),
         audio_file: UploadFile = File(...),
         current_user: User = Depends(get_current_user),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """Evaluate pronunciation for authenticated user."""
     if not current_user.target_language:
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.api.deps import get_db, get_current_user
@@ -29,7 +30,7 @@ router = APIRouter()
 async def create_placement_test(
     request: PlacementTestStartRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Start a new placement test.
@@ -37,7 +38,7 @@ async def create_placement_test(
     Generates all 18 questions (6 vocabulary, 6 grammar, 6 reading) upfront using predefined questions.
     """
     # Create new placement test with all questions
-    test = start_placement_test(db, current_user.id, request.target_language)
+    test = await start_placement_test(db, current_user.id, request.target_language)
 
     questions = test.questions_data.get("questions", [])
 
@@ -53,12 +54,12 @@ async def create_placement_test(
 async def get_question(
     test_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get the next unanswered question in the test.
     """
-    question_data = get_next_question(db, test_id)
+    question_data = await get_next_question(db, test_id)
 
     if question_data is None:
         raise HTTPException(
@@ -68,7 +69,7 @@ async def get_question(
 
     # Verify the test belongs to the current user
     from app.db.models import PlacementTest
-    test = db.query(PlacementTest).filter(PlacementTest.id == test_id).first()
+    test = await db.scalar(select(PlacementTest).where(PlacementTest.id == test_id))
     if test and test.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -83,14 +84,14 @@ async def submit_test_answer(
     test_id: str,
     answer: PlacementTestAnswerRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Submit an answer for a question.
     """
     # Verify the test belongs to the current user
     from app.db.models import PlacementTest
-    test = db.query(PlacementTest).filter(PlacementTest.id == test_id).first()
+    test = await db.scalar(select(PlacementTest).where(PlacementTest.id == test_id))
     if not test:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,7 +111,7 @@ async def submit_test_answer(
         )
 
     # Submit the answer
-    success = submit_answer(db, test_id, answer.question_number, answer.selected_option)
+    success = await submit_answer(db, test_id, answer.question_number, answer.selected_option)
 
     if not success:
         raise HTTPException(
@@ -137,7 +138,7 @@ async def submit_test_answer(
 async def complete_test(
     test_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Complete the test and calculate results.
@@ -146,7 +147,7 @@ async def complete_test(
     """
     # Verify the test belongs to the current user
     from app.db.models import PlacementTest
-    test = db.query(PlacementTest).filter(PlacementTest.id == test_id).first()
+    test = await db.scalar(select(PlacementTest).where(PlacementTest.id == test_id))
     if not test:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -166,7 +167,7 @@ async def complete_test(
         )
 
     # Calculate results
-    results = calculate_results(db, test_id)
+    results = await calculate_results(db, test_id)
 
     if results is None:
         raise HTTPException(
@@ -180,12 +181,12 @@ async def complete_test(
 @router.get("/history", response_model=PlacementTestHistoryResponse)
 async def get_history(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get placement test history for the current user.
     """
-    tests = get_user_test_history(db, current_user.id)
+    tests = await get_user_test_history(db, current_user.id)
 
     return PlacementTestHistoryResponse(
         tests=[
@@ -3,16 +3,23 @@ Progress tracking and level advancement endpoints.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.api.deps import get_db, get_current_user
 from app.db.models import User
 from app.services.progress_service import (
+    get_conversation_message_count,
     get_user_progress_summary,
     advance_user_level,
-    get_level_history
+    get_level_history,
+    record_conversation_messages,
+    load_progress_snapshot
 )
+from app.services.activity_rollup import get_activity_chart
+from app.services.answer_events import settle_answer_events
+from app.services.conversation_history import append_messages
 from app.schemas.progress import (
     ProgressSummaryResponse,
     AdvancementResponse,
@@ -26,7 +33,7 @@ router = APIRouter()
 @router.get("/summary", response_model=ProgressSummaryResponse)
 async def get_progress_summary(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get overall progress summary and advancement eligibility.
@@ -40,7 +47,8 @@ async def get_progress_summary(
     - Total XP
     """
     try:
-        return get_user_progress_summary(current_user.id, db)
+        await settle_answer_events(current_user, db)
+        return await get_user_progress_summary(current_user.id, db)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -50,7 +58,7 @@ async def get_progress_summary(
 @router.post("/advance", response_model=AdvancementResponse)
 async def advance_level(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Trigger level advancement for current user.
@@ -67,7 +75,8 @@ async def advance_level(
     - Awards XP based on level completed
     """
     try:
-        return advance_user_level(current_user.id, db)
+        await settle_answer_events(current_user, db)
+        return await advance_user_level(current_user.id, db)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -77,7 +86,7 @@ async def advance_level(
 @router.get("/history", response_model=List[LevelHistoryItem])
 async def get_history(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get historical level progression for current user.
@@ -90,7 +99,7 @@ async def get_history(
     - Weighted overall score
     """
     try:
-        return get_level_history(current_user.id, db)
+        return await get_level_history(current_user.id, db)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get level history: {str(e)}")
 
@@ -103,7 +112,7 @@ class CheatCodeRequest(BaseModel):
 async def apply_cheat_code(
     request: CheatCodeRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Apply cheat code for demo purposes.
@@ -121,10 +130,10 @@ async def apply_cheat_code(
         modules = ["vocabulary", "grammar", "writing", "phonetics"]
 
         for module in modules:
-            progress = db.query(UserProgress).filter(
+            progress = await db.scalar(select(UserProgress).where(
                 UserProgress.user_id == current_user.id,
                 UserProgress.module == module
-            ).first()
+            ))
 
             if not progress:
                 progress = UserProgress(
@@ -143,19 +152,7 @@ async def apply_cheat_code(
                 progress.last_activity_at = datetime.utcnow()
 
         # Add conversation messages if needed
-        sessions = db.query(ConversationSession).filter(
-            ConversationSession.user_id == current_user.id
-        ).all()
-
-        # Count existing user messages
-        existing_messages = 0
-        for session in sessions:
-            context = session.context_json
-            if isinstance(context, dict) and "messages" in context:
-                existing_messages += sum(
-                    1 for msg in context["messages"]
-                    if isinstance(msg, dict) and msg.get("role") == "user"
-                )
+        existing_messages = await get_conversation_message_count(current_user.id, current_user.level, db)
 
         # If less than 25 messages, create a new session with dummy messages
         if existing_messages < 25:
@@ -170,16 +167,19 @@ async def apply_cheat_code(
                 id=str(uuid4()),
                 user_id=current_user.id,
                 target_language=current_user.target_language or "Spanish",
-                context_json={"messages": dummy_messages},
+                context_json={},
                 created_at=datetime.utcnow()
             )
             db.add(session)
+            await db.flush()
+            await append_messages(session.id, dummy_messages, db, expected_seq=0)
+            await record_conversation_messages(current_user.id, db, count=25)
 
         # Set user as eligible for advancement
         current_user.can_advance = True
         current_user.advancement_notified_at = datetime.utcnow()
 
-        db.commit()
+        await db.commit()
 
         return {
             "success": True,
@@ -189,72 +189,49 @@ async def apply_cheat_code(
         }
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to apply cheat code: {str(e)}")
 
 
 @router.get("/charts")
 async def get_charts_data(
+    days: int = 30,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get data formatted for charts visualization.
 
+    Query params:
+    - days: Activity range, one of 7, 30, 90, 365 (default 30); 90 days are
+      drawn per week and 365 days per 30 days
+
     Returns:
-    - activity_by_date: Daily activity counts by module (last 30 days)
+    - activity_over_time: Activity counts by module per day (or bucket)
     - module_scores: Current scores for each module
     - level_progression: Historical level completion data
     """
-    from app.db.models import ContentLog, UserProgress, LevelHistory
-    from datetime import datetime, timedelta
-    from collections import defaultdict
+    from datetime import datetime
 
     try:
-        # 1. Activity over time (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-
-        logs = db.query(ContentLog).filter(
-            ContentLog.user_id == current_user.id,
-            ContentLog.created_at >= thirty_days_ago
-        ).all()
-
-        # Group by date and module
-        activity_by_date = defaultdict(lambda: defaultdict(int))
-        for log in logs:
-            date_str = log.created_at.strftime('%Y-%m-%d')
-            activity_by_date[date_str][log.module] += 1
-
-        # Convert to sorted list
-        sorted_dates = sorted(activity_by_date.keys())
-        activity_data = {
-            "dates": sorted_dates,
-            "vocabulary": [activity_by_date[d].get("vocabulary", 0) for d in sorted_dates],
-            "grammar": [activity_by_date[d].get("grammar", 0) for d in sorted_dates],
-            "writing": [activity_by_date[d].get("writing", 0) for d in sorted_dates],
-            "phonetics": [activity_by_date[d].get("phonetics", 0) for d in sorted_dates],
-            "conversation": [activity_by_date[d].get("conversation", 0) for d in sorted_dates]
-        }
+        # 1. Activity over time, from the daily rollup
+        activity_data = await get_activity_chart(current_user.id, db, days=days)
 
         # 2. Current module scores
-        progress_records = db.query(UserProgress).filter(
-            UserProgress.user_id == current_user.id
-        ).all()
+        snapshot = await load_progress_snapshot(current_user.id, db, with_history=True)
 
         module_scores = {
             "modules": [],
             "scores": []
         }
 
-        for progress in progress_records:
+        for progress in snapshot.progress.values():
             if progress.score is not None:
                 module_scores["modules"].append(progress.module.capitalize())
                 module_scores["scores"].append(round(progress.score, 1))
 
         # 3. Level progression history
-        level_history = db.query(LevelHistory).filter(
-            LevelHistory.user_id == current_user.id
-        ).order_by(LevelHistory.completed_at).all()
+        level_history = snapshot.level_history
 
         level_progression = {
             "levels": [],
@@ -269,18 +246,8 @@ async def get_charts_data(
 
         # Always add current level to show progress
         if current_user.level:
-            # Calculate current weighted score from all modules
-            current_progress = db.query(UserProgress).filter(
-                UserProgress.user_id == current_user.id
-            ).all()
-
-            scores = [p.score for p in current_progress if p.score is not None]
-
-            # Show current level even if no scores yet
-            if scores:
-                current_weighted = sum(scores) / len(scores)
-            else:
-                current_weighted = 0.0
+            # Current weighted score, on the same scale as completed levels
+            current_weighted = snapshot.weighted_score
 
             level_label = f"{current_user.level} (Current)" if level_history else current_user.level
             level_progression["levels"].append(level_label)
@@ -295,6 +262,8 @@ async def get_charts_data(
             "level_progression": level_progression
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get charts data: {str(e)}")
 
@@ -303,7 +272,7 @@ async def get_charts_data(
 async def get_module_details(
     module: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get detailed progress for a specific module.
@@ -311,8 +280,6 @@ async def get_module_details(
     Currently returns basic module info.
     Can be extended with trend analysis and recommendations.
     """
-    from app.db.models import UserProgress
-
     try:
         # Validate module name
         valid_modules = ["vocabulary", "grammar", "writing", "phonetics", "conversation"]
@@ -323,10 +290,8 @@ async def get_module_details(
             )
 
         # Get progress for this module
-        progress = db.query(UserProgress).filter(
-            UserProgress.user_id == current_user.id,
-            UserProgress.module == module
-        ).first()
+        snapshot = await load_progress_snapshot(current_user.id, db)
+        progress = snapshot.progress.get(module)
 
         if not progress:
             return {
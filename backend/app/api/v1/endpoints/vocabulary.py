@@ -1,11 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from app.api.deps import get_db, get_current_user
 from app.db.models import User
-from app.schemas.vocabulary import FlashcardResponse, VocabularyAnswerRequest, VocabularyAnswerResponse, ReviewStatsResponse
-from app.services.vocabulary import get_next_flashcard, submit_vocabulary_answer
+from app.core.config import settings
+from app.schemas.vocabulary import (
+    FlashcardBatchResponse,
+    FlashcardResponse,
+    ReviewStatsResponse,
+    VocabularyAnswerRequest,
+    VocabularyAnswerResponse,
+)
+from app.services.vocabulary import get_flashcard_batch, get_next_flashcard, submit_vocabulary_answer
 from app.services.srs_service import get_review_stats
 
 router = APIRouter()
@@ -14,7 +21,7 @@ router = APIRouter()
 @router.get("/next", response_model=FlashcardResponse)
 async def get_flashcard(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get next vocabulary flashcard for authenticated user."""
     if not current_user.target_language:
@@ -29,11 +36,33 @@ async def get_flashcard(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/batch", response_model=FlashcardBatchResponse)
+async def get_flashcard_batch_endpoint(
+    count: int = Query(10, ge=1, description="Number of flashcards to generate"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get several vocabulary flashcards at once for a study session."""
+    if not current_user.target_language:
+        raise HTTPException(status_code=400, detail="Please set your target language first")
+
+    if not current_user.level:
+        raise HTTPException(status_code=400, detail="Please set your proficiency level or take the placement test")
+
+    if count > settings.VOCAB_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=400, detail=f"count must be at most {settings.VOCAB_BATCH_MAX_SIZE}")
+
+    try:
+        return await get_flashcard_batch(current_user.id, current_user.target_language, current_user.level, count, db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/answer", response_model=VocabularyAnswerResponse)
 async def submit_answer(
     request: VocabularyAnswerRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit vocabulary answer."""
     try:
@@ -47,11 +76,11 @@ async def submit_answer(
 @router.get("/review-stats", response_model=ReviewStatsResponse)
 async def get_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get SRS review statistics for the current user."""
     try:
-        stats = get_review_stats(db, current_user)
+        stats = await get_review_stats(db, current_user)
         return ReviewStatsResponse(**stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
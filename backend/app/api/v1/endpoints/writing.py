@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
 
 from app.api.deps import get_db, get_current_user
@@ -26,7 +26,7 @@ async def get_prompts(
 async def get_feedback(
     request: WritingFeedbackRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get writing feedback for authenticated user."""
     if not current_user.target_language:
@@ -0,0 +1,155 @@
+"""
+Content-addressed storage for generated media.
+
+Blobs are keyed by the SHA-256 of their bytes: the same image is stored once,
+and the bytes behind a digest never change, so responses can be cached
+forever. FilesystemBlobStore is the default backend; another backend only
+needs to implement BlobStore.
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import os
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+from app.core.config import settings
+
+_DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+# Leading bytes of the image formats the image providers return
+_MEDIA_TYPES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def blob_digest(data: bytes) -> str:
+    """SHA-256 hex digest a blob is stored under."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_blob_digest(value: str) -> bool:
+    """Whether `value` is a well-formed digest (lowercase hex SHA-256)."""
+    return bool(_DIGEST_PATTERN.fullmatch(value or ""))
+
+
+def guess_media_type(data: bytes) -> str:
+    """Content type of an image blob, from its leading bytes."""
+    for magic, media_type in _MEDIA_TYPES:
+        if data.startswith(magic):
+            return media_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+class BlobStore(ABC):
+    """Interface for blob backends."""
+
+    @abstractmethod
+    async def put(self, data: bytes) -> str:
+        """Store `data` (a no-op if it is already stored) and return its digest."""
+
+    @abstractmethod
+    async def get(self, digest: str) -> Optional[bytes]:
+        """Bytes stored under `digest`, or None."""
+
+    @abstractmethod
+    async def exists(self, digest: str) -> bool:
+        """Whether a blob is stored under `digest`, without reading it."""
+
+
+class FilesystemBlobStore(BlobStore):
+    """Blobs as files under `root`, fanned out by the first two digest byte pairs."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self._path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a partial file
+        temp = path.with_name(f"{digest}.{uuid4().hex}.tmp")
+        temp.write_bytes(data)
+        os.replace(temp, path)
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        try:
+            return self._path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    async def put(self, data: bytes) -> str:
+        digest = blob_digest(data)
+        await asyncio.to_thread(self._write, digest, data)
+        return digest
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        if not is_blob_digest(digest):
+            return None
+        return await asyncio.to_thread(self._read, digest)
+
+    async def exists(self, digest: str) -> bool:
+        if not is_blob_digest(digest):
+            return False
+        return await asyncio.to_thread(self._path(digest).is_file)
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Get or create the configured blob store."""
+    global _blob_store
+    if _blob_store is None:
+        backend = settings.BLOB_STORE_BACKEND.lower()
+        if backend != "filesystem":
+            raise ValueError(f"Unsupported BLOB_STORE_BACKEND: {settings.BLOB_STORE_BACKEND}")
+        _blob_store = FilesystemBlobStore(settings.BLOB_STORE_PATH)
+    return _blob_store
+
+
+def reset_blob_store(store: Optional[BlobStore] = None) -> None:
+    """Replace the global blob store (config changes, tests)."""
+    global _blob_store
+    _blob_store = store
+
+
+async def store_base64(data_b64: Optional[str]) -> Optional[str]:
+    """
+    Store a base64-encoded blob, as returned by the image clients.
+
+    Returns:
+        Its digest, or None if there is no data, it is not valid base64 or the store failed
+    """
+    if not data_b64:
+        return None
+    try:
+        data = base64.b64decode(data_b64, validate=True)
+    except (binascii.Error, ValueError) as e:
+        print(f"[WARNING] Not storing media, invalid base64: {e}")
+        return None
+
+    try:
+        return await get_blob_store().put(data)
+    except OSError as e:
+        print(f"[WARNING] Blob store write failed: {e}")
+        return None
+
+
+def media_url(digest: str) -> str:
+    """URL GET /media/{digest} serves a blob from."""
+    return f"{settings.MEDIA_BASE_URL}{settings.API_V1_PREFIX}/media/{digest}"
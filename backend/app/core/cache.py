@@ -1,10 +1,13 @@
 """Redis cache client wrapper for content caching."""
 
+import asyncio
 import redis
 import json
 import hashlib
 import logging
-from typing import Optional, Any, Dict
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Tuple
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -47,6 +50,26 @@ class CacheClient:
             logger.warning(f"Cache get error for key {key}: {e}")
             return None
 
+    def get_with_ttl(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """Get value from cache with its remaining TTL in seconds (None if it never expires)."""
+        if not self.enabled or not self.redis_client:
+            return None, None
+
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.get(key)
+            pipe.pttl(key)
+            value, pttl = pipe.execute()
+            if not value:
+                return None, None
+            # -1: no expiry; -2: expired between the two commands
+            if pttl == -2:
+                return None, None
+            return json.loads(value), (pttl / 1000 if pttl > 0 else None)
+        except Exception as e:
+            logger.warning(f"Cache get error for key {key}: {e}")
+            return None, None
+
     def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> bool:
         """Set value in cache with optional TTL."""
         if not self.enabled or not self.redis_client:
@@ -75,16 +98,22 @@ class CacheClient:
             logger.warning(f"Cache delete error for key {key}: {e}")
             return False
 
-    def clear_pattern(self, pattern: str) -> int:
-        """Delete all keys matching pattern."""
+    def clear_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Delete all keys matching pattern (incremental SCAN, not a blocking KEYS)."""
         if not self.enabled or not self.redis_client:
             return 0
 
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                return self.redis_client.delete(*keys)
-            return 0
+            deleted = 0
+            batch = []
+            for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += self.redis_client.delete(*batch)
+                    batch = []
+            if batch:
+                deleted += self.redis_client.delete(*batch)
+            return deleted
         except Exception as e:
             logger.warning(f"Cache clear pattern error for {pattern}: {e}")
             return 0
@@ -125,3 +154,167 @@ class CacheClient:
 
 # Global cache instance
 cache = CacheClient()
+
+
+class LRUCache:
+    """In-process LRU cache bounded by the total byte size of its values."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+
+    @staticmethod
+    def _size_of(key: str, value: str) -> int:
+        return len(key.encode()) + len(value.encode())
+
+    def get(self, key: str) -> Optional[str]:
+        """Get value and mark it as most recently used. Expired entries are dropped."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at, _size = entry
+        if expires_at and expires_at <= time.monotonic():
+            self.delete(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> bool:
+        """Store value, evicting least recently used entries until it fits."""
+        size = self._size_of(key, value)
+        if size > self.max_bytes:
+            return False
+
+        self.delete(key)
+        while self._entries and self.current_bytes + size > self.max_bytes:
+            _old_key, (_value, _expires_at, old_size) = self._entries.popitem(last=False)
+            self.current_bytes -= old_size
+
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds else 0.0
+        self._entries[key] = (value, expires_at, size)
+        self.current_bytes += size
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Remove a key if present."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.current_bytes -= entry[2]
+        return True
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCache:
+    """
+    In-process LRU in front of the shared Redis cache.
+
+    Redis calls block, so they run in a worker thread. Without a local tier
+    every read goes to Redis, so a delete is seen by all workers at once.
+    """
+
+    def __init__(self, local: Optional[LRUCache], remote: Optional[CacheClient] = None):
+        self.local = local
+        self.remote = remote
+        self.stats = {"local_hits": 0, "remote_hits": 0, "misses": 0, "sets": 0}
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up key locally, then in Redis (promoting remote hits to the local tier)."""
+        if self.local is not None:
+            value = self.local.get(key)
+            if value is not None:
+                self.stats["local_hits"] += 1
+                return value
+
+        if self.remote is not None:
+            value, ttl_seconds = await asyncio.to_thread(self.remote.get_with_ttl, key)
+            if isinstance(value, str):
+                self.stats["remote_hits"] += 1
+                if self.local is not None:
+                    # The local copy expires with the Redis entry
+                    self.local.set(key, value, ttl_seconds)
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str, ttl_seconds: Optional[int] = None) -> None:
+        """Write value to both tiers."""
+        self.stats["sets"] += 1
+        if self.local is not None:
+            self.local.set(key, value, ttl_seconds)
+        if self.remote is not None:
+            await asyncio.to_thread(self.remote.set, key, value, ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        """Remove key from both tiers."""
+        if self.local is not None:
+            self.local.delete(key)
+        if self.remote is not None:
+            await asyncio.to_thread(self.remote.delete, key)
+
+
+# Cache namespaces whose entries hold checker/validator verdicts
+VALIDATION_CACHE_MODULES = {"checker", "secondary"}
+
+
+def get_llm_cache_ttl(module: str) -> int:
+    """Resolve the TTL (seconds) for cached LLM responses of a module."""
+    overrides = settings.LLM_CACHE_TTL_SECONDS or {}
+    if module in overrides:
+        return int(overrides[module])
+    if module in VALIDATION_CACHE_MODULES:
+        return settings.VALIDATION_CACHE_TTL_MINUTES * 60
+    return settings.CACHE_TTL_HOURS * 3600
+
+
+def make_llm_cache_key(
+    module: str,
+    *,
+    provider: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    system_prompt: str,
+    user_prompt: str,
+    response_schema: Optional[str] = None
+) -> str:
+    """Generate cache key for an LLM call from its provider settings and normalized prompts."""
+    params = dict(
+        provider=provider,
+        model=model,
+        temperature=round(temperature, 4),
+        max_tokens=max_tokens,
+        system_prompt=" ".join(system_prompt.split()),
+        user_prompt=" ".join(user_prompt.split())
+    )
+    # Only structured-output calls carry the schema, so plain-text keys are unchanged
+    if response_schema:
+        params["response_schema"] = response_schema
+    return CacheClient.make_cache_key(f"llm:{module}", **params)
+
+
+_llm_response_cache: Optional[TieredCache] = None
+
+
+def get_llm_response_cache() -> Optional[TieredCache]:
+    """Get or create the global LLM response cache, or None when disabled."""
+    global _llm_response_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _llm_response_cache is None:
+        _llm_response_cache = TieredCache(
+            local=LRUCache(max_bytes=settings.LLM_CACHE_MAX_BYTES),
+            remote=cache if cache.enabled else None
+        )
+    return _llm_response_cache
@@ -0,0 +1,171 @@
+"""Per-provider circuit breakers so a degraded upstream fails fast instead of tying up workers."""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker driven by error rate and latency.
+
+    Outcomes of the last window_size calls are kept. Once at least min_calls
+    are recorded, the breaker opens if the failure rate or the share of calls
+    slower than slow_call_seconds reaches its threshold. While open, requests
+    are refused; after open_seconds up to half_open_max_calls probes are let
+    through. If they all succeed (and are not slow) the breaker closes,
+    otherwise it opens again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 2,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.min_calls = max(1, min_calls)
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+
+        # (failed, slow) per call, most recent last
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=max(window_size, self.min_calls))
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.half_opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        self.stats = {"allowed": 0, "rejected": 0, "opened": 0, "successes": 0, "failures": 0}
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the provider now (counts it as a probe when half-open)."""
+        if self.state == OPEN:
+            if self._clock() - self.opened_at < self.open_seconds:
+                self.stats["rejected"] += 1
+                return False
+            self._half_open()
+
+        if self.state == HALF_OPEN:
+            if self._probes_started >= self.half_open_max_calls:
+                # Probes that never reported back (e.g. cancelled) must not wedge the breaker
+                if self._clock() - self.half_opened_at < self.open_seconds:
+                    self.stats["rejected"] += 1
+                    return False
+                self._half_open()
+            self._probes_started += 1
+
+        self.stats["allowed"] += 1
+        return True
+
+    def record_success(self, latency_seconds: float = 0.0) -> None:
+        """Record a completed call; a slow success counts against the latency threshold."""
+        self.stats["successes"] += 1
+        slow = latency_seconds >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            if slow:
+                self._open()
+                return
+            self._probes_succeeded += 1
+            if self._probes_succeeded >= self.half_open_max_calls:
+                self._close()
+            return
+        self._window.append((False, slow))
+        self._evaluate()
+
+    def record_failure(self) -> None:
+        """Record a failed call (after the caller's own retries)."""
+        self.stats["failures"] += 1
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self._window.append((True, False))
+        self._evaluate()
+
+    def _evaluate(self) -> None:
+        if self.state != CLOSED or len(self._window) < self.min_calls:
+            return
+        calls = len(self._window)
+        failure_rate = sum(1 for failed, _ in self._window if failed) / calls
+        slow_rate = sum(1 for _, slow in self._window if slow) / calls
+        if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = self._clock()
+        self.stats["opened"] += 1
+        logger.warning("Circuit for provider %s opened; refusing calls for %.0fs", self.name, self.open_seconds)
+
+    def _half_open(self) -> None:
+        self.state = HALF_OPEN
+        self.half_opened_at = self._clock()
+        self._probes_started = 0
+        self._probes_succeeded = 0
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._window.clear()
+        logger.info("Circuit for provider %s closed again", self.name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State, window error/slow rates and counters."""
+        calls = len(self._window)
+        return {
+            **self.stats,
+            "state": self.state,
+            "window_calls": calls,
+            "failure_rate": sum(1 for failed, _ in self._window if failed) / calls if calls else 0.0,
+            "slow_call_rate": sum(1 for _, slow in self._window if slow) / calls if calls else 0.0,
+            "open_for_seconds": (
+                max(0.0, self.open_seconds - (self._clock() - self.opened_at)) if self.state == OPEN else 0.0
+            ),
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Get or create the breaker for a provider from settings."""
+    provider = provider.lower()
+    if provider not in _breakers:
+        _breakers[provider] = CircuitBreaker(
+            name=provider,
+            window_size=settings.LLM_BREAKER_WINDOW_SIZE,
+            min_calls=settings.LLM_BREAKER_MIN_CALLS,
+            failure_rate_threshold=settings.LLM_BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_rate_threshold=settings.LLM_BREAKER_SLOW_CALL_RATE,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+            half_open_max_calls=settings.LLM_BREAKER_HALF_OPEN_CALLS
+        )
+    return _breakers[provider]
+
+
+def reset_circuit_breakers() -> None:
+    """Drop all breakers (config changes, tests)."""
+    _breakers.clear()
+
+
+def get_circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every provider breaker, keyed by provider name."""
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
@@ -55,6 +55,114 @@ class Settings(BaseSettings):
     VALIDATION_CACHE_TTL_MINUTES: int = 60
     RECENT_WORDS_CACHE_TTL_MINUTES: int = 5
 
+    # Generated media (images) stored by SHA-256 and served from /media/{digest}
+    BLOB_STORE_BACKEND: str = "filesystem"
+    BLOB_STORE_PATH: str = "./media"
+    MEDIA_BASE_URL: str = ""  # Prefix for media URLs in responses, e.g. "https://api.example.com"; empty keeps them relative
+
+    # LLM response cache (in-process LRU in front of Redis)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    LLM_CACHE_TTL_SECONDS: dict = {}  # Per-module overrides, e.g. '{"checker": 7200}'
+
+    # LLM rate governor (per provider; 0 disables the RPM/TPM buckets)
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_RPM_LIMIT: int = 0
+    LLM_TPM_LIMIT: int = 0
+    LLM_PROVIDER_LIMITS: dict = {}  # e.g. '{"groq": {"max_concurrency": 4, "rpm": 30, "tpm": 6000}}'
+    LLM_GOVERNOR_MAX_WAIT_SECONDS: float = 30.0
+    LLM_RATE_LIMIT_RETRIES: int = 2
+    LLM_RATE_LIMIT_BACKOFF_SECONDS: float = 2.0  # Used when a 429 carries no Retry-After
+
+    # LLM tail latency: hedged duplicates and retries of transient (5xx/connection) errors
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+    LLM_HEDGE_MAX_RATE: float = 0.1  # At most ~10% of requests are duplicated
+    LLM_RETRY_ATTEMPTS: int = 2
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 4.0
+
+    # Circuit breaker per LLM provider: opens on error rate or slow-call rate over the last calls
+    LLM_CIRCUIT_BREAKER_ENABLED: bool = True
+    LLM_BREAKER_WINDOW_SIZE: int = 20
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 10.0
+    LLM_BREAKER_SLOW_CALL_RATE: float = 0.8
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+    LLM_BREAKER_HALF_OPEN_CALLS: int = 2
+    # Providers tried in order when the primary fails or its circuit is open, e.g.
+    # '[{"provider": "groq", "api_key": "...", "model": "llama-3.1-8b-instant"}]' (base_url optional)
+    LLM_FALLBACK_PROVIDERS: list = []
+
+    # Structured output: re-asks when a JSON response fails schema validation
+    LLM_JSON_RETRIES: int = 1
+
+    # Usage accounting for LLM, STT and image calls (llm_usage table, /admin/llm-usage)
+    LLM_USAGE_ENABLED: bool = True
+    LLM_USAGE_FLUSH_SIZE: int = 50
+    LLM_USAGE_FLUSH_INTERVAL_SECONDS: float = 10.0
+    LLM_PRICING: dict = {}  # e.g. '{"gemini-2.5-flash": {"input_per_million": 0.3, "output_per_million": 2.5}}'
+    ADMIN_API_KEY: str = ""  # Required in X-Admin-Key for /admin routes; empty disables them
+
+    # Outbound HTTP pool shared by LLM, STT and image clients
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP2_ENABLED: bool = False  # Requires the 'h2' package
+
+    # Fake provider: set LLM_PROVIDER / STT_PROVIDER / LLM_IMAGE_PROVIDER to "fake" for offline load tests
+    FAKE_PROVIDER_LATENCY_MS: float = 300.0  # Median latency per request
+    FAKE_PROVIDER_LATENCY_DISTRIBUTION: str = "lognormal"  # fixed, uniform, normal or lognormal
+    FAKE_PROVIDER_LATENCY_SPREAD: float = 0.5  # Lognormal sigma; for uniform/normal a fraction of the median
+    FAKE_PROVIDER_ERROR_RATE: float = 0.0  # Fraction of requests answered with 503
+    FAKE_PROVIDER_RATE_LIMIT_RATE: float = 0.0  # Fraction of requests answered with 429
+    FAKE_PROVIDER_RETRY_AFTER_SECONDS: float = 1.0
+    FAKE_PROVIDER_STREAM_CHUNK_MS: float = 20.0  # Delay between streamed chunks
+    FAKE_PROVIDER_SEED: int = 0
+
+    # Conversation context window: recent turns verbatim, older ones folded into a running summary
+    CONVERSATION_VERBATIM_TURNS: int = 6
+    CONVERSATION_SUMMARY_MIN_MESSAGES: int = 4  # Fold older messages in batches of at least this many
+    CONVERSATION_SUMMARY_MAX_WORDS: int = 120
+    CONVERSATION_CONTEXT_TOKEN_BUDGET: int = 1500  # Summary + verbatim history, estimated locally
+    CONVERSATION_HISTORY_WINDOW: int = 40  # Most stored messages loaded per reply (unsummarized ones only)
+
+    # Adaptive validation: checker / secondary validator run on a sample sized by each segment's failure rate
+    VALIDATION_SAMPLING_ENABLED: bool = True
+    VALIDATION_MIN_SAMPLES: int = 30  # Segments with fewer observed checks are always validated
+    VALIDATION_WINDOW_SIZE: int = 200  # Most recent outcomes kept per segment and stage
+    VALIDATION_MIN_SAMPLE_RATE: float = 0.1  # Floor for stable segments
+    VALIDATION_SAMPLING_GAIN: float = 10.0  # Sample rate = failure rate x gain, capped at 1
+    VALIDATION_HISTORY_ROWS: int = 1000  # ContentLog rows read per module to seed the stats
+
+    # Vocabulary batch generation
+    VOCAB_BATCH_MAX_SIZE: int = 20
+    VOCAB_BATCH_IMAGE_CONCURRENCY: int = 4
+
+    # Pre-generated flashcard pool per (language, level); refills spend LLM quota in the background
+    FLASHCARD_POOL_ENABLED: bool = False
+    FLASHCARD_POOL_LOW_WATER: int = 10
+    FLASHCARD_POOL_TARGET_SIZE: int = 30
+    FLASHCARD_POOL_REFILL_INTERVAL_SECONDS: int = 300
+
+    # Achievements and advancement eligibility after an answer; off = evaluate inline before responding
+    ANSWER_EVENTS_BACKGROUND: bool = True
+    ANSWER_EVENTS_MAX_CONCURRENCY: int = 4
+    ANSWER_EVENTS_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+
+    # In-memory achievement catalog; reloaded at once on ORM changes, after this long for external seeds
+    ACHIEVEMENT_CATALOG_TTL_SECONDS: int = 300
+
+    # Per-user achievement listings (GET /achievements/); dropped on commits that touch the user.
+    # Kept in Redis when enabled; otherwise in-process (MAX_BYTES), where other workers only
+    # see a change once the TTL runs out
+    ACHIEVEMENTS_CACHE_TTL_SECONDS: int = 300
+    ACHIEVEMENTS_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
     # CORS
     BACKEND_CORS_ORIGINS: Union[list, str] = ["*"]
 
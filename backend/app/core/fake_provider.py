@@ -0,0 +1,389 @@
+"""
+In-process fake AI provider for offline load testing.
+
+Setting LLM_PROVIDER, STT_PROVIDER or LLM_IMAGE_PROVIDER to "fake" routes
+that client's requests to FakeProviderTransport instead of the network.
+The transport speaks the OpenAI-compatible wire format (chat completions,
+SSE streaming, audio transcriptions, image generations, model listing), so
+the rate governor, retries, hedging and usage accounting run exactly as they
+do against a real provider.
+
+Response bodies are derived from a hash of the request, so identical prompts
+always get identical answers. Structured-output requests name their schema
+(see app.schemas.llm_outputs) and get schema-valid JSON templated from the
+prompt. Latency, 5xx errors and 429s are drawn from a seeded RNG configured
+by the FAKE_PROVIDER_* settings.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.rate_governor import estimate_tokens
+
+FAKE_PROVIDER_BASE_URL = "http://fake-provider.local/v1"
+FAKE_MODEL = "fake-model"
+
+LATENCY_DISTRIBUTIONS = {"fixed", "uniform", "normal", "lognormal"}
+
+# 1x1 PNG returned for every generated image
+FAKE_IMAGE_B64 = (
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+_CONCEPTS = [
+    "book", "house", "water", "friend", "apple", "street", "window", "school",
+    "bread", "train", "garden", "river", "chair", "letter", "market", "mountain",
+    "kitchen", "teacher", "morning", "city", "flower", "bridge", "doctor", "music",
+]
+
+_REPLIES = [
+    "That sounds great! What did you do next?",
+    "Interesting. Can you tell me a little more about it?",
+    "I see. How did that make you feel?",
+    "Good point. What do you usually do on weekends?",
+    "Nice! Where would you like to travel this year?",
+]
+
+_PHRASES = [
+    "The weather is very nice today.",
+    "I would like a cup of coffee, please.",
+    "My friend lives near the old bridge.",
+    "We are going to the market tomorrow.",
+    "Where is the train station, please?",
+]
+
+
+def _seed_for(*parts: str) -> int:
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    return int(digest[:16], 16)
+
+
+def _search(pattern: str, text: str, default: str = "") -> str:
+    match = re.search(pattern, text)
+    return match.group(1) if match else default
+
+
+def _flashcard(rng: random.Random, language: str, used: set) -> Dict[str, Any]:
+    concept = rng.choice(_CONCEPTS)
+    word = f"{concept}-{language[:2].lower()}{rng.randrange(10_000):04d}"
+    while word in used:
+        word = f"{concept}-{language[:2].lower()}{rng.randrange(10_000):04d}"
+    used.add(word)
+
+    distractors = rng.sample([c for c in _CONCEPTS if c != concept], 3)
+    correct_index = rng.randrange(4)
+    options = [f"a {c}" for c in distractors]
+    options.insert(correct_index, f"a {concept}")
+    return {
+        "word": word,
+        "definition": f"a {concept}",
+        "example_sentence": f"This is my {word}.",
+        "options": options,
+        "correct_option_index": correct_index,
+        "image_prompt": f"a simple {concept} on a white background",
+    }
+
+
+def _checker(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    return {"is_valid": True, "issues": [], "suggested_fix": None}
+
+
+def _secondary_validation(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "is_approved": True,
+        "confidence_score": round(0.8 + 0.2 * rng.random(), 2),
+        "validation_details": {
+            key: "ok" for key in (
+                "accuracy", "educational_value", "cultural_sensitivity",
+                "difficulty_match", "pedagogical_quality", "safety",
+            )
+        },
+        "critical_issues": [],
+        "recommendations": [],
+        "improved_version": None,
+    }
+
+
+def _flashcard_single(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    return _flashcard(rng, _search(r"learning (\w+)", prompt, "fake"), set())
+
+
+def _flashcard_batch(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    count = int(_search(r"Generate (\d+)", prompt, "1"))
+    language = _search(r"learning (\w+)", prompt, "fake")
+    used: set = set()
+    return {"flashcards": [_flashcard(rng, language, used) for _ in range(count)]}
+
+
+def _grammar_question(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    concept = rng.choice(_CONCEPTS)
+    correct_index = rng.randrange(4)
+    return {
+        "question_text": f"Which form completes the sentence about the {concept}? ___",
+        "options": ["form A", "form B", "form C", "form D"],
+        "correct_option_index": correct_index,
+        "explanation": f"Form {'ABCD'[correct_index]} agrees with the subject.",
+    }
+
+
+def _writing_feedback(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    text = _search(r"<student_text>\s*(.*?)\s*</student_text>", prompt, "").strip()
+    return {
+        "corrected_text": text,
+        "overall_comment": "Clear and well organised. Watch your verb endings.",
+        "inline_explanation": None,
+        "score": float(rng.randrange(60, 101)),
+    }
+
+
+def _conversation_correction(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    return {"corrected_message": None, "tips": "Try using a longer sentence next time."}
+
+
+def _pronunciation_analysis(prompt: str, rng: random.Random) -> Dict[str, Any]:
+    phrase = _search(r'trying to say: "(.*?)"', prompt, "")
+    return {
+        "transcript": phrase,
+        "confidence": round(0.7 + 0.3 * rng.random(), 2),
+        "score": float(rng.randrange(60, 101)),
+        "feedback": "Good rhythm; keep your vowels short.",
+        "word_level_feedback": [],
+    }
+
+
+# Templates per structured-output schema name (the json_schema "name" sent by the client)
+_STRUCTURED_TEMPLATES: Dict[str, Callable[[str, random.Random], Dict[str, Any]]] = {
+    "CheckerOutput": _checker,
+    "SecondaryValidationOutput": _secondary_validation,
+    "FlashcardOutput": _flashcard_single,
+    "FlashcardBatchOutput": _flashcard_batch,
+    "GrammarQuestionOutput": _grammar_question,
+    "WritingFeedbackOutput": _writing_feedback,
+    "ConversationCorrectionOutput": _conversation_correction,
+    "PronunciationAnalysisOutput": _pronunciation_analysis,
+}
+
+
+def _example_from_schema(node: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """Minimal valid instance of a JSON schema, for schemas without a template."""
+    if "$ref" in node:
+        node = defs[node["$ref"].split("/")[-1]]
+    if "default" in node:
+        return node["default"]
+    if "anyOf" in node:
+        return _example_from_schema(node["anyOf"][0], defs)
+
+    kind = node.get("type")
+    if kind == "object":
+        return {name: _example_from_schema(prop, defs) for name, prop in node.get("properties", {}).items()}
+    if kind == "array":
+        return [_example_from_schema(node.get("items", {}), defs)]
+    return {"string": "fake", "integer": 0, "number": 0.5, "boolean": True, "null": None}.get(kind, "fake")
+
+
+def fake_completion_text(messages: List[Dict[str, str]], response_format: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Deterministic completion for a chat request.
+
+    Args:
+        messages: Chat messages as sent by the client
+        response_format: OpenAI response_format, if structured output was requested
+
+    Returns:
+        JSON text for structured requests, otherwise a short templated reply
+    """
+    prompt = "\n\n".join(message.get("content") or "" for message in messages)
+    json_schema = (response_format or {}).get("json_schema") or {}
+    name = json_schema.get("name", "")
+    rng = random.Random(_seed_for(name, prompt))
+
+    if name in _STRUCTURED_TEMPLATES:
+        return json.dumps(_STRUCTURED_TEMPLATES[name](prompt, rng))
+    if json_schema.get("schema"):
+        schema = json_schema["schema"]
+        return json.dumps(_example_from_schema(schema, schema.get("$defs", {})))
+    if (response_format or {}).get("type") == "json_object":
+        return "{}"
+
+    if "Respond ONLY with a number" in prompt:
+        return str(rng.randrange(50, 101))
+    if "pronunciation practice" in prompt:
+        return rng.choice(_PHRASES)
+    if "visual image description" in prompt:
+        return f"a simple {rng.choice(_CONCEPTS)} on a white background"
+    return rng.choice(_REPLIES)
+
+
+class _FakeEventStream(httpx.AsyncByteStream):
+    """SSE body that releases chunks with a delay between them."""
+
+    def __init__(self, events: List[Dict[str, Any]], delay: float, sleep: Callable[[float], Awaitable[None]]):
+        self._events = events
+        self._delay = delay
+        self._sleep = sleep
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for index, event in enumerate(self._events):
+            if index and self._delay > 0:
+                await self._sleep(self._delay)
+            yield f"data: {json.dumps(event)}\n\n".encode("utf-8")
+        yield b"data: [DONE]\n\n"
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakeProviderTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that answers AI provider requests locally.
+
+    Every request first waits for a latency sampled from the configured
+    distribution, then may be failed with a 429 (with Retry-After) or a 503
+    according to rate_limit_rate and error_rate. Latency and failures come
+    from one RNG seeded with seed, so a run with a fixed request order is
+    reproducible.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        distribution: str = "lognormal",
+        spread: float = 0.5,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_seconds: float = 1.0,
+        stream_chunk_ms: float = 20.0,
+        seed: int = 0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.spread = spread
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.stream_chunk_ms = stream_chunk_ms
+        self._rng = random.Random(seed)
+        self._sleep = sleep
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    def sample_latency(self) -> float:
+        """Latency for one request in seconds; latency_ms is the median."""
+        median = self.latency_ms / 1000
+        if self.distribution == "fixed" or self.spread <= 0:
+            return median
+        if self.distribution == "uniform":
+            value = self._rng.uniform(median * (1 - self.spread), median * (1 + self.spread))
+        elif self.distribution == "normal":
+            value = self._rng.gauss(median, median * self.spread)
+        else:
+            value = median * math.exp(self._rng.gauss(0.0, self.spread))
+        return max(0.0, value)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats["requests"] += 1
+        await self._sleep(self.sample_latency())
+
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return httpx.Response(
+                429,
+                headers={"Retry-After": str(self.retry_after_seconds)},
+                json={"error": {"message": "Rate limit exceeded (fake provider)", "code": 429}},
+                request=request
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.stats["errors"] += 1
+            return httpx.Response(
+                503,
+                json={"error": {"message": "Service unavailable (fake provider)", "code": 503}},
+                request=request
+            )
+
+        path = request.url.path
+        if path.endswith("/chat/completions"):
+            body = json.loads(await request.aread())
+            return self._chat_completion(request, body)
+        if path.endswith("/audio/transcriptions"):
+            return httpx.Response(200, json={"text": "fake transcript"}, request=request)
+        if path.endswith("/images/generations"):
+            return httpx.Response(200, json={"data": [{"b64_json": FAKE_IMAGE_B64}]}, request=request)
+        if path.endswith("/models"):
+            return httpx.Response(200, json={"data": [{"id": FAKE_MODEL}]}, request=request)
+        return httpx.Response(404, json={"error": {"message": f"Unknown fake endpoint: {path}"}}, request=request)
+
+    def _chat_completion(self, request: httpx.Request, body: Dict[str, Any]) -> httpx.Response:
+        messages = body.get("messages") or []
+        text = fake_completion_text(messages, body.get("response_format"))
+        usage = {
+            "prompt_tokens": estimate_tokens(*(message.get("content") or "" for message in messages)),
+            "completion_tokens": estimate_tokens(text),
+        }
+
+        if not body.get("stream"):
+            return httpx.Response(
+                200,
+                json={
+                    "model": body.get("model", FAKE_MODEL),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                    "usage": usage,
+                },
+                request=request
+            )
+
+        # One chunk per word, then a usage-only chunk like OpenAI's include_usage
+        words = re.findall(r"\S+\s*", text) or [text]
+        events: List[Dict[str, Any]] = [{"choices": [{"index": 0, "delta": {"content": word}}]} for word in words]
+        events.append({"choices": [], "usage": usage})
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "text/event-stream"},
+            stream=_FakeEventStream(events, self.stream_chunk_ms / 1000, self._sleep),
+            request=request
+        )
+
+    async def aclose(self) -> None:
+        # Shared by every fake client; closing one client must not affect the others
+        pass
+
+
+_transport: Optional[FakeProviderTransport] = None
+
+
+def get_fake_transport() -> FakeProviderTransport:
+    """Get or create the process-wide fake transport from settings."""
+    global _transport
+    if _transport is None:
+        _transport = FakeProviderTransport(
+            latency_ms=settings.FAKE_PROVIDER_LATENCY_MS,
+            distribution=settings.FAKE_PROVIDER_LATENCY_DISTRIBUTION,
+            spread=settings.FAKE_PROVIDER_LATENCY_SPREAD,
+            error_rate=settings.FAKE_PROVIDER_ERROR_RATE,
+            rate_limit_rate=settings.FAKE_PROVIDER_RATE_LIMIT_RATE,
+            retry_after_seconds=settings.FAKE_PROVIDER_RETRY_AFTER_SECONDS,
+            stream_chunk_ms=settings.FAKE_PROVIDER_STREAM_CHUNK_MS,
+            seed=settings.FAKE_PROVIDER_SEED
+        )
+    return _transport
+
+
+def reset_fake_transport() -> None:
+    """Drop the fake transport so the next client picks up changed settings."""
+    global _transport
+    _transport = None
+
+
+def get_fake_provider_stats() -> Optional[Dict[str, int]]:
+    """Counters for the fake transport, or None if no fake client was created."""
+    return dict(_transport.stats) if _transport is not None else None
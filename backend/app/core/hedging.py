@@ -0,0 +1,200 @@
+"""Hedged requests and jittered retries for cutting upstream tail latency."""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class LatencyWindow:
+    """Rolling window of recent request latencies (in seconds)."""
+
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile of the window, or None if it is empty."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+class RequestHedger:
+    """
+    Fire a duplicate request when the first one is slower than usual.
+
+    The hedge delay is the configured percentile of recent successful
+    latencies (never below min_delay_seconds). The first successful response
+    wins and the other request is cancelled. Hedges are rate-capped with a
+    budget that grows by max_rate per request, so at most roughly that
+    fraction of requests is ever duplicated.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = False,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        min_delay_seconds: float = 1.0,
+        max_rate: float = 0.1,
+        window_size: int = 200
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay_seconds = min_delay_seconds
+        self.max_rate = max_rate
+        self.latencies = LatencyWindow(window_size)
+        # Start with one hedge available; the budget never banks more than a few
+        self._budget = 1.0
+        self._max_budget = max(1.0, max_rate * 10)
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "retries": 0}
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if hedging is off or untrained."""
+        if not self.enabled or len(self.latencies) < self.min_samples:
+            return None
+        return max(self.min_delay_seconds, self.latencies.percentile(self.percentile))
+
+    async def run(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func, hedging with a second call if the first is slow.
+
+        Args:
+            func: Zero-argument coroutine factory performing one request
+
+        Returns:
+            The result of whichever call succeeds first
+
+        Raises:
+            Exception: The primary call's error if every attempt fails
+        """
+        self.stats["requests"] += 1
+        self._budget = min(self._max_budget, self._budget + self.max_rate)
+        delay = self.hedge_delay()
+        started_at = time.perf_counter()
+
+        if delay is None:
+            result = await func()
+            self.latencies.record(time.perf_counter() - started_at)
+            return result
+
+        primary = asyncio.ensure_future(func())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._budget >= 1.0:
+                self._budget -= 1.0
+                self.stats["hedged"] += 1
+                tasks.append(asyncio.ensure_future(func()))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.stats["hedge_wins"] += 1
+                        self.latencies.record(time.perf_counter() - started_at)
+                        return task.result()
+
+            raise primary.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Mark the losing call's error as retrieved
+                    task.exception()
+
+    def record_retry(self, error: Exception) -> None:
+        """Count a retry of a transient error (used as retry_with_jitter's on_retry)."""
+        self.stats["retries"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus the current hedge delay."""
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "samples": len(self.latencies),
+            "hedge_delay_seconds": self.hedge_delay(),
+        }
+
+
+async def retry_with_jitter(
+    func: Callable[[], Awaitable[T]],
+    *,
+    retries: int,
+    base_delay: float,
+    max_delay: float,
+    is_retryable: Callable[[Exception], bool],
+    on_retry: Optional[Callable[[Exception], None]] = None
+) -> T:
+    """
+    Call func, retrying retryable errors with full-jitter exponential backoff.
+
+    Args:
+        func: Zero-argument coroutine factory performing one attempt
+        retries: Maximum number of retries after the first attempt
+        base_delay: Backoff ceiling for the first retry (doubles each retry)
+        max_delay: Upper bound on any single backoff
+        is_retryable: Decides whether an exception is transient
+        on_retry: Optional callback invoked before each retry
+
+    Returns:
+        The first successful result
+    """
+    attempt = 0
+    while True:
+        try:
+            return await func()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            if on_retry:
+                on_retry(e)
+            await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * (2 ** attempt))))
+            attempt += 1
+
+
+_hedgers: Dict[str, RequestHedger] = {}
+
+
+def get_request_hedger(provider: str) -> RequestHedger:
+    """Get or create the hedger for a provider from current settings."""
+    provider = provider.lower()
+    if provider not in _hedgers:
+        _hedgers[provider] = RequestHedger(
+            name=provider,
+            enabled=settings.LLM_HEDGING_ENABLED,
+            percentile=settings.LLM_HEDGE_PERCENTILE,
+            min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+            min_delay_seconds=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+            max_rate=settings.LLM_HEDGE_MAX_RATE
+        )
+    return _hedgers[provider]
+
+
+def reset_request_hedgers() -> None:
+    """Drop all hedgers so new settings take effect."""
+    _hedgers.clear()
+
+
+def get_hedging_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every provider hedger, keyed by provider name."""
+    return {name: hedger.snapshot() for name, hedger in _hedgers.items()}
@@ -0,0 +1,272 @@
+"""Shared outbound HTTP connection pool for all AI provider clients."""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.fake_provider import get_fake_transport
+from app.core.llm_usage import mark_first_byte_hook
+
+logger = logging.getLogger(__name__)
+
+HostKey = Tuple[bytes, bytes, Optional[int]]
+
+
+class _HostSlots:
+    """FIFO counter limiting concurrent requests to one host."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        while self.in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Woken then cancelled: pass the wakeup on so a free slot isn't left idle
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_next(exclude=waiter)
+                raise
+            finally:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake_next()
+
+    def _wake_next(self, exclude: Optional[asyncio.Future] = None) -> None:
+        for waiter in self._waiters:
+            if waiter is not exclude and not waiter.done():
+                waiter.set_result(None)
+                return
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body wrapper that frees the host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, slots: _HostSlots):
+        self._stream = stream
+        self._slots = slots
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._slots.release()
+
+
+class _PooledTransport(httpx.AsyncBaseTransport):
+    """
+    Per-client view of the shared pool.
+
+    Closing a client only closes this view; the sockets belong to the
+    OutboundPool and are closed when the pool itself is closed.
+    """
+
+    def __init__(self, pool: "OutboundPool"):
+        self._pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class OutboundPool:
+    """
+    One tuned connection pool shared by every outbound AI client.
+
+    Provides pool limits, keep-alive expiry, optional HTTP/2, a per-host
+    concurrency cap and a single SSL context (CA bundle loaded once).
+    Connection reuse is measured through httpx's trace extension.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        max_connections_per_host: int = 20
+    ):
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1")
+                http2 = False
+
+        self.http2 = http2
+        self.max_connections_per_host = max_connections_per_host
+        self.ssl_context = httpx.create_ssl_context()
+        self.transport = httpx.AsyncHTTPTransport(
+            verify=self.ssl_context,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+        self._hosts: Dict[HostKey, _HostSlots] = {}
+        self.closed = False
+        self.stats = {
+            "requests": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+            "tls_handshakes": 0,
+            "errors": 0,
+        }
+
+    def client(self, timeout: float = 30.0) -> httpx.AsyncClient:
+        """Create a lightweight AsyncClient that sends through this pool."""
+        return httpx.AsyncClient(
+            transport=_PooledTransport(self),
+            timeout=timeout,
+            # Response hooks run once headers arrive, which is the call's time to first byte
+            event_hooks={"response": [mark_first_byte_hook]}
+        )
+
+    def _host_slots(self, url: httpx.URL) -> _HostSlots:
+        key = (url.raw_scheme, url.raw_host, url.port)
+        if key not in self._hosts:
+            self._hosts[key] = _HostSlots(self.max_connections_per_host)
+        return self._hosts[key]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slots = self._host_slots(request.url)
+        await slots.acquire()
+
+        opened = {"connect": False}
+        outer_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.started":
+                opened["connect"] = True
+            elif event_name == "connection.start_tls.started":
+                self.stats["tls_handshakes"] += 1
+            if outer_trace is not None:
+                await outer_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        self.stats["requests"] += 1
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException as e:
+            # Cancellation (hedge losers, pipeline siblings, SSE disconnects) must free the slot too
+            if isinstance(e, Exception):
+                self.stats["errors"] += 1
+            slots.release()
+            raise
+        finally:
+            key = "new_connections" if opened["connect"] else "reused_connections"
+            self.stats[key] += 1
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, slots),
+            extensions=response.extensions
+        )
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        self.closed = True
+        await self.transport.aclose()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Reuse counters and current per-host load."""
+        handled = self.stats["new_connections"] + self.stats["reused_connections"]
+        return {
+            **self.stats,
+            "reuse_ratio": self.stats["reused_connections"] / handled if handled else 0.0,
+            "http2": self.http2,
+            "hosts_in_flight": {
+                host.decode("ascii", "replace"): slots.in_flight
+                for (_, host, _), slots in self._hosts.items()
+                if slots.in_flight
+            },
+        }
+
+
+_pool: Optional[OutboundPool] = None
+
+
+def get_outbound_pool() -> OutboundPool:
+    """Get or create the process-wide outbound pool from settings."""
+    global _pool
+    if _pool is None or _pool.closed:
+        _pool = OutboundPool(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            http2=settings.HTTP2_ENABLED,
+            max_connections_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        )
+    return _pool
+
+
+def get_http_client(timeout: float = 30.0, provider: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    Get an AsyncClient backed by the shared pool.
+
+    Clients for the "fake" provider send to the in-process fake transport
+    instead (see app.core.fake_provider) and never touch the network.
+    """
+    if provider == "fake":
+        return httpx.AsyncClient(
+            transport=get_fake_transport(),
+            timeout=timeout,
+            event_hooks={"response": [mark_first_byte_hook]}
+        )
+    return get_outbound_pool().client(timeout=timeout)
+
+
+def close_client_soon(client: Any) -> None:
+    """
+    Close a replaced service client without blocking a sync reset_* call.
+
+    Schedules client.close() on the running loop; with no loop running the
+    client holds no sockets of its own, so there is nothing to release.
+    """
+    if client is None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.create_task(client.close())
+
+
+async def close_outbound_pool() -> None:
+    """Close the shared pool (application shutdown)."""
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
+
+
+def get_http_pool_stats() -> Optional[Dict[str, Any]]:
+    """Stats for the shared pool, or None if it has not been created yet."""
+    return _pool.snapshot() if _pool is not None else None
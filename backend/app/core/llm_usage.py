@@ -0,0 +1,279 @@
+"""Per-call token, latency and cost accounting for upstream AI calls."""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Who a call is made for: module, stage and user_id, set by the services
+_usage_tags: ContextVar[Dict[str, Optional[str]]] = ContextVar("llm_usage_tags", default={})
+# The call currently being measured, so provider code deep in the stack can add usage
+_current_call: ContextVar[Optional["AICall"]] = ContextVar("llm_usage_call", default=None)
+
+
+@contextmanager
+def llm_usage_scope(
+    *,
+    module: Optional[str] = None,
+    stage: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> Iterator[None]:
+    """
+    Tag every AI call made inside the block (including tasks it starts).
+
+    Tags not given are inherited from the enclosing scope, so a service can
+    set module and user once and inner helpers only override the stage.
+    """
+    tags = dict(_usage_tags.get())
+    for key, value in (("module", module), ("stage", stage), ("user_id", user_id)):
+        if value is not None:
+            tags[key] = value
+    token = _usage_tags.set(tags)
+    try:
+        yield
+    finally:
+        _usage_tags.reset(token)
+
+
+class AICall:
+    """Measurements for one logical upstream call (retries and hedges included)."""
+
+    def __init__(self, service: str, provider: str, model: str, stage: Optional[str] = None):
+        tags = _usage_tags.get()
+        self.service = service
+        self.provider = provider
+        self.model = model
+        self.module = tags.get("module")
+        self.stage = stage or tags.get("stage") or "generate"
+        self.user_id = tags.get("user_id")
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.retries = 0
+        self.cached = False
+        self.success = True
+        self.ttfb_seconds: Optional[float] = None
+        self.latency_seconds = 0.0
+        self._started_at = time.perf_counter()
+        self._finished = False
+
+    def add_usage(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> None:
+        """Add provider-reported token counts."""
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+
+    def mark_first_byte(self) -> None:
+        """Record time to first byte (only the first response counts)."""
+        if self.ttfb_seconds is None:
+            self.ttfb_seconds = time.perf_counter() - self._started_at
+
+    def record_retry(self, error: Optional[Exception] = None) -> None:
+        """Count one retry (signature matches retry_with_jitter's on_retry)."""
+        self.retries += 1
+
+    def finish(self, success: Optional[bool] = None) -> None:
+        """Stop the clock and hand the call to the usage recorder."""
+        if self._finished:
+            return
+        self._finished = True
+        if success is not None:
+            self.success = success
+        self.latency_seconds = time.perf_counter() - self._started_at
+        if settings.LLM_USAGE_ENABLED:
+            get_usage_recorder().record(self)
+
+
+@contextmanager
+def track_ai_call(service: str, provider: str, model: str, stage: Optional[str] = None) -> Iterator[AICall]:
+    """
+    Measure one upstream call; exceptions leaving the block mark it failed.
+
+    Not for use inside async generators: the current call is kept in a
+    context variable, which must be reset in the context that set it.
+    Streaming code creates an AICall and calls finish() itself.
+    """
+    call = AICall(service, provider, model, stage)
+    token = _current_call.set(call)
+    try:
+        yield call
+    except BaseException:
+        call.success = False
+        raise
+    finally:
+        _current_call.reset(token)
+        call.finish()
+
+
+def current_ai_call() -> Optional[AICall]:
+    """The call being measured in this context, if any."""
+    return _current_call.get()
+
+
+async def mark_first_byte_hook(response: Any) -> None:
+    """httpx response event hook: headers have arrived for the current call."""
+    call = _current_call.get()
+    if call is not None:
+        call.mark_first_byte()
+
+
+def gemini_usage(data: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt, completion) tokens from a Gemini response's usageMetadata."""
+    usage = data.get("usageMetadata") or {}
+    return usage.get("promptTokenCount"), usage.get("candidatesTokenCount")
+
+
+def openai_usage(data: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt, completion) tokens from an OpenAI-compatible response's usage."""
+    usage = data.get("usage") or {}
+    return usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, calls: int = 1) -> float:
+    """
+    Cost in USD from LLM_PRICING, keyed by model name.
+
+    Each entry may give input_per_million, output_per_million and per_call
+    (the latter for image generation); unknown models cost 0.
+    """
+    price = settings.LLM_PRICING.get(model) or {}
+    return (
+        prompt_tokens * price.get("input_per_million", 0.0) / 1_000_000 +
+        completion_tokens * price.get("output_per_million", 0.0) / 1_000_000 +
+        calls * price.get("per_call", 0.0)
+    )
+
+
+class UsageRecorder:
+    """
+    Buffers finished calls and writes them to the llm_usage table in batches.
+
+    A batch is due once it reaches flush_size rows or flush_interval seconds
+    have passed since the last flush; it is then written by a background
+    task on the async engine, so the call that filled it doesn't wait for
+    the insert. Rows still buffered when the process dies are lost, which
+    is acceptable for accounting data.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = 50,
+        flush_interval_seconds: float = 10.0,
+        session_factory: Optional[Callable[[], Any]] = None,
+        max_buffer: int = 5000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.flush_size = flush_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.session_factory = session_factory
+        self.max_buffer = max_buffer
+        self._clock = clock
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = clock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"recorded": 0, "flushed": 0, "dropped": 0}
+
+    def record(self, call: AICall) -> None:
+        """Queue a finished call and start a background flush if the batch is due."""
+        if len(self._buffer) >= self.max_buffer:
+            self.stats["dropped"] += 1
+            return
+        self._buffer.append({
+            "service": call.service,
+            "provider": call.provider,
+            "model": call.model,
+            "module": call.module,
+            "stage": call.stage,
+            "user_id": call.user_id,
+            "prompt_tokens": call.prompt_tokens,
+            "completion_tokens": call.completion_tokens,
+            "latency_ms": call.latency_seconds * 1000,
+            "ttfb_ms": call.ttfb_seconds * 1000 if call.ttfb_seconds is not None else None,
+            "retries": call.retries,
+            "cached": call.cached,
+            "success": call.success,
+            "cost_usd": 0.0 if call.cached else estimate_cost(call.model, call.prompt_tokens, call.completion_tokens),
+            "created_at": datetime.utcnow(),
+        })
+        self.stats["recorded"] += 1
+        if (len(self._buffer) >= self.flush_size or
+                self._clock() - self._last_flush >= self.flush_interval_seconds):
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (sync scripts): the rows wait for the next flush
+            return
+        self._flush_task = loop.create_task(self.flush())
+
+    async def drain(self) -> None:
+        """Wait for a background flush in progress, if any."""
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+
+    async def flush(self) -> int:
+        """Write buffered rows in one transaction. Returns the number written."""
+        self._last_flush = self._clock()
+        if not self._buffer:
+            return 0
+
+        rows, self._buffer = self._buffer, []
+        # Imported here so the core package does not pull in the DB layer at import time
+        from sqlalchemy import insert
+        from app.db.models import LLMUsageRecord
+        if self.session_factory is None:
+            from app.db.database import AsyncSessionLocal
+            self.session_factory = AsyncSessionLocal
+
+        try:
+            async with self.session_factory() as db:
+                await db.execute(insert(LLMUsageRecord), rows)
+                await db.commit()
+        except Exception as e:
+            self.stats["dropped"] += len(rows)
+            logger.warning("Dropping %d LLM usage rows: %s", len(rows), e)
+            return 0
+
+        self.stats["flushed"] += len(rows)
+        return len(rows)
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+
+_recorder: Optional[UsageRecorder] = None
+
+
+def get_usage_recorder() -> UsageRecorder:
+    """Get or create the process-wide usage recorder from settings."""
+    global _recorder
+    if _recorder is None:
+        _recorder = UsageRecorder(
+            flush_size=settings.LLM_USAGE_FLUSH_SIZE,
+            flush_interval_seconds=settings.LLM_USAGE_FLUSH_INTERVAL_SECONDS
+        )
+    return _recorder
+
+
+def reset_usage_recorder(recorder: Optional[UsageRecorder] = None) -> None:
+    """Replace the global usage recorder (config changes, tests)."""
+    global _recorder
+    _recorder = recorder
+
+
+async def flush_usage_recorder() -> int:
+    """Write any buffered usage rows (call before reporting and at shutdown)."""
+    if _recorder is None:
+        return 0
+    await _recorder.drain()
+    return await _recorder.flush()
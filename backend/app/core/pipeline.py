@@ -0,0 +1,151 @@
+"""Dependency-graph executor for multi-stage content generation pipelines."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class PipelineError(Exception):
+    """Raised when a pipeline graph is malformed."""
+    pass
+
+
+class Stage:
+    """A single named step in a pipeline and the stages it waits for."""
+
+    def __init__(self, name: str, func: StageFunc, depends_on: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+class PipelineResult:
+    """Stage outputs plus per-stage wall-clock timings (in seconds)."""
+
+    def __init__(self, name: str, results: Dict[str, Any], timings: Dict[str, float], total_seconds: float):
+        self.name = name
+        self.results = results
+        self.timings = timings
+        self.total_seconds = total_seconds
+
+    def __getitem__(self, stage_name: str) -> Any:
+        return self.results[stage_name]
+
+
+class Pipeline:
+    """
+    Run async stages as a dependency graph.
+
+    Each stage is started as soon as every stage it depends on has finished,
+    so independent branches run concurrently on the event loop. A stage
+    function receives a dict holding the initial inputs and the results of
+    all stages completed so far, and returns its own result.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+
+    def add_stage(self, name: str, func: StageFunc, depends_on: Iterable[str] = ()) -> "Pipeline":
+        """Register a stage. Returns the pipeline so calls can be chained."""
+        if name in self.stages:
+            raise PipelineError(f"Duplicate stage '{name}' in pipeline '{self.name}'")
+        self.stages[name] = Stage(name, func, depends_on)
+        return self
+
+    def _validate(self, inputs: Dict[str, Any]) -> None:
+        for stage in self.stages.values():
+            if stage.name in inputs:
+                raise PipelineError(f"Stage '{stage.name}' shadows a pipeline input of the same name")
+            for dep in stage.depends_on:
+                if dep not in self.stages and dep not in inputs:
+                    raise PipelineError(f"Stage '{stage.name}' depends on unknown stage '{dep}'")
+
+        # Detect cycles with a simple DFS over stage dependencies
+        visiting, done = set(), set()
+
+        def visit(name: str) -> None:
+            if name in done or name not in self.stages:
+                return
+            if name in visiting:
+                raise PipelineError(f"Cycle detected in pipeline '{self.name}' at stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for stage_name in self.stages:
+            visit(stage_name)
+
+    async def run(self, inputs: Optional[Dict[str, Any]] = None) -> PipelineResult:
+        """
+        Execute all stages and return their results and timings.
+
+        Args:
+            inputs: Initial values made available to every stage
+
+        Returns:
+            PipelineResult with each stage's output and duration
+
+        Raises:
+            PipelineError: If the graph references unknown stages or has a cycle
+            Exception: The first exception raised by any stage (others are cancelled)
+        """
+        context: Dict[str, Any] = dict(inputs or {})
+        self._validate(context)
+
+        timings: Dict[str, float] = {}
+        pending = dict(self.stages)
+        running: Dict[asyncio.Task, str] = {}
+        started_at = time.perf_counter()
+
+        async def run_stage(stage: Stage) -> Any:
+            stage_start = time.perf_counter()
+            try:
+                return await stage.func(context)
+            finally:
+                timings[stage.name] = time.perf_counter() - stage_start
+
+        def launch_ready() -> None:
+            ready: List[str] = [
+                name for name, stage in pending.items()
+                if all(dep in context for dep in stage.depends_on)
+            ]
+            for name in ready:
+                stage = pending.pop(name)
+                running[asyncio.create_task(run_stage(stage))] = name
+
+        try:
+            launch_ready()
+            while running:
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    context[name] = task.result()
+                launch_ready()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+        total = time.perf_counter() - started_at
+        logger.info(
+            "Pipeline %s finished in %.3fs (%s)",
+            self.name,
+            total,
+            ", ".join(f"{name}={seconds:.3f}s" for name, seconds in timings.items())
+        )
+
+        return PipelineResult(
+            name=self.name,
+            results={name: context[name] for name in self.stages},
+            timings=timings,
+            total_seconds=total
+        )
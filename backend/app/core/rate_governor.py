@@ -0,0 +1,273 @@
+"""Provider-aware concurrency limiting and adaptive rate governing for upstream AI calls."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateGovernorTimeout(Exception):
+    """Raised when a request waits longer than the governor allows."""
+    pass
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, rate_per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.rate_per_second = rate_per_minute / 60.0
+        self._clock = clock
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate_per_second
+
+    def consume(self, amount: float) -> None:
+        """Take tokens out of the bucket (call only after wait_time returned 0)."""
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateGovernor:
+    """
+    Admission control for one upstream provider.
+
+    Combines three limits:
+    - an adaptive concurrency limit (AIMD: +1/limit per success, halved on 429)
+    - optional requests-per-minute and tokens-per-minute token buckets
+    - a pause window set from Retry-After when the provider rate-limits us
+
+    Callers wait in FIFO order for a slot and give up after max_wait_seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        rpm: int = 0,
+        tpm: int = 0,
+        min_concurrency: int = 1,
+        max_wait_seconds: float = 30.0,
+        default_backoff_seconds: float = 2.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.max_wait_seconds = max_wait_seconds
+        self.default_backoff_seconds = default_backoff_seconds
+        self._clock = clock
+
+        self.request_bucket = TokenBucket(rpm, clock) if rpm > 0 else None
+        self.token_bucket = TokenBucket(tpm, clock) if tpm > 0 else None
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.stats = {
+            "admitted": 0,
+            "rate_limited": 0,
+            "timeouts": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers currently waiting for admission."""
+        return len(self._waiters)
+
+    def _admission_delay(self, tokens: int) -> Optional[float]:
+        """
+        Seconds to wait before the next admission attempt.
+
+        Returns 0 (and consumes bucket tokens) when the caller may proceed now,
+        or None when it must wait for another request to finish.
+        """
+        now = self._clock()
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        if self.in_flight >= int(self.limit):
+            return None
+
+        delays = [0.0]
+        if self.request_bucket:
+            delays.append(self.request_bucket.wait_time(1))
+        if self.token_bucket and tokens:
+            delays.append(self.token_bucket.wait_time(tokens))
+        delay = max(delays)
+        if delay > 0:
+            return delay
+
+        if self.request_bucket:
+            self.request_bucket.consume(1)
+        if self.token_bucket and tokens:
+            self.token_bucket.consume(tokens)
+        return 0.0
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until a request may be sent upstream.
+
+        Args:
+            tokens: Estimated tokens the request will consume (for the TPM bucket)
+
+        Raises:
+            RateGovernorTimeout: If admission takes longer than max_wait_seconds
+        """
+        started_at = self._clock()
+        deadline = started_at + self.max_wait_seconds
+
+        # Queue behind existing waiters so admission stays roughly FIFO
+        must_queue = bool(self._waiters)
+        while True:
+            delay = None if must_queue else self._admission_delay(tokens)
+            must_queue = False
+            if delay == 0:
+                break
+
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                self.stats["timeouts"] += 1
+                self._wake_next()
+                raise RateGovernorTimeout(
+                    f"Timed out after {self.max_wait_seconds:.0f}s waiting for {self.name} capacity"
+                )
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                timeout = remaining if delay is None else min(delay, remaining)
+                await asyncio.wait_for(asyncio.shield(waiter), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                # Woken then cancelled: pass the wakeup on so free capacity isn't left idle
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_next()
+                raise
+            finally:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+
+        self.in_flight += 1
+        waited = self._clock() - started_at
+        self.stats["admitted"] += 1
+        self.stats["total_wait_seconds"] += waited
+        self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+
+        # More capacity may still be free (e.g. after the limit grew); let the next waiter try
+        if self.in_flight < int(self.limit):
+            self._wake_next()
+
+    def release(self) -> None:
+        """Return a concurrency slot and wake the next waiter."""
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def record_success(self) -> None:
+        """Additive increase: grow the concurrency limit by roughly one per window."""
+        self.limit = min(float(self.max_concurrency), self.limit + 1.0 / max(self.limit, 1.0))
+
+    def record_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Multiplicative decrease plus a pause honouring the provider's Retry-After."""
+        self.stats["rate_limited"] += 1
+        self.limit = max(float(self.min_concurrency), self.limit / 2.0)
+        backoff = retry_after if retry_after is not None else self.default_backoff_seconds
+        self.paused_until = max(self.paused_until, self._clock() + backoff)
+        logger.warning(
+            "Provider %s rate-limited us; concurrency limit now %.1f, pausing %.1fs",
+            self.name, self.limit, backoff
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limits, queue depth and wait statistics."""
+        admitted = self.stats["admitted"]
+        return {
+            **self.stats,
+            "limit": round(self.limit, 2),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "paused_for_seconds": max(0.0, self.paused_until - self._clock()),
+            "avg_wait_seconds": self.stats["total_wait_seconds"] / admitted if admitted else 0.0,
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token estimate (~4 characters per token) for budgeting."""
+    return sum(len(text) for text in texts if text) // 4 + 1
+
+
+_governors: Dict[str, RateGovernor] = {}
+
+
+def get_rate_governor(provider: str) -> RateGovernor:
+    """Get or create the governor for a provider, applying LLM_PROVIDER_LIMITS overrides."""
+    provider = provider.lower()
+    if provider not in _governors:
+        overrides = (settings.LLM_PROVIDER_LIMITS or {}).get(provider, {})
+        _governors[provider] = RateGovernor(
+            name=provider,
+            max_concurrency=int(overrides.get("max_concurrency", settings.LLM_MAX_CONCURRENCY)),
+            rpm=int(overrides.get("rpm", settings.LLM_RPM_LIMIT)),
+            tpm=int(overrides.get("tpm", settings.LLM_TPM_LIMIT)),
+            max_wait_seconds=float(overrides.get("max_wait_seconds", settings.LLM_GOVERNOR_MAX_WAIT_SECONDS)),
+            default_backoff_seconds=settings.LLM_RATE_LIMIT_BACKOFF_SECONDS
+        )
+    return _governors[provider]
+
+
+def reset_rate_governors() -> None:
+    """Drop all governors so new limits from settings take effect."""
+    _governors.clear()
+
+
+def get_rate_governor_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every provider governor, keyed by provider name."""
+    return {name: governor.snapshot() for name, governor in _governors.items()}
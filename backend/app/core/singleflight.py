@@ -0,0 +1,79 @@
+"""Single-flight coalescing of identical in-flight upstream requests."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls that share a key into one upstream request.
+
+    The first caller for a key (the leader) starts the request; callers that
+    arrive while it is still running await the same task and get the same
+    result or exception. Once the request finishes the key is forgotten, so
+    later calls start a fresh request.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.stats = {"calls": 0, "leaders": 0, "coalesced": 0}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run func once per key among concurrent callers.
+
+        Args:
+            key: Identity of the request (callers with equal keys share a result)
+            func: Zero-argument coroutine factory that performs the request
+
+        Returns:
+            The result of the shared request
+        """
+        self.stats["calls"] += 1
+
+        task = self._in_flight.get(key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["leaders"] += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+
+        # Shield so one caller's cancellation does not cancel the shared request
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve the exception so an unawaited failure is not logged as never retrieved
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct requests currently running."""
+        return len(self._in_flight)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus current in-flight count."""
+        return {**self.stats, "in_flight": self.in_flight}
+
+
+# One group per upstream client type
+_groups: Dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get or create the named single-flight group."""
+    if name not in _groups:
+        _groups[name] = SingleFlight(name)
+    return _groups[name]
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every single-flight group, keyed by group name."""
+    return {name: group.snapshot() for name, group in _groups.items()}
@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, delete, func, inspect, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -20,18 +22,88 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
+def async_database_url(url: str) -> str:
+    """
+    The same database addressed through an asyncio driver.
+
+    sqlite -> sqlite+aiosqlite, postgresql (any sync driver) -> postgresql+asyncpg.
+    URLs that already name an async driver are returned unchanged.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if backend in ("postgresql", "postgres"):
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    return url
+
+
+# Async engine used on the request path, so queries don't block the event
+# loop while other requests wait on LLM calls. The sync engine above is kept
+# for table creation and scripts.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    echo=settings.DEBUG
+)
+
+# expire_on_commit=False: attributes stay readable after commit without an
+# implicit (and, under asyncio, impossible) lazy reload
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+async def get_db():
     """
     Dependency function to get database session.
-    Yields a database session and ensures it's closed after use.
+    Yields an async database session and ensures it's closed after use.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
-    """Initialize database by creating all tables."""
-    Base.metadata.create_all(bind=engine)
+def _remove_duplicate_unlocks(connection) -> int:
+    """
+    Keep the first row of each (user, achievement) in user_achievements.
+
+    Unlocks were not idempotent before uq_user_achievement existed, so older
+    databases can hold duplicates that would stop the index from building.
+    """
+    table = Base.metadata.tables["user_achievements"]
+    first_unlocks = select(func.min(table.c.id)).group_by(table.c.user_id, table.c.achievement_id)
+    return connection.execute(delete(table).where(table.c.id.not_in(first_unlocks))).rowcount
+
+
+# Clean-up that must run before a unique index can be built on an existing table
+_BEFORE_UNIQUE_INDEX = {
+    "uq_user_achievement": _remove_duplicate_unlocks,
+}
+
+
+def init_db(bind=None):
+    """
+    Initialize database by creating all tables.
+
+    Raises:
+        Exception: A unique index could not be created; the app must not run without it
+    """
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+
+    # create_all skips tables that already exist; add indexes declared since
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspect(bind).get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                with bind.begin() as connection:
+                    prepare = _BEFORE_UNIQUE_INDEX.get(index.name)
+                    if prepare is not None:
+                        removed = prepare(connection)
+                        if removed:
+                            print(f"[WARNING] Removed {removed} duplicate rows before creating {index.name}")
+                    index.create(bind=connection)
+            except Exception as e:
+                if index.unique:
+                    raise
+                print(f"[WARNING] Could not create index {index.name}: {e}")
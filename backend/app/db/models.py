@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Float, Integer, Boolean, JSON, ForeignKey, Text, Index
+from sqlalchemy import Column, String, Date, DateTime, Float, Integer, Boolean, JSON, ForeignKey, Text, Index
 from sqlalchemy.sql import func
 from uuid import uuid4
 from app.db.database import Base
@@ -55,12 +55,12 @@ class UserProgress(Base):
 
 
 class ConversationSession(Base):
-    """Store conversation session data and chat history."""
+    """Store conversation session settings and the running summary; messages are in ConversationMessage."""
     __tablename__ = "conversation_sessions"
 
     id = Column(String, primary_key=True, default=get_uuid_str)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
-    context_json = Column(JSON, nullable=False, default=dict)
+    context_json = Column(JSON, nullable=False, default=dict)  # system_prompt, summary, summarized_count, topic, level
     target_language = Column(String, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
@@ -193,5 +193,105 @@ class UserAchievement(Base):
     is_viewed = Column(Boolean, default=False)  # For "NEW" badge
 
     __table_args__ = (
-        Index('idx_user_achievement', 'user_id', 'achievement_id'),
-    )
\ No newline at end of file
+        # One row per unlock; concurrent unlocks of the same achievement fail here
+        Index('uq_user_achievement', 'user_id', 'achievement_id', unique=True),
+    )
+
+
+class DailyActivity(Base):
+    """ContentLog rows per user, day and module, kept up to date as logs are written."""
+    __tablename__ = "daily_activity"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    activity_date = Column(Date, nullable=False)  # UTC day
+    module = Column(String, nullable=False)
+    activity_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Chart range scans per user; upserts target this key
+        Index('uq_daily_activity_user_date_module', 'user_id', 'activity_date', 'module', unique=True),
+    )
+
+
+class ConversationMessage(Base):
+    """One message of a conversation session; rows are only ever appended."""
+    __tablename__ = "conversation_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, ForeignKey("conversation_sessions.id"), nullable=False)
+    seq = Column(Integer, nullable=False)  # Position in the session, from 0
+    role = Column(String(20), nullable=False)  # "user" or "assistant"
+    content = Column(Text, nullable=False)
+    token_estimate = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # Keyset reads by seq; concurrent appends at the same position fail here
+        Index('uq_conversation_message_seq', 'session_id', 'seq', unique=True),
+    )
+
+
+class ConversationMessageCount(Base):
+    """Conversation messages a user has sent at a level, kept in step with ConversationSession turns."""
+    __tablename__ = "conversation_message_counts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    level = Column(String(10), nullable=False)
+    user_messages = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('uq_conversation_count_user_level', 'user_id', 'level', unique=True),
+    )
+
+
+class FlashcardPoolEntry(Base):
+    """Pre-generated, validated flashcard waiting to be served for a (language, level)."""
+    __tablename__ = "flashcard_pool"
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_language = Column(String(50), nullable=False)
+    level = Column(String(10), nullable=False)
+    word = Column(String(200), nullable=False)
+
+    # Card as served (including image_digest and validation metadata)
+    card = Column(JSON, nullable=False)
+    checker_result = Column(JSON, nullable=True)
+    secondary_validation = Column(JSON, nullable=True)
+    is_validated = Column(Boolean, default=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_pool_language_level', 'target_language', 'level', 'id'),
+    )
+
+
+class LLMUsageRecord(Base):
+    """One upstream AI call (LLM, STT or image) with its tokens, latency and cost."""
+    __tablename__ = "llm_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime, nullable=False)
+
+    service = Column(String(20), nullable=False)  # llm, stt, image
+    provider = Column(String(50), nullable=False)
+    model = Column(String(200), nullable=False)
+    module = Column(String(50), nullable=True)  # vocabulary, grammar, conversation, ...
+    stage = Column(String(50), nullable=False)  # generate, checker, secondary, image-prompt, correction, ...
+    user_id = Column(String, nullable=True)
+
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    latency_ms = Column(Float, nullable=False)
+    ttfb_ms = Column(Float, nullable=True)
+    retries = Column(Integer, default=0)
+    cached = Column(Boolean, default=False)
+    success = Column(Boolean, default=True)
+    cost_usd = Column(Float, default=0.0)
+
+    __table_args__ = (
+        Index('idx_llm_usage_created', 'created_at'),
+        Index('idx_llm_usage_module_stage', 'module', 'stage', 'created_at'),
+        Index('idx_llm_usage_user', 'user_id', 'created_at'),
+    )
@@ -3,6 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.db.database import init_db
+from app.core.http_pool import close_outbound_pool
+from app.core.llm_usage import flush_usage_recorder
+from app.services.answer_events import get_answer_event_worker
+from app.services.flashcard_pool import get_flashcard_replenisher
 
 # Create FastAPI app
 app = FastAPI(
@@ -29,6 +33,17 @@ app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 async def startup_event():
     """Initialize database on startup."""
     init_db()
+    if settings.FLASHCARD_POOL_ENABLED:
+        get_flashcard_replenisher().start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background work, write buffered usage rows and close pooled outbound connections."""
+    await get_flashcard_replenisher().stop()
+    await get_answer_event_worker().stop()
+    await flush_usage_recorder()
+    await close_outbound_pool()
 
 
 @app.get("/")
@@ -0,0 +1,31 @@
+"""
+Pydantic schemas for admin/diagnostic reports.
+"""
+
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from datetime import datetime
+
+
+class LLMUsageGroup(BaseModel):
+    """Aggregated AI calls for one combination of the grouping columns."""
+    keys: Dict[str, Optional[str]] = {}  # e.g. {"module": "vocabulary", "stage": "checker"}
+    calls: int = 0
+    errors: int = 0
+    cached: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    total_latency_ms: float = 0.0
+    avg_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+    avg_ttfb_ms: Optional[float] = None
+
+
+class LLMUsageReport(BaseModel):
+    """Usage report for /admin/llm-usage, groups sorted by total latency."""
+    since: datetime
+    group_by: List[str]
+    totals: LLMUsageGroup
+    groups: List[LLMUsageGroup] = []
@@ -0,0 +1,154 @@
+"""
+Structured-output schemas for JSON-producing LLM calls.
+
+These mirror the response schemas in app/schemas and are sent to the
+provider (Gemini responseSchema / OpenAI response_format) so the model is
+constrained to valid JSON of the right shape, then used to validate it.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, field_validator
+
+from app.schemas.phonetics import WordIssue
+
+
+class LLMOutput(BaseModel):
+    """Base for LLM output schemas; unknown keys from the model are ignored."""
+    model_config = ConfigDict(extra="ignore")
+
+
+def _as_json_text(value: Any) -> Any:
+    """Models sometimes return a nested object where we asked for a JSON string."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+class CheckerOutput(LLMOutput):
+    """Primary checker verdict."""
+    is_valid: bool = True
+    issues: List[str] = []
+    suggested_fix: Optional[str] = None
+
+    _fix_as_text = field_validator("suggested_fix", mode="before")(_as_json_text)
+
+
+class ValidationDetails(LLMOutput):
+    """Per-criterion notes from the secondary validator."""
+    accuracy: Optional[str] = None
+    educational_value: Optional[str] = None
+    cultural_sensitivity: Optional[str] = None
+    difficulty_match: Optional[str] = None
+    pedagogical_quality: Optional[str] = None
+    safety: Optional[str] = None
+
+
+class SecondaryValidationOutput(LLMOutput):
+    """Secondary validator verdict."""
+    is_approved: bool = True
+    confidence_score: float = 0.8
+    validation_details: ValidationDetails = ValidationDetails()
+    critical_issues: List[str] = []
+    recommendations: List[str] = []
+    improved_version: Optional[str] = None
+
+    _improved_as_text = field_validator("improved_version", mode="before")(_as_json_text)
+
+
+class FlashcardOutput(LLMOutput):
+    """Generated flashcard (see FlashcardResponse)."""
+    word: str
+    definition: str
+    example_sentence: str = ""
+    options: List[str]
+    correct_option_index: int
+    image_prompt: Optional[str] = None
+
+
+class FlashcardBatchOutput(LLMOutput):
+    """Several generated flashcards from one call."""
+    flashcards: List[FlashcardOutput]
+
+
+class GrammarQuestionOutput(LLMOutput):
+    """Generated grammar question (see GrammarQuestionResponse)."""
+    question_text: str
+    options: List[str]
+    correct_option_index: int
+    explanation: Optional[str] = None
+
+
+class WritingFeedbackOutput(LLMOutput):
+    """Writing feedback (see WritingFeedbackResponse)."""
+    corrected_text: str
+    overall_comment: str
+    inline_explanation: Optional[str] = None
+    score: Optional[float] = None
+
+
+class ConversationCorrectionOutput(LLMOutput):
+    """Correction of the student's conversation message."""
+    corrected_message: Optional[str] = None
+    tips: Optional[str] = None
+
+
+class PronunciationAnalysisOutput(LLMOutput):
+    """Transcript and pronunciation analysis (see PhoneticsEvaluationResponse)."""
+    transcript: str = ""
+    confidence: float = 1.0
+    score: Optional[float] = None
+    feedback: Optional[str] = None
+    word_level_feedback: List[WordIssue] = []
+
+
+# Keys of the OpenAPI subset accepted by Gemini's responseSchema
+_GEMINI_SCHEMA_KEYS = {
+    "type", "format", "description", "nullable", "enum", "properties",
+    "required", "items", "minItems", "maxItems", "minimum", "maximum",
+}
+
+
+def _to_gemini_schema(node: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    if "$ref" in node:
+        node = defs[node["$ref"].split("/")[-1]]
+
+    if "anyOf" in node:
+        variants = [variant for variant in node["anyOf"] if variant.get("type") != "null"]
+        converted = _to_gemini_schema(variants[0], defs)
+        if len(variants) < len(node["anyOf"]):
+            converted["nullable"] = True
+        return converted
+
+    converted: Dict[str, Any] = {}
+    for key, value in node.items():
+        if key == "properties":
+            converted[key] = {name: _to_gemini_schema(prop, defs) for name, prop in value.items()}
+        elif key == "items":
+            converted[key] = _to_gemini_schema(value, defs)
+        elif key == "type":
+            converted[key] = value.upper()
+        elif key in _GEMINI_SCHEMA_KEYS:
+            converted[key] = value
+    return converted
+
+
+def gemini_response_schema(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """Convert a pydantic model to Gemini's responseSchema (refs inlined, unsupported keys dropped)."""
+    json_schema = schema.model_json_schema()
+    return _to_gemini_schema(json_schema, json_schema.get("$defs", {}))
+
+
+def openai_response_format(schema: Type[BaseModel], provider: str) -> Dict[str, Any]:
+    """response_format for OpenAI-compatible APIs (Groq only guarantees JSON mode)."""
+    if provider == "groq":
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": schema.__name__,
+            "schema": schema.model_json_schema(),
+            "strict": False
+        }
+    }
@@ -17,12 +17,17 @@ class FlashcardResponse(BaseModel):
     example_sentence: str
     options: Optional[List[str]] = None
     correct_option_index: Optional[int] = None
-    image_data: Optional[str] = None
+    image_url: Optional[str] = None  # GET /media/{digest}
     validation: Optional[ValidationMetadata] = None
     is_review: Optional[bool] = False
     review_id: Optional[int] = None
 
 
+class FlashcardBatchResponse(BaseModel):
+    """Response containing several flashcards for a study session."""
+    flashcards: List[FlashcardResponse]
+
+
 class VocabularyAnswerRequest(BaseModel):
     """Request to submit a vocabulary answer."""
     word: str
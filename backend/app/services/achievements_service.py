@@ -3,148 +3,275 @@ Achievements Service
 Manages achievement unlocking, tracking, and progress calculation.
 """
 
-from typing import List, Dict, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+import asyncio
+import json
+import time
+from typing import Any, Callable, List, Dict, Optional, Set, Tuple
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 from datetime import datetime
 
+from app.core.cache import LRUCache, TieredCache, cache
+from app.core.config import settings
 from app.db.models import Achievement, UserAchievement, User, UserProgress, LevelHistory, ContentLog
 
 
-def check_and_unlock_achievements(user_id: str, db: Session) -> List[Dict]:
+# Achievement columns exposed to clients and kept in the catalog
+_ACHIEVEMENT_FIELDS = (
+    "id", "code", "name", "description", "icon", "tier", "xp_reward",
+    "criteria_type", "criteria_threshold", "criteria_module"
+)
+
+# Criteria that don't depend on the module of the answer
+_GLOBAL_CRITERIA = [("count", "all"), ("level_advance", None), ("total_xp", None)]
+
+
+class AchievementCatalog:
     """
-    Check if user has met criteria for any locked achievements and unlock them.
+    In-memory copy of the achievements table, indexed by (criteria_type, criteria_module).
 
-    Args:
-        user_id: User ID to check achievements for
-        db: Database session
+    Reloaded after invalidate() (called when Achievement rows change through
+    the ORM) or once ACHIEVEMENT_CATALOG_TTL_SECONDS have passed, which picks
+    up rows written by seed_achievements.py.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._by_criteria: Dict[Tuple[str, Optional[str]], List[Dict]] = {}
+        self._loaded_at: Optional[float] = None
+
+    def invalidate(self) -> None:
+        """Force a reload on next use."""
+        self._loaded_at = None
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load the catalog unless a fresh copy is cached."""
+        if self._loaded_at is not None and self._clock() - self._loaded_at < settings.ACHIEVEMENT_CATALOG_TTL_SECONDS:
+            return
+        by_criteria: Dict[Tuple[str, Optional[str]], List[Dict]] = {}
+        for achievement in (await db.scalars(select(Achievement))).all():
+            entry = {field: getattr(achievement, field) for field in _ACHIEVEMENT_FIELDS}
+            by_criteria.setdefault((entry["criteria_type"], entry["criteria_module"]), []).append(entry)
+        for entries in by_criteria.values():
+            entries.sort(key=lambda entry: entry["criteria_threshold"] or 0)
+        self._by_criteria = by_criteria
+        self._loaded_at = self._clock()
+
+    def for_criteria(self, criteria_type: str, module: Optional[str]) -> List[Dict]:
+        """Achievements with this criteria, lowest threshold first."""
+        return self._by_criteria.get((criteria_type, module), [])
+
+    def relevant_to(self, module: Optional[str]) -> List[Dict]:
+        """
+        Achievements an answer in `module` can unlock (all of them if module is None).
+
+        Module-independent criteria (all-module counts, level advances, XP)
+        are always included.
+        """
+        if module is None:
+            return [entry for entries in self._by_criteria.values() for entry in entries]
+        keys = [("count", module), ("score", module)] + _GLOBAL_CRITERIA
+        return [entry for key in keys for entry in self.for_criteria(*key)]
+
+
+_catalog: Optional[AchievementCatalog] = None
+
+
+def get_achievement_catalog() -> AchievementCatalog:
+    """Get or create the process-wide achievement catalog."""
+    global _catalog
+    if _catalog is None:
+        _catalog = AchievementCatalog()
+    return _catalog
+
+
+def reset_achievement_catalog() -> None:
+    """Drop the cached catalog (tests)."""
+    global _catalog
+    _catalog = None
+
+
+@event.listens_for(Achievement, "after_insert")
+@event.listens_for(Achievement, "after_update")
+@event.listens_for(Achievement, "after_delete")
+def _invalidate_catalog(mapper, connection, target) -> None:
+    if _catalog is not None:
+        _catalog.invalidate()
+    # Listings embed catalog entries; the Redis copies are cleared on commit
+    if _listing_cache is not None and _listing_cache.local is not None:
+        _listing_cache.local.clear()
+    session = object_session(target)
+    if session is not None:
+        session.info["achievement_catalog_changed"] = True
+
+
+async def _fetch_counters(user_id: str, modules: List[str], db: AsyncSession) -> Dict[str, Any]:
+    """
+    Every value the criteria compare against, in one query.
 
     Returns:
-        List of newly unlocked achievements with details
+        {"activities": ContentLog rows, "levels": LevelHistory rows,
+         "attempts": {module: total_attempts}, "scores": {module: score}}
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return []
+    def module_progress(column, module):
+        return select(column).where(
+            UserProgress.user_id == user_id,
+            UserProgress.module == module
+        ).scalar_subquery()
+
+    columns = [
+        select(func.count()).select_from(ContentLog).where(ContentLog.user_id == user_id).scalar_subquery(),
+        select(func.count()).select_from(LevelHistory).where(LevelHistory.user_id == user_id).scalar_subquery()
+    ]
+    for module in modules:
+        columns.append(module_progress(UserProgress.total_attempts, module))
+        columns.append(module_progress(UserProgress.score, module))
 
-    # Get all achievements
-    all_achievements = db.query(Achievement).all()
+    row = (await db.execute(select(*columns))).one()
+    return {
+        "activities": row[0] or 0,
+        "levels": row[1] or 0,
+        "attempts": {module: row[2 + 2 * i] or 0 for i, module in enumerate(modules)},
+        "scores": {module: row[3 + 2 * i] for i, module in enumerate(modules)}
+    }
 
-    # Get already unlocked achievement IDs
-    unlocked_ids = [
-        ua.achievement_id for ua in
-        db.query(UserAchievement).filter(UserAchievement.user_id == user_id).all()
-    ]
 
-    # Filter to only locked achievements
-    locked_achievements = [a for a in all_achievements if a.id not in unlocked_ids]
+def _criteria_value(achievement: Dict, counters: Dict[str, Any], total_xp: int) -> Optional[float]:
+    """Current value of the quantity an achievement's threshold applies to (None if not tracked)."""
+    criteria_type = achievement["criteria_type"]
+    module = achievement["criteria_module"]
 
-    newly_unlocked = []
+    if criteria_type == "count":
+        # Count-based achievements (e.g., "complete 10 flashcards")
+        if module == "all":
+            return counters["activities"]
+        return counters["attempts"].get(module, 0)
+    if criteria_type == "score":
+        # Score-based achievements (e.g., "get 90% in grammar")
+        return counters["scores"].get(module) if module else None
+    if criteria_type == "level_advance":
+        return counters["levels"]
+    if criteria_type == "total_xp":
+        return total_xp
+    return None
 
-    for achievement in locked_achievements:
-        # Check if criteria is met
-        if _check_criteria(user, achievement, db):
-            # Unlock the achievement
-            user_achievement = UserAchievement(
-                user_id=user_id,
-                achievement_id=achievement.id,
-                unlocked_at=datetime.utcnow(),
-                is_viewed=False  # Mark as new
-            )
-            db.add(user_achievement)
-
-            # Award XP
-            user.total_xp = (user.total_xp or 0) + achievement.xp_reward
-
-            newly_unlocked.append({
-                "id": achievement.id,
-                "code": achievement.code,
-                "name": achievement.name,
-                "description": achievement.description,
-                "icon": achievement.icon,
-                "tier": achievement.tier,
-                "xp_reward": achievement.xp_reward
-            })
 
-    if newly_unlocked:
-        db.commit()
+def _criteria_met(achievement: Dict, counters: Dict[str, Any], total_xp: int) -> bool:
+    value = _criteria_value(achievement, counters, total_xp)
+    threshold = achievement["criteria_threshold"]
+    return value is not None and threshold is not None and value >= threshold
 
-    return newly_unlocked
 
+async def _unlock(user: User, achievement: Dict, db: AsyncSession) -> bool:
+    """
+    Insert the unlock row; False if it already exists (e.g. a concurrent unlock).
 
-def _check_criteria(user: User, achievement: Achievement, db: Session) -> bool:
+    The savepoint keeps a unique-constraint violation from rolling back the
+    caller's other unlocks.
     """
-    Check if user meets the criteria for an achievement.
+    try:
+        async with db.begin_nested():
+            db.add(UserAchievement(
+                user_id=user.id,
+                achievement_id=achievement["id"],
+                unlocked_at=datetime.utcnow(),
+                is_viewed=False  # Mark as new
+            ))
+    except IntegrityError:
+        return False
+    # Award XP
+    user.total_xp = (user.total_xp or 0) + (achievement["xp_reward"] or 0)
+    return True
 
-    Args:
-        user: User object
-        achievement: Achievement object to check
-        db: Database session
 
-    Returns:
-        True if criteria is met, False otherwise
+async def check_and_unlock_achievements(user_id: str, db: AsyncSession, module: Optional[str] = None) -> List[Dict]:
     """
-    criteria_type = achievement.criteria_type
-    threshold = achievement.criteria_threshold
-    module = achievement.criteria_module
-
-    if criteria_type == "count":
-        # Count-based achievements (e.g., "complete 10 flashcards")
-        if module == "all":
-            # Total activities across all modules
-            total_count = db.query(ContentLog).filter(
-                ContentLog.user_id == user.id
-            ).count()
-            return total_count >= threshold
-        else:
-            # Specific module count
-            progress = db.query(UserProgress).filter(
-                and_(
-                    UserProgress.user_id == user.id,
-                    UserProgress.module == module
-                )
-            ).first()
+    Check if user has met criteria for any locked achievements and unlock them.
 
-            if not progress:
-                return False
+    Only achievements an answer in `module` can affect are evaluated; the
+    counters they need come from a single query, so the cost doesn't grow
+    with the size of the catalog.
 
-            return progress.total_attempts >= threshold
+    Args:
+        user_id: User ID to check achievements for
+        db: Database session
+        module: Module of the answer that triggered the check (None = every achievement)
 
-    elif criteria_type == "score":
-        # Score-based achievements (e.g., "get 90% in grammar")
-        if not module:
-            return False
+    Returns:
+        List of newly unlocked achievements with details
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        return []
 
-        progress = db.query(UserProgress).filter(
-            and_(
-                UserProgress.user_id == user.id,
-                UserProgress.module == module
-            )
-        ).first()
+    catalog = get_achievement_catalog()
+    await catalog.ensure_loaded(db)
+    candidates = catalog.relevant_to(module)
+    if not candidates:
+        return []
 
-        if not progress or progress.score is None:
-            return False
+    modules = sorted({
+        a["criteria_module"] for a in candidates
+        if a["criteria_type"] in ("count", "score") and a["criteria_module"] not in (None, "all")
+    })
+    counters = await _fetch_counters(user_id, modules, db)
 
-        return progress.score >= threshold
+    # XP achievements are re-checked below, after this round's rewards
+    met = [
+        a for a in candidates
+        if a["criteria_type"] != "total_xp" and _criteria_met(a, counters, user.total_xp or 0)
+    ]
+    xp_achievements = catalog.for_criteria("total_xp", None)
+    if not met and not any(_criteria_met(a, counters, user.total_xp or 0) for a in xp_achievements):
+        return []
 
-    elif criteria_type == "level_advance":
-        # Level advancement achievements
-        level_count = db.query(LevelHistory).filter(
-            LevelHistory.user_id == user.id
-        ).count()
+    unlocked_ids = set((await db.scalars(
+        select(UserAchievement.achievement_id)
+        .where(
+            UserAchievement.user_id == user_id,
+            UserAchievement.achievement_id.in_([a["id"] for a in met + xp_achievements])
+        )
+    )).all())
 
-        return level_count >= threshold
+    newly_unlocked = []
+    for achievement in met:
+        if achievement["id"] not in unlocked_ids and await _unlock(user, achievement, db):
+            newly_unlocked.append(achievement)
+            unlocked_ids.add(achievement["id"])
+
+    # Rewards can cross XP thresholds, whose rewards can cross more
+    progressed = True
+    while progressed:
+        progressed = False
+        for achievement in xp_achievements:
+            if (
+                achievement["id"] not in unlocked_ids and
+                _criteria_met(achievement, counters, user.total_xp or 0) and
+                await _unlock(user, achievement, db)
+            ):
+                newly_unlocked.append(achievement)
+                unlocked_ids.add(achievement["id"])
+                progressed = True
 
-    elif criteria_type == "total_xp":
-        # Total XP achievements
-        return (user.total_xp or 0) >= threshold
+    if newly_unlocked:
+        await db.commit()
 
-    return False
+    return [
+        {field: a[field] for field in ("id", "code", "name", "description", "icon", "tier", "xp_reward")}
+        for a in newly_unlocked
+    ]
 
 
-def get_user_achievements(user_id: str, db: Session) -> Dict:
+async def get_user_achievements(user_id: str, db: AsyncSession) -> Dict:
     """
     Get all achievements for a user with unlock status and progress.
 
+    The listing is cached per user until a commit touches that user's
+    progress, activity, level history, unlocks or XP (see
+    _track_achievement_writes), or the catalog changes.
+
     Args:
         user_id: User ID (string/UUID)
         db: Database session
@@ -152,48 +279,51 @@ def get_user_achievements(user_id: str, db: Session) -> Dict:
     Returns:
         Dictionary with unlocked and locked achievements, including progress
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    listing_cache = get_achievement_listing_cache()
+    await wait_for_listing_invalidations()
+    cached = await listing_cache.get(_listing_cache_key(user_id))
+    if cached is not None:
+        return json.loads(cached)
+
+    user = await db.get(User, user_id)
     if not user:
         print(f"[DEBUG] User not found with id: {user_id}")
         return {"unlocked": [], "locked": []}
 
-    # Get all achievements
-    all_achievements = db.query(Achievement).all()
+    catalog = get_achievement_catalog()
+    await catalog.ensure_loaded(db)
+    all_achievements = sorted(catalog.relevant_to(None), key=lambda a: a["id"])
 
     # Get unlocked achievements
-    user_achievements = db.query(UserAchievement).filter(
+    user_achievements = (await db.scalars(select(UserAchievement).where(
         UserAchievement.user_id == user_id
-    ).all()
+    ))).all()
 
     unlocked_map = {ua.achievement_id: ua for ua in user_achievements}
 
+    # Every metric the locked achievements' progress needs, in one query
+    modules = sorted({
+        a["criteria_module"] for a in all_achievements
+        if a["id"] not in unlocked_map and
+        a["criteria_type"] in ("count", "score") and a["criteria_module"] not in (None, "all")
+    })
+    counters = await _fetch_counters(user_id, modules, db)
+
     unlocked = []
     locked = []
 
     for achievement in all_achievements:
-        achievement_data = {
-            "id": achievement.id,
-            "code": achievement.code,
-            "name": achievement.name,
-            "description": achievement.description,
-            "icon": achievement.icon,
-            "tier": achievement.tier,
-            "xp_reward": achievement.xp_reward,
-            "criteria_type": achievement.criteria_type,
-            "criteria_threshold": achievement.criteria_threshold,
-            "criteria_module": achievement.criteria_module
-        }
-
-        if achievement.id in unlocked_map:
+        achievement_data = dict(achievement)
+
+        if achievement["id"] in unlocked_map:
             # Unlocked achievement
-            ua = unlocked_map[achievement.id]
+            ua = unlocked_map[achievement["id"]]
             achievement_data["unlocked_at"] = ua.unlocked_at.isoformat()
             achievement_data["is_new"] = not ua.is_viewed
             unlocked.append(achievement_data)
         else:
             # Locked achievement - calculate progress
-            progress_percent = _calculate_progress(user, achievement, db)
-            achievement_data["progress"] = progress_percent
+            achievement_data["progress"] = _progress_percent(achievement, counters, user.total_xp or 0)
             locked.append(achievement_data)
 
     # Sort unlocked by date (newest first)
@@ -202,72 +332,131 @@ def get_user_achievements(user_id: str, db: Session) -> Dict:
     # Sort locked by progress (closest to unlock first)
     locked.sort(key=lambda x: x["progress"], reverse=True)
 
-    return {
+    listing = {
         "unlocked": unlocked,
         "locked": locked,
         "new_count": sum(1 for a in unlocked if a["is_new"])
     }
+    await listing_cache.set(_listing_cache_key(user_id), json.dumps(listing), settings.ACHIEVEMENTS_CACHE_TTL_SECONDS)
+    return listing
 
 
-def _calculate_progress(user: User, achievement: Achievement, db: Session) -> int:
+def _progress_percent(achievement: Dict, counters: Dict[str, Any], total_xp: int) -> int:
     """
-    Calculate progress percentage towards an achievement.
-
-    Args:
-        user: User object
-        achievement: Achievement object
-        db: Database session
+    Progress percentage towards an achievement.
 
     Returns:
         Progress percentage (0-100)
     """
-    criteria_type = achievement.criteria_type
-    threshold = achievement.criteria_threshold
-    module = achievement.criteria_module
-
-    if threshold == 0:
+    threshold = achievement["criteria_threshold"]
+    if not threshold:
         return 0
 
-    current_value = 0
+    current_value = _criteria_value(achievement, counters, total_xp) or 0
+    return min(100, int((current_value / threshold) * 100))
 
-    if criteria_type == "count":
-        if module == "all":
-            current_value = db.query(ContentLog).filter(
-                ContentLog.user_id == user.id
-            ).count()
+
+# Rows whose changes alter a user's achievement listing
+_LISTING_SOURCES = (UserProgress, ContentLog, LevelHistory, UserAchievement)
+
+_listing_cache: Optional[TieredCache] = None
+
+
+def _listing_cache_key(user_id: str) -> str:
+    return f"achievements:{user_id}"
+
+
+def get_achievement_listing_cache() -> TieredCache:
+    """
+    Get or create the per-user cache of achievement listings.
+
+    With Redis the listings live only there: invalidation happens in the
+    committing worker, and a local copy in any other worker would stay
+    stale. Without Redis they are kept in this process.
+    """
+    global _listing_cache
+    if _listing_cache is None:
+        if cache.enabled:
+            _listing_cache = TieredCache(local=None, remote=cache)
         else:
-            progress = db.query(UserProgress).filter(
-                and_(
-                    UserProgress.user_id == user.id,
-                    UserProgress.module == module
-                )
-            ).first()
-            current_value = progress.total_attempts if progress else 0
-
-    elif criteria_type == "score":
-        if module:
-            progress = db.query(UserProgress).filter(
-                and_(
-                    UserProgress.user_id == user.id,
-                    UserProgress.module == module
-                )
-            ).first()
-            current_value = progress.score if progress and progress.score else 0
-
-    elif criteria_type == "level_advance":
-        current_value = db.query(LevelHistory).filter(
-            LevelHistory.user_id == user.id
-        ).count()
-
-    elif criteria_type == "total_xp":
-        current_value = user.total_xp or 0
-
-    # Calculate percentage
-    progress = min(100, int((current_value / threshold) * 100))
-    return progress
-
-
-def mark_achievements_viewed(user_id: str, db: Session) -> bool:
+            _listing_cache = TieredCache(local=LRUCache(max_bytes=settings.ACHIEVEMENTS_CACHE_MAX_BYTES))
+    return _listing_cache
+
+
+def reset_achievement_listing_cache() -> None:
+    """Drop all cached listings (tests)."""
+    global _listing_cache
+    _listing_cache = None
+
+
+@event.listens_for(Session, "after_flush")
+def _track_achievement_writes(session, flush_context) -> None:
+    """Remember which users' listings a flush changed; they are dropped on commit."""
+    user_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, _LISTING_SOURCES):
+            user_ids.add(obj.user_id)
+    if user_ids:
+        session.info.setdefault("achievement_listing_users", set()).update(user_ids)
+
+
+# Redis deletes started by _invalidate_listings that haven't finished yet
+_pending_invalidations: Set[asyncio.Task] = set()
+
+
+def _delete_remote_listings(remote, user_ids: Set[str], catalog_changed: bool) -> None:
+    if catalog_changed:
+        remote.clear_pattern(_listing_cache_key("*"))
+        return
+    for user_id in user_ids:
+        remote.delete(_listing_cache_key(user_id))
+
+
+async def wait_for_listing_invalidations() -> None:
+    """Wait for Redis deletes from earlier commits, so a read after a commit isn't stale."""
+    if _pending_invalidations:
+        await asyncio.gather(*list(_pending_invalidations), return_exceptions=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_listings(session) -> None:
+    """
+    Drop the listings a commit changed.
+
+    The local tier is cleared here; Redis calls block, so they run in a
+    worker thread (inline when no event loop is running, e.g. scripts).
+    """
+    user_ids = session.info.pop("achievement_listing_users", set())
+    catalog_changed = session.info.pop("achievement_catalog_changed", False)
+    if not (user_ids or catalog_changed) or _listing_cache is None:
+        return
+    if _listing_cache.local is not None:
+        for user_id in user_ids:
+            _listing_cache.local.delete(_listing_cache_key(user_id))
+    if _listing_cache.remote is None:
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _delete_remote_listings(_listing_cache.remote, user_ids, catalog_changed)
+        return
+    task = loop.create_task(asyncio.to_thread(
+        _delete_remote_listings, _listing_cache.remote, user_ids, catalog_changed
+    ))
+    _pending_invalidations.add(task)
+    task.add_done_callback(_pending_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_listing_writes(session) -> None:
+    session.info.pop("achievement_listing_users", None)
+    session.info.pop("achievement_catalog_changed", None)
+
+
+async def mark_achievements_viewed(user_id: str, db: AsyncSession) -> bool:
     """
     Mark all user's achievements as viewed (clear NEW badges).
 
@@ -278,12 +467,12 @@ def mark_achievements_viewed(user_id: str, db: Session) -> bool:
     Returns:
         True if successful
     """
-    user_achievements = db.query(UserAchievement).filter(
+    user_achievements = (await db.scalars(select(UserAchievement).where(
         UserAchievement.user_id == user_id
-    ).all()
+    ))).all()
 
     for ua in user_achievements:
         ua.is_viewed = True
 
-    db.commit()
+    await db.commit()
     return True
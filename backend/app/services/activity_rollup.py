@@ -0,0 +1,126 @@
+"""
+Daily activity rollup for the progress charts.
+
+Every ContentLog insert for a user bumps a (user_id, date, module) counter
+in DailyActivity, in the same transaction, so the charts read a few small
+rows per day instead of the logs with their payloads. Existing logs are
+counted into the rollup by backfill_daily_activity.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Date, delete, event, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import ContentLog, DailyActivity
+
+# Chart ranges in days, and the bucket size (days per point) each is drawn with
+CHART_RANGES = {7: 1, 30: 1, 90: 7, 365: 30}
+
+CHART_MODULES = ["vocabulary", "grammar", "writing", "phonetics", "conversation"]
+
+
+def _increment(connection, user_id: str, activity_date: date, module: str, count: int = 1) -> None:
+    """Add `count` to one rollup row, creating it if needed (safe under concurrent writers)."""
+    table = DailyActivity.__table__
+    values = {"user_id": user_id, "activity_date": activity_date, "module": module, "activity_count": count}
+
+    upsert = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}.get(connection.dialect.name)
+    if upsert is not None:
+        statement = upsert(table).values(**values)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=["user_id", "activity_date", "module"],
+            set_={"activity_count": table.c.activity_count + statement.excluded.activity_count}
+        ))
+        return
+
+    updated = connection.execute(
+        update(table)
+        .where(table.c.user_id == user_id, table.c.activity_date == activity_date, table.c.module == module)
+        .values(activity_count=table.c.activity_count + count)
+    ).rowcount
+    if not updated:
+        connection.execute(insert(table).values(**values))
+
+
+@event.listens_for(ContentLog, "after_insert")
+def _count_content_log(mapper, connection, target) -> None:
+    if target.user_id is None:
+        return
+    # created_at is filled in by the database; the insert happens now
+    logged_at = target.created_at if isinstance(target.created_at, datetime) else datetime.utcnow()
+    _increment(connection, target.user_id, logged_at.date(), target.module)
+
+
+async def backfill_daily_activity(db: AsyncSession) -> int:
+    """
+    Rebuild the rollup from ContentLog.
+
+    Replaces every DailyActivity row in one transaction; logs written while
+    it runs may be missed, so run it when the app is idle (or stopped).
+
+    Returns:
+        Number of rollup rows written
+    """
+    day = func.date(ContentLog.created_at, type_=Date)
+    rows = (await db.execute(
+        select(ContentLog.user_id, day, ContentLog.module, func.count())
+        .where(ContentLog.user_id.isnot(None), ContentLog.created_at.isnot(None))
+        .group_by(ContentLog.user_id, day, ContentLog.module)
+    )).all()
+
+    await db.execute(delete(DailyActivity))
+    db.add_all([
+        DailyActivity(user_id=user_id, activity_date=activity_date, module=module, activity_count=count)
+        for user_id, activity_date, module, count in rows
+    ])
+    await db.commit()
+    return len(rows)
+
+
+async def get_activity_chart(
+    user_id: str,
+    db: AsyncSession,
+    days: int = 30,
+    today: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    Activity counts per module over the last `days` days, for the charts.
+
+    Args:
+        user_id: User ID
+        db: Database session
+        days: One of CHART_RANGES; longer ranges are summed into wider buckets
+        today: Last day of the range (defaults to the current UTC day)
+
+    Returns:
+        {"dates": bucket start dates with activity, "bucket_days": ..., <module>: counts per date}
+
+    Raises:
+        ValueError: days is not a supported range
+    """
+    if days not in CHART_RANGES:
+        raise ValueError(f"Unsupported range: {days} days (use one of {sorted(CHART_RANGES)})")
+    bucket_days = CHART_RANGES[days]
+    start = (today or datetime.utcnow().date()) - timedelta(days=days - 1)
+
+    rows = (await db.execute(
+        select(DailyActivity.activity_date, DailyActivity.module, DailyActivity.activity_count)
+        .where(DailyActivity.user_id == user_id, DailyActivity.activity_date >= start)
+    )).all()
+
+    buckets: Dict[str, Dict[str, int]] = {}
+    for activity_date, module, count in rows:
+        offset = (activity_date - start).days // bucket_days * bucket_days
+        label = (start + timedelta(days=offset)).strftime('%Y-%m-%d')
+        counts = buckets.setdefault(label, {})
+        counts[module] = counts.get(module, 0) + count
+
+    dates = sorted(buckets)
+    chart: Dict[str, Any] = {"dates": dates, "bucket_days": bucket_days}
+    for module in CHART_MODULES:
+        chart[module] = [buckets[d].get(module, 0) for d in dates]
+    return chart
@@ -1,7 +1,50 @@
 import httpx
 import json
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple, Type, TypeVar
+from pydantic import BaseModel, ValidationError
 from app.core.config import settings
+from app.core.cache import TieredCache, get_llm_cache_ttl, get_llm_response_cache, make_llm_cache_key
+from app.core.singleflight import get_single_flight
+from app.core.rate_governor import (
+    RateGovernorTimeout,
+    estimate_tokens,
+    get_rate_governor,
+    parse_retry_after,
+    reset_rate_governors,
+)
+from app.core.hedging import get_request_hedger, reset_request_hedgers, retry_with_jitter
+from app.core.circuit_breaker import CircuitBreaker, get_circuit_breaker, reset_circuit_breakers
+from app.core.fake_provider import FAKE_PROVIDER_BASE_URL
+from app.core.http_pool import close_client_soon, get_http_client
+from app.core.llm_usage import (
+    AICall,
+    current_ai_call,
+    gemini_usage,
+    llm_usage_scope,
+    openai_usage,
+    track_ai_call,
+)
+from app.schemas.llm_outputs import (
+    CheckerOutput,
+    SecondaryValidationOutput,
+    gemini_response_schema,
+    openai_response_format,
+)
+
+OutputModel = TypeVar("OutputModel", bound=BaseModel)
+
+# Providers spoken to through the /chat/completions API ("fake" is the offline test provider)
+OPENAI_COMPATIBLE_PROVIDERS = {"openai", "gpt", "groq", "fake"}
+
+# API roots for fallback providers configured without a base_url
+PROVIDER_BASE_URLS = {
+    "gemini": "https://generativelanguage.googleapis.com/v1beta",
+    "openai": "https://api.openai.com/v1",
+    "gpt": "https://api.openai.com/v1",
+    "groq": "https://api.groq.com/openai/v1",
+    "fake": FAKE_PROVIDER_BASE_URL,
+}
 
 
 class LLMError(Exception):
@@ -9,15 +52,90 @@ class LLMError(Exception):
     pass
 
 
+class LLMOutputError(LLMError):
+    """The LLM answered, but not with JSON matching the requested schema."""
+    pass
+
+
+class LLMProviderError(LLMError):
+    """The provider itself failed (5xx, dropped connection, timeout); counts against its circuit breaker."""
+    pass
+
+
+def parse_llm_json(text: str, schema: Type[OutputModel]) -> OutputModel:
+    """
+    Parse and validate a JSON response against an output schema.
+
+    Markdown code fences are stripped first, since models without native
+    structured output still tend to wrap JSON in them.
+
+    Raises:
+        LLMOutputError: If the text is not JSON or does not match the schema
+    """
+    cleaned = text.strip()
+    if cleaned.startswith("```json"):
+        cleaned = cleaned[7:]
+    elif cleaned.startswith("```"):
+        cleaned = cleaned[3:]
+    if cleaned.endswith("```"):
+        cleaned = cleaned[:-3]
+
+    try:
+        return schema.model_validate(json.loads(cleaned.strip()))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise LLMOutputError(f"Invalid {schema.__name__} JSON from LLM: {str(e)}")
+
+
+# Connection-level failures worth retrying; read timeouts are left to hedging
+_TRANSIENT_TRANSPORT_ERRORS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError,
+)
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """True for 5xx responses and dropped connections."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, _TRANSIENT_TRANSPORT_ERRORS)
+
+
+def _is_provider_fault(error: Exception) -> bool:
+    """
+    True for failures that say the provider is unhealthy: transient errors and timeouts.
+
+    4xx responses (bad or oversized requests) and local queueing are not.
+    """
+    return _is_transient_error(error) or isinstance(error, (httpx.TimeoutException, httpx.NetworkError, TimeoutError))
+
+
+def _circuit_breaker(provider: str) -> Optional[CircuitBreaker]:
+    return get_circuit_breaker(provider) if settings.LLM_CIRCUIT_BREAKER_ENABLED else None
+
+
 class LLMClient:
     """Client for interacting with LLM API (Gemini)."""
 
-    def __init__(self, api_key: str, base_url: str, model: str = "gemini-1.5-flash", provider: str = "gemini"):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        model: str = "gemini-1.5-flash",
+        provider: str = "gemini",
+        response_cache: Optional[TieredCache] = None,
+        fallbacks: Optional[List["LLMClient"]] = None
+    ):
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.provider = provider.lower()
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = get_http_client(timeout=30.0, provider=self.provider)
+        self.response_cache = response_cache
+        # Tried in order when this provider fails or its circuit is open
+        self.fallbacks = fallbacks or []
 
     async def generate(
         self,
@@ -25,7 +143,9 @@ class LLMClient:
         system_prompt: str,
         user_prompt: str,
         temperature: float = 0.3,
-        max_tokens: int = 512
+        max_tokens: int = 512,
+        cache_module: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None
     ) -> str:
         """
         Call the LLM with the given prompts and return the generated text.
@@ -35,6 +155,10 @@ class LLMClient:
             user_prompt: User input/query
             temperature: Controls randomness (0.0-1.0)
             max_tokens: Maximum tokens to generate
+            cache_module: Opt into the response cache under this module's TTL.
+                Only use for calls where identical prompts should give identical answers.
+            response_schema: Ask the provider for JSON constrained to this model
+                (Gemini responseSchema / OpenAI response_format)
 
         Returns:
             Generated text from the LLM
@@ -42,35 +166,434 @@ class LLMClient:
         Raises:
             LLMError: If the API call fails
         """
-        try:
-            if self.provider in {"openai", "gpt", "groq"}:
-                return await self._generate_openai_compatible(
+        request_key = make_llm_cache_key(
+            cache_module or "generate",
+            provider=self.provider,
+            model=self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            response_schema=response_schema.__name__ if response_schema else None
+        )
+
+        with track_ai_call("llm", self.provider, self.model) as call:
+            use_cache = bool(cache_module) and self.response_cache is not None
+            if use_cache:
+                cached = await self.response_cache.get(request_key)
+                if cached is not None:
+                    call.cached = True
+                    return cached
+
+            # Identical prompts already in flight share one upstream request
+            text = await get_single_flight("llm").do(
+                request_key,
+                lambda: self._generate_uncached(
                     system_prompt=system_prompt,
                     user_prompt=user_prompt,
                     temperature=temperature,
-                    max_tokens=max_tokens
+                    max_tokens=max_tokens,
+                    response_schema=response_schema
                 )
+            )
 
-            # Default to Gemini API
-            return await self._generate_gemini(
+            if use_cache and response_schema is not None:
+                # Don't pin a malformed structured answer in the cache
+                try:
+                    parse_llm_json(text, response_schema)
+                except LLMOutputError:
+                    use_cache = False
+
+            if use_cache:
+                await self.response_cache.set(request_key, text, get_llm_cache_ttl(cache_module))
+
+            return text
+
+    async def generate_json(
+        self,
+        *,
+        schema: Type[OutputModel],
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.3,
+        max_tokens: int = 512,
+        cache_module: Optional[str] = None
+    ) -> OutputModel:
+        """
+        Call the LLM in structured-output mode and return a validated object.
+
+        The provider is asked for JSON matching the schema; if the answer still
+        fails validation the call is repeated (uncached) up to LLM_JSON_RETRIES times.
+
+        Args:
+            schema: Pydantic model the response must match (see app.schemas.llm_outputs)
+            system_prompt: System-level instructions for the LLM
+            user_prompt: User input/query
+            temperature: Controls randomness (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+            cache_module: Opt into the response cache under this module's TTL
+
+        Returns:
+            Instance of schema
+
+        Raises:
+            LLMOutputError: If no valid response was produced
+            LLMError: If the API call fails
+        """
+        attempt = 0
+        while True:
+            text = await self.generate(
                 system_prompt=system_prompt,
                 user_prompt=user_prompt,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                cache_module=cache_module if attempt == 0 else None,
+                response_schema=schema
             )
+            try:
+                return parse_llm_json(text, schema)
+            except LLMOutputError:
+                if attempt >= settings.LLM_JSON_RETRIES:
+                    raise
+                attempt += 1
+
+    async def _generate_uncached(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> str:
+        """
+        Call the first provider in the chain (this one, then the fallbacks) whose circuit allows it.
 
+        Providers with an open circuit are skipped without a request, so a
+        degraded primary costs nothing once its breaker has tripped. Only
+        provider faults (LLMProviderError) count against a breaker; other
+        errors still move on to the next provider.
+        """
+        call = current_ai_call()
+        last_error: Optional[LLMError] = None
+
+        for client in [self, *self.fallbacks]:
+            breaker = _circuit_breaker(client.provider)
+            if breaker is not None and not breaker.allow_request():
+                last_error = last_error or LLMError(f"LLM provider {client.provider} unavailable (circuit open)")
+                continue
+
+            if call is not None:
+                call.provider, call.model = client.provider, client.model
+            started = time.perf_counter()
+            try:
+                text = await client._generate_with_retries(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    response_schema=response_schema
+                )
+            except LLMError as e:
+                # Only provider faults count; a busy governor or a rejected request says nothing about its health
+                if breaker is not None and isinstance(e, LLMProviderError):
+                    breaker.record_failure()
+                last_error = e
+                continue
+
+            if breaker is not None:
+                breaker.record_success(time.perf_counter() - started)
+            return text
+
+        raise last_error
+
+    async def _generate_with_retries(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> str:
+        """Call this client's provider with hedging and retries of transient errors."""
+        hedger = get_request_hedger(self.provider)
+        call = current_ai_call()
+
+        def on_retry(error: Exception) -> None:
+            hedger.record_retry(error)
+            if call is not None:
+                call.record_retry(error)
+
+        async def attempt() -> str:
+            return await self._governed_call(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_schema=response_schema
+            )
+
+        try:
+            return await retry_with_jitter(
+                lambda: hedger.run(attempt),
+                retries=settings.LLM_RETRY_ATTEMPTS,
+                base_delay=settings.LLM_RETRY_BASE_DELAY_SECONDS,
+                max_delay=settings.LLM_RETRY_MAX_DELAY_SECONDS,
+                is_retryable=_is_transient_error,
+                on_retry=on_retry
+            )
+
+        except RateGovernorTimeout as e:
+            raise LLMError(f"LLM provider busy: {str(e)}")
         except httpx.HTTPError as e:
-            raise LLMError(f"HTTP error during LLM API call: {str(e)}")
+            error_type = LLMProviderError if _is_provider_fault(e) else LLMError
+            raise error_type(f"HTTP error during LLM API call: {str(e)}")
         except Exception as e:
-            raise LLMError(f"Error during LLM generation: {str(e)}")
+            error_type = LLMProviderError if _is_provider_fault(e) else LLMError
+            raise error_type(f"Error during LLM generation: {str(e)}")
 
-    async def _generate_gemini(
+    async def _governed_call(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        response_schema: Optional[Type[BaseModel]] = None
+    ) -> str:
+        """Make one provider call through the rate governor, retrying 429s after backoff."""
+        governor = get_rate_governor(self.provider)
+        # TPM budget is charged with the prompt estimate plus the full output allowance
+        tokens = estimate_tokens(system_prompt, user_prompt) + max_tokens
+        attempt = 0
+
+        while True:
+            await governor.acquire(tokens)
+            try:
+                if self.provider in OPENAI_COMPATIBLE_PROVIDERS:
+                    text = await self._generate_openai_compatible(
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        response_schema=response_schema
+                    )
+                else:
+                    # Default to Gemini API
+                    text = await self._generate_gemini(
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        response_schema=response_schema
+                    )
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 429:
+                    raise
+                governor.record_rate_limited(parse_retry_after(e.response.headers.get("Retry-After")))
+                if attempt >= settings.LLM_RATE_LIMIT_RETRIES:
+                    raise
+                attempt += 1
+                call = current_ai_call()
+                if call is not None:
+                    call.record_retry(e)
+                continue
+            finally:
+                governor.release()
+
+            governor.record_success()
+            return text
+
+    async def generate_stream(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.3,
+        max_tokens: int = 512
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text from the LLM chunk by chunk.
+
+        Uses Gemini streamGenerateContent (SSE) or OpenAI-compatible stream=true.
+        Streamed calls bypass the response cache and single-flight coalescing.
+        A provider that fails before sending anything is replaced by the next
+        one in the fallback chain; once text has been yielded, errors propagate.
+
+        Args:
+            system_prompt: System-level instructions for the LLM
+            user_prompt: User input/query
+            temperature: Controls randomness (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+
+        Yields:
+            Text chunks in the order the provider sends them
+
+        Raises:
+            LLMError: If the API call fails
+        """
+        last_error: Optional[LLMError] = None
+
+        for client in [self, *self.fallbacks]:
+            breaker = _circuit_breaker(client.provider)
+            if breaker is not None and not breaker.allow_request():
+                last_error = last_error or LLMError(f"LLM provider {client.provider} unavailable (circuit open)")
+                continue
+
+            started = time.perf_counter()
+            streamed = False
+            try:
+                async for chunk in client._stream_single(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                ):
+                    streamed = True
+                    yield chunk
+            except LLMError as e:
+                if breaker is not None and isinstance(e, LLMProviderError):
+                    breaker.record_failure()
+                if streamed:
+                    raise
+                last_error = e
+                continue
+
+            if breaker is not None:
+                breaker.record_success(time.perf_counter() - started)
+            return
+
+        raise last_error
+
+    async def _stream_single(
         self,
         *,
         system_prompt: str,
         user_prompt: str,
         temperature: float,
         max_tokens: int
+    ) -> AsyncIterator[str]:
+        """Stream from this client's provider only."""
+        # Measured by hand: track_ai_call's context variable can't span generator yields
+        call = AICall("llm", self.provider, self.model)
+        stream_usage: Tuple[Optional[int], Optional[int]] = (None, None)
+        try:
+            if self.provider in OPENAI_COMPATIBLE_PROVIDERS:
+                url = f"{self.base_url}/chat/completions"
+                headers = {
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                }
+                payload = {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "stream": True
+                }
+                if self.provider != "groq":
+                    # Ask for a final usage chunk (Groq does not accept stream_options)
+                    payload["stream_options"] = {"include_usage": True}
+                extract = self._extract_openai_stream_text
+                usage_of = openai_usage
+            else:
+                url = f"{self.base_url}/models/{self.model}:streamGenerateContent?alt=sse&key={self.api_key}"
+                headers = {}
+                payload = {
+                    "contents": [
+                        {
+                            "parts": [
+                                {"text": f"{system_prompt}\n\n{user_prompt}"}
+                            ]
+                        }
+                    ],
+                    "generationConfig": {
+                        "temperature": temperature,
+                        "maxOutputTokens": max_tokens,
+                    }
+                }
+                extract = self._extract_gemini_stream_text
+                usage_of = gemini_usage
+
+            # The slot is held for the whole stream; 429s feed the governor but are not retried
+            governor = get_rate_governor(self.provider)
+            await governor.acquire(estimate_tokens(system_prompt, user_prompt) + max_tokens)
+            try:
+                async with self.client.stream("POST", url, json=payload, headers=headers) as response:
+                    call.mark_first_byte()
+                    if response.status_code == 429:
+                        governor.record_rate_limited(parse_retry_after(response.headers.get("Retry-After")))
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        # SSE frames look like "data: {...}"; skip keep-alives and other fields
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if not data or data == "[DONE]":
+                            continue
+                        chunk = json.loads(data)
+                        # Usage arrives cumulatively (Gemini) or in a final chunk (OpenAI)
+                        if any(count is not None for count in usage_of(chunk)):
+                            stream_usage = usage_of(chunk)
+                        text = extract(chunk)
+                        if text:
+                            yield text
+                governor.record_success()
+            finally:
+                governor.release()
+
+        except RateGovernorTimeout as e:
+            call.success = False
+            raise LLMError(f"LLM provider busy: {str(e)}")
+        except httpx.HTTPError as e:
+            call.success = False
+            error_type = LLMProviderError if _is_provider_fault(e) else LLMError
+            raise error_type(f"HTTP error during LLM API call: {str(e)}")
+        except LLMError:
+            call.success = False
+            raise
+        except Exception as e:
+            call.success = False
+            error_type = LLMProviderError if _is_provider_fault(e) else LLMError
+            raise error_type(f"Error during LLM generation: {str(e)}")
+        finally:
+            call.add_usage(*stream_usage)
+            call.finish()
+
+    @staticmethod
+    def _record_usage(usage: Tuple[Optional[int], Optional[int]]) -> None:
+        """Add provider-reported token counts to the call being measured."""
+        call = current_ai_call()
+        if call is not None:
+            call.add_usage(*usage)
+
+    @staticmethod
+    def _extract_gemini_stream_text(chunk: Dict[str, Any]) -> str:
+        candidates = chunk.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts)
+
+    @staticmethod
+    def _extract_openai_stream_text(chunk: Dict[str, Any]) -> str:
+        choices = chunk.get("choices") or []
+        if not choices:
+            return ""
+        return (choices[0].get("delta") or {}).get("content") or ""
+
+    async def _generate_gemini(
+        self,
+        *,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        response_schema: Optional[Type[BaseModel]] = None
     ) -> str:
         combined_prompt = f"{system_prompt}\n\n{user_prompt}"
         url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
@@ -88,10 +611,14 @@ class LLMClient:
                 "maxOutputTokens": max_tokens,
             }
         }
+        if response_schema is not None:
+            payload["generationConfig"]["responseMimeType"] = "application/json"
+            payload["generationConfig"]["responseSchema"] = gemini_response_schema(response_schema)
 
         response = await self.client.post(url, json=payload)
         response.raise_for_status()
         data = response.json()
+        self._record_usage(gemini_usage(data))
 
         if "candidates" in data and len(data["candidates"]) > 0:
             candidate = data["candidates"][0]
@@ -108,7 +635,8 @@ class LLMClient:
         system_prompt: str,
         user_prompt: str,
         temperature: float,
-        max_tokens: int
+        max_tokens: int,
+        response_schema: Optional[Type[BaseModel]] = None
     ) -> str:
         url = f"{self.base_url}/chat/completions"
         headers = {
@@ -124,10 +652,13 @@ class LLMClient:
             "temperature": temperature,
             "max_tokens": max_tokens
         }
+        if response_schema is not None:
+            payload["response_format"] = openai_response_format(response_schema, self.provider)
 
         response = await self.client.post(url, json=payload, headers=headers)
         response.raise_for_status()
         data = response.json()
+        self._record_usage(openai_usage(data))
 
         choices = data.get("choices", [])
         if choices and "message" in choices[0]:
@@ -136,8 +667,10 @@ class LLMClient:
         raise LLMError("Unexpected response format from OpenAI-compatible API")
 
     async def close(self):
-        """Close the HTTP client."""
+        """Close the HTTP client (and those of the fallback providers)."""
         await self.client.aclose()
+        for fallback in self.fallbacks:
+            await fallback.close()
 
 
 class CheckerService:
@@ -188,49 +721,32 @@ Respond ONLY with valid JSON in this exact format:
 }}"""
 
         try:
-            response = await self.llm.generate(
-                system_prompt="You are a language learning content validator. Always respond with valid JSON only.",
-                user_prompt=checker_prompt,
-                temperature=0.1,
-                max_tokens=1024
-            )
+            with llm_usage_scope(stage="checker"):
+                result = await self.llm.generate_json(
+                    schema=CheckerOutput,
+                    system_prompt="You are a language learning content validator. Always respond with valid JSON only.",
+                    user_prompt=checker_prompt,
+                    temperature=0.1,
+                    max_tokens=1024,
+                    cache_module="checker"
+                )
+            return result.model_dump()
 
-            # Try to parse JSON from response
-            # Sometimes LLM adds Markdown code blocks, so clean it up
-            cleaned_response = response.strip()
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.startswith("```"):
-                cleaned_response = cleaned_response[3:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
-            cleaned_response = cleaned_response.strip()
-
-            result = json.loads(cleaned_response)
-
-            # Validate structure
-            if "is_valid" not in result:
-                result["is_valid"] = True
-            if "issues" not in result:
-                result["issues"] = []
-            if "suggested_fix" not in result:
-                result["suggested_fix"] = None
-
-            return result
-
-        except json.JSONDecodeError:
+        except LLMOutputError:
             # If checker fails to return valid JSON, assume content is valid
             return {
                 "is_valid": True,
                 "issues": ["Checker returned invalid JSON"],
-                "suggested_fix": None
+                "suggested_fix": None,
+                "error": True
             }
         except Exception as e:
             # On any error, assume content is valid to not block the flow
             return {
                 "is_valid": True,
                 "issues": [f"Checker error: {str(e)}"],
-                "suggested_fix": None
+                "suggested_fix": None,
+                "error": True
             }
 
 
@@ -299,42 +815,18 @@ Respond ONLY with valid JSON in this exact format:
 }}"""
 
         try:
-            response = await self.llm.generate(
-                system_prompt="You are an expert language learning content auditor. Always respond with valid JSON only.",
-                user_prompt=validator_prompt,
-                temperature=0.05,  # Very low temperature for consistency
-                max_tokens=2048
-            )
+            with llm_usage_scope(stage="secondary"):
+                result = await self.llm.generate_json(
+                    schema=SecondaryValidationOutput,
+                    system_prompt="You are an expert language learning content auditor. Always respond with valid JSON only.",
+                    user_prompt=validator_prompt,
+                    temperature=0.05,  # Very low temperature for consistency
+                    max_tokens=2048,
+                    cache_module="secondary"
+                )
+            return result.model_dump()
 
-            # Clean up response
-            cleaned_response = response.strip()
-            if cleaned_response.startswith("```json"):
-                cleaned_response = cleaned_response[7:]
-            if cleaned_response.startswith("```"):
-                cleaned_response = cleaned_response[3:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
-            cleaned_response = cleaned_response.strip()
-
-            result = json.loads(cleaned_response)
-
-            # Validate structure
-            if "is_approved" not in result:
-                result["is_approved"] = True
-            if "confidence_score" not in result:
-                result["confidence_score"] = 0.8
-            if "validation_details" not in result:
-                result["validation_details"] = {}
-            if "critical_issues" not in result:
-                result["critical_issues"] = []
-            if "recommendations" not in result:
-                result["recommendations"] = []
-            if "improved_version" not in result:
-                result["improved_version"] = None
-
-            return result
-
-        except json.JSONDecodeError:
+        except LLMOutputError:
             # If validator fails, return permissive result
             return {
                 "is_approved": True,
@@ -342,7 +834,8 @@ Respond ONLY with valid JSON in this exact format:
                 "validation_details": {},
                 "critical_issues": ["Secondary validator returned invalid JSON"],
                 "recommendations": [],
-                "improved_version": None
+                "improved_version": None,
+                "error": True
             }
         except Exception as e:
             # On any error, return permissive result
@@ -352,7 +845,8 @@ Respond ONLY with valid JSON in this exact format:
                 "validation_details": {},
                 "critical_issues": [f"Secondary validator error: {str(e)}"],
                 "recommendations": [],
-                "improved_version": None
+                "improved_version": None,
+                "error": True
             }
 
 
@@ -363,7 +857,29 @@ _llm_client: Optional[LLMClient] = None
 def reset_llm_client() -> None:
     """Reset the global LLM client instance after config changes."""
     global _llm_client
+    close_client_soon(_llm_client)
     _llm_client = None
+    reset_rate_governors()
+    reset_request_hedgers()
+    reset_circuit_breakers()
+
+
+def _fallback_clients() -> List[LLMClient]:
+    """Clients for LLM_FALLBACK_PROVIDERS, in order; entries without a known base URL are skipped."""
+    clients = []
+    for entry in settings.LLM_FALLBACK_PROVIDERS or []:
+        provider = str(entry.get("provider", "")).lower()
+        base_url = entry.get("base_url") or PROVIDER_BASE_URLS.get(provider)
+        if not base_url or not entry.get("model"):
+            print(f"[WARNING] Ignoring fallback LLM provider without base URL or model: {provider or entry}")
+            continue
+        clients.append(LLMClient(
+            api_key=entry.get("api_key", ""),
+            base_url=base_url,
+            model=entry["model"],
+            provider=provider
+        ))
+    return clients
 
 
 def get_llm_client() -> LLMClient:
@@ -374,7 +890,9 @@ def get_llm_client() -> LLMClient:
             api_key=settings.LLM_API_KEY,
             base_url=settings.LLM_API_BASE_URL,
             model=settings.LLM_MODEL,
-            provider=settings.LLM_PROVIDER
+            provider=settings.LLM_PROVIDER,
+            response_cache=get_llm_response_cache(),
+            fallbacks=_fallback_clients()
         )
     return _llm_client
 
@@ -0,0 +1,170 @@
+"""
+Post-answer pipeline.
+
+Answer handlers persist the score and publish an AnswerRecorded event; the
+achievement check and the advancement-eligibility update run afterwards in
+a background worker. Events for one user are processed in order, by a single
+task at a time, and events that queue up while that task is busy are folded
+into one evaluation (both steps only read the current database state).
+
+Results are stored on the user (unlocked achievements, can_advance), so the
+client sees them on its next request; read endpoints call settle_answer_events
+first so that request never races the worker.
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models import User
+
+
+class AnswerRecorded:
+    """A scored answer has been committed for `user_id` in `module` (None: unknown / several)."""
+
+    def __init__(self, user_id: str, module: Optional[str], recorded_at: Optional[datetime] = None):
+        self.user_id = user_id
+        self.module = module
+        self.recorded_at = recorded_at or datetime.utcnow()
+
+
+async def process_answer_recorded(event: AnswerRecorded, db: AsyncSession) -> List[Dict]:
+    """
+    Unlock achievements and flag advancement eligibility after an answer.
+
+    Args:
+        event: The recorded answer
+        db: Database session
+
+    Returns:
+        Newly unlocked achievements
+    """
+    from app.services.achievements_service import check_and_unlock_achievements
+    from app.services.progress_service import calculate_advancement_eligibility
+
+    newly_unlocked = await check_and_unlock_achievements(event.user_id, db, module=event.module)
+
+    user = await db.get(User, event.user_id)
+    if user is not None and not user.can_advance:
+        eligibility = await calculate_advancement_eligibility(event.user_id, db)
+        if eligibility["eligible"]:
+            user.can_advance = True
+            user.advancement_notified_at = datetime.utcnow()
+            await db.commit()
+
+    return newly_unlocked
+
+
+class AnswerEventWorker:
+    """Processes AnswerRecorded events in the background, one task per user."""
+
+    def __init__(self, session_factory: Optional[Callable[[], AsyncSession]] = None):
+        self._session_factory = session_factory or AsyncSessionLocal
+        self._pending: Dict[str, List[AnswerRecorded]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots = asyncio.Semaphore(max(1, settings.ANSWER_EVENTS_MAX_CONCURRENCY))
+        self.processed = 0
+
+    def publish(self, event: AnswerRecorded) -> None:
+        """Queue an event; starts the user's task unless one is already running."""
+        self._pending.setdefault(event.user_id, []).append(event)
+        task = self._tasks.get(event.user_id)
+        if task is None or task.done():
+            self._tasks[event.user_id] = asyncio.get_running_loop().create_task(self._run_user(event.user_id))
+
+    async def _run_user(self, user_id: str) -> None:
+        try:
+            while self._pending.get(user_id):
+                events = self._pending.pop(user_id)
+                # Answers from several modules: evaluate every achievement
+                folded = events[-1] if len({e.module for e in events}) == 1 else AnswerRecorded(user_id, None)
+                async with self._slots:
+                    try:
+                        async with self._session_factory() as db:
+                            await process_answer_recorded(folded, db)
+                        self.processed += len(events)
+                    except Exception as e:
+                        print(f"[WARNING] Post-answer processing for user {user_id} failed: {e}")
+        finally:
+            if self._tasks.get(user_id) is asyncio.current_task():
+                del self._tasks[user_id]
+
+    async def wait_for_user(self, user_id: str) -> bool:
+        """
+        Wait until the user's queued events are processed.
+
+        Returns:
+            True if there was work to wait for
+        """
+        task = self._tasks.get(user_id)
+        if task is None or task.done():
+            return False
+        await asyncio.shield(task)
+        return True
+
+    async def drain(self) -> None:
+        """Wait for every queued event (shutdown, tests)."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Finish queued work, then cancel anything still running."""
+        try:
+            await asyncio.wait_for(self.drain(), timeout=settings.ANSWER_EVENTS_SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            tasks = list(self._tasks.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._tasks.clear()
+            self._pending.clear()
+
+
+_worker: Optional[AnswerEventWorker] = None
+
+
+def get_answer_event_worker() -> AnswerEventWorker:
+    """Get or create the global post-answer worker."""
+    global _worker
+    if _worker is None:
+        _worker = AnswerEventWorker()
+    return _worker
+
+
+def reset_answer_event_worker(worker: Optional[AnswerEventWorker] = None) -> None:
+    """Replace the global worker (tests)."""
+    global _worker
+    _worker = worker
+
+
+async def record_answer(user_id: str, module: str, db: AsyncSession) -> None:
+    """
+    Publish AnswerRecorded for a committed answer.
+
+    With ANSWER_EVENTS_BACKGROUND off the event is processed inline on `db`,
+    as before the pipeline existed.
+
+    Args:
+        user_id: User who answered
+        module: Module of the answer
+        db: Request database session
+    """
+    event = AnswerRecorded(user_id, module)
+    if settings.ANSWER_EVENTS_BACKGROUND:
+        get_answer_event_worker().publish(event)
+    else:
+        await process_answer_recorded(event, db)
+
+
+async def settle_answer_events(user: User, db: AsyncSession) -> None:
+    """
+    Let pending post-answer work for `user` finish before a read.
+
+    The user row is reloaded when the worker changed it in its own session.
+    """
+    if await get_answer_event_worker().wait_for_user(user.id):
+        await db.refresh(user)
@@ -2,15 +2,16 @@
 Authentication service for user registration, login, and management.
 """
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import User
 from app.core.security import get_password_hash, verify_password
 from app.schemas.auth import UserRegisterRequest
 
 
-def register_user(db: Session, user_data: UserRegisterRequest) -> Optional[User]:
+async def register_user(db: AsyncSession, user_data: UserRegisterRequest) -> Optional[User]:
     """
     Register a new user.
 
@@ -25,7 +26,7 @@ def register_user(db: Session, user_data: UserRegisterRequest) -> Optional[User]
         IntegrityError: If username is not unique
     """
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = await db.scalar(select(User).where(User.username == user_data.username))
     if existing_user:
         return None
 
@@ -41,15 +42,15 @@ def register_user(db: Session, user_data: UserRegisterRequest) -> Optional[User]
 
     try:
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         return new_user
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         return None
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> Optional[User]:
     """
     Authenticate a user by username and password.
 
@@ -61,7 +62,7 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     Returns:
         User object if authentication successful, None otherwise
     """
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
 
     if not user:
         return None
@@ -75,7 +76,7 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     return user
 
 
-def get_user_by_id(db: Session, user_id: str) -> Optional[User]:
+async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
     """
     Get a user by ID.
 
@@ -86,10 +87,10 @@ def get_user_by_id(db: Session, user_id: str) -> Optional[User]:
     Returns:
         User object if found, None otherwise
     """
-    return db.query(User).filter(User.id == user_id).first()
+    return await db.get(User, user_id)
 
 
-def update_user_language(db: Session, user_id: str, language: str) -> Optional[User]:
+async def update_user_language(db: AsyncSession, user_id: str, language: str) -> Optional[User]:
     """
     Update user's target language.
 
@@ -101,17 +102,17 @@ def update_user_language(db: Session, user_id: str, language: str) -> Optional[U
     Returns:
         Updated User object if found, None otherwise
     """
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id(db, user_id)
     if not user:
         return None
 
     user.target_language = language
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
-def update_user_level(db: Session, user_id: str, level: str) -> Optional[User]:
+async def update_user_level(db: AsyncSession, user_id: str, level: str) -> Optional[User]:
     """
     Update user's proficiency level.
 
@@ -123,11 +124,11 @@ def update_user_level(db: Session, user_id: str, level: str) -> Optional[User]:
     Returns:
         Updated User object if found, None otherwise
     """
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id(db, user_id)
     if not user:
         return None
 
     user.level = level
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
@@ -1,10 +1,19 @@
+import asyncio
 import json
-from typing import Dict, Any, Optional
-from sqlalchemy.orm import Session
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator, Callable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
 from datetime import datetime
 from app.db.models import User, ConversationSession, ContentLog, UserProgress
-from app.services.ai_services import get_llm_client, get_checker_service
+from app.core.config import settings
+from app.core.llm_usage import llm_usage_scope
+from app.services.ai_services import LLMOutputError, get_llm_client, get_checker_service
+from app.services.answer_events import record_answer
+from app.services.progress_service import record_conversation_messages
+from app.services.conversation_context import ContextWindow, apply_summary, build_context_window, fold_summary
+from app.services.conversation_history import SequenceConflict, append_messages, load_recent_messages, migrate_session
+from app.schemas.llm_outputs import ConversationCorrectionOutput
 from app.schemas.conversation import (
     ConversationStartRequest,
     ConversationStartResponse,
@@ -16,7 +25,7 @@ from app.schemas.conversation import (
 async def start_conversation(
     user: User,
     request: ConversationStartRequest,
-    db: Session
+    db: AsyncSession
 ) -> ConversationStartResponse:
     """
     Start a new conversation session.
@@ -41,21 +50,22 @@ Keep your opening message short (1-2 sentences) and in {user.target_language}.""
 
     user_prompt = "Generate a friendly opening message to start the conversation."
 
-    # Generate opening message
-    opening_message = await llm.generate(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-        temperature=0.7,
-        max_tokens=512
-    )
+    with llm_usage_scope(module="conversation", user_id=user.id):
+        # Generate opening message
+        opening_message = await llm.generate(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=0.7,
+            max_tokens=512
+        )
 
-    # Check content (optional for opening message, but good practice)
-    checker_result = await checker.check_content(
-        module="conversation",
-        original_instruction="Generate opening message",
-        user_input=request.model_dump(),
-        generated_content=opening_message
-    )
+        # Check content (optional for opening message, but good practice)
+        checker_result = await checker.check_content(
+            module="conversation",
+            original_instruction="Generate opening message",
+            user_input=request.model_dump(),
+            generated_content=opening_message
+        )
 
     # If not valid, use suggested fix or regenerate once
     if not checker_result["is_valid"] and checker_result["suggested_fix"]:
@@ -67,17 +77,18 @@ Keep your opening message short (1-2 sentences) and in {user.target_language}.""
         target_language=user.target_language,
         context_json={
             "system_prompt": system_prompt,
-            "messages": [
-                {"role": "assistant", "content": opening_message}
-            ],
+            "summary": "",
+            "summarized_count": 0,
             "topic": request.topic,
             "level": user.level
         },
         is_active=True
     )
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await db.flush()
+    await append_messages(session.id, [{"role": "assistant", "content": opening_message}], db, expected_seq=0)
+    await db.commit()
+    await db.refresh(session)
 
     # Log content
     content_log = ContentLog(
@@ -89,7 +100,7 @@ Keep your opening message short (1-2 sentences) and in {user.target_language}.""
         is_validated=checker_result["is_valid"]
     )
     db.add(content_log)
-    db.commit()
+    await db.commit()
 
     return ConversationStartResponse(
         session_id=str(session.id),
@@ -97,31 +108,11 @@ Keep your opening message short (1-2 sentences) and in {user.target_language}.""
     )
 
 
-async def send_message(
-    session_id: str,
-    user: User,
-    request: ConversationMessageRequest,
-    db: Session
-) -> ConversationMessageResponse:
-    """
-    Send a message in a conversation session.
-
-    Args:
-        session_id: Conversation session ID
-        user: Authenticated user
-        request: Message request
-        db: Database session
-
-    Returns:
-        ConversationMessageResponse with reply and optional corrections/tips
-    """
-    llm = get_llm_client()
-    checker = get_checker_service()
-
-    # Load conversation session
-    session = db.query(ConversationSession).filter(
+async def _load_session(session_id: str, user: User, db: AsyncSession) -> ConversationSession:
+    """Load a conversation session and verify the user owns it."""
+    session = await db.scalar(select(ConversationSession).where(
         ConversationSession.id == session_id
-    ).first()
+    ))
 
     if not session:
         raise ValueError(f"Conversation session {session_id} not found")
@@ -130,30 +121,59 @@ async def send_message(
     if str(session.user_id) != str(user.id):
         raise ValueError("Invalid user for this session")
 
-    # Get context
-    context = session.context_json
-    system_prompt = context.get("system_prompt", "")
-    messages = context.get("messages", [])
+    return session
+
+
+async def _load_context(session: ConversationSession, new_message: str, db: AsyncSession) -> Tuple[ContextWindow, int]:
+    """
+    Build the context window from the session's unsummarized recent messages.
+
+    Returns:
+        (window, sequence number the new user message is expected to get)
+    """
+    if await migrate_session(session, db):
+        await db.commit()
+
+    context = session.context_json or {}
+    history, expected_seq = await load_recent_messages(
+        session.id, db,
+        since_seq=int(context.get("summarized_count", 0)),
+        limit=settings.CONVERSATION_HISTORY_WINDOW
+    )
+    return build_context_window(context, history, new_message), expected_seq
+
+
+def _strip_tags(text: str) -> str:
+    """Sanitize content to prevent tag injection."""
+    for tag in ("conversation_history", "conversation_summary"):
+        text = text.replace(f"<{tag}>", "").replace(f"</{tag}>", "")
+    return text
 
-    # Add user message to context
-    messages.append({"role": "user", "content": request.message})
 
+def _build_reply_prompt(target_language: str, window: ContextWindow) -> str:
+    """Format the summary and recent messages into the tutor reply prompt."""
     formatted_history = ""
-    for msg in messages:
+    for msg in window.messages:
         role = msg['role'].upper()
-        # Sanitize content to prevent tag injection
-        content = msg['content'].replace("<conversation_history>", "").replace("</conversation_history>", "")
-        formatted_history += f"{role}: {content}\n"
+        formatted_history += f"{role}: {_strip_tags(msg['content'])}\n"
+
+    summary_block = ""
+    if window.summary:
+        summary_block = f"""
+            <conversation_summary>
+            Earlier in this conversation: {_strip_tags(window.summary)}
+            </conversation_summary>
+"""
 
     # We explicitly tell the AI NOT to correct grammar in the chat bubble.
-    user_prompt = f"""
+    return f"""{summary_block}
             <conversation_history>
             {formatted_history}
             </conversation_history>
 
             INSTRUCTIONS:
             1. The user has just replied (see history above).
-            2. Respond as the friendly language tutor in {session.target_language}.
+            2. Respond as the friendly language tutor in {target_language}.
             3. Keep your response conversational and appropriate for the learner.
             4. CRITICAL: Do NOT correct the user's grammar or spelling in your response. 
                - There is a separate system that handles corrections.
@@ -164,15 +184,9 @@ async def send_message(
             Do not output any script, screenplay, or roleplay text. Stick to the tutor persona.
             """
 
-    # Generate reply
-    reply = await llm.generate(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-        temperature=0.7,
-        max_tokens=2048
-    )
 
-    # Check reply
+async def _check_reply(checker, request: ConversationMessageRequest, reply: str) -> Tuple[str, Dict[str, Any]]:
+    """Run the checker on a reply and apply its suggested fix if invalid."""
     checker_result = await checker.check_content(
         module="conversation",
         original_instruction="Generate conversation reply",
@@ -184,8 +198,12 @@ async def send_message(
     if not checker_result["is_valid"] and checker_result["suggested_fix"]:
         reply = checker_result["suggested_fix"]
 
-    # Generate corrections and tips for user message
-    correction_prompt = f"""The student wrote: "{request.message}"
+    return reply, checker_result
+
+
+async def _generate_corrections(llm, target_language: str, message: str) -> Tuple[Optional[str], Optional[str]]:
+    """Ask the LLM for a corrected version of the student's message and tips."""
+    correction_prompt = f"""The student wrote: "{message}"
 
     Provide:
     1. A corrected version if there are grammatical errors (or null if perfect)
@@ -197,54 +215,79 @@ async def send_message(
       "tips": "helpful tips or null"
     }}"""
 
-    correction_response = await llm.generate(
-        system_prompt=f"You are a language tutor providing feedback on {session.target_language} writing.",
-        user_prompt=correction_prompt,
-        temperature=0.3,
-        max_tokens=2048
-    )
-
-    # Parse corrections
+    try:
+        with llm_usage_scope(stage="correction"):
+            correction_data = await llm.generate_json(
+                schema=ConversationCorrectionOutput,
+                system_prompt=f"You are a language tutor providing feedback on {target_language} writing.",
+                user_prompt=correction_prompt,
+                temperature=0.3,
+                max_tokens=2048
+            )
+    except LLMOutputError:
+        return None, None  # If parsing fails, just skip
+
+    # AI sometimes returns the string "null" instead of valid JSON null
     corrected_user_message = None
+    raw_correction = correction_data.corrected_message
+    if raw_correction and raw_correction.lower() != "null":
+        corrected_user_message = raw_correction
+
     tips = None
+    raw_tips = correction_data.tips
+    if raw_tips and raw_tips.lower() != "null":
+        tips = raw_tips
+
+    return corrected_user_message, tips
+
+
+async def _record_turn(
+    session_id: str,
+    user_id: str,
+    request: ConversationMessageRequest,
+    reply: str,
+    corrected_user_message: Optional[str],
+    tips: Optional[str],
+    checker_result: Dict[str, Any],
+    db: AsyncSession,
+    window: Optional[ContextWindow] = None,
+    summary: Optional[str] = None,
+    expected_seq: Optional[int] = None
+) -> None:
+    """Persist the user message + reply (and any folded summary), update progress, achievements and the content log."""
+    turn = [
+        {"role": "user", "content": request.message},
+        {"role": "assistant", "content": reply}
+    ]
     try:
-        cleaned = correction_response.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-
-        correction_data = json.loads(cleaned.strip())
-
-        # AI sometimes returns the string "null" instead of valid JSON null
-        raw_correction = correction_data.get("corrected_message")
-        if raw_correction and str(raw_correction).lower() != "null":
-            corrected_user_message = raw_correction
-
-        raw_tips = correction_data.get("tips")
-        if raw_tips and str(raw_tips).lower() != "null":
-            tips = raw_tips
-
-    except (json.JSONDecodeError, KeyError, TypeError):
-        pass  # If parsing fails, just skip
-
-    # Update context with new messages
-    messages.append({"role": "assistant", "content": reply})
-    context["messages"] = messages
-    session.context_json = context
-    db.commit()
+        await append_messages(session_id, turn, db, expected_seq=expected_seq)
+    except SequenceConflict:
+        # Another message in this session was answered meanwhile; keep both turns, this one last
+        await append_messages(session_id, turn, db)
+
+    if window is not None and summary:
+        # Reload so the compare-and-set sees summaries stored by concurrent turns
+        session = await db.scalar(
+            select(ConversationSession)
+            .where(ConversationSession.id == session_id)
+            .execution_options(populate_existing=True)
+        )
+        context = dict(session.context_json or {})
+        apply_summary(context, window, summary)
+        session.context_json = context
+    # Committed with the turn, so the count always matches the stored history
+    await record_conversation_messages(user_id, db)
+    await db.commit()
 
     # Update user progress
-    progress = db.query(UserProgress).filter(
-        UserProgress.user_id == user.id,
+    progress = await db.scalar(select(UserProgress).where(
+        UserProgress.user_id == user_id,
         UserProgress.module == "conversation"
-    ).first()
+    ))
 
     if not progress:
         progress = UserProgress(
-            user_id=user.id,
+            user_id=user_id,
             module="conversation",
             total_attempts=1
         )
@@ -255,15 +298,11 @@ async def send_message(
     # Update last activity timestamp
     progress.last_activity_at = datetime.utcnow()
 
-    db.commit()
-
-    # Check for achievements
-    from app.services.achievements_service import check_and_unlock_achievements
-    newly_unlocked = check_and_unlock_achievements(user.id, db)
+    await db.commit()
 
     # Log content
     content_log = ContentLog(
-        user_id=user.id,
+        user_id=user_id,
         module="conversation",
         input_payload=request.model_dump(),
         generated_content={
@@ -275,7 +314,69 @@ async def send_message(
         is_validated=checker_result["is_valid"]
     )
     db.add(content_log)
-    db.commit()
+    await db.commit()
+
+    # Achievements and advancement eligibility are evaluated in the background
+    await record_answer(user_id, "conversation", db)
+
+
+async def send_message(
+    session_id: str,
+    user: User,
+    request: ConversationMessageRequest,
+    db: AsyncSession
+) -> ConversationMessageResponse:
+    """
+    Send a message in a conversation session.
+
+    Args:
+        session_id: Conversation session ID
+        user: Authenticated user
+        request: Message request
+        db: Database session
+
+    Returns:
+        ConversationMessageResponse with reply and optional corrections/tips
+    """
+    llm = get_llm_client()
+    checker = get_checker_service()
+
+    # Load conversation session
+    session = await _load_session(session_id, user, db)
+
+    # Get context: recent turns verbatim, older ones via the running summary
+    window, expected_seq = await _load_context(session, request.message, db)
+    system_prompt = session.context_json.get("system_prompt", "")
+
+    user_prompt = _build_reply_prompt(session.target_language, window)
+
+    with llm_usage_scope(module="conversation", user_id=user.id):
+        # Fold old messages into the summary while the reply is generated
+        summary_task = asyncio.create_task(fold_summary(llm, session.target_language, window)) if window.fold else None
+        try:
+            # Generate reply
+            reply = await llm.generate(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                temperature=0.7,
+                max_tokens=2048
+            )
+
+            # Check reply
+            reply, checker_result = await _check_reply(checker, request, reply)
+
+            # Generate corrections and tips for user message
+            corrected_user_message, tips = await _generate_corrections(llm, session.target_language, request.message)
+
+            summary = await summary_task if summary_task else None
+        finally:
+            if summary_task is not None and not summary_task.done():
+                summary_task.cancel()
+
+    await _record_turn(
+        session_id, user.id, request, reply, corrected_user_message, tips, checker_result, db,
+        window=window, summary=summary, expected_seq=expected_seq
+    )
 
     return ConversationMessageResponse(
         reply=reply,
@@ -283,3 +384,94 @@ async def send_message(
         tips=tips,
         session_id=session_id
     )
+
+
+async def stream_message(
+    session_id: str,
+    user: User,
+    request: ConversationMessageRequest,
+    db: AsyncSession,
+    session_factory: Optional[Callable[[], AsyncSession]] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streaming variant of send_message.
+
+    Validates the session up front (raising ValueError like send_message) and
+    returns an async iterator of (event, data) pairs:
+        token        {"text": ...}                        reply chunks as they arrive
+        reply        {"reply": ..., "replaced": bool}     final reply after the checker
+        corrections  {"corrected_user_message", "tips"}   feedback on the user's message
+        done         {"session_id": ...}
+        error        {"detail": ...}                      on failure; nothing is persisted
+
+    Args:
+        session_id: Conversation session ID
+        user: Authenticated user
+        request: Message request
+        db: Database session, used only before streaming starts
+        session_factory: Opens the session the turn is persisted with (defaults to a new
+            session on db's engine)
+
+    Returns:
+        Async iterator of (event name, payload) tuples
+    """
+    llm = get_llm_client()
+    checker = get_checker_service()
+
+    session = await _load_session(session_id, user, db)
+
+    # Copy what the stream needs so it does not depend on ORM state after the
+    # request scope (the DB session may be closed before the body is sent)
+    window, expected_seq = await _load_context(session, request.message, db)
+    system_prompt = (session.context_json or {}).get("system_prompt", "")
+    target_language = session.target_language
+    user_id = user.id
+    user_prompt = _build_reply_prompt(target_language, window)
+    engine = db.bind
+    open_session = session_factory or (
+        lambda: AsyncSession(engine, autoflush=False, expire_on_commit=False)
+    )
+
+    async def events() -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        # The generator is consumed by a single task, so the scope's reset
+        # happens in the context that set it
+        with llm_usage_scope(module="conversation", user_id=user_id):
+            # Corrections and the summary fold don't depend on the reply, so start them immediately
+            corrections_task = asyncio.create_task(
+                _generate_corrections(llm, target_language, request.message)
+            )
+            summary_task = asyncio.create_task(fold_summary(llm, target_language, window)) if window.fold else None
+            try:
+                chunks = []
+                async for chunk in llm.generate_stream(
+                    system_prompt=system_prompt,
+                    user_prompt=user_prompt,
+                    temperature=0.7,
+                    max_tokens=2048
+                ):
+                    chunks.append(chunk)
+                    yield "token", {"text": chunk}
+
+                streamed_reply = "".join(chunks)
+                reply, checker_result = await _check_reply(checker, request, streamed_reply)
+                yield "reply", {"reply": reply, "replaced": reply != streamed_reply}
+
+                corrected_user_message, tips = await corrections_task
+                yield "corrections", {"corrected_user_message": corrected_user_message, "tips": tips}
+
+                summary = await summary_task if summary_task else None
+                # The request's session is closed by now; persist on one owned by the stream
+                async with open_session() as persist_db:
+                    await _record_turn(
+                        session_id, user_id, request, reply, corrected_user_message, tips, checker_result,
+                        persist_db, window=window, summary=summary, expected_seq=expected_seq
+                    )
+                yield "done", {"session_id": session_id}
+            except Exception as e:
+                yield "error", {"detail": str(e)}
+            finally:
+                for task in (corrections_task, summary_task):
+                    if task is not None and not task.done():
+                        task.cancel()
+
+    return events()
@@ -0,0 +1,137 @@
+"""
+Context-window management for conversation sessions.
+
+Messages are stored as ConversationMessage rows (see conversation_history),
+but the reply prompt only carries the last CONVERSATION_VERBATIM_TURNS turns
+word for word. Older messages are folded into a running summary kept in
+ConversationSession.context_json ("summary" plus "summarized_count", the
+sequence number of the first message the summary does not cover), and the
+whole window is kept under a token budget.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.llm_usage import llm_usage_scope
+from app.core.rate_governor import estimate_tokens
+from app.services.ai_services import LLMError
+
+
+class ContextWindow:
+    """What one reply prompt sees, plus the messages due to be folded into the summary."""
+
+    def __init__(
+        self,
+        summary: str,
+        messages: List[Dict[str, Any]],
+        summarized_count: int,
+        fold: List[Dict[str, Any]]
+    ):
+        self.summary = summary
+        self.messages = messages
+        self.summarized_count = summarized_count
+        self.fold = fold
+
+    @property
+    def fold_end(self) -> int:
+        """summarized_count once the fold lands."""
+        return self.fold[-1]["seq"] + 1 if self.fold else self.summarized_count
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.summary, *(message["content"] for message in self.messages))
+
+
+def build_context_window(context: Dict[str, Any], history: List[Dict[str, Any]], new_message: str) -> ContextWindow:
+    """
+    Select the summary and verbatim messages for the next reply prompt.
+
+    History older than the loaded window that was never folded (the summary
+    call kept failing) is skipped: the next fold moves past it.
+
+    Args:
+        context: Session context_json
+        history: Recent stored messages ({"seq", "role", "content"}), oldest first
+        new_message: The user's new message (always kept verbatim)
+
+    Returns:
+        ContextWindow whose messages end with the new user message
+    """
+    summarized_count = int(context.get("summarized_count", 0))
+    summary = context.get("summary") or ""
+
+    unsummarized = [message for message in history if message["seq"] >= summarized_count]
+    unsummarized.append({"role": "user", "content": new_message})
+    keep = max(1, settings.CONVERSATION_VERBATIM_TURNS * 2)
+    older = unsummarized[:-keep]
+
+    # Fold in batches so the summary is not rewritten on every turn
+    fold = older if len(older) >= settings.CONVERSATION_SUMMARY_MIN_MESSAGES else []
+
+    # Until the fold lands, older messages stay in the prompt as long as the budget allows
+    window = ContextWindow(summary, unsummarized, summarized_count, fold)
+    _enforce_budget(window, settings.CONVERSATION_CONTEXT_TOKEN_BUDGET)
+    return window
+
+
+def _enforce_budget(window: ContextWindow, budget: int) -> None:
+    """Drop the oldest verbatim messages, then trim the summary, until the window fits."""
+    while len(window.messages) > 1 and window.tokens > budget:
+        window.messages.pop(0)
+
+    if window.tokens > budget and window.summary:
+        spare_tokens = max(0, budget - estimate_tokens(*(message["content"] for message in window.messages)))
+        # estimate_tokens counts ~4 characters per token
+        window.summary = window.summary[-spare_tokens * 4:] if spare_tokens else ""
+
+
+async def fold_summary(llm, target_language: str, window: ContextWindow) -> Optional[str]:
+    """
+    Fold window.fold into the running summary.
+
+    Returns:
+        The updated summary, or None if there is nothing to fold or the LLM call failed
+        (the messages then stay unsummarized and are retried on a later turn)
+    """
+    if not window.fold:
+        return None
+
+    formatted = "\n".join(f"{message['role'].upper()}: {message['content']}" for message in window.fold)
+    prompt = f"""Current summary of a {target_language} practice conversation:
+{window.summary or "(none yet)"}
+
+New messages to add:
+{formatted}
+
+Write the updated summary in English, at most {settings.CONVERSATION_SUMMARY_MAX_WORDS} words.
+Keep topics discussed, facts the student shared about themselves and recurring mistakes.
+Respond ONLY with the summary text."""
+
+    try:
+        with llm_usage_scope(stage="summary"):
+            summary = await llm.generate(
+                system_prompt="You maintain a concise running summary of a tutoring conversation.",
+                user_prompt=prompt,
+                temperature=0.2,
+                max_tokens=512
+            )
+    except LLMError as e:
+        print(f"[WARNING] Conversation summary update failed: {e}")
+        return None
+
+    return summary.strip() or None
+
+
+def apply_summary(context: Dict[str, Any], window: ContextWindow, summary: Optional[str]) -> None:
+    """
+    Store a folded summary in context, unless another turn already moved it on.
+
+    Args:
+        context: Session context_json being updated (modified in place)
+        window: Window the summary was folded from
+        summary: Result of fold_summary
+    """
+    if not summary or int(context.get("summarized_count", 0)) != window.summarized_count:
+        return
+    context["summary"] = summary
+    context["summarized_count"] = window.fold_end
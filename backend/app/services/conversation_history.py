@@ -0,0 +1,168 @@
+"""
+Append-only storage for conversation transcripts.
+
+Every message is one ConversationMessage row numbered by `seq` within its
+session, so a turn costs two single-row inserts however long the session
+is, and a reply prompt reads only the recent window (a keyset query on the
+(session_id, seq) index). The same unique index is the concurrency check:
+a writer inserts at the sequence number it expects to be next, and a
+conflict means another turn was stored in the meantime.
+
+Sessions created before the table existed keep their transcript in
+context_json["messages"]; migrate_session moves it over on first use and
+migrate_conversation_sessions does it for every stored session.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.rate_governor import estimate_tokens
+from app.db.models import ConversationMessage, ConversationSession
+
+# Tries for an unconditional append before giving up on a busy session
+_APPEND_ATTEMPTS = 3
+
+
+class SequenceConflict(Exception):
+    """Another writer already stored a message at the expected sequence number."""
+
+
+def _row(session_id: str, seq: int, message: Mapping[str, Any]) -> ConversationMessage:
+    content = str(message.get("content", ""))
+    return ConversationMessage(
+        session_id=session_id,
+        seq=seq,
+        role=message.get("role", "user"),
+        content=content,
+        token_estimate=estimate_tokens(content)
+    )
+
+
+async def next_seq(session_id: str, db: AsyncSession) -> int:
+    """Sequence number the next message of a session gets."""
+    last = await db.scalar(
+        select(func.max(ConversationMessage.seq)).where(ConversationMessage.session_id == session_id)
+    )
+    return 0 if last is None else last + 1
+
+
+async def append_messages(
+    session_id: str,
+    messages: Sequence[Mapping[str, Any]],
+    db: AsyncSession,
+    expected_seq: Optional[int] = None
+) -> int:
+    """
+    Append messages to a session (flushed; the caller commits).
+
+    Args:
+        session_id: Conversation session ID
+        messages: {"role", "content"} dicts, oldest first
+        db: Database session
+        expected_seq: Sequence number the first message must get. None appends
+            after whatever is stored, retrying if another writer gets there first
+
+    Returns:
+        The sequence number following the appended messages
+
+    Raises:
+        SequenceConflict: expected_seq is taken, or the session stayed too busy to append
+    """
+    for _ in range(_APPEND_ATTEMPTS):
+        seq = expected_seq if expected_seq is not None else await next_seq(session_id, db)
+        try:
+            async with db.begin_nested():
+                db.add_all([_row(session_id, seq + offset, message) for offset, message in enumerate(messages)])
+            return seq + len(messages)
+        except IntegrityError:
+            if expected_seq is not None:
+                break
+
+    raise SequenceConflict(f"Conversation session {session_id} already has a message at seq {seq}")
+
+
+async def load_recent_messages(
+    session_id: str,
+    db: AsyncSession,
+    since_seq: int,
+    limit: int
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Load the newest messages of a session, at most `limit`, none before `since_seq`.
+
+    Args:
+        session_id: Conversation session ID
+        db: Database session
+        since_seq: First sequence number of interest (the rest is summarized)
+        limit: Maximum number of messages to load
+
+    Returns:
+        ({"seq", "role", "content"} dicts oldest first, sequence number of the next message)
+    """
+    rows = (await db.execute(
+        select(ConversationMessage.seq, ConversationMessage.role, ConversationMessage.content)
+        .where(ConversationMessage.session_id == session_id, ConversationMessage.seq >= since_seq)
+        .order_by(ConversationMessage.seq.desc())
+        .limit(max(1, limit))
+    )).all()
+
+    messages = [{"seq": seq, "role": role, "content": content} for seq, role, content in reversed(rows)]
+    following = messages[-1]["seq"] + 1 if messages else await next_seq(session_id, db)
+    return messages, following
+
+
+async def migrate_session(session: ConversationSession, db: AsyncSession) -> bool:
+    """
+    Move a session's context_json["messages"] into ConversationMessage rows.
+
+    Args:
+        session: Conversation session, modified in place
+        db: Database session (the caller commits)
+
+    Returns:
+        True if the session still had its transcript in context_json
+    """
+    context = session.context_json or {}
+    if "messages" not in context:
+        return False
+
+    messages = [message for message in context["messages"] or [] if isinstance(message, dict)]
+    try:
+        async with db.begin_nested():
+            db.add_all([_row(session.id, seq, message) for seq, message in enumerate(messages)])
+    except IntegrityError:
+        # Another request migrated this session first
+        pass
+
+    session.context_json = {key: value for key, value in context.items() if key != "messages"}
+    return True
+
+
+async def migrate_conversation_sessions(db: AsyncSession, batch_size: int = 100) -> int:
+    """
+    Migrate every session that still stores its transcript in context_json.
+
+    Returns:
+        Number of sessions migrated
+    """
+    migrated = 0
+    after = ""
+    while True:
+        sessions = (await db.scalars(
+            select(ConversationSession)
+            .where(ConversationSession.id > after)
+            .order_by(ConversationSession.id)
+            .limit(batch_size)
+        )).all()
+        if not sessions:
+            return migrated
+
+        for session in sessions:
+            if await migrate_session(session, db):
+                migrated += 1
+        after = sessions[-1].id
+        await db.commit()
+        db.expunge_all()
@@ -0,0 +1,210 @@
+"""
+Pool of pre-generated, validated flashcards per (target_language, level).
+
+A background replenisher keeps each pool above a low-water mark so
+/vocabulary/next can usually serve a card with a single DB lookup instead
+of running the generate -> check -> image chain inside the request.
+"""
+
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models import FlashcardPoolEntry, User
+
+PoolKey = Tuple[str, str]
+
+# How many of the oldest entries to scan when skipping words the user has seen
+POP_SCAN_LIMIT = 100
+
+
+async def pool_size(target_language: str, level: str, db: AsyncSession) -> int:
+    """Number of cards waiting in one pool."""
+    return await db.scalar(select(func.count()).select_from(FlashcardPoolEntry).where(
+        FlashcardPoolEntry.target_language == target_language,
+        FlashcardPoolEntry.level == level
+    ))
+
+
+async def pop_flashcard(
+    target_language: str,
+    level: str,
+    exclude_words: Iterable[str],
+    db: AsyncSession
+) -> Optional[Dict[str, Any]]:
+    """
+    Take the oldest pooled card whose word the user has not seen recently.
+
+    Args:
+        target_language: Target language
+        level: CEFR level
+        exclude_words: Words to skip (case-insensitive)
+        db: Database session
+
+    Returns:
+        Dict with "card", "checker_result" and "secondary_validation",
+        or None if no suitable card is pooled
+    """
+    excluded = {word.lower() for word in exclude_words}
+    candidates = (await db.scalars(select(FlashcardPoolEntry).where(
+        FlashcardPoolEntry.target_language == target_language,
+        FlashcardPoolEntry.level == level
+    ).order_by(FlashcardPoolEntry.id).limit(POP_SCAN_LIMIT))).all()
+
+    for entry in candidates:
+        if entry.word.lower() in excluded:
+            continue
+
+        pooled = {
+            "card": dict(entry.card),
+            "checker_result": entry.checker_result,
+            "secondary_validation": entry.secondary_validation
+        }
+        # Claim the row with a conditional delete; another worker may have taken it
+        claimed = await db.execute(
+            delete(FlashcardPoolEntry)
+            .where(FlashcardPoolEntry.id == entry.id)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if claimed.rowcount:
+            return pooled
+
+    return None
+
+
+async def replenish_pool(target_language: str, level: str, db: Optional[AsyncSession] = None) -> int:
+    """
+    Top up one pool to FLASHCARD_POOL_TARGET_SIZE if it is below the low-water mark.
+
+    Only cards that passed both validation stages are pooled.
+
+    Args:
+        target_language: Target language
+        level: CEFR level
+        db: Database session (a new one is opened if omitted)
+
+    Returns:
+        Number of cards added
+    """
+    # Imported here to avoid a circular import with the vocabulary service
+    from app.services.vocabulary import generate_flashcard_batch
+
+    owns_session = db is None
+    db = db or AsyncSessionLocal()
+    try:
+        size = await pool_size(target_language, level, db)
+        if size >= settings.FLASHCARD_POOL_LOW_WATER:
+            return 0
+
+        added = 0
+        while size + added < settings.FLASHCARD_POOL_TARGET_SIZE:
+            pooled_words: List[str] = [
+                word for (word,) in (await db.execute(select(FlashcardPoolEntry.word).where(
+                    FlashcardPoolEntry.target_language == target_language,
+                    FlashcardPoolEntry.level == level
+                ))).all()
+            ]
+            wanted = min(settings.VOCAB_BATCH_MAX_SIZE, settings.FLASHCARD_POOL_TARGET_SIZE - size - added)
+            batch = await generate_flashcard_batch(target_language, level, wanted, pooled_words, db)
+
+            entries = [
+                FlashcardPoolEntry(
+                    target_language=target_language,
+                    level=level,
+                    word=card["word"],
+                    card=card,
+                    checker_result=batch["checker_result"],
+                    secondary_validation=batch["secondary_validation"],
+                    is_validated=True
+                )
+                for card in batch["cards"]
+                if card["validation"]["is_validated"]
+            ]
+            if not entries:
+                # Nothing passed validation this round; try again on the next cycle
+                break
+
+            db.add_all(entries)
+            await db.commit()
+            added += len(entries)
+
+        return added
+    finally:
+        if owns_session:
+            await db.close()
+
+
+async def get_active_pool_keys(db: AsyncSession) -> List[PoolKey]:
+    """(language, level) pairs that currently have learners."""
+    rows = (await db.execute(
+        select(User.target_language, User.level)
+        .where(User.target_language.isnot(None), User.level.isnot(None))
+        .distinct()
+    )).all()
+    return [(language, level) for language, level in rows]
+
+
+class FlashcardPoolReplenisher:
+    """Runs pool top-ups in the background, at most one per pool at a time."""
+
+    def __init__(self):
+        self._tasks: Dict[PoolKey, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def schedule(self, target_language: str, level: str) -> None:
+        """Start a top-up for one pool unless one is already running."""
+        key = (target_language, level)
+        task = self._tasks.get(key)
+        if task is not None and not task.done():
+            return
+        self._tasks[key] = asyncio.get_running_loop().create_task(self._replenish(key))
+
+    async def _replenish(self, key: PoolKey) -> None:
+        try:
+            added = await replenish_pool(*key)
+            if added:
+                print(f"[INFO] Flashcard pool {key[0]}/{key[1]}: added {added} cards")
+        except Exception as e:
+            print(f"[WARNING] Flashcard pool {key[0]}/{key[1]} refill failed: {e}")
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    keys = await get_active_pool_keys(db)
+                for target_language, level in keys:
+                    self.schedule(target_language, level)
+            except Exception as e:
+                # Keep the loop alive; the next cycle retries
+                print(f"[WARNING] Flashcard pool refill cycle failed: {e}")
+            await asyncio.sleep(settings.FLASHCARD_POOL_REFILL_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        """Start the periodic refill loop (call from application startup)."""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.get_running_loop().create_task(self._run_forever())
+
+    async def stop(self) -> None:
+        """Cancel the refill loop and any running top-ups."""
+        tasks = [task for task in [self._loop_task, *self._tasks.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._tasks.clear()
+
+
+_replenisher: Optional[FlashcardPoolReplenisher] = None
+
+
+def get_flashcard_replenisher() -> FlashcardPoolReplenisher:
+    """Get or create the global replenisher."""
+    global _replenisher
+    if _replenisher is None:
+        _replenisher = FlashcardPoolReplenisher()
+    return _replenisher
@@ -1,10 +1,17 @@
 import json
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
 from datetime import datetime
 from app.db.models import User, ContentLog, UserProgress
-from app.services.ai_services import get_llm_client, get_checker_service, get_secondary_validator
+from app.core.config import settings
+from app.core.pipeline import Pipeline
+from app.core.llm_usage import llm_usage_scope
+from app.services.ai_services import LLMOutputError, get_llm_client, get_checker_service, get_secondary_validator
+from app.services.validation_policy import get_validation_policy, sampled_check, sampled_validation, segment_key, was_sampled_out
+from app.services.answer_events import record_answer
+from app.schemas.llm_outputs import GrammarQuestionOutput
 from app.schemas.grammar import GrammarQuestionResponse, GrammarAnswerRequest, GrammarAnswerResponse
 
 
@@ -13,7 +20,7 @@ async def get_grammar_question(
     target_language: str,
     level: Optional[str],
     topic: Optional[str],
-    db: Session
+    db: AsyncSession
 ) -> GrammarQuestionResponse:
     """
     Generate a grammar question.
@@ -33,7 +40,7 @@ async def get_grammar_question(
     secondary_validator = get_secondary_validator()
 
     # Find or create user
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         user = User(
             external_id=user_id,
@@ -41,17 +48,18 @@ async def get_grammar_question(
             level=level
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
     level_info = f" at {level} level" if level else ""
     topic_info = f" about {topic}" if topic else ""
 
-    recent_logs = db.query(ContentLog) \
-        .filter(ContentLog.user_id == user.id, ContentLog.module == "vocabulary") \
-        .order_by(ContentLog.created_at.desc()) \
-        .limit(20) \
-        .all()
+    recent_logs = (await db.scalars(
+        select(ContentLog)
+        .where(ContentLog.user_id == user.id, ContentLog.module == "vocabulary")
+        .order_by(ContentLog.created_at.desc())
+        .limit(20)
+    )).all()
 
     # Extract just the words
     seen_words = []
@@ -76,54 +84,71 @@ async def get_grammar_question(
       "explanation": "Brief explanation in English of why the correct answer is correct"
     }}"""
 
-    # Generate question
-    response = await llm.generate(
-        system_prompt=f"You are a language learning content creator. Always respond with valid JSON only.",
-        user_prompt=prompt,
-        temperature=0.7,
-        max_tokens=4096 # return JSON can be large
-    )
+    user_input = {"target_language": target_language, "level": level, "topic": topic}
+    segment = segment_key("grammar", target_language, level)
+    await get_validation_policy().ensure_history("grammar", db)
 
-    try:
-        cleaned = response.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-
-        question_data = json.loads(cleaned.strip())
-    except (json.JSONDecodeError, ValueError) as e:
-        # Prevent 500 Crash
-        print(f"JSON Parse Error: {e}")
-        # Return a fallback or re-raise a clean error
-        print("[DEBUG] the json looked like this:")
-        print(cleaned)
-        raise ValueError("Failed to generate valid grammar question from AI.")
+    async def generate_stage(ctx):
+        try:
+            question = await llm.generate_json(
+                schema=GrammarQuestionOutput,
+                system_prompt=f"You are a language learning content creator. Always respond with valid JSON only.",
+                user_prompt=prompt,
+                temperature=0.7,
+                max_tokens=4096 # return JSON can be large
+            )
+        except LLMOutputError as e:
+            # Prevent 500 Crash
+            print(f"JSON Parse Error: {e}")
+            raise ValueError("Failed to generate valid grammar question from AI.")
+
+        return question.model_dump()
 
     # Stage 1: Primary checker - format and basic validation
-    checker_result = await checker.check_content(
-        module="grammar",
-        original_instruction="Generate grammar question",
-        user_input={"target_language": target_language, "level": level, "topic": topic},
-        generated_content=json.dumps(question_data)
-    )
+    async def check_stage(ctx):
+        question_data = ctx["generate"]
+        checker_result = await sampled_check(
+            checker,
+            segment,
+            module="grammar",
+            original_instruction="Generate grammar question",
+            user_input=user_input,
+            generated_content=json.dumps(question_data)
+        )
 
-    # If not valid and has suggested fix, try to use it
-    if not checker_result["is_valid"] and checker_result["suggested_fix"]:
-        try:
-            question_data = json.loads(checker_result["suggested_fix"])
-        except (TypeError, json.JSONDecodeError, KeyError):
-            pass
+        # If not valid and has suggested fix, try to use it
+        if not checker_result["is_valid"] and checker_result["suggested_fix"]:
+            try:
+                question_data = json.loads(checker_result["suggested_fix"])
+            except (TypeError, json.JSONDecodeError, KeyError):
+                pass
+
+        return {"checker_result": checker_result, "question_data": question_data}
 
     # Stage 2: Secondary validation - deep accuracy and quality check
-    secondary_validation = await secondary_validator.deep_validate(
-        module="grammar",
-        user_input={"target_language": target_language, "level": level, "topic": topic},
-        generated_content=json.dumps(question_data),
-        primary_validation=checker_result
-    )
+    async def secondary_stage(ctx):
+        checked = ctx["check"]
+        return await sampled_validation(
+            secondary_validator,
+            segment,
+            checked["checker_result"],
+            module="grammar",
+            user_input=user_input,
+            generated_content=json.dumps(checked["question_data"])
+        )
+
+    # Grammar has no image branch, so the graph is a straight line; running it
+    # through the same executor keeps per-stage timings comparable with vocabulary
+    with llm_usage_scope(module="grammar", user_id=user.id):
+        result = await Pipeline("grammar") \
+            .add_stage("generate", generate_stage) \
+            .add_stage("check", check_stage, depends_on=["generate"]) \
+            .add_stage("secondary", secondary_stage, depends_on=["check"]) \
+            .run()
+
+    checker_result = result["check"]["checker_result"]
+    question_data = result["check"]["question_data"]
+    secondary_validation = result["secondary"]
 
     # If secondary validator suggests improvement and has high confidence, use it
     if (not secondary_validation["is_approved"] and
@@ -143,22 +168,22 @@ async def get_grammar_question(
     question_data["validation"] = {
         "is_validated": checker_result["is_valid"] and secondary_validation["is_approved"],
         "confidence_score": secondary_validation.get("confidence_score"),
-        "primary_check_passed": checker_result["is_valid"],
-        "secondary_check_passed": secondary_validation["is_approved"]
+        "primary_check_passed": None if was_sampled_out(checker_result) else checker_result["is_valid"],
+        "secondary_check_passed": None if was_sampled_out(secondary_validation) else secondary_validation["is_approved"]
     }
 
     # Log content with both validation stages
     content_log = ContentLog(
         user_id=user.id,
         module="grammar",
-        input_payload={"target_language": target_language, "level": level, "topic": topic},
+        input_payload={"target_language": target_language, "level": level, "topic": topic, "model": settings.LLM_MODEL},
         generated_content=question_data,
         checker_result=checker_result,
         secondary_validation=secondary_validation,
         is_validated=checker_result["is_valid"] and secondary_validation["is_approved"]
     )
     db.add(content_log)
-    db.commit()
+    await db.commit()
 
     return GrammarQuestionResponse(**question_data)
 
@@ -166,7 +191,7 @@ async def get_grammar_question(
 async def submit_grammar_answer(
     request: GrammarAnswerRequest,
     current_user: User,
-    db: Session
+    db: AsyncSession
 ) -> GrammarAnswerResponse:
     """
     Submit a grammar answer and get feedback.
@@ -185,10 +210,10 @@ async def submit_grammar_answer(
 
     # Update user progress
     # this is what i fixed: was filtering by external_id, so logged-in users were not found
-    progress = db.query(UserProgress).filter(
+    progress = await db.scalar(select(UserProgress).where(
         UserProgress.user_id == user.id,
         UserProgress.module == "grammar"
-    ).first()
+    ))
 
     if not progress:
         progress = UserProgress(
@@ -210,19 +235,10 @@ async def submit_grammar_answer(
     # Update last activity timestamp
     progress.last_activity_at = datetime.utcnow()
 
-    db.commit()
-
-    # Check for achievements
-    from app.services.achievements_service import check_and_unlock_achievements
-    newly_unlocked = check_and_unlock_achievements(user.id, db)
+    await db.commit()
 
-    # Check if user now meets advancement criteria
-    from app.services.progress_service import calculate_advancement_eligibility
-    eligibility = calculate_advancement_eligibility(user.id, db)
-    if eligibility["eligible"] and not user.can_advance:
-        user.can_advance = True
-        user.advancement_notified_at = datetime.utcnow()
-        db.commit()
+    # Achievements and advancement eligibility are evaluated in the background
+    await record_answer(user.id, "grammar", db)
 
     explanation = request.explanation or ("Correct!" if is_correct else f"The correct answer was option {request.correct_option_index}.")
 
@@ -1,6 +1,9 @@
-import httpx
+import hashlib
 from typing import Optional
 from app.core.config import settings
+from app.core.singleflight import get_single_flight
+from app.core.http_pool import close_client_soon, get_http_client
+from app.core.llm_usage import track_ai_call
 
 class ImageGenClient:
     """Client dedicated to interacting with Image Generation API (Imagen 4)."""
@@ -10,13 +13,25 @@ class ImageGenClient:
         self.base_url = base_url
         self.model = model
         self.provider = provider.lower()
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = get_http_client(timeout=30.0, provider=self.provider)
 
     async def generate_safe_image(self, prompt: str) -> Optional[str]:
         """
         Generate a safe image based on the prompt.
+        Concurrent requests for the same prompt share one upstream call.
         Returns: base64 encoded image string OR None if generation fails.
         """
+        key_source = f"{self.provider}|{self.model}|{' '.join(prompt.split())}"
+        request_key = hashlib.sha256(key_source.encode()).hexdigest()
+        with track_ai_call("image", self.provider, self.model, stage="image") as call:
+            image = await get_single_flight("image").do(
+                request_key,
+                lambda: self._generate_safe_image_uncached(prompt)
+            )
+            call.success = image is not None
+            return image
+
+    async def _generate_safe_image_uncached(self, prompt: str) -> Optional[str]:
         try:
             safe_prompt = (
                 f"cartoon style illustration of {prompt}. "
@@ -24,7 +39,7 @@ class ImageGenClient:
                 "IMPORTANT: No text, letters, or words should appear in the image."
             )
 
-            if self.provider in {"openai", "gpt"}:
+            if self.provider in {"openai", "gpt", "fake"}:
                 url = f"{self.base_url}/images/generations"
                 headers = {
                     "Authorization": f"Bearer {self.api_key}",
@@ -100,6 +115,7 @@ _image_client: Optional[ImageGenClient] = None
 def reset_image_client() -> None:
     """Reset singleton ImageGenClient instance after config changes."""
     global _image_client
+    close_client_soon(_image_client)
     _image_client = None
 
 
@@ -0,0 +1,102 @@
+"""
+Reports over the llm_usage table (see app.core.llm_usage for recording).
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import LLMUsageRecord
+from app.schemas.admin import LLMUsageGroup, LLMUsageReport
+
+# Columns a report can be grouped by ("user" is the user_id column)
+GROUP_COLUMNS = {
+    "service": LLMUsageRecord.service,
+    "provider": LLMUsageRecord.provider,
+    "model": LLMUsageRecord.model,
+    "module": LLMUsageRecord.module,
+    "stage": LLMUsageRecord.stage,
+    "user": LLMUsageRecord.user_id,
+}
+
+_AGGREGATES = [
+    func.count(LLMUsageRecord.id).label("calls"),
+    func.sum(case((LLMUsageRecord.success.is_(False), 1), else_=0)).label("errors"),
+    func.sum(case((LLMUsageRecord.cached.is_(True), 1), else_=0)).label("cached"),
+    func.sum(LLMUsageRecord.retries).label("retries"),
+    func.sum(LLMUsageRecord.prompt_tokens).label("prompt_tokens"),
+    func.sum(LLMUsageRecord.completion_tokens).label("completion_tokens"),
+    func.sum(LLMUsageRecord.cost_usd).label("cost_usd"),
+    func.sum(LLMUsageRecord.latency_ms).label("total_latency_ms"),
+    func.avg(LLMUsageRecord.latency_ms).label("avg_latency_ms"),
+    func.max(LLMUsageRecord.latency_ms).label("max_latency_ms"),
+    func.avg(LLMUsageRecord.ttfb_ms).label("avg_ttfb_ms"),
+]
+
+
+def _to_group(row, group_by: List[str]) -> LLMUsageGroup:
+    return LLMUsageGroup(
+        keys={name: getattr(row, name) for name in group_by},
+        calls=row.calls or 0,
+        errors=row.errors or 0,
+        cached=row.cached or 0,
+        retries=row.retries or 0,
+        prompt_tokens=row.prompt_tokens or 0,
+        completion_tokens=row.completion_tokens or 0,
+        cost_usd=round(row.cost_usd or 0.0, 6),
+        total_latency_ms=round(row.total_latency_ms or 0.0, 1),
+        avg_latency_ms=round(row.avg_latency_ms or 0.0, 1),
+        max_latency_ms=round(row.max_latency_ms or 0.0, 1),
+        avg_ttfb_ms=round(row.avg_ttfb_ms, 1) if row.avg_ttfb_ms is not None else None
+    )
+
+
+async def get_llm_usage_report(
+    db: AsyncSession,
+    since: datetime,
+    group_by: List[str],
+    user_id: Optional[str] = None
+) -> LLMUsageReport:
+    """
+    Aggregate recorded AI calls since a point in time.
+
+    Args:
+        db: Database session
+        since: Only include calls recorded at or after this time (UTC)
+        group_by: Names from GROUP_COLUMNS to group by, in order
+        user_id: Restrict the report to one user
+
+    Returns:
+        LLMUsageReport with overall totals and one group per key combination
+
+    Raises:
+        ValueError: If group_by names an unknown column
+    """
+    unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"Cannot group by {', '.join(unknown)}; choose from {', '.join(GROUP_COLUMNS)}")
+
+    filters = [LLMUsageRecord.created_at >= since]
+    if user_id:
+        filters.append(LLMUsageRecord.user_id == user_id)
+
+    totals = (await db.execute(select(*_AGGREGATES).where(*filters))).one()
+
+    group_columns = [GROUP_COLUMNS[name].label(name) for name in group_by]
+    rows = []
+    if group_columns:
+        rows = (await db.execute(
+            select(*group_columns, *_AGGREGATES)
+            .where(*filters)
+            .group_by(*[GROUP_COLUMNS[name] for name in group_by])
+            .order_by(func.sum(LLMUsageRecord.latency_ms).desc())
+        )).all()
+
+    return LLMUsageReport(
+        since=since,
+        group_by=group_by,
+        totals=_to_group(totals, []),
+        groups=[_to_group(row, group_by) for row in rows]
+    )
@@ -1,10 +1,13 @@
 import json
 from typing import Dict
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
 from datetime import datetime
 from app.db.models import User, ContentLog, UserProgress
+from app.core.llm_usage import llm_usage_scope
 from app.services.ai_services import get_llm_client
+from app.services.answer_events import record_answer
 from app.services.stt_client import get_stt_client
 from app.schemas.phonetics import PhoneticsEvaluationResponse, PhoneticsPracticeSession
 
@@ -55,12 +58,13 @@ async def generate_target_phrase(
     phrase_text = "Hola, ¿cómo estás hoy?"  # Default fallback
 
     try:
-        response = await llm.generate(
-            system_prompt="You are a language teacher.",
-            user_prompt=prompt,
-            temperature=0.9,
-            max_tokens=512
-        )
+        with llm_usage_scope(module="phonetics"):
+            response = await llm.generate(
+                system_prompt="You are a language teacher.",
+                user_prompt=prompt,
+                temperature=0.9,
+                max_tokens=512
+            )
         phrase_text = response.strip().replace('"', '')
     except (ValueError, TypeError):
         print("[DEBUG] LLM phrase generation failed, using fallback.")
@@ -79,7 +83,7 @@ async def evaluate_pronunciation(
     target_language: str,
     target_phrase: str,
     audio_bytes: bytes,
-    db: Session
+    db: AsyncSession
 ) -> PhoneticsEvaluationResponse:
     """
     Evaluate pronunciation using STT and LLM analysis.
@@ -99,34 +103,38 @@ async def evaluate_pronunciation(
     # Find or create user
 
     # this is what i fixed: was filtering by external_id, so logged-in users were not found
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         user = User(external_id=user_id)
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
 
     # Transcribe audio
-    analysis_result = await stt.analyze_audio(audio_bytes,
-    target_language=target_language,
-    target_phrase=target_phrase
-    )
+    with llm_usage_scope(module="phonetics", user_id=user.id):
+        analysis_result = await stt.analyze_audio(audio_bytes,
+        target_language=target_language,
+        target_phrase=target_phrase
+        )
 
     transcript = analysis_result.get("transcript", "")
     stt_confidence = analysis_result.get("confidence", 0.0)
-    score = analysis_result.get("score", 0.0)
-    feedback = analysis_result.get("feedback", "No feedback provided.")
-    word_level_feedback = analysis_result.get("word_level_feedback", [])
+    # Fields the model left out may come back as None
+    score = analysis_result.get("score")
+    if score is None:
+        score = 0.0
+    feedback = analysis_result.get("feedback") or "No feedback provided."
+    word_level_feedback = analysis_result.get("word_level_feedback") or []
 
     # Voice recording error handling
     if stt_confidence < 0.6:
         feedback = f"⚠️ Low audio quality. Please try speaking again. (AI heard: '{transcript}')"
         score = max(score, 10.0)
 
-    progress = db.query(UserProgress).filter(
+    progress = await db.scalar(select(UserProgress).where(
         UserProgress.user_id == user.id,
         UserProgress.module == "phonetics"
-    ).first()
+    ))
 
     if not progress:
         progress = UserProgress(
@@ -146,19 +154,7 @@ async def evaluate_pronunciation(
     # Update last activity timestamp
     progress.last_activity_at = datetime.utcnow()
 
-    db.commit()
-
-    # Check for achievements
-    from app.services.achievements_service import check_and_unlock_achievements
-    newly_unlocked = check_and_unlock_achievements(user.id, db)
-
-    # Check if user now meets advancement criteria
-    from app.services.progress_service import calculate_advancement_eligibility
-    eligibility = calculate_advancement_eligibility(user.id, db)
-    if eligibility["eligible"] and not user.can_advance:
-        user.can_advance = True
-        user.advancement_notified_at = datetime.utcnow()
-        db.commit()
+    await db.commit()
 
     # Log content
     content_log = ContentLog(
@@ -173,7 +169,10 @@ async def evaluate_pronunciation(
         is_validated=True
     )
     db.add(content_log)
-    db.commit()
+    await db.commit()
+
+    # Achievements and advancement eligibility are evaluated in the background
+    await record_answer(user.id, "phonetics", db)
 
     return PhoneticsEvaluationResponse(
         transcript=transcript,
@@ -2,7 +2,8 @@
 Placement test service for generating and scoring language proficiency tests.
 """
 from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
 
 from app.db.models import PlacementTest, User
@@ -10,7 +11,7 @@ from app.services.placement_test_questions import get_predefined_question
 from app.core.config import settings
 
 
-def start_placement_test(db: Session, user_id: str, target_language: str) -> PlacementTest:
+async def start_placement_test(db: AsyncSession, user_id: str, target_language: str) -> PlacementTest:
     """
     Start a new placement test by generating all 18 questions upfront using predefined questions.
 
@@ -65,8 +66,8 @@ def start_placement_test(db: Session, user_id: str, target_language: str) -> Pla
     )
 
     db.add(placement_test)
-    db.commit()
-    db.refresh(placement_test)
+    await db.commit()
+    await db.refresh(placement_test)
 
     return placement_test
 
@@ -113,7 +114,7 @@ def _generate_reading_question(language: str, level: str) -> Dict[str, Any]:
     return get_predefined_question(language, "reading", level)
 
 
-def get_next_question(db: Session, test_id: str) -> Optional[Dict[str, Any]]:
+async def get_next_question(db: AsyncSession, test_id: str) -> Optional[Dict[str, Any]]:
     """
     Get the next unanswered question in the test.
 
@@ -124,7 +125,7 @@ def get_next_question(db: Session, test_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Next question data or None if all answered
     """
-    test = db.query(PlacementTest).filter(PlacementTest.id == test_id).first()
+    test = await db.scalar(select(PlacementTest).where(PlacementTest.id == test_id))
     if not test:
         return None
 
@@ -146,7 +147,7 @@ def get_next_question(db: Session, test_id: str) -> Optional[Dict[str, Any]]:
     return None
 
 
-def submit_answer(db: Session, test_id: str, question_number: int, selected_option: int) -> bool:
+async def submit_answer(db: AsyncSession, test_id: str, question_number: int, selected_option: int) -> bool:
     """
     Submit an answer for a question.
 
@@ -159,7 +160,7 @@ def submit_answer(db: Session, test_id: str, question_number: int, selected_opti
     Returns:
         True if answer submitted successfully, False otherwise
     """
-    test = db.query(PlacementTest).filter(PlacementTest.id == test_id).first()
+    test = await db.scalar(select(PlacementTest).where(PlacementTest.id == test_id))
     if not test or test.completed:
         return False
 
@@ -171,11 +172,11 @@ def submit_answer(db: Session, test_id: str, question_number: int, selected_opti
     # Flag the JSON column as modified so SQLAlchemy detects the change
     flag_modified(test, "answers_data")
 
-    db.commit()
+    await db.commit()
     return True
 
 
-def calculate_results(db: Session, test_id: str) -> Optional[Dict[str, Any]]:
+async def calculate_results(db: AsyncSession, test_id: str) -> Optional[Dict[str, Any]]:
     """
     Calculate test results and determine CEFR level.
 
@@ -186,7 +187,7 @@ def calculate_results(db: Session, test_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary with scores and determined level
     """
-    test = db.query(PlacementTest).filter(PlacementTest.id == test_id).first()
+    test = await db.scalar(select(PlacementTest).where(PlacementTest.id == test_id))
     if not test:
         return None
 
@@ -253,14 +254,14 @@ def calculate_results(db: Session, test_id: str) -> Optional[Dict[str, Any]]:
     test.completed = True
 
     # Update user's level and placement test status
-    user = db.query(User).filter(User.id == test.user_id).first()
+    user = await db.scalar(select(User).where(User.id == test.user_id))
     if user:
         user.level = level
         user.placement_test_completed = True
         user.placement_test_score = overall_score
 
-    db.commit()
-    db.refresh(test)
+    await db.commit()
+    await db.refresh(test)
 
     # Generate recommendations
     recommendations = _generate_recommendations(level, vocab_score, grammar_score, reading_score)
@@ -322,7 +323,7 @@ def _generate_recommendations(level: str, vocab_score: float, grammar_score: flo
     return recommendations
 
 
-def get_user_test_history(db: Session, user_id: str) -> List[PlacementTest]:
+async def get_user_test_history(db: AsyncSession, user_id: str) -> List[PlacementTest]:
     """
     Get all placement tests for a user.
 
@@ -333,4 +334,4 @@ def get_user_test_history(db: Session, user_id: str) -> List[PlacementTest]:
     Returns:
         List of PlacementTest objects
     """
-    return db.query(PlacementTest).filter(PlacementTest.user_id == user_id).order_by(PlacementTest.test_date.desc()).all()
+    return (await db.scalars(select(PlacementTest).where(PlacementTest.user_id == user_id).order_by(PlacementTest.test_date.desc()))).all()
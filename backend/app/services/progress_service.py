@@ -8,13 +8,15 @@ Handles:
 - Archiving progress history
 """
 
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, event, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 from uuid import uuid4
 
-from app.db.models import User, UserProgress, LevelHistory, ConversationSession
+from app.db.models import User, UserProgress, LevelHistory, ConversationSession, ConversationMessage, ConversationMessageCount
 from app.schemas.progress import (
     ModuleProgress,
     ConversationEngagement,
@@ -45,6 +47,14 @@ XP_REWARDS = {
 # Scored modules (exclude conversation)
 SCORED_MODULES = ["vocabulary", "grammar", "writing", "phonetics"]
 
+# Weight of each scored module in the weighted score
+MODULE_WEIGHTS = {
+    "vocabulary": 0.30,
+    "grammar": 0.30,
+    "writing": 0.20,
+    "phonetics": 0.20
+}
+
 
 def get_next_level(current_level: str) -> Optional[str]:
     """Get the next CEFR level, or None if already at max."""
@@ -57,80 +67,47 @@ def get_next_level(current_level: str) -> Optional[str]:
     return None
 
 
-def _get_module_progress(user_id: str, module: str, db: Session) -> Optional[UserProgress]:
-    """Get progress record for a specific module."""
-    return db.query(UserProgress).filter(
-        UserProgress.user_id == user_id,
-        UserProgress.module == module
-    ).first()
-
-
-def _get_conversation_message_count(user_id: str, db: Session) -> int:
-    """Get total conversation messages sent by user."""
-    # Count messages from conversation_sessions context_json
-    sessions = db.query(ConversationSession).filter(
-        ConversationSession.user_id == user_id
-    ).all()
-
-    total_messages = 0
-    for session in sessions:
-        context = session.context_json
-        if isinstance(context, dict) and "messages" in context:
-            # Count user messages only
-            total_messages += sum(
-                1 for msg in context["messages"]
-                if isinstance(msg, dict) and msg.get("role") == "user"
-            )
-
-    return total_messages
-
-
-def calculate_advancement_eligibility(user_id: str, db: Session) -> dict:
+class ProgressSnapshot:
     """
-    Calculate if user is eligible to advance to next level.
+    A user's module progress, conversation count and (optionally) level history.
 
-    Requirements:
-    - All 4 scored modules >= 85% with minimum 10 attempts each
-    - Conversation module >= 20 messages
+    Read with one query by load_progress_snapshot; eligibility, the weighted
+    score and overall progress are derived from it in memory.
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return {"eligible": False, "reason": "User not found"}
-
-    if not user.level:
-        return {"eligible": False, "reason": "User level not set"}
 
-    next_level = get_next_level(user.level)
-    if not next_level:
-        return {"eligible": False, "reason": "Already at maximum level (C2)"}
-
-    # Check each scored module
-    module_status = {}
-    all_modules_ready = True
-    blocking_reasons = []
-
-    for module in SCORED_MODULES:
-        progress = _get_module_progress(user_id, module, db)
-
-        if not progress:
-            module_status[module] = {
-                "ready": False,
-                "score": None,
-                "attempts": 0,
-                "reason": "No activity yet"
-            }
-            all_modules_ready = False
-            blocking_reasons.append(f"{module.title()}: No activity yet")
-            continue
-
-        score = progress.score or 0.0
-        attempts = progress.total_attempts or 0
+    def __init__(
+        self,
+        user: User,
+        progress: Dict[str, UserProgress],
+        conversation_messages: int,
+        level_history: Optional[List[LevelHistory]] = None
+    ):
+        self.user = user
+        self.progress = progress
+        self.conversation_messages = conversation_messages
+        self.level_history = level_history
+
+    def module_score(self, module: str) -> Optional[float]:
+        progress = self.progress.get(module)
+        return progress.score if progress else None
+
+    def module_attempts(self, module: str) -> int:
+        progress = self.progress.get(module)
+        return (progress.total_attempts or 0) if progress else 0
+
+    def module_status(self, module: str) -> dict:
+        """Whether a scored module meets the advancement thresholds, and why not."""
+        if module not in self.progress:
+            return {"ready": False, "score": None, "attempts": 0, "reason": "No activity yet"}
+
+        score = self.module_score(module) or 0.0
+        attempts = self.module_attempts(module)
 
         meets_score = score >= SCORE_THRESHOLD
         meets_attempts = attempts >= MINIMUM_ATTEMPTS
         ready = meets_score and meets_attempts
 
-        module_status[module] = {
+        return {
             "ready": ready,
             "score": score,
             "attempts": attempts,
@@ -140,71 +117,262 @@ def calculate_advancement_eligibility(user_id: str, db: Session) -> dict:
             )
         }
 
-        if not ready:
-            all_modules_ready = False
+    @property
+    def conversation_ready(self) -> bool:
+        return self.conversation_messages >= CONVERSATION_MINIMUM
+
+    @property
+    def weighted_score(self) -> float:
+        """Scored modules weighted by MODULE_WEIGHTS; modules without a score count as 0."""
+        return sum((self.module_score(module) or 0.0) * weight for module, weight in MODULE_WEIGHTS.items())
+
+    @property
+    def overall_progress(self) -> float:
+        """Share of the 5 requirements (4 scored modules + conversation) met, 0-100."""
+        modules_ready = sum(1 for module in SCORED_MODULES if self.module_status(module)["ready"])
+        if self.conversation_ready:
+            modules_ready += 1
+        return modules_ready / (len(SCORED_MODULES) + 1) * 100
+
+    def eligibility(self) -> dict:
+        """Advancement eligibility, as returned by calculate_advancement_eligibility."""
+        if not self.user.level:
+            return {"eligible": False, "reason": "User level not set"}
+
+        if not get_next_level(self.user.level):
+            return {"eligible": False, "reason": "Already at maximum level (C2)"}
+
+        module_status = {module: self.module_status(module) for module in SCORED_MODULES}
+        blocking_reasons = [
+            f"{module.title()}: {status['reason']}"
+            for module, status in module_status.items() if not status["ready"]
+        ]
+
+        if not self.conversation_ready:
             blocking_reasons.append(
-                f"{module.title()}: {module_status[module]['reason']}"
+                f"Conversation: Need {CONVERSATION_MINIMUM - self.conversation_messages} more messages"
             )
 
-    # Check conversation engagement
-    conversation_messages = _get_conversation_message_count(user_id, db)
-    conversation_ready = conversation_messages >= CONVERSATION_MINIMUM
+        eligible = not blocking_reasons
+
+        return {
+            "eligible": eligible,
+            "reason": None if eligible else "; ".join(blocking_reasons),
+            "modules": module_status,
+            "conversation_messages": self.conversation_messages,
+            "conversation_ready": self.conversation_ready
+        }
+
+
+_SNAPSHOT_CACHE_KEY = "progress_snapshots"
+
+
+async def load_progress_snapshot(
+    user_id: str,
+    db: AsyncSession,
+    with_history: bool = False
+) -> Optional[ProgressSnapshot]:
+    """
+    Read a user's progress snapshot in one query.
+
+    Snapshots are kept on the session until its next write, commit or
+    rollback, so one request builds each user's snapshot once.
+
+    Args:
+        user_id: User ID
+        db: Database session
+        with_history: Also load the user's LevelHistory rows
+
+    Returns:
+        ProgressSnapshot, or None if the user does not exist
+    """
+    cache = db.info.setdefault(_SNAPSHOT_CACHE_KEY, {})
+    cached = cache.get(user_id)
+    if cached is not None and (cached.level_history is not None or not with_history):
+        return cached
+
+    conversation_messages = (
+        select(ConversationMessageCount.user_messages)
+        .where(ConversationMessageCount.user_id == User.id, ConversationMessageCount.level == User.level)
+        .scalar_subquery()
+    )
+    query = (
+        select(User, conversation_messages, UserProgress, *([LevelHistory] if with_history else []))
+        .outerjoin(UserProgress, UserProgress.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    if with_history:
+        # At most one history row per completed level, so the join stays a few dozen rows
+        query = query.outerjoin(LevelHistory, LevelHistory.user_id == User.id)
+
+    rows = (await db.execute(query)).all()
+    if not rows:
+        return None
+
+    progress: Dict[str, UserProgress] = {}
+    history: Dict[str, LevelHistory] = {}
+    for row in rows:
+        if row[2] is not None:
+            progress.setdefault(row[2].module, row[2])
+        if with_history and row[3] is not None:
+            history[row[3].id] = row[3]
+
+    snapshot = ProgressSnapshot(
+        user=rows[0][0],
+        progress=progress,
+        conversation_messages=rows[0][1] or 0,
+        level_history=sorted(history.values(), key=lambda record: record.completed_at) if with_history else None
+    )
+    cache[user_id] = snapshot
+    return snapshot
+
+
+@event.listens_for(Session, "after_flush")
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _drop_progress_snapshots(session, *args) -> None:
+    session.info.pop(_SNAPSHOT_CACHE_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _drop_snapshots_on_dml(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info.pop(_SNAPSHOT_CACHE_KEY, None)
+
+
+async def get_conversation_message_count(user_id: str, level: str, db: AsyncSession) -> int:
+    """Get conversation messages sent by user at a level (maintained counter, no history scan)."""
+    count = await db.scalar(select(ConversationMessageCount.user_messages).where(
+        ConversationMessageCount.user_id == user_id,
+        ConversationMessageCount.level == level
+    ))
+    return count or 0
 
-    if not conversation_ready:
-        all_modules_ready = False
-        blocking_reasons.append(
-            f"Conversation: Need {CONVERSATION_MINIMUM - conversation_messages} more messages"
+
+async def record_conversation_messages(user_id: str, db: AsyncSession, count: int = 1) -> None:
+    """
+    Add user messages to the counter for the user's current level.
+
+    Runs in the caller's transaction, so the count commits together with the
+    turn that produced it. The increment is a single UPDATE (level read in
+    SQL), so concurrent turns don't lose counts. Users without a level are
+    not counted.
+
+    Args:
+        user_id: User who sent the messages
+        db: Database session
+        count: Number of user messages
+    """
+    current_level = select(User.level).where(User.id == user_id).scalar_subquery()
+    increment = (
+        update(ConversationMessageCount)
+        .where(
+            ConversationMessageCount.user_id == user_id,
+            ConversationMessageCount.level == current_level
         )
+        .values(user_messages=ConversationMessageCount.user_messages + count)
+        .execution_options(synchronize_session=False)
+    )
+    if (await db.execute(increment)).rowcount:
+        return
+
+    try:
+        async with db.begin_nested():
+            await db.execute(
+                insert(ConversationMessageCount).from_select(
+                    ["user_id", "level", "user_messages"],
+                    select(User.id, User.level, literal(count)).where(User.id == user_id, User.level.isnot(None))
+                )
+            )
+    except IntegrityError:
+        # First message at this level raced with another; that row exists now
+        await db.execute(increment)
+
 
-    eligible = all_modules_ready and conversation_ready
+async def backfill_conversation_message_counts(db: AsyncSession) -> int:
+    """
+    Set every user's counter for their current level from stored conversations.
 
-    return {
-        "eligible": eligible,
-        "reason": None if eligible else "; ".join(blocking_reasons),
-        "modules": module_status,
-        "conversation_messages": conversation_messages,
-        "conversation_ready": conversation_ready
-    }
+    Conversation sessions are deleted on advancement, so all stored user
+    messages belong to the current level. Sessions still holding their
+    transcript in context_json are not counted; migrate them first.
 
+    Returns:
+        Number of users whose counter was written
+    """
+    users = (await db.execute(
+        select(User.id, User.level).where(User.level.isnot(None))
+    )).all()
+    user_messages = dict((await db.execute(
+        select(ConversationSession.user_id, func.count(ConversationMessage.id))
+        .join(ConversationMessage, ConversationMessage.session_id == ConversationSession.id)
+        .where(ConversationMessage.role == "user")
+        .group_by(ConversationSession.user_id)
+    )).all())
+
+    written = 0
+    for user_id, level in users:
+        total_messages = user_messages.get(user_id, 0)
+
+        counter = await db.scalar(select(ConversationMessageCount).where(
+            ConversationMessageCount.user_id == user_id,
+            ConversationMessageCount.level == level
+        ))
+        if counter is None:
+            if not total_messages:
+                continue
+            db.add(ConversationMessageCount(user_id=user_id, level=level, user_messages=total_messages))
+        else:
+            counter.user_messages = total_messages
+        written += 1
+
+    await db.commit()
+    return written
+
+
+async def calculate_advancement_eligibility(user_id: str, db: AsyncSession) -> dict:
+    """
+    Calculate if user is eligible to advance to next level.
+
+    Requirements:
+    - All 4 scored modules >= 85% with minimum 10 attempts each
+    - Conversation module >= 20 messages
+    """
+    snapshot = await load_progress_snapshot(user_id, db)
+    if not snapshot:
+        return {"eligible": False, "reason": "User not found"}
 
-def get_user_progress_summary(user_id: str, db: Session) -> ProgressSummaryResponse:
+    return snapshot.eligibility()
+
+
+async def get_user_progress_summary(user_id: str, db: AsyncSession) -> ProgressSummaryResponse:
     """Get comprehensive progress summary for user."""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    snapshot = await load_progress_snapshot(user_id, db)
+    if not snapshot:
         raise ValueError("User not found")
+    user = snapshot.user
 
     # Get advancement eligibility
-    eligibility = calculate_advancement_eligibility(user_id, db)
+    eligibility = snapshot.eligibility()
 
     # Build module progress list
     modules = []
-    total_score = 0.0
-    scored_count = 0
-
     for module in SCORED_MODULES:
-        progress = _get_module_progress(user_id, module, db)
+        progress = snapshot.progress.get(module)
 
         if progress:
             score = progress.score or 0.0
             total_attempts = progress.total_attempts or 0
-            correct_attempts = progress.correct_attempts or 0
-            last_activity = progress.last_activity_at
-
-            meets_threshold = score >= SCORE_THRESHOLD
-            meets_minimum = total_attempts >= MINIMUM_ATTEMPTS
 
             modules.append(ModuleProgress(
                 module=module,
                 score=score,
                 total_attempts=total_attempts,
-                correct_attempts=correct_attempts,
-                last_activity=last_activity,
-                meets_threshold=meets_threshold,
-                meets_minimum_attempts=meets_minimum
+                correct_attempts=progress.correct_attempts or 0,
+                last_activity=progress.last_activity_at,
+                meets_threshold=score >= SCORE_THRESHOLD,
+                meets_minimum_attempts=total_attempts >= MINIMUM_ATTEMPTS
             ))
-
-            total_score += score
-            scored_count += 1
         else:
             modules.append(ModuleProgress(
                 module=module,
@@ -217,37 +385,11 @@ def get_user_progress_summary(user_id: str, db: Session) -> ProgressSummaryRespo
             ))
 
     # Conversation engagement
-    conversation_messages = eligibility["conversation_messages"]
     conversation_engagement = ConversationEngagement(
-        total_messages=conversation_messages,
-        meets_threshold=conversation_messages >= CONVERSATION_MINIMUM
+        total_messages=snapshot.conversation_messages,
+        meets_threshold=snapshot.conversation_ready
     )
 
-    # Calculate weighted score
-    module_scores = {m: eligibility["modules"].get(m, {}).get("score", 0.0) for m in SCORED_MODULES}
-    # Ensure all scores are numbers (convert None to 0.0)
-    weighted_score = (
-        (module_scores.get("vocabulary") or 0.0) * 0.30 +
-        (module_scores.get("grammar") or 0.0) * 0.30 +
-        (module_scores.get("writing") or 0.0) * 0.20 +
-        (module_scores.get("phonetics") or 0.0) * 0.20
-    )
-
-    # Calculate overall progress based on modules ready to advance
-    # Count how many modules meet BOTH requirements (attempts >= 10 AND score >= 85%)
-    modules_ready = 0
-    total_modules = 5  # 4 scored modules + conversation
-
-    for module in SCORED_MODULES:
-        module_status = eligibility["modules"].get(module, {})
-        if module_status.get("ready", False):
-            modules_ready += 1
-
-    if eligibility["conversation_ready"]:
-        modules_ready += 1
-
-    overall_progress = (modules_ready / total_modules) * 100
-
     # Calculate time at current level
     days_at_level = 0
     if user.level_started_at:
@@ -259,8 +401,8 @@ def get_user_progress_summary(user_id: str, db: Session) -> ProgressSummaryRespo
         next_level=get_next_level(user.level) if user.level else "A1",
         can_advance=eligibility["eligible"],
         advancement_reason=eligibility["reason"],
-        overall_progress=overall_progress,
-        weighted_score=weighted_score,
+        overall_progress=snapshot.overall_progress,
+        weighted_score=snapshot.weighted_score,
         modules=modules,
         conversation_engagement=conversation_engagement,
         time_at_current_level=days_at_level,
@@ -268,7 +410,7 @@ def get_user_progress_summary(user_id: str, db: Session) -> ProgressSummaryRespo
     )
 
 
-def advance_user_level(user_id: str, db: Session) -> AdvancementResponse:
+async def advance_user_level(user_id: str, db: AsyncSession) -> AdvancementResponse:
     """
     Advance user to next level.
 
@@ -280,12 +422,13 @@ def advance_user_level(user_id: str, db: Session) -> AdvancementResponse:
     5. Award XP
     6. Return celebration data
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    snapshot = await load_progress_snapshot(user_id, db)
+    if not snapshot:
         raise ValueError("User not found")
+    user = snapshot.user
 
     # Verify eligibility
-    eligibility = calculate_advancement_eligibility(user_id, db)
+    eligibility = snapshot.eligibility()
     if not eligibility["eligible"]:
         raise ValueError(f"Not eligible to advance: {eligibility['reason']}")
 
@@ -295,28 +438,11 @@ def advance_user_level(user_id: str, db: Session) -> AdvancementResponse:
     if not new_level:
         raise ValueError("Already at maximum level")
 
-    # Collect current scores for archiving
-    module_scores = {}
-    module_attempts = {}
-
-    for module in SCORED_MODULES:
-        progress = _get_module_progress(user_id, module, db)
-        if progress:
-            module_scores[module] = progress.score
-            module_attempts[module] = progress.total_attempts
-        else:
-            module_scores[module] = None
-            module_attempts[module] = 0
-
-    conversation_messages = eligibility["conversation_messages"]
-
-    # Calculate weighted score for history (ensure all values are numbers)
-    weighted_score = (
-        (module_scores.get("vocabulary") or 0.0) * 0.30 +
-        (module_scores.get("grammar") or 0.0) * 0.30 +
-        (module_scores.get("writing") or 0.0) * 0.20 +
-        (module_scores.get("phonetics") or 0.0) * 0.20
-    )
+    # Collect current scores for archiving (read before the reset below changes them)
+    module_scores = {module: snapshot.module_score(module) for module in SCORED_MODULES}
+    module_attempts = {module: snapshot.module_attempts(module) for module in SCORED_MODULES}
+    conversation_messages = snapshot.conversation_messages
+    weighted_score = snapshot.weighted_score
 
     # Calculate days at level
     days_at_level = 0
@@ -346,7 +472,7 @@ def advance_user_level(user_id: str, db: Session) -> AdvancementResponse:
     db.add(history_entry)
 
     # Reset progress for new level
-    reset_progress_for_new_level(user_id, db)
+    await reset_progress_for_new_level(user_id, db)
 
     # Update user
     user.level = new_level
@@ -358,7 +484,7 @@ def advance_user_level(user_id: str, db: Session) -> AdvancementResponse:
     xp_earned = XP_REWARDS.get(old_level, 100)
     user.total_xp = (user.total_xp or 0) + xp_earned
 
-    db.commit()
+    await db.commit()
 
     celebration_message = f"Congratulations! You've advanced from {old_level} to {new_level}!"
 
@@ -371,29 +497,39 @@ def advance_user_level(user_id: str, db: Session) -> AdvancementResponse:
         module_scores=module_scores
     )
 
-def reset_progress_for_new_level(user_id: str, db: Session):
-    """Reset all module progress scores and attempts to 0, and clear conversation sessions."""
+async def reset_progress_for_new_level(user_id: str, db: AsyncSession):
+    """Reset all module progress scores and attempts to 0, and clear conversation sessions and message counts."""
     # Reset UserProgress for all modules (vocabulary, grammar, writing, phonetics)
-    progress_records = db.query(UserProgress).filter(
+    progress_records = (await db.scalars(select(UserProgress).where(
         UserProgress.user_id == user_id
-    ).all()
+    ))).all()
 
     for progress in progress_records:
         progress.score = 0.0
         progress.total_attempts = 0
         progress.correct_attempts = 0
 
-    # Delete all conversation sessions to reset conversation progress
-    db.query(ConversationSession).filter(
+    # Delete all conversation sessions (and their messages) to reset conversation progress
+    await db.execute(delete(ConversationMessage).where(
+        ConversationMessage.session_id.in_(
+            select(ConversationSession.id).where(ConversationSession.user_id == user_id)
+        )
+    ))
+    await db.execute(delete(ConversationSession).where(
         ConversationSession.user_id == user_id
-    ).delete()
+    ))
+    await db.execute(
+        update(ConversationMessageCount)
+        .where(ConversationMessageCount.user_id == user_id)
+        .values(user_messages=0)
+        .execution_options(synchronize_session=False)
+    )
 
 
-def get_level_history(user_id: str, db: Session) -> List[LevelHistoryItem]:
-    """Get historical level progression for user."""
-    history_records = db.query(LevelHistory).filter(
-        LevelHistory.user_id == user_id
-    ).order_by(LevelHistory.completed_at.desc()).all()
+async def get_level_history(user_id: str, db: AsyncSession) -> List[LevelHistoryItem]:
+    """Get historical level progression for user (most recent first)."""
+    snapshot = await load_progress_snapshot(user_id, db, with_history=True)
+    history_records = reversed(snapshot.level_history) if snapshot else []
 
     result = []
     for record in history_records:
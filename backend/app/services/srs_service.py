@@ -5,8 +5,8 @@ Implements the SM-2 algorithm for vocabulary review scheduling.
 
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select
 
 from app.db.models import VocabularyReview, User
 
@@ -62,8 +62,8 @@ def calculate_sm2(quality: int, easiness_factor: float, repetitions: int, interv
     }
 
 
-def add_word_to_srs(
-    db: Session,
+async def add_word_to_srs(
+    db: AsyncSession,
     user: User,
     word: str,
     definition: str,
@@ -83,19 +83,19 @@ def add_word_to_srs(
         Created VocabularyReview object
     """
     # Check if word already exists for this user
-    existing = db.query(VocabularyReview).filter(
+    existing = await db.scalar(select(VocabularyReview).where(
         and_(
             VocabularyReview.user_id == user.id,
             VocabularyReview.word == word,
             VocabularyReview.target_language == user.target_language
         )
-    ).first()
+    ))
 
     if existing:
         # Update next_review_date to make it due now if it's in the future
         if existing.next_review_date > datetime.now():
             existing.next_review_date = datetime.now()
-            db.commit()
+            await db.commit()
         return existing
 
     # Create new review
@@ -112,14 +112,76 @@ def add_word_to_srs(
     )
 
     db.add(review)
-    db.commit()
-    db.refresh(review)
+    await db.commit()
+    await db.refresh(review)
 
     return review
 
 
-def update_review(
-    db: Session,
+async def add_words_to_srs(
+    db: AsyncSession,
+    user: User,
+    cards: List[Dict],
+    commit: bool = True
+) -> List[VocabularyReview]:
+    """
+    Add several words to the user's SRS review queue with one lookup and one commit.
+
+    Same semantics as add_word_to_srs: existing words are made due now,
+    new words are scheduled for immediate review.
+
+    Args:
+        db: Database session
+        user: Current user
+        cards: Dicts with "word", "definition" and optional "example_sentence"
+        commit: Commit the session (set False to commit with other pending rows)
+
+    Returns:
+        VocabularyReview objects in the order of the input cards
+    """
+    words = [card["word"] for card in cards]
+    existing = {
+        review.word: review
+        for review in (await db.scalars(select(VocabularyReview).where(
+            and_(
+                VocabularyReview.user_id == user.id,
+                VocabularyReview.word.in_(words),
+                VocabularyReview.target_language == user.target_language
+            )
+        ))).all()
+    }
+
+    now = datetime.now()
+    reviews = []
+    for card in cards:
+        review = existing.get(card["word"])
+        if review:
+            if review.next_review_date > now:
+                review.next_review_date = now
+        else:
+            review = VocabularyReview(
+                user_id=user.id,
+                word=card["word"],
+                definition=card["definition"],
+                example_sentence=card.get("example_sentence"),
+                target_language=user.target_language,
+                easiness_factor=2.5,
+                repetitions=0,
+                interval=1,
+                next_review_date=now
+            )
+            db.add(review)
+            existing[card["word"]] = review
+        reviews.append(review)
+
+    if commit:
+        await db.commit()
+
+    return reviews
+
+
+async def update_review(
+    db: AsyncSession,
     review_id: int,
     quality: int
 ) -> VocabularyReview:
@@ -134,7 +196,7 @@ def update_review(
     Returns:
         Updated VocabularyReview object
     """
-    review = db.query(VocabularyReview).filter(VocabularyReview.id == review_id).first()
+    review = await db.scalar(select(VocabularyReview).where(VocabularyReview.id == review_id))
 
     if not review:
         raise ValueError(f"Review {review_id} not found")
@@ -154,13 +216,13 @@ def update_review(
     review.next_review_date = datetime.now() + timedelta(days=new_params["interval"])
     review.last_reviewed_at = datetime.now()
 
-    db.commit()
-    db.refresh(review)
+    await db.commit()
+    await db.refresh(review)
 
     return review
 
 
-def get_due_reviews(db: Session, user: User) -> List[VocabularyReview]:
+async def get_due_reviews(db: AsyncSession, user: User) -> List[VocabularyReview]:
     """
     Get all reviews that are due for the user.
 
@@ -171,15 +233,15 @@ def get_due_reviews(db: Session, user: User) -> List[VocabularyReview]:
     Returns:
         List of due VocabularyReview objects
     """
-    return db.query(VocabularyReview).filter(
+    return (await db.scalars(select(VocabularyReview).where(
         and_(
             VocabularyReview.user_id == user.id,
             VocabularyReview.next_review_date <= datetime.now()
         )
-    ).order_by(VocabularyReview.next_review_date).all()
+    ).order_by(VocabularyReview.next_review_date))).all()
 
 
-def get_review_stats(db: Session, user: User) -> Dict:
+async def get_review_stats(db: AsyncSession, user: User) -> Dict:
     """
     Get statistics about the user's SRS reviews.
 
@@ -191,28 +253,28 @@ def get_review_stats(db: Session, user: User) -> Dict:
         Dictionary with review statistics
     """
     # Count due reviews
-    due_count = db.query(VocabularyReview).filter(
+    due_count = await db.scalar(select(func.count()).select_from(VocabularyReview).where(
         and_(
             VocabularyReview.user_id == user.id,
             VocabularyReview.next_review_date <= datetime.now()
         )
-    ).count()
+    ))
 
     # Count learning (repetitions < 5)
-    learning_count = db.query(VocabularyReview).filter(
+    learning_count = await db.scalar(select(func.count()).select_from(VocabularyReview).where(
         and_(
             VocabularyReview.user_id == user.id,
             VocabularyReview.repetitions < 5
         )
-    ).count()
+    ))
 
     # Count mastered (repetitions >= 5)
-    mastered_count = db.query(VocabularyReview).filter(
+    mastered_count = await db.scalar(select(func.count()).select_from(VocabularyReview).where(
         and_(
             VocabularyReview.user_id == user.id,
             VocabularyReview.repetitions >= 5
         )
-    ).count()
+    ))
 
     return {
         "due": due_count,
@@ -222,7 +284,7 @@ def get_review_stats(db: Session, user: User) -> Dict:
     }
 
 
-def get_review_by_id(db: Session, review_id: int, user_id: str) -> Optional[VocabularyReview]:
+async def get_review_by_id(db: AsyncSession, review_id: int, user_id: str) -> Optional[VocabularyReview]:
     """
     Get a specific review by ID for a user.
 
@@ -234,9 +296,9 @@ def get_review_by_id(db: Session, review_id: int, user_id: str) -> Optional[Voca
     Returns:
         VocabularyReview object or None
     """
-    return db.query(VocabularyReview).filter(
+    return await db.scalar(select(VocabularyReview).where(
         and_(
             VocabularyReview.id == review_id,
             VocabularyReview.user_id == user_id
         )
-    ).first()
+    ))
@@ -1,9 +1,13 @@
 import httpx
 import base64
-import json
+import hashlib
 from typing import Dict, Any, Optional
 from app.core.config import settings
-from app.services.ai_services import get_llm_client
+from app.core.singleflight import get_single_flight
+from app.core.http_pool import close_client_soon, get_http_client
+from app.core.llm_usage import current_ai_call, gemini_usage, track_ai_call
+from app.services.ai_services import LLMOutputError, get_llm_client, parse_llm_json
+from app.schemas.llm_outputs import PronunciationAnalysisOutput, gemini_response_schema
 
 
 class STTError(Exception):
@@ -17,9 +21,9 @@ class STTClient:
     def __init__(self, api_key: str, base_url: str, model: str, provider: str):
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
-        self.client = httpx.AsyncClient(timeout=30.0)
         self.model = model
         self.provider = provider.lower()
+        self.client = get_http_client(timeout=30.0, provider=self.provider)
 
     async def analyze_audio(
             self,
@@ -30,9 +34,30 @@ class STTClient:
     ) -> Dict[str, Any]:
         """
         Transcribes audio AND provides phonetic feedback in one go.
+        Concurrent submissions of the same recording share one upstream call.
         """
+        key_hash = hashlib.sha256(audio_bytes)
+        key_hash.update(f"|{self.provider}|{self.model}|{mime_type}|{target_language}|{target_phrase}".encode())
+        with track_ai_call("stt", self.provider, self.model, stage="transcription"):
+            return await get_single_flight("stt").do(
+                key_hash.hexdigest(),
+                lambda: self._analyze_audio_uncached(
+                    audio_bytes=audio_bytes,
+                    mime_type=mime_type,
+                    target_language=target_language,
+                    target_phrase=target_phrase
+                )
+            )
+
+    async def _analyze_audio_uncached(
+            self,
+            audio_bytes: bytes,
+            mime_type: str,
+            target_language: str,
+            target_phrase: str
+    ) -> Dict[str, Any]:
         try:
-            if self.provider in {"openai", "gpt"}:
+            if self.provider in {"openai", "gpt", "fake"}:
                 return await self._analyze_openai_compatible(
                     audio_bytes=audio_bytes,
                     mime_type=mime_type,
@@ -56,7 +81,7 @@ class STTClient:
 
         except httpx.HTTPError as e:
             raise STTError(f"HTTP error during STT API call: {str(e)}")
-        except json.JSONDecodeError:
+        except LLMOutputError:
             raise STTError("AI returned invalid JSON")
         except Exception as e:
             raise STTError(f"Error during speech transcription: {str(e)}")
@@ -121,7 +146,8 @@ class STTClient:
             }],
             "generationConfig": {
                 "temperature": 0.2,
-                "responseMimeType": "application/json"
+                "responseMimeType": "application/json",
+                "responseSchema": gemini_response_schema(PronunciationAnalysisOutput)
             }
         }
 
@@ -129,25 +155,15 @@ class STTClient:
         response.raise_for_status()
 
         data = response.json()
+        call = current_ai_call()
+        if call is not None:
+            call.add_usage(*gemini_usage(data))
 
         if "candidates" in data and len(data["candidates"]) > 0:
             candidate = data["candidates"][0]
             if "content" in candidate and "parts" in candidate["content"]:
                 raw_text = candidate["content"]["parts"][0]["text"]
-                clean_json = raw_text.strip()
-                if clean_json.startswith("```json"):
-                    clean_json = clean_json[7:]
-                if clean_json.startswith("```"):
-                    clean_json = clean_json[3:]
-                if clean_json.endswith("```"):
-                    clean_json = clean_json[:-3]
-
-                parsed_result = json.loads(clean_json)
-                if "confidence" not in parsed_result:
-                    parsed_result["confidence"] = 1.0
-                if "word_level_feedback" not in parsed_result:
-                    parsed_result["word_level_feedback"] = []
-                return parsed_result
+                return parse_llm_json(raw_text, PronunciationAnalysisOutput).model_dump(exclude_none=True)
         raise STTError("No content returned from AI")
 
     async def _analyze_openai_compatible(
@@ -198,28 +214,17 @@ class STTClient:
             }}
             """
 
-        analysis = await llm.generate(
+        analysis = await llm.generate_json(
+            schema=PronunciationAnalysisOutput,
             system_prompt="You are a strict phonetic evaluator. Respond with JSON only.",
             user_prompt=prompt_text,
             temperature=0.2,
             max_tokens=512
         )
 
-        clean_json = analysis.strip()
-        if clean_json.startswith("```json"):
-            clean_json = clean_json[7:]
-        if clean_json.startswith("```"):
-            clean_json = clean_json[3:]
-        if clean_json.endswith("```"):
-            clean_json = clean_json[:-3]
-
-        parsed_result = json.loads(clean_json)
-        if "transcript" not in parsed_result:
+        parsed_result = analysis.model_dump(exclude_none=True)
+        if not parsed_result["transcript"]:
             parsed_result["transcript"] = transcript
-        if "confidence" not in parsed_result:
-            parsed_result["confidence"] = 1.0
-        if "word_level_feedback" not in parsed_result:
-            parsed_result["word_level_feedback"] = []
         return parsed_result
 
     async def close(self):
@@ -234,6 +239,7 @@ _stt_client: Optional[STTClient] = None
 def reset_stt_client() -> None:
     """Reset the global STT client instance after config changes."""
     global _stt_client
+    close_client_soon(_stt_client)
     _stt_client = None
 
 
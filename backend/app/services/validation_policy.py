@@ -0,0 +1,216 @@
+"""
+Adaptive sampling for the checker and secondary validator.
+
+Pass rates are tracked per segment, a (module, language, level, model)
+tuple, over the last VALIDATION_WINDOW_SIZE checks, seeded from ContentLog
+history. Segments with too little history always get both checks. Stable
+segments are sampled at failure rate x VALIDATION_SAMPLING_GAIN, never less
+than VALIDATION_MIN_SAMPLE_RATE, so a segment that starts failing is quickly
+back to full validation.
+"""
+
+import asyncio
+import random
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import ContentLog
+
+Segment = Tuple[str, Optional[str], Optional[str], str]
+
+PRIMARY = "primary"
+SECONDARY = "secondary"
+
+# Stand-ins stored when a check is sampled out; "sampled_out" keeps them out of the stats
+SKIPPED_CHECK = {"is_valid": True, "issues": [], "suggested_fix": None, "sampled_out": True}
+SKIPPED_VALIDATION = {
+    "is_approved": True,
+    "confidence_score": None,
+    "validation_details": {},
+    "critical_issues": [],
+    "recommendations": [],
+    "improved_version": None,
+    "sampled_out": True
+}
+
+
+def segment_key(module: str, target_language: Optional[str], level: Optional[str], model: Optional[str] = None) -> Segment:
+    """Segment for content generated by `model` (defaults to the configured LLM_MODEL)."""
+    return (module, target_language, level, model or settings.LLM_MODEL)
+
+
+def was_sampled_out(result: Optional[Dict[str, Any]]) -> bool:
+    """Whether a stored checker / validator result is a stand-in for a skipped check."""
+    return bool(result and result.get("sampled_out"))
+
+
+def counts_as_outcome(result: Optional[Dict[str, Any]]) -> bool:
+    """
+    Whether a checker / validator result is a real verdict.
+
+    Sampled-out stand-ins and the permissive fallbacks returned when the check
+    itself failed (provider errors, invalid JSON; tagged "error") are not.
+    """
+    return isinstance(result, dict) and not was_sampled_out(result) and not result.get("error")
+
+
+class ValidationPolicy:
+    """Per-segment pass-rate windows and the sampling decisions derived from them."""
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+        self._outcomes: Dict[Tuple[str, Segment], Deque[bool]] = {}
+        self._loaded_modules: Set[str] = set()
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {
+            PRIMARY: {"run": 0, "skipped": 0},
+            SECONDARY: {"run": 0, "skipped": 0}
+        }
+
+    def _window(self, stage: str, segment: Segment) -> Deque[bool]:
+        key = (stage, segment)
+        if key not in self._outcomes:
+            self._outcomes[key] = deque(maxlen=max(1, settings.VALIDATION_WINDOW_SIZE))
+        return self._outcomes[key]
+
+    def record(self, stage: str, segment: Segment, passed: bool) -> None:
+        """Add the outcome of a check that actually ran."""
+        self._window(stage, segment).append(bool(passed))
+
+    def sample_rate(self, stage: str, segment: Segment) -> float:
+        """Probability of running `stage` for the next item in `segment`."""
+        window = self._outcomes.get((stage, segment))
+        if not window or len(window) < settings.VALIDATION_MIN_SAMPLES:
+            return 1.0
+        failure_rate = sum(1 for passed in window if not passed) / len(window)
+        return min(1.0, max(settings.VALIDATION_MIN_SAMPLE_RATE, failure_rate * settings.VALIDATION_SAMPLING_GAIN))
+
+    def should_run(self, stage: str, segment: Segment) -> bool:
+        """Draw whether `stage` runs this time, and count the decision."""
+        run = (
+            not settings.VALIDATION_SAMPLING_ENABLED or
+            self._rng.random() < self.sample_rate(stage, segment)
+        )
+        self.stats[stage]["run" if run else "skipped"] += 1
+        return run
+
+    async def ensure_history(self, module: str, db: AsyncSession) -> None:
+        """
+        Seed the windows for a module from recent ContentLog rows (once per process).
+
+        Rows written before the model was logged count towards the current model.
+        Pooled cards are skipped, their checks were counted when the pool was filled.
+        Concurrent first calls wait for one load; a failed load is retried by the next call.
+        """
+        if module in self._loaded_modules or not settings.VALIDATION_SAMPLING_ENABLED:
+            return
+
+        async with self._load_locks.setdefault(module, asyncio.Lock()):
+            if module in self._loaded_modules:
+                return
+
+            rows = (await db.execute(
+                select(ContentLog.input_payload, ContentLog.checker_result, ContentLog.secondary_validation)
+                .where(ContentLog.module == module)
+                .order_by(ContentLog.created_at.desc())
+                .limit(settings.VALIDATION_HISTORY_ROWS)
+            )).all()
+
+            # Oldest first, so the windows end with the most recent outcomes
+            for payload, checker_result, secondary_validation in reversed(rows):
+                payload = payload if isinstance(payload, dict) else {}
+                if payload.get("pooled"):
+                    continue
+                segment = segment_key(module, payload.get("target_language"), payload.get("level"), payload.get("model"))
+                if counts_as_outcome(checker_result):
+                    self.record(PRIMARY, segment, checker_result.get("is_valid", True))
+                if counts_as_outcome(secondary_validation):
+                    self.record(SECONDARY, segment, secondary_validation.get("is_approved", True))
+            self._loaded_modules.add(module)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Run/skip counters and the current sample rate of every tracked segment."""
+        return {
+            "stages": {stage: dict(counts) for stage, counts in self.stats.items()},
+            "segments": [
+                {
+                    "stage": stage,
+                    "segment": "/".join(str(part) for part in segment),
+                    "samples": len(window),
+                    "pass_rate": sum(window) / len(window) if window else None,
+                    "sample_rate": self.sample_rate(stage, segment)
+                }
+                for (stage, segment), window in self._outcomes.items()
+            ]
+        }
+
+
+async def sampled_check(checker, segment: Segment, **kwargs) -> Dict[str, Any]:
+    """
+    Run CheckerService.check_content unless the policy samples it out.
+
+    Args:
+        checker: CheckerService
+        segment: Segment of the content being checked
+        **kwargs: Passed to check_content
+
+    Fallback results from a failed checker are returned but not recorded.
+
+    Returns:
+        The checker result, or SKIPPED_CHECK
+    """
+    policy = get_validation_policy()
+    if not policy.should_run(PRIMARY, segment):
+        return dict(SKIPPED_CHECK)
+    result = await checker.check_content(**kwargs)
+    if counts_as_outcome(result):
+        policy.record(PRIMARY, segment, result["is_valid"])
+    return result
+
+
+async def sampled_validation(validator, segment: Segment, primary_validation: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    """
+    Run SecondaryValidatorService.deep_validate unless the policy samples it out.
+
+    Content the primary checker rejected is always validated. Fallback results
+    from a failed validator are returned but not recorded.
+
+    Args:
+        validator: SecondaryValidatorService
+        segment: Segment of the content being validated
+        primary_validation: Result of sampled_check
+        **kwargs: Passed to deep_validate
+
+    Returns:
+        The validation result, or SKIPPED_VALIDATION
+    """
+    policy = get_validation_policy()
+    if not primary_validation.get("is_valid", True):
+        policy.stats[SECONDARY]["run"] += 1
+    elif not policy.should_run(SECONDARY, segment):
+        return dict(SKIPPED_VALIDATION)
+    result = await validator.deep_validate(primary_validation=primary_validation, **kwargs)
+    if counts_as_outcome(result):
+        policy.record(SECONDARY, segment, result["is_approved"])
+    return result
+
+
+_policy: Optional[ValidationPolicy] = None
+
+
+def get_validation_policy() -> ValidationPolicy:
+    """Get or create the process-wide validation policy."""
+    global _policy
+    if _policy is None:
+        _policy = ValidationPolicy()
+    return _policy
+
+
+def reset_validation_policy() -> None:
+    """Drop all pass-rate history (config changes, tests)."""
+    global _policy
+    _policy = None
@@ -8,6 +8,7 @@ from typing import Optional
 from google.cloud import aiplatform
 from google.oauth2 import service_account
 from vertexai.preview.vision_models import ImageGenerationModel
+from app.core.llm_usage import track_ai_call
 
 
 class VertexImageClient:
@@ -49,7 +50,8 @@ class VertexImageClient:
 
         # Load the image generation model (using newer Imagen 3)
         # Note: imagegeneration@006 is deprecated, using imagen-3.0-generate-001
-        self.model = ImageGenerationModel.from_pretrained("imagen-3.0-generate-001")
+        self.model_name = "imagen-3.0-generate-001"
+        self.model = ImageGenerationModel.from_pretrained(self.model_name)
 
     async def generate_safe_image(self, prompt: str) -> Optional[str]:
         """
@@ -61,6 +63,12 @@ class VertexImageClient:
         Returns:
             Base64 encoded image string or None if generation fails
         """
+        with track_ai_call("image", "vertex", self.model_name, stage="image") as call:
+            image = await self._generate_image(prompt)
+            call.success = image is not None
+            return image
+
+    async def _generate_image(self, prompt: str) -> Optional[str]:
         try:
             # Create safe educational prompt
             safe_prompt = (
@@ -1,11 +1,19 @@
+import asyncio
 import json
-from typing import Optional
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from sqlalchemy import select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
-from app.db.models import User, ContentLog, UserProgress
+from app.db.models import User, ContentLog, FlashcardPoolEntry, UserProgress
 from app.services.image_client import get_image_client
+from app.core.blob_store import media_url, store_base64
 from app.core.config import settings
-from app.services.srs_service import get_due_reviews, add_word_to_srs, update_review
+from app.core.pipeline import Pipeline
+from app.core.llm_usage import llm_usage_scope
+from app.services.flashcard_pool import get_flashcard_replenisher, pop_flashcard
+from app.services.srs_service import get_due_reviews, add_word_to_srs, add_words_to_srs, update_review
+from app.services.validation_policy import get_validation_policy, sampled_check, sampled_validation, segment_key, was_sampled_out
+from app.services.answer_events import record_answer
 import random
 
 # Conditionally import Vertex AI client
@@ -15,7 +23,14 @@ if settings.USE_VERTEX_AI:
     except ImportError:
         print("Warning: Vertex AI not available. Install google-cloud-aiplatform.")
 from app.services.ai_services import get_llm_client, get_checker_service, get_secondary_validator
-from app.schemas.vocabulary import FlashcardResponse, VocabularyAnswerRequest, VocabularyAnswerResponse, ValidationMetadata
+from app.schemas.llm_outputs import FlashcardBatchOutput, FlashcardOutput
+from app.schemas.vocabulary import (
+    FlashcardBatchResponse,
+    FlashcardResponse,
+    ValidationMetadata,
+    VocabularyAnswerRequest,
+    VocabularyAnswerResponse,
+)
 from datetime import datetime
 
 
@@ -54,12 +69,13 @@ Examples:
 Visual description:"""
 
     try:
-        response = await llm.generate(
-            system_prompt="You create concise visual descriptions for image generation.",
-            user_prompt=prompt,
-            temperature=0.4,
-            max_tokens=128
-        )
+        with llm_usage_scope(stage="image-prompt"):
+            response = await llm.generate(
+                system_prompt="You create concise visual descriptions for image generation.",
+                user_prompt=prompt,
+                temperature=0.4,
+                max_tokens=128
+            )
 
         # Clean up response
         image_prompt = response.strip().strip('"').strip("'").strip('.')
@@ -80,11 +96,219 @@ Visual description:"""
     return f"{clean_def}, clear and simple composition"
 
 
+async def _generate_flashcard_image(
+    flashcard_data: dict,
+    target_language: str,
+    llm,
+    imm_client
+) -> Optional[str]:
+    """
+    Build a visual prompt for a flashcard, generate its image and store it.
+
+    Returns:
+        Blob digest of the image, or None if the card has no word/definition or generation fails
+    """
+    word = flashcard_data.get("word", "")
+    definition = flashcard_data.get("definition", "")
+    if not (word and definition):
+        return None
+
+    # Create a visual, descriptive prompt instead of just the word
+    image_prompt = await _generate_image_description_prompt(
+        word=word,
+        definition=definition,
+        example_sentence=flashcard_data.get("example_sentence", ""),
+        target_language=target_language,
+        llm=llm
+    )
+    print(f"[DEBUG] Attempting to generate image for word '{word}'")
+    print(f"[DEBUG] Image prompt: {image_prompt}")
+    print(f"[DEBUG] Using Vertex AI: {settings.USE_VERTEX_AI}")
+    imm_b64 = await imm_client.generate_safe_image(image_prompt)
+    print(f"[DEBUG] Image generated: {imm_b64 is not None}, size: {len(imm_b64) if imm_b64 else 0}")
+    return await store_base64(imm_b64)
+
+
+def _get_image_generation_client():
+    """Use Vertex AI if enabled, otherwise the legacy image client."""
+    if settings.USE_VERTEX_AI and settings.VERTEX_AI_PROJECT_ID:
+        return get_vertex_image_client(
+            credentials_path=settings.VERTEX_AI_CREDENTIALS_PATH,
+            project_id=settings.VERTEX_AI_PROJECT_ID,
+            location=settings.VERTEX_AI_LOCATION
+        )
+    return get_image_client()
+
+
+async def _get_or_create_user(user_id: str, target_language: str, level: Optional[str], db: AsyncSession) -> User:
+    # this is what i fixed: was filtering by external_id, so logged-in users were not found
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user:
+        user = User(
+            external_id=user_id,
+            target_language=target_language,
+            level=level
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+    return user
+
+
+def _build_review_flashcard(review) -> FlashcardResponse:
+    """Turn a due SRS review into a flashcard without any LLM calls."""
+    # Generate simple distractor options (generic wrong answers)
+    # This avoids LLM calls for reviews and makes them faster
+    distractors = [
+        "a type of food or drink",
+        "a place or location",
+        "an action or activity"
+    ]
+
+    # Create options with correct answer at random position
+    correct_index = random.randint(0, 3)
+    options = distractors[:3]
+    options.insert(correct_index, review.definition)
+
+    return FlashcardResponse(
+        word=review.word,
+        definition=review.definition,
+        example_sentence=review.example_sentence or "",
+        options=options,
+        correct_option_index=correct_index,
+        is_review=True,
+        review_id=review.id,
+        validation=ValidationMetadata(
+            is_validated=True,
+            confidence_score=1.0,
+            primary_check_passed=True,
+            secondary_check_passed=True
+        )
+    )
+
+
+async def _get_seen_words(user: User, db: AsyncSession) -> List[str]:
+    """Words from the user's last 20 generated flashcards (to avoid repetition)."""
+    recent_logs = (await db.scalars(
+        select(ContentLog)
+        .where(ContentLog.user_id == user.id, ContentLog.module == "vocabulary")
+        .order_by(ContentLog.created_at.desc())
+        .limit(20)
+    )).all()
+
+    # Extract just the words
+    seen_words = []
+    for log in recent_logs:
+        if log.generated_content and isinstance(log.generated_content, dict):
+            word = log.generated_content.get("word")
+            if word:
+                seen_words.append(word)
+    return seen_words
+
+
+def _build_validation(checker_result: dict, secondary_validation: dict) -> dict:
+    """Validation metadata shown by the frontend."""
+    return {
+        "is_validated": checker_result["is_valid"] and secondary_validation["is_approved"],
+        "confidence_score": secondary_validation.get("confidence_score"),
+        "primary_check_passed": None if was_sampled_out(checker_result) else checker_result["is_valid"],
+        "secondary_check_passed": None if was_sampled_out(secondary_validation) else secondary_validation["is_approved"]
+    }
+
+
+def _flashcard_response(card: dict) -> FlashcardResponse:
+    """Response for a card as stored; its image is referenced by URL, not inlined."""
+    digest = card.get("image_digest")
+    return FlashcardResponse(**{**card, "image_url": media_url(digest) if digest else None})
+
+
+async def externalize_card_image(card: dict) -> dict:
+    """
+    Move an inline base64 image (cards stored before the blob store) into the blob store.
+
+    Args:
+        card: Card dict, modified in place
+
+    Returns:
+        The card, with "image_digest" instead of "image_data"
+    """
+    if "image_data" in card:
+        digest = await store_base64(card.pop("image_data"))
+        if digest:
+            card["image_digest"] = digest
+    return card
+
+
+async def migrate_inline_images(db: AsyncSession, batch_size: int = 100) -> int:
+    """
+    Move inline images out of every vocabulary ContentLog row and pooled card.
+
+    Returns:
+        Number of rows rewritten
+    """
+    migrated = 0
+    for model, column, condition in [
+        (ContentLog, ContentLog.generated_content, ContentLog.module == "vocabulary"),
+        (FlashcardPoolEntry, FlashcardPoolEntry.card, true()),
+    ]:
+        after = None
+        while True:
+            query = select(model.id, column).where(condition).order_by(model.id).limit(batch_size)
+            if after is not None:
+                query = query.where(model.id > after)
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+
+            for row_id, content in rows:
+                if isinstance(content, dict) and "image_data" in content:
+                    await db.execute(
+                        update(model).where(model.id == row_id)
+                        .values({column.key: await externalize_card_image(dict(content))})
+                    )
+                    migrated += 1
+            after = rows[-1][0]
+            await db.commit()
+
+    return migrated
+
+
+async def _record_flashcard(
+    user: User,
+    flashcard_data: dict,
+    checker_result: dict,
+    secondary_validation: dict,
+    input_payload: dict,
+    db: AsyncSession
+) -> None:
+    """Log a served flashcard with both validation stages and add its word to SRS."""
+    content_log = ContentLog(
+        user_id=user.id,
+        module="vocabulary",
+        input_payload=input_payload,
+        generated_content=flashcard_data,
+        checker_result=checker_result,
+        secondary_validation=secondary_validation,
+        is_validated=checker_result["is_valid"] and secondary_validation["is_approved"]
+    )
+    db.add(content_log)
+    await db.commit()
+
+    # Add new word to SRS for future review
+    await add_word_to_srs(
+        db=db,
+        user=user,
+        word=flashcard_data.get("word", ""),
+        definition=flashcard_data.get("definition", ""),
+        example_sentence=flashcard_data.get("example_sentence", "")
+    )
+
+
 async def get_next_flashcard(
     user_id: str,
     target_language: str,
     level: Optional[str],
-    db: Session
+    db: AsyncSession
 ) -> FlashcardResponse:
     """
     Generate a vocabulary flashcard.
@@ -102,82 +326,35 @@ async def get_next_flashcard(
     checker = get_checker_service()
     secondary_validator = get_secondary_validator()
 
-    # Use Vertex AI if enabled, otherwise use legacy client
-    if settings.USE_VERTEX_AI and settings.VERTEX_AI_PROJECT_ID:
-        imm_client = get_vertex_image_client(
-            credentials_path=settings.VERTEX_AI_CREDENTIALS_PATH,
-            project_id=settings.VERTEX_AI_PROJECT_ID,
-            location=settings.VERTEX_AI_LOCATION
-        )
-    else:
-        imm_client = get_image_client()
+    imm_client = _get_image_generation_client()
 
     # Find or create user
-    # this is what i fixed: was filtering by external_id, so logged-in users were not found
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        user = User(
-            external_id=user_id,
-            target_language=target_language,
-            level=level
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+    user = await _get_or_create_user(user_id, target_language, level, db)
 
     # Check for due SRS reviews first
-    due_reviews = get_due_reviews(db, user)
+    due_reviews = await get_due_reviews(db, user)
     if due_reviews:
         # Get the oldest due review (FIFO - first in, first out)
         # This ensures cards are reviewed in order and prevents showing the same card twice
         review = due_reviews[0]  # Already ordered by next_review_date in get_due_reviews
-
-        # Generate simple distractor options (generic wrong answers)
-        # This avoids LLM calls for reviews and makes them faster
-        distractors = [
-            "a type of food or drink",
-            "a place or location",
-            "an action or activity"
-        ]
-
-        # Create options with correct answer at random position
-        correct_index = random.randint(0, 3)
-        options = distractors[:3]
-        options.insert(correct_index, review.definition)
-
-        return FlashcardResponse(
-            word=review.word,
-            definition=review.definition,
-            example_sentence=review.example_sentence or "",
-            options=options,
-            correct_option_index=correct_index,
-            image_data=None,
-            is_review=True,
-            review_id=review.id,
-            validation=ValidationMetadata(
-                is_validated=True,
-                confidence_score=1.0,
-                primary_check_passed=True,
-                secondary_check_passed=True
-            )
-        )
+        return _build_review_flashcard(review)
 
     level_info = f" at {level} level" if level else ""
 
     # Last 20 seen words to avoid repetition
-    recent_logs = db.query(ContentLog) \
-        .filter(ContentLog.user_id == user.id, ContentLog.module == "vocabulary") \
-        .order_by(ContentLog.created_at.desc()) \
-        .limit(20) \
-        .all()
-
-    # Extract just the words
-    seen_words = []
-    for log in recent_logs:
-        if log.generated_content and isinstance(log.generated_content, dict):
-            word = log.generated_content.get("word")
-            if word:
-                seen_words.append(word)
+    seen_words = await _get_seen_words(user, db)
+
+    # Serve a pre-generated card when the pool has one; generate live otherwise
+    if settings.FLASHCARD_POOL_ENABLED and level:
+        pooled = await pop_flashcard(target_language, level, seen_words, db)
+        get_flashcard_replenisher().schedule(target_language, level)
+        if pooled:
+            flashcard_data = await externalize_card_image(pooled["card"])
+            await _record_flashcard(
+                user, flashcard_data, pooled["checker_result"], pooled["secondary_validation"],
+                {"target_language": target_language, "level": level, "pooled": True}, db
+            )
+            return _flashcard_response(flashcard_data)
 
     exclusions = ", ".join(seen_words)
 
@@ -198,119 +375,366 @@ async def get_next_flashcard(
 
         The options should be 4 English definitions (one correct, three plausible distractors)."""
 
-    # Generate flashcard
-    response = await llm.generate(
-        system_prompt=f"You are a language learning content creator. Always respond with valid JSON only.",
-        user_prompt=prompt,
-        temperature=0.7,
-        max_tokens=4096 # Return JSON can be large
-    )
+    user_input = {"target_language": target_language, "level": level}
+    segment = segment_key("vocabulary", target_language, level)
+    await get_validation_policy().ensure_history("vocabulary", db)
 
-    # Parse JSON
-    cleaned = response.strip()
-    if cleaned.startswith("```json"):
-        cleaned = cleaned[7:]
-    if cleaned.startswith("```"):
-        cleaned = cleaned[3:]
-    if cleaned.endswith("```"):
-        cleaned = cleaned[:-3]
+    async def generate_stage(ctx):
+        flashcard = await llm.generate_json(
+            schema=FlashcardOutput,
+            system_prompt=f"You are a language learning content creator. Always respond with valid JSON only.",
+            user_prompt=prompt,
+            temperature=0.7,
+            max_tokens=4096 # Return JSON can be large
+        )
 
-    flashcard_data = json.loads(cleaned.strip())
+        return flashcard.model_dump(exclude_none=True)
 
     # Stage 1: Primary checker - format and basic validation
-    checker_result = await checker.check_content(
-        module="vocabulary",
-        original_instruction="Generate vocabulary flashcard",
-        user_input={"target_language": target_language, "level": level},
-        generated_content=json.dumps(flashcard_data)
-    )
+    async def check_stage(ctx):
+        flashcard_data = ctx["generate"]
+        checker_result = await sampled_check(
+            checker,
+            segment,
+            module="vocabulary",
+            original_instruction="Generate vocabulary flashcard",
+            user_input=user_input,
+            generated_content=json.dumps(flashcard_data)
+        )
+
+        # If not valid and has suggested fix, try to use it
+        if not checker_result["is_valid"] and checker_result["suggested_fix"]:
+            try:
+                flashcard_data = json.loads(checker_result["suggested_fix"])
+            except (json.JSONDecodeError, TypeError, KeyError):
+                pass  # Keep original if parsing fails
 
-    # If not valid and has suggested fix, try to use it
-    if not checker_result["is_valid"] and checker_result["suggested_fix"]:
-        try:
-            flashcard_data = json.loads(checker_result["suggested_fix"])
-        except (json.JSONDecodeError, TypeError, KeyError):
-            pass  # Keep original if parsing fails
+        return {"checker_result": checker_result, "flashcard_data": flashcard_data}
 
     # Stage 2: Secondary validation - deep accuracy and quality check
-    secondary_validation = await secondary_validator.deep_validate(
-        module="vocabulary",
-        user_input={"target_language": target_language, "level": level},
-        generated_content=json.dumps(flashcard_data),
-        primary_validation=checker_result
+    async def secondary_stage(ctx):
+        checked = ctx["check"]
+        return await sampled_validation(
+            secondary_validator,
+            segment,
+            checked["checker_result"],
+            module="vocabulary",
+            user_input=user_input,
+            generated_content=json.dumps(checked["flashcard_data"])
+        )
+
+    # Image prompt + image generation only need the checked card, so this
+    # branch runs alongside secondary validation
+    async def image_stage(ctx):
+        return await _generate_flashcard_image(ctx["check"]["flashcard_data"], target_language, llm, imm_client)
+
+    with llm_usage_scope(module="vocabulary", user_id=user.id):
+        result = await Pipeline("vocabulary") \
+            .add_stage("generate", generate_stage) \
+            .add_stage("check", check_stage, depends_on=["generate"]) \
+            .add_stage("secondary", secondary_stage, depends_on=["check"]) \
+            .add_stage("image", image_stage, depends_on=["check"]) \
+            .run()
+
+        checker_result = result["check"]["checker_result"]
+        flashcard_data = result["check"]["flashcard_data"]
+        secondary_validation = result["secondary"]
+        image_digest = result["image"]
+
+        # If secondary validator suggests improvement and has high confidence, use it
+        if (not secondary_validation["is_approved"] and
+            secondary_validation["improved_version"] and
+            secondary_validation["confidence_score"] > 0.7):
+            try:
+                improved_data = json.loads(secondary_validation["improved_version"])
+                if (improved_data.get("word") != flashcard_data.get("word") or
+                        improved_data.get("definition") != flashcard_data.get("definition")):
+                    # The image was drawn for the pre-improvement card; redo it for the new word
+                    image_digest = await _generate_flashcard_image(improved_data, target_language, llm, imm_client)
+                flashcard_data = improved_data
+            except (json.JSONDecodeError, TypeError, KeyError, AttributeError):
+                pass  # Keep current version if parsing fails
+
+    # Logged and served by digest; the image bytes stay in the blob store
+    flashcard_data["image_digest"] = image_digest
+
+    # Add validation metadata for frontend display
+    flashcard_data["validation"] = _build_validation(checker_result, secondary_validation)
+
+    await _record_flashcard(
+        user, flashcard_data, checker_result, secondary_validation,
+        {"target_language": target_language, "level": level, "model": settings.LLM_MODEL}, db
     )
 
-    # If secondary validator suggests improvement and has high confidence, use it
-    if (not secondary_validation["is_approved"] and
-        secondary_validation["improved_version"] and
-        secondary_validation["confidence_score"] > 0.7):
-        try:
-            improved_data = json.loads(secondary_validation["improved_version"])
-            flashcard_data = improved_data
-        except (json.JSONDecodeError, TypeError, KeyError):
-            pass  # Keep current version if parsing fails
+    return _flashcard_response(flashcard_data)
 
-    word = flashcard_data.get("word", "")
-    definition = flashcard_data.get("definition", "")
-    example_sentence = flashcard_data.get("example_sentence", "")
-    imm_b64 = None
-
-    if word and definition:
-        # Generate image with improved prompt
-        # Create a visual, descriptive prompt instead of just the word
-        image_prompt = await _generate_image_description_prompt(
-            word=word,
-            definition=definition,
-            example_sentence=example_sentence,
-            target_language=target_language,
-            llm=llm
+
+def _extract_cards(data) -> List[dict]:
+    """Accept either {"flashcards": [...]} or a bare list of cards."""
+    if isinstance(data, dict):
+        data = data.get("flashcards")
+    return data if isinstance(data, list) else []
+
+
+def _is_complete_card(card) -> bool:
+    """A card needs a word, a definition and four options with a valid answer index."""
+    if not isinstance(card, dict):
+        return False
+    options = card.get("options")
+    index = card.get("correct_option_index")
+    return (
+        bool(card.get("word")) and
+        bool(card.get("definition")) and
+        isinstance(options, list) and len(options) == 4 and
+        isinstance(index, int) and 0 <= index < 4
+    )
+
+
+async def generate_flashcard_batch(
+    target_language: str,
+    level: Optional[str],
+    count: int,
+    seen_words: List[str],
+    db: Optional[AsyncSession] = None
+) -> dict:
+    """
+    Generate and validate several new flashcards without writing to the database.
+
+    The cards come from a single LLM call, are validated together by one
+    checker call and one secondary validation call (each subject to the
+    adaptive validation policy), and have their images generated with
+    bounded concurrency.
+
+    Args:
+        target_language: Target language
+        level: Difficulty level
+        count: Number of flashcards wanted
+        seen_words: Words the new cards must not repeat
+        db: Database session, only read to seed the validation policy
+
+    Returns:
+        Dict with "cards" (each including image_digest and validation),
+        "checker_result" and "secondary_validation"
+
+    Raises:
+        ValueError: If the LLM response contains no usable flashcards
+    """
+    llm = get_llm_client()
+    checker = get_checker_service()
+    secondary_validator = get_secondary_validator()
+    imm_client = _get_image_generation_client()
+
+    remaining = count
+    level_info = f" at {level} level" if level else ""
+    exclusions = ", ".join(seen_words)
+
+    prompt = f"""Generate {remaining} different vocabulary flashcards for learning {target_language}{level_info}
+
+        IMPORTANT: Do NOT use any of the following words: {exclusions}.
+        Every card must use a different word, and none may repeat the words listed above.
+        Please provide SHORT example sentences (MAX 12 words) that clearly illustrate the meaning of each word.
+
+        Respond ONLY with valid JSON in this exact format:
+        {{
+          "flashcards": [
+            {{
+              "word": "word in {target_language}",
+              "definition": "definition in English",
+              "example_sentence": "example sentence using the word in {target_language}",
+              "options": ["option1", "option2", "option3", "option4"],
+              "correct_option_index": 0,
+              "image_prompt": "concrete visual scene illustrating the word, max 15 words, no text"
+            }}
+          ]
+        }}
+
+        The options should be 4 English definitions (one correct, three plausible distractors)."""
+
+    user_input = {"target_language": target_language, "level": level, "count": remaining}
+    segment = segment_key("vocabulary", target_language, level)
+    if db is not None:
+        await get_validation_policy().ensure_history("vocabulary", db)
+    image_slots = asyncio.Semaphore(settings.VOCAB_BATCH_IMAGE_CONCURRENCY)
+
+    async def card_image(card: dict) -> Optional[str]:
+        async with image_slots:
+            # Cards carry their own image prompt, saving one LLM call per card
+            image_prompt = (card.get("image_prompt") or "").strip()
+            if 5 <= len(image_prompt) <= 120:
+                return await store_base64(await imm_client.generate_safe_image(image_prompt))
+            return await _generate_flashcard_image(card, target_language, llm, imm_client)
+
+    async def card_images(cards: List[dict]) -> List[Optional[str]]:
+        results = await asyncio.gather(*(card_image(card) for card in cards), return_exceptions=True)
+        return [None if isinstance(result, Exception) else result for result in results]
+
+    async def generate_stage(ctx):
+        batch = await llm.generate_json(
+            schema=FlashcardBatchOutput,
+            system_prompt="You are a language learning content creator. Always respond with valid JSON only.",
+            user_prompt=prompt,
+            temperature=0.7,
+            max_tokens=min(8192, 512 * remaining + 512)
+        )
+        return [card.model_dump() for card in batch.flashcards]
+
+    # Stage 1: one checker call for the whole batch
+    async def check_stage(ctx):
+        cards = ctx["generate"]
+        checker_result = await sampled_check(
+            checker,
+            segment,
+            module="vocabulary",
+            original_instruction=f"Generate {remaining} vocabulary flashcards",
+            user_input=user_input,
+            generated_content=json.dumps({"flashcards": cards})
         )
-        print(f"[DEBUG] Attempting to generate image for word '{word}'")
-        print(f"[DEBUG] Image prompt: {image_prompt}")
-        print(f"[DEBUG] Using Vertex AI: {settings.USE_VERTEX_AI}")
-        imm_b64 = await imm_client.generate_safe_image(image_prompt)
-        print(f"[DEBUG] Image generated: {imm_b64 is not None}, size: {len(imm_b64) if imm_b64 else 0}")
 
-    # update the field to be seen in the frontend
-    flashcard_data["image_data"] = imm_b64
+        if not checker_result["is_valid"] and checker_result["suggested_fix"]:
+            try:
+                cards = _extract_cards(json.loads(checker_result["suggested_fix"])) or cards
+            except (json.JSONDecodeError, TypeError):
+                pass  # Keep original if parsing fails
+
+        # Drop malformed cards and repeats of recently seen words
+        taken = {word.lower() for word in seen_words}
+        usable = []
+        for card in cards:
+            if not _is_complete_card(card):
+                continue
+            key = card["word"].strip().lower()
+            if key in taken:
+                continue
+            taken.add(key)
+            usable.append(card)
+
+        if not usable:
+            raise ValueError("Failed to generate valid vocabulary flashcards from AI.")
+
+        return {"checker_result": checker_result, "cards": usable[:remaining]}
+
+    # Stage 2: one secondary validation for the whole batch
+    async def secondary_stage(ctx):
+        checked = ctx["check"]
+        return await sampled_validation(
+            secondary_validator,
+            segment,
+            checked["checker_result"],
+            module="vocabulary",
+            user_input=user_input,
+            generated_content=json.dumps({"flashcards": checked["cards"]})
+        )
 
-    # Add validation metadata for frontend display
-    flashcard_data["validation"] = {
-        "is_validated": checker_result["is_valid"] and secondary_validation["is_approved"],
-        "confidence_score": secondary_validation.get("confidence_score"),
-        "primary_check_passed": checker_result["is_valid"],
-        "secondary_check_passed": secondary_validation["is_approved"]
+    async def images_stage(ctx):
+        return await card_images(ctx["check"]["cards"])
+
+    with llm_usage_scope(module="vocabulary"):
+        result = await Pipeline("vocabulary_batch") \
+            .add_stage("generate", generate_stage) \
+            .add_stage("check", check_stage, depends_on=["generate"]) \
+            .add_stage("secondary", secondary_stage, depends_on=["check"]) \
+            .add_stage("images", images_stage, depends_on=["check"]) \
+            .run()
+
+        checker_result = result["check"]["checker_result"]
+        cards = result["check"]["cards"]
+        secondary_validation = result["secondary"]
+        images = result["images"]
+
+        # Same improvement rule as the single-card path, applied only if every improved card is usable
+        if (not secondary_validation["is_approved"] and
+            secondary_validation["improved_version"] and
+            secondary_validation["confidence_score"] > 0.7):
+            try:
+                improved = _extract_cards(json.loads(secondary_validation["improved_version"]))
+                if len(improved) == len(cards) and all(_is_complete_card(card) for card in improved):
+                    changed = [
+                        i for i, (old, new) in enumerate(zip(cards, improved))
+                        if old.get("word") != new.get("word") or old.get("definition") != new.get("definition")
+                    ]
+                    redrawn = await card_images([improved[i] for i in changed])
+                    for i, image in zip(changed, redrawn):
+                        images[i] = image
+                    cards = improved
+            except (json.JSONDecodeError, TypeError):
+                pass  # Keep current version if parsing fails
+
+    validation = _build_validation(checker_result, secondary_validation)
+    for card, image in zip(cards, images):
+        card["image_digest"] = image
+        card["validation"] = validation
+
+    return {
+        "cards": cards,
+        "checker_result": checker_result,
+        "secondary_validation": secondary_validation
     }
 
-    # Log content with both validation stages
-    content_log = ContentLog(
-        user_id=user.id,
-        module="vocabulary",
-        input_payload={"target_language": target_language, "level": level},
-        generated_content=flashcard_data,
-        checker_result=checker_result,
-        secondary_validation=secondary_validation,
-        is_validated=checker_result["is_valid"] and secondary_validation["is_approved"]
-    )
-    db.add(content_log)
-    db.commit()
 
-    # Add new word to SRS for future review
-    add_word_to_srs(
-        db=db,
-        user=user,
-        word=word,
-        definition=definition,
-        example_sentence=example_sentence
-    )
+async def get_flashcard_batch(
+    user_id: str,
+    target_language: str,
+    level: Optional[str],
+    count: int,
+    db: AsyncSession
+) -> FlashcardBatchResponse:
+    """
+    Generate several vocabulary flashcards for a study session.
 
-    return FlashcardResponse(**flashcard_data)
+    Due SRS reviews are served first, like get_next_flashcard; the rest come
+    from generate_flashcard_batch. ContentLog rows and SRS entries are
+    written in one commit.
+
+    Args:
+        user_id: External user ID
+        target_language: Target language
+        level: Difficulty level
+        count: Number of flashcards wanted
+        db: Database session
+
+    Returns:
+        FlashcardBatchResponse with up to `count` flashcards
+
+    Raises:
+        ValueError: If the LLM response contains no usable flashcards
+    """
+    user = await _get_or_create_user(user_id, target_language, level, db)
+
+    flashcards = [_build_review_flashcard(review) for review in (await get_due_reviews(db, user))[:count]]
+    remaining = count - len(flashcards)
+    if remaining == 0:
+        return FlashcardBatchResponse(flashcards=flashcards)
+
+    with llm_usage_scope(module="vocabulary", user_id=user.id):
+        batch = await generate_flashcard_batch(target_language, level, remaining, await _get_seen_words(user, db), db)
+    cards = batch["cards"]
+
+    content_logs = []
+    for card in cards:
+        content_logs.append(ContentLog(
+            user_id=user.id,
+            module="vocabulary",
+            input_payload={
+                "target_language": target_language, "level": level, "batch_size": len(cards), "model": settings.LLM_MODEL
+            },
+            generated_content=card,
+            checker_result=batch["checker_result"],
+            secondary_validation=batch["secondary_validation"],
+            is_validated=card["validation"]["is_validated"]
+        ))
+        flashcards.append(_flashcard_response(card))
+
+    db.add_all(content_logs)
+    await add_words_to_srs(db, user, cards, commit=False)
+    await db.commit()
+
+    return FlashcardBatchResponse(flashcards=flashcards)
 
 
 async def submit_vocabulary_answer(
     request: VocabularyAnswerRequest,
     current_user: User,
-    db: Session
+    db: AsyncSession
 ) -> VocabularyAnswerResponse:
     """
     Submit a vocabulary answer and get feedback.
@@ -329,13 +753,13 @@ async def submit_vocabulary_answer(
 
     # If this is an SRS review, update the review
     if request.review_id is not None and request.quality is not None:
-        update_review(db, request.review_id, request.quality)
+        await update_review(db, request.review_id, request.quality)
 
     # Update user progress
-    progress = db.query(UserProgress).filter(
+    progress = await db.scalar(select(UserProgress).where(
         UserProgress.user_id == user.id,
         UserProgress.module == "vocabulary"
-    ).first()
+    ))
 
     if not progress:
         progress = UserProgress(
@@ -357,19 +781,10 @@ async def submit_vocabulary_answer(
     # Update last activity timestamp
     progress.last_activity_at = datetime.utcnow()
 
-    db.commit()
-
-    # Check for achievements
-    from app.services.achievements_service import check_and_unlock_achievements
-    newly_unlocked = check_and_unlock_achievements(user.id, db)
+    await db.commit()
 
-    # Check if user now meets advancement criteria
-    from app.services.progress_service import calculate_advancement_eligibility
-    eligibility = calculate_advancement_eligibility(user.id, db)
-    if eligibility["eligible"] and not user.can_advance:
-        user.can_advance = True
-        user.advancement_notified_at = datetime.utcnow()
-        db.commit()
+    # Achievements and advancement eligibility are evaluated in the background
+    await record_answer(user.id, "vocabulary", db)
 
     explanation = "Correct!" if is_correct else f"The correct answer was option {request.correct_option_index}."
 
@@ -1,16 +1,20 @@
 import json
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from app.db.models import User, ContentLog, UserProgress
-from app.services.ai_services import get_llm_client, get_checker_service
+from app.core.llm_usage import llm_usage_scope
+from app.services.ai_services import LLMOutputError, get_llm_client, get_checker_service
+from app.services.answer_events import record_answer
+from app.schemas.llm_outputs import WritingFeedbackOutput
 from app.schemas.writing import WritingFeedbackRequest, WritingFeedbackResponse
 
 
 async def get_writing_feedback(
         user: User,
         request: WritingFeedbackRequest,
-        db: Session
+        db: AsyncSession
 ) -> WritingFeedbackResponse:
     """
     Get feedback on user's writing.
@@ -51,42 +55,34 @@ async def get_writing_feedback(
     
     The score should be between 0 and 100 based on grammar, vocabulary, and overall quality."""
 
-    # Generate feedback
-    response = await llm.generate(
-        system_prompt=f"You are a language tutor providing feedback. Always respond with valid JSON only.",
-        user_prompt=prompt,
-        temperature=0.3,
-        # Large token limit for long essays
-        max_tokens=8192
-    )
-
-    # Parse JSON
-    cleaned = response.strip()
-    if cleaned.startswith("```json"):
-        cleaned = cleaned[7:]
-    if cleaned.startswith("```"):
-        cleaned = cleaned[3:]
-    if cleaned.endswith("```"):
-        cleaned = cleaned[:-3]
-
-    try:
-        feedback_data = json.loads(cleaned.strip())
-    except json.JSONDecodeError:
-        # Fallback if AI refuses or fails
-        feedback_data = {
-            "corrected_text": "Error processing text.",
-            "overall_comment": "The input could not be processed. Please ensure it is valid text in the target language.",
-            "inline_explanation": "N/A",
-            "score": 0
-        }
-
-    # Check content
-    checker_result = await checker.check_content(
-        module="writing",
-        original_instruction="Generate writing feedback",
-        user_input=request.model_dump(),
-        generated_content=json.dumps(feedback_data)
-    )
+    with llm_usage_scope(module="writing", user_id=user.id):
+        # Generate feedback
+        try:
+            feedback = await llm.generate_json(
+                schema=WritingFeedbackOutput,
+                system_prompt=f"You are a language tutor providing feedback. Always respond with valid JSON only.",
+                user_prompt=prompt,
+                temperature=0.3,
+                # Large token limit for long essays
+                max_tokens=8192
+            )
+            feedback_data = feedback.model_dump(exclude_none=True)
+        except LLMOutputError:
+            # Fallback if AI refuses or fails
+            feedback_data = {
+                "corrected_text": "Error processing text.",
+                "overall_comment": "The input could not be processed. Please ensure it is valid text in the target language.",
+                "inline_explanation": "N/A",
+                "score": 0
+            }
+
+        # Check content
+        checker_result = await checker.check_content(
+            module="writing",
+            original_instruction="Generate writing feedback",
+            user_input=request.model_dump(),
+            generated_content=json.dumps(feedback_data)
+        )
 
     # If not valid and has suggested fix, try to use it
     if not checker_result["is_valid"] and checker_result["suggested_fix"]:
@@ -97,10 +93,10 @@ async def get_writing_feedback(
 
     # Update user progress with score
     score = feedback_data.get("score", 0)
-    progress = db.query(UserProgress).filter(
+    progress = await db.scalar(select(UserProgress).where(
         UserProgress.user_id == user.id,
         UserProgress.module == "writing"
-    ).first()
+    ))
 
     if not progress:
         progress = UserProgress(
@@ -121,19 +117,7 @@ async def get_writing_feedback(
     # Update last activity timestamp
     progress.last_activity_at = datetime.utcnow()
 
-    db.commit()
-
-    # Check for achievements
-    from app.services.achievements_service import check_and_unlock_achievements
-    newly_unlocked = check_and_unlock_achievements(user.id, db)
-
-    # Check if user now meets advancement criteria
-    from app.services.progress_service import calculate_advancement_eligibility
-    eligibility = calculate_advancement_eligibility(user.id, db)
-    if eligibility["eligible"] and not user.can_advance:
-        user.can_advance = True
-        user.advancement_notified_at = datetime.utcnow()
-        db.commit()
+    await db.commit()
 
     # Log content
     content_log = ContentLog(
@@ -145,6 +129,9 @@ async def get_writing_feedback(
         is_validated=checker_result["is_valid"]
     )
     db.add(content_log)
-    db.commit()
+    await db.commit()
+
+    # Achievements and advancement eligibility are evaluated in the background
+    await record_answer(user.id, "writing", db)
 
     return WritingFeedbackResponse(**feedback_data)
@@ -0,0 +1,32 @@
+"""
+Rebuild the daily activity rollup (daily_activity) from content_logs.
+
+Run once after deploying the rollup, and again any time it is suspected to
+have drifted. It replaces the whole table, so run it while the app is idle.
+
+Usage:
+    python backfill_activity_rollup.py
+"""
+
+import asyncio
+import sys
+
+from app.db import models  # noqa: F401  (registers tables for init_db)
+from app.db.database import AsyncSessionLocal, init_db
+from app.services.activity_rollup import backfill_daily_activity
+
+
+async def backfill() -> int:
+    async with AsyncSessionLocal() as db:
+        return await backfill_daily_activity(db)
+
+
+def main() -> int:
+    init_db()
+    written = asyncio.run(backfill())
+    print(f"✓ Daily activity rollup rebuilt ({written} rows)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
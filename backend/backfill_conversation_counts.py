@@ -0,0 +1,37 @@
+"""
+Populate conversation_message_counts from stored conversation sessions.
+
+Run once after deploying the maintained counter (and again any time it is
+suspected to have drifted); it overwrites each user's counter for their
+current level with the number of user messages in their stored sessions.
+Sessions that still keep their transcript in context_json are migrated to
+conversation_messages first.
+
+Usage:
+    python backfill_conversation_counts.py
+"""
+
+import asyncio
+import sys
+
+from app.db import models  # noqa: F401  (registers tables for init_db)
+from app.db.database import AsyncSessionLocal, init_db
+from app.services.conversation_history import migrate_conversation_sessions
+from app.services.progress_service import backfill_conversation_message_counts
+
+
+async def backfill() -> int:
+    async with AsyncSessionLocal() as db:
+        await migrate_conversation_sessions(db)
+        return await backfill_conversation_message_counts(db)
+
+
+def main() -> int:
+    init_db()
+    written = asyncio.run(backfill())
+    print(f"✓ Conversation message counters written for {written} users")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
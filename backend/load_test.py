@@ -0,0 +1,440 @@
+"""
+Load-test harness: simulated learners against a running backend.
+
+Each learner registers, picks a language, takes the placement test and then
+loops over weighted activities (vocabulary, grammar, conversation, writing,
+progress polling) with randomised think time until the run ends. Latency is
+recorded per endpoint and written as JSON that can be compared between runs.
+
+Run the server with LLM_PROVIDER=fake (and STT/LLM_IMAGE_PROVIDER=fake) to
+measure the stack itself without API keys or spend.
+
+Usage:
+    python load_test.py --learners 50 --duration 120 --output results.json
+    python load_test.py --learners 50 --duration 120 --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Relative weight of each activity in a learner's loop
+JOURNEY_WEIGHTS = {
+    "vocabulary": 4,
+    "grammar": 3,
+    "conversation": 1,
+    "writing": 1,
+    "progress": 1,
+}
+
+CONVERSATION_MESSAGES = [
+    "Hello! I am learning every day.",
+    "Yesterday I go to the market with my friend.",
+    "What do you like to do on weekends?",
+    "I want to travel to the mountains next summer.",
+]
+
+WRITING_SAMPLES = [
+    "Last weekend I visit my grandmother. We cook together and eat a big dinner.",
+    "My favourite season is autumn because the trees is very colourful.",
+    "I work in an office. Every morning I takes the bus and read a book.",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile with linear interpolation between closest ranks (0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class EndpointStats:
+    """Latencies and outcomes for one endpoint."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.status_codes: Counter = Counter()
+        self.errors = 0
+
+    def record(self, latency: float, status_code: Optional[int]) -> None:
+        self.latencies.append(latency)
+        # None means the request never got a response (timeout, connection error)
+        self.status_codes[str(status_code) if status_code is not None else "exception"] += 1
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        count = len(self.latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": self.errors / count if count else 0.0,
+            "throughput_rps": count / elapsed if elapsed else 0.0,
+            "mean_ms": sum(self.latencies) / count * 1000 if count else 0.0,
+            "p50_ms": percentile(self.latencies, 50) * 1000,
+            "p95_ms": percentile(self.latencies, 95) * 1000,
+            "p99_ms": percentile(self.latencies, 99) * 1000,
+            "max_ms": max(self.latencies) * 1000 if count else 0.0,
+            "status_codes": dict(self.status_codes),
+        }
+
+
+class LoadStats:
+    """Per-endpoint stats for a whole run."""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.learners_started = 0
+        self.learners_failed = 0
+
+    def record(self, endpoint: str, latency: float, status_code: Optional[int]) -> None:
+        self.endpoints.setdefault(endpoint, EndpointStats()).record(latency, status_code)
+
+    def report(self, elapsed: float, config: Dict[str, Any]) -> Dict[str, Any]:
+        """JSON-serialisable results; endpoints are sorted by name for stable diffs."""
+        totals = EndpointStats()
+        for stats in self.endpoints.values():
+            totals.latencies.extend(stats.latencies)
+            totals.status_codes.update(stats.status_codes)
+            totals.errors += stats.errors
+        return {
+            "started_at": config.get("started_at"),
+            "config": config,
+            "elapsed_seconds": elapsed,
+            "learners": {"started": self.learners_started, "failed": self.learners_failed},
+            "totals": totals.summary(elapsed),
+            "endpoints": {name: self.endpoints[name].summary(elapsed) for name in sorted(self.endpoints)},
+        }
+
+
+class Learner:
+    """One simulated learner walking a realistic journey."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        stats: LoadStats,
+        rng: random.Random,
+        language: str,
+        think_time_seconds: float,
+        run_id: str,
+        index: int
+    ):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.language = language
+        self.think_time_seconds = think_time_seconds
+        self.username = f"load_{run_id}_{index}"
+        self.headers: Dict[str, str] = {}
+
+    async def request(self, endpoint: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        """
+        Send one request and record it under endpoint (a route template such as
+        "POST /conversation/{id}/message"). Returns the response on success, else None.
+        """
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(endpoint, time.perf_counter() - started, None)
+            return None
+        self.stats.record(endpoint, time.perf_counter() - started, response.status_code)
+        return response if response.status_code < 400 else None
+
+    async def think(self) -> None:
+        if self.think_time_seconds > 0:
+            await asyncio.sleep(self.rng.expovariate(1 / self.think_time_seconds))
+
+    async def register(self) -> bool:
+        response = await self.request(
+            "POST /auth/register", "POST", "/auth/register",
+            json={"username": self.username, "password": "load-test-password"}
+        )
+        if response is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return await self.request(
+            "PUT /auth/me/language", "PUT", "/auth/me/language",
+            json={"target_language": self.language}
+        ) is not None
+
+    async def placement_test(self) -> bool:
+        response = await self.request(
+            "POST /placement-test/start", "POST", "/placement-test/start",
+            json={"target_language": self.language}
+        )
+        if response is None:
+            return False
+        test_id = response.json()["test_id"]
+
+        has_next = True
+        while has_next:
+            question = await self.request("GET /placement-test/{id}/question", "GET", f"/placement-test/{test_id}/question")
+            if question is None:
+                return False
+            answer = await self.request(
+                "POST /placement-test/{id}/answer", "POST", f"/placement-test/{test_id}/answer",
+                json={
+                    "question_number": question.json()["current_question_number"],
+                    "selected_option": self.rng.randrange(4)
+                }
+            )
+            if answer is None:
+                return False
+            has_next = answer.json()["has_next"]
+
+        return await self.request(
+            "POST /placement-test/{id}/complete", "POST", f"/placement-test/{test_id}/complete"
+        ) is not None
+
+    async def vocabulary(self) -> None:
+        card = await self.request("GET /vocabulary/next", "GET", "/vocabulary/next")
+        if card is None:
+            return
+        data = card.json()
+        await self.think()
+        await self.request("POST /vocabulary/answer", "POST", "/vocabulary/answer", json={
+            "word": data["word"],
+            "selected_option_index": self.rng.randrange(len(data.get("options") or [None] * 4)),
+            "correct_option_index": data.get("correct_option_index") or 0,
+            "review_id": data.get("review_id"),
+        })
+
+    async def grammar(self) -> None:
+        question = await self.request("GET /grammar/question", "GET", "/grammar/question")
+        if question is None:
+            return
+        data = question.json()
+        await self.think()
+        await self.request("POST /grammar/answer", "POST", "/grammar/answer", json={
+            "question_id": data["question_id"],
+            "selected_option_index": self.rng.randrange(len(data["options"])),
+            "correct_option_index": data["correct_option_index"],
+            "explanation": data.get("explanation"),
+        })
+
+    async def conversation(self) -> None:
+        started = await self.request("POST /conversation/start", "POST", "/conversation/start", json={})
+        if started is None:
+            return
+        session_id = started.json()["session_id"]
+        for _ in range(self.rng.randint(2, 4)):
+            await self.think()
+            message = {"message": self.rng.choice(CONVERSATION_MESSAGES)}
+            if self.rng.random() < 0.5:
+                await self.stream_message(session_id, message)
+            else:
+                await self.request(
+                    "POST /conversation/{id}/message", "POST", f"/conversation/{session_id}/message", json=message
+                )
+
+    async def stream_message(self, session_id: str, message: Dict[str, str]) -> None:
+        """Streamed reply; the latency recorded is until the last event arrives."""
+        endpoint = "POST /conversation/{id}/message/stream"
+        started = time.perf_counter()
+        try:
+            async with self.client.stream(
+                "POST", f"/conversation/{session_id}/message/stream", headers=self.headers, json=message
+            ) as response:
+                body = "".join([chunk async for chunk in response.aiter_text()])
+        except httpx.HTTPError:
+            self.stats.record(endpoint, time.perf_counter() - started, None)
+            return
+        # The stream reports failures in-band with an error event
+        status_code = response.status_code if "event: error" not in body else 502
+        self.stats.record(endpoint, time.perf_counter() - started, status_code)
+
+    async def writing(self) -> None:
+        await self.request("GET /writing/prompts", "GET", "/writing/prompts")
+        await self.think()
+        await self.request("POST /writing/feedback", "POST", "/writing/feedback", json={
+            "text": self.rng.choice(WRITING_SAMPLES)
+        })
+
+    async def progress(self) -> None:
+        await self.request("GET /progress/summary", "GET", "/progress/summary")
+        await self.request("GET /progress/charts", "GET", "/progress/charts")
+
+    async def run(self, deadline: float, max_activities: Optional[int] = None) -> None:
+        self.stats.learners_started += 1
+        if not await self.register() or not await self.placement_test():
+            self.stats.learners_failed += 1
+            return
+
+        activities = list(JOURNEY_WEIGHTS)
+        weights = [JOURNEY_WEIGHTS[name] for name in activities]
+        done = 0
+        while time.monotonic() < deadline and (max_activities is None or done < max_activities):
+            await getattr(self, self.rng.choices(activities, weights)[0])()
+            done += 1
+            await self.think()
+
+
+async def run_load_test(
+    base_url: str,
+    learners: int = 10,
+    duration_seconds: float = 60.0,
+    ramp_up_seconds: float = 10.0,
+    think_time_seconds: float = 1.0,
+    language: str = "Spanish",
+    seed: int = 0,
+    timeout_seconds: float = 60.0,
+    max_activities: Optional[int] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> Dict[str, Any]:
+    """
+    Run learners concurrently and return the JSON report.
+
+    Args:
+        base_url: API root, e.g. http://localhost:8000/api/v1
+        learners: Number of concurrent learners
+        duration_seconds: Time after which learners stop starting new activities
+        ramp_up_seconds: Learner start times are spread evenly over this window
+        think_time_seconds: Mean pause between a learner's actions (exponential)
+        language: Target language for every learner
+        seed: Seed for the learners' choices, so runs are comparable
+        timeout_seconds: Per-request timeout
+        max_activities: Stop each learner after this many activities (useful for smoke runs)
+        transport: Optional httpx transport (e.g. ASGITransport to drive the app in-process)
+
+    Returns:
+        Report dict (see LoadStats.report)
+    """
+    config = {
+        "base_url": base_url,
+        "learners": learners,
+        "duration_seconds": duration_seconds,
+        "ramp_up_seconds": ramp_up_seconds,
+        "think_time_seconds": think_time_seconds,
+        "language": language,
+        "seed": seed,
+        "max_activities": max_activities,
+        "started_at": datetime.utcnow().isoformat(),
+    }
+    stats = LoadStats()
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(max_connections=max(learners, 1) * 2, max_keepalive_connections=max(learners, 1))
+
+    async with httpx.AsyncClient(
+        base_url=base_url.rstrip("/"),
+        timeout=timeout_seconds,
+        limits=limits,
+        transport=transport
+    ) as client:
+        started = time.monotonic()
+        deadline = started + ramp_up_seconds + duration_seconds
+
+        async def start_learner(index: int) -> None:
+            if learners > 1:
+                await asyncio.sleep(ramp_up_seconds * index / learners)
+            learner = Learner(
+                client, stats, random.Random(seed * 100_003 + index),
+                language, think_time_seconds, run_id, index
+            )
+            await learner.run(deadline, max_activities)
+
+        await asyncio.gather(*(start_learner(index) for index in range(learners)))
+        elapsed = time.monotonic() - started
+
+    return stats.report(elapsed, config)
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    max_regression_pct: float = 20.0
+) -> List[str]:
+    """
+    Endpoints whose p95 latency or error rate got worse than allowed.
+
+    Args:
+        baseline: Report from an earlier run
+        current: Report from this run
+        max_regression_pct: Allowed p95 increase in percent
+
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+    for name, now in current["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None or not before["requests"]:
+            continue
+        if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + max_regression_pct / 100):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.0f}ms -> {now['p95_ms']:.0f}ms")
+        if now["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {before['error_rate']:.1%} -> {now['error_rate']:.1%}")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print a per-endpoint latency table."""
+    print(f"{'endpoint':<42} {'reqs':>6} {'err%':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["totals"])]
+    for name, stats in rows:
+        print(
+            f"{name:<42} {stats['requests']:>6} {stats['error_rate'] * 100:>5.1f}% "
+            f"{stats['throughput_rps']:>7.2f} {stats['p50_ms']:>6.0f}ms {stats['p95_ms']:>6.0f}ms {stats['p99_ms']:>6.0f}ms"
+        )
+    learners = report["learners"]
+    print(f"\n{learners['started']} learners ({learners['failed']} failed to onboard) in {report['elapsed_seconds']:.1f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate concurrent learners against the backend.")
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--learners", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of steady load after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=10.0)
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between a learner's actions")
+    parser.add_argument("--language", default="Spanish")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report; exit 1 on regressions")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Allowed p95 increase in percent")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load_test(
+        base_url=args.base_url,
+        learners=args.learners,
+        duration_seconds=args.duration,
+        ramp_up_seconds=args.ramp_up,
+        think_time_seconds=args.think_time,
+        language=args.language,
+        seed=args.seed,
+        timeout_seconds=args.timeout
+    ))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare_reports(json.load(f), report, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
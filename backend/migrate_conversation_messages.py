@@ -0,0 +1,33 @@
+"""
+Move conversation transcripts from context_json into conversation_messages.
+
+Sessions are also migrated on first use, so this is optional; run it after
+deploying the message table to migrate everything at once. Safe to re-run:
+sessions already migrated are skipped.
+
+Usage:
+    python migrate_conversation_messages.py
+"""
+
+import asyncio
+import sys
+
+from app.db import models  # noqa: F401  (registers tables for init_db)
+from app.db.database import AsyncSessionLocal, init_db
+from app.services.conversation_history import migrate_conversation_sessions
+
+
+async def migrate() -> int:
+    async with AsyncSessionLocal() as db:
+        return await migrate_conversation_sessions(db)
+
+
+def main() -> int:
+    init_db()
+    migrated = asyncio.run(migrate())
+    print(f"✓ Conversation messages migrated for {migrated} sessions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""
+Move inline base64 flashcard images into the blob store.
+
+Vocabulary content logs and pooled cards written before the blob store keep
+their image in image_data; this stores each image under BLOB_STORE_PATH and
+replaces it with its digest. Pooled cards are also converted when served,
+so this mainly shrinks the database. Safe to re-run.
+
+Usage:
+    python migrate_media.py
+"""
+
+import asyncio
+import sys
+
+from app.db import models  # noqa: F401  (registers tables for init_db)
+from app.db.database import AsyncSessionLocal, init_db
+from app.services.vocabulary import migrate_inline_images
+
+
+async def migrate() -> int:
+    async with AsyncSessionLocal() as db:
+        return await migrate_inline_images(db)
+
+
+def main() -> int:
+    init_db()
+    migrated = asyncio.run(migrate())
+    print(f"✓ Inline images moved to the blob store for {migrated} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
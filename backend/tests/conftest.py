@@ -6,18 +6,91 @@ This file contains fixtures that are automatically available to all tests.
 
 import pytest
 import os
+from unittest.mock import AsyncMock
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 from app.db.database import Base
 from app.db.models import User
 from app.main import app
 from app.core.security import get_password_hash
+from app.core.blob_store import FilesystemBlobStore, reset_blob_store
+from app.core.circuit_breaker import reset_circuit_breakers
+from app.core.llm_usage import UsageRecorder, reset_usage_recorder
+from app.services.ai_services import LLMClient
+from app.services.validation_policy import reset_validation_policy
+from app.services.achievements_service import reset_achievement_catalog, reset_achievement_listing_cache
+from app.services.answer_events import AnswerEventWorker, get_answer_event_worker, reset_answer_event_worker
 from app.api.deps import get_db
 
 # Test database URL - use a separate database for tests
 TEST_DATABASE_URL = "sqlite:///./test_language_app.db"
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test_language_app.db"
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breakers():
+    """
+    Reset provider circuit breakers after each test.
+
+    Breakers are process-wide, so failures provoked by one test
+    must not leave a circuit open for the next.
+    """
+    yield
+    reset_circuit_breakers()
+
+
+@pytest.fixture(autouse=True)
+def fresh_validation_policy():
+    """
+    Reset adaptive validation stats after each test.
+
+    Pass rates are process-wide; a test must not inherit another's
+    history and start skipping checks.
+    """
+    yield
+    reset_validation_policy()
+
+
+@pytest.fixture(autouse=True)
+def fresh_achievement_catalog():
+    """
+    Drop the cached achievement catalog and listings after each test.
+
+    Each test seeds its own achievements into a fresh database.
+    """
+    yield
+    reset_achievement_catalog()
+    reset_achievement_listing_cache()
+
+
+@pytest.fixture(autouse=True)
+def fresh_usage_recorder():
+    """
+    Buffer AI call usage without flushing during tests.
+
+    A background flush would write to the app database from a loop the
+    test is about to close; tests that check usage flush explicitly.
+    """
+    reset_usage_recorder(UsageRecorder(flush_size=10_000, flush_interval_seconds=float("inf")))
+    yield
+    reset_usage_recorder()
+
+
+@pytest.fixture(autouse=True)
+def fresh_blob_store(tmp_path):
+    """
+    Store generated media in the test's temporary directory.
+
+    Tests must not write images into the working tree's media/ folder.
+    """
+    store = FilesystemBlobStore(str(tmp_path / "media"))
+    reset_blob_store(store)
+    yield store
+    reset_blob_store()
 
 
 @pytest.fixture(scope="function")
@@ -47,12 +120,41 @@ def db_engine():
 
 
 @pytest.fixture(scope="function")
-def db_session(db_engine):
+def async_session_factory(db_engine):
     """
-    Create a fresh database session for each test.
+    Async session factory on the test database, configured like AsyncSessionLocal.
+
+    NullPool gives every session its own connection, so sessions opened by
+    the TestClient's event loop never share a connection with the test's.
+    """
+    engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+    factory = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    # Post-answer work runs on the test database too
+    reset_answer_event_worker(AnswerEventWorker(session_factory=factory))
+    yield factory
+    reset_answer_event_worker()
+    engine.sync_engine.dispose()
+
+
+@pytest.fixture(scope="function")
+async def db_session(async_session_factory):
+    """
+    Create a fresh async database session for each test.
     
     This ensures each test has a clean database state.
     """
+    async with async_session_factory() as session:
+        yield session
+        await get_answer_event_worker().drain()
+
+
+@pytest.fixture(scope="function")
+def sync_db_session(db_engine):
+    """
+    Synchronous session on the same test database.
+
+    Used by model tests and to seed or inspect data around TestClient requests.
+    """
     TestingSessionLocal = sessionmaker(
         autocommit=False,
         autoflush=False,
@@ -66,17 +168,16 @@ def db_session(db_engine):
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(async_session_factory):
     """
     Create a FastAPI test client with overridden database dependency.
     
     This client can be used to make HTTP requests to the API endpoints.
+    Each request gets its own async session on the test database.
     """
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    async def override_get_db():
+        async with async_session_factory() as session:
+            yield session
     
     app.dependency_overrides[get_db] = override_get_db
     
@@ -94,7 +195,7 @@ def client(db_session):
 
 
 @pytest.fixture
-def sample_user(db_session):
+def sample_user(sync_db_session):
     """
     Create a sample user for testing.
     
@@ -112,14 +213,14 @@ def sample_user(db_session):
         level="A1",
         is_active=True
     )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
+    sync_db_session.add(user)
+    sync_db_session.commit()
+    sync_db_session.refresh(user)
     return user
 
 
 @pytest.fixture
-def sample_user_advanced(db_session):
+def sample_user_advanced(sync_db_session):
     """
     Create an advanced level sample user for testing.
     """
@@ -131,9 +232,9 @@ def sample_user_advanced(db_session):
         level="B2",
         is_active=True
     )
-    db_session.add(user)
-    db_session.commit()
-    db_session.refresh(user)
+    sync_db_session.add(user)
+    sync_db_session.commit()
+    sync_db_session.refresh(user)
     return user
 
 
@@ -188,6 +289,20 @@ def mock_llm_response():
     }
 
 
+@pytest.fixture
+def mock_llm_client():
+    """
+    Real LLMClient with generate() mocked.
+
+    generate_json runs as usual, so services parse the canned text
+    set on mock_llm_client.generate.
+    """
+    client = LLMClient(api_key="test_key", base_url="https://test.api.com")
+    client.generate = AsyncMock()
+    client.close = AsyncMock()
+    return client
+
+
 @pytest.fixture
 def mock_vocabulary_flashcard():
     """
@@ -0,0 +1,49 @@
+"""
+Integration tests for admin endpoints.
+"""
+
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.db.models import LLMUsageRecord
+
+
+class TestLLMUsageEndpoint:
+    """Test GET /admin/llm-usage."""
+
+    def test_requires_admin_key(self, client: TestClient, monkeypatch):
+        monkeypatch.setattr("app.api.deps.settings.ADMIN_API_KEY", "secret-admin-key")
+
+        assert client.get("/api/v1/admin/llm-usage").status_code == 403
+        response = client.get("/api/v1/admin/llm-usage", headers={"X-Admin-Key": "wrong"})
+        assert response.status_code == 403
+
+    def test_reports_usage_by_stage(self, client: TestClient, sync_db_session, monkeypatch):
+        monkeypatch.setattr("app.api.deps.settings.ADMIN_API_KEY", "secret-admin-key")
+        sync_db_session.add(LLMUsageRecord(
+            created_at=datetime.utcnow(), service="llm", provider="gemini", model="m",
+            module="vocabulary", stage="secondary", latency_ms=1200, prompt_tokens=800
+        ))
+        sync_db_session.commit()
+
+        response = client.get(
+            "/api/v1/admin/llm-usage?group_by=stage",
+            headers={"X-Admin-Key": "secret-admin-key"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["totals"]["calls"] == 1
+        assert data["groups"][0]["keys"] == {"stage": "secondary"}
+        assert data["groups"][0]["prompt_tokens"] == 800
+
+    def test_unknown_group_by_is_bad_request(self, client: TestClient, monkeypatch):
+        monkeypatch.setattr("app.api.deps.settings.ADMIN_API_KEY", "secret-admin-key")
+
+        response = client.get(
+            "/api/v1/admin/llm-usage?group_by=colour",
+            headers={"X-Admin-Key": "secret-admin-key"}
+        )
+
+        assert response.status_code == 400
@@ -393,7 +393,7 @@ class TestLegacyAuthEndpoints:
         assert response.status_code == 404
         assert "not found" in response.json()["detail"].lower()
     
-    def test_get_legacy_user_progress(self, client: TestClient, db_session):
+    def test_get_legacy_user_progress(self, client: TestClient, sync_db_session):
         """Test getting user progress via legacy endpoint."""
         from app.db.models import User, UserProgress
         
@@ -404,7 +404,7 @@ class TestLegacyAuthEndpoints:
         )
         
         # Add some progress manually
-        user = db_session.query(User).filter(User.external_id == "progress_test_user").first()
+        user = sync_db_session.query(User).filter(User.external_id == "progress_test_user").first()
         progress = UserProgress(
             user_id=user.id,
             module="vocabulary",
@@ -412,8 +412,8 @@ class TestLegacyAuthEndpoints:
             total_attempts=20,
             correct_attempts=17
         )
-        db_session.add(progress)
-        db_session.commit()
+        sync_db_session.add(progress)
+        sync_db_session.commit()
         
         response = client.get("/api/v1/auth/users/progress_test_user/progress")
         
@@ -452,7 +452,7 @@ class TestAuthErrorHandling:
             assert response.status_code == 404
             assert "not found" in response.json()["detail"].lower()
     
-    def test_manual_level_update_marks_placement_complete(self, authenticated_client: TestClient, db_session):
+    def test_manual_level_update_marks_placement_complete(self, authenticated_client: TestClient, sync_db_session):
         """Test that manually setting level marks placement test as completed."""
         from app.db.models import User
         
@@ -461,7 +461,7 @@ class TestAuthErrorHandling:
         user_id = user_response.json()["id"]
         
         # Verify placement test not completed initially
-        user = db_session.query(User).filter(User.id == user_id).first()
+        user = sync_db_session.query(User).filter(User.id == user_id).first()
         initial_status = user.placement_test_completed
         
         # Update level
@@ -471,7 +471,7 @@ class TestAuthErrorHandling:
         )
         
         # Verify placement test is now marked complete
-        db_session.refresh(user)
+        sync_db_session.refresh(user)
         assert user.placement_test_completed == True
         assert user.level == "B1"
     
@@ -102,6 +102,33 @@ class TestConversationEndpointErrors:
             assert response.status_code == 500
             assert "rate limit" in response.json()["detail"].lower()
 
+    
+    def test_stream_message_with_invalid_session_raises_404(self, authenticated_client: TestClient):
+        """Test that streaming to an invalid session returns 404 before any event."""
+        with patch('app.api.v1.endpoints.conversation.stream_message', new=AsyncMock(side_effect=ValueError("Session not found"))):
+            response = authenticated_client.post(
+                "/api/v1/conversation/invalid-session-123/message/stream",
+                json={"message": "Hola"}
+            )
+            
+            assert response.status_code == 404
+    
+    def test_stream_message_returns_sse_frames(self, authenticated_client: TestClient):
+        """Test that stream events are serialized as Server-Sent Events."""
+        async def events():
+            yield "token", {"text": "Hola"}
+            yield "done", {"session_id": "abc"}
+        
+        with patch('app.api.v1.endpoints.conversation.stream_message', new=AsyncMock(return_value=events())):
+            response = authenticated_client.post(
+                "/api/v1/conversation/abc/message/stream",
+                json={"message": "Hola"}
+            )
+            
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            assert 'event: token\ndata: {"text": "Hola"}\n\n' in response.text
+            assert "event: done" in response.text
 
 class TestGrammarEndpointErrors:
     """Test grammar endpoint error handling."""
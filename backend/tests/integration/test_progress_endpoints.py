@@ -12,7 +12,7 @@ from sqlalchemy.orm import Session
 class TestProgressSummary:
     """Test progress summary endpoint."""
     
-    def test_get_progress_summary_success(self, authenticated_client: TestClient, db_session: Session):
+    def test_get_progress_summary_success(self, authenticated_client: TestClient, sync_db_session: Session):
         """Test getting progress summary for user with activity."""
         # Set up user
         authenticated_client.put("/api/v1/auth/me/language", json={"target_language": "German"})
@@ -44,7 +44,7 @@ class TestProgressSummary:
 class TestProgressHistory:
     """Test progress history endpoint."""
     
-    def test_get_level_history_success(self, authenticated_client: TestClient, db_session: Session):
+    def test_get_level_history_success(self, authenticated_client: TestClient, sync_db_session: Session):
         """Test getting level advancement history."""
         # Set up user
         authenticated_client.put("/api/v1/auth/me/language", json={"target_language": "French"})
@@ -62,7 +62,7 @@ class TestProgressHistory:
 class TestLevelAdvancement:
     """Test level advancement functionality."""
     
-    def test_advance_level_without_eligibility_fails(self, client: TestClient, db_session):
+    def test_advance_level_without_eligibility_fails(self, client: TestClient, sync_db_session):
         """Test that advancing level without meeting requirements fails."""
         response = client.post(
             "/api/v1/auth/register",
@@ -91,7 +91,7 @@ class TestLevelAdvancement:
         assert response.status_code == 400
         assert "not eligible" in response.json()["detail"].lower()
     
-    def test_advance_level_success_with_module_completion(self, authenticated_client: TestClient, db_session: Session):
+    def test_advance_level_success_with_module_completion(self, authenticated_client: TestClient, sync_db_session: Session):
         """Test successful level advancement when user meets requirements."""
         # Set up user
         authenticated_client.put("/api/v1/auth/me/language", json={"target_language": "Spanish"})
@@ -111,13 +111,13 @@ class TestLevelAdvancement:
                 total_attempts=100,
                 correct_attempts=85
             )
-            db_session.add(progress)
+            sync_db_session.add(progress)
         
         # Set can_advance flag
-        user = db_session.query(User).filter(User.id == user_id).first()
+        user = sync_db_session.query(User).filter(User.id == user_id).first()
         user.can_advance = True
         user.total_xp = 1500  # Sufficient XP
-        db_session.commit()
+        sync_db_session.commit()
         
         # Try to advance
         response = authenticated_client.post("/api/v1/progress/advance")
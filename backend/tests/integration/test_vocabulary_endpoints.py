@@ -95,6 +95,22 @@ class TestVocabularyEndpoint:
         # Assert
         assert response.status_code == 403  # FastAPI returns 403 for missing credentials
 
+    def test_get_batch_without_auth_fails(self, client: TestClient):
+        """Test that the batch endpoint requires authentication."""
+        response = client.get("/api/v1/vocabulary/batch?count=5")
+
+        assert response.status_code == 403
+
+    def test_get_batch_rejects_oversized_count(self, authenticated_client: TestClient):
+        """Test that batch size is capped."""
+        authenticated_client.put("/api/v1/auth/me/language", json={"target_language": "German"})
+        authenticated_client.put("/api/v1/auth/me/level", json={"level": "A1"})
+
+        response = authenticated_client.get("/api/v1/vocabulary/batch?count=500")
+
+        assert response.status_code == 400
+        assert "count" in response.json()["detail"]
+
 
 class TestVocabularyAnswer:
     """Test cases for submitting vocabulary answers."""
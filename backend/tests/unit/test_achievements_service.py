@@ -0,0 +1,370 @@
+"""
+Unit tests for achievement evaluation.
+
+Tests:
+- Only achievements the answer's module can affect are unlocked
+- XP rewards cascade into XP achievements
+- Unlocks are idempotent, including against a concurrent unlock
+- Duplicate unlocks in an existing database are removed before the unique index is built
+- The catalog is cached, and reloaded on changes
+- Queries per check don't grow with the catalog
+- The listing reads its metrics in one query, is cached per user and dropped on writes (in every worker, off the event loop)
+"""
+
+import threading
+import pytest
+from sqlalchemy import create_engine, event, func, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.db.database import Base, init_db
+from app.db.models import Achievement, User, UserAchievement, UserProgress
+from app.services.achievements_service import (
+    AchievementCatalog,
+    _unlock,
+    check_and_unlock_achievements,
+    _listing_cache_key,
+    get_achievement_catalog,
+    get_achievement_listing_cache,
+    get_user_achievements,
+    reset_achievement_listing_cache,
+    wait_for_listing_invalidations,
+)
+
+
+def _achievement(code, criteria_type, threshold, module=None, xp=10):
+    return Achievement(
+        code=code, name=code, description=code, criteria_type=criteria_type,
+        criteria_threshold=threshold, criteria_module=module, xp_reward=xp
+    )
+
+
+async def _user_with_progress(db_session, **attempts):
+    user = User(username="testuser", hashed_password="hash", target_language="Spanish", level="A1", total_xp=0)
+    db_session.add(user)
+    await db_session.commit()
+    for module, total in attempts.items():
+        db_session.add(UserProgress(user_id=user.id, module=module, total_attempts=total, score=80.0))
+    await db_session.commit()
+    return user
+
+
+class CountStatements:
+    """Collects the SQL statements run on the session's engine."""
+
+    def __init__(self, db_session):
+        self.engine = db_session.bind.sync_engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self.statements
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+
+class TestCheckAndUnlock:
+    """Test unlocking from a module's answer."""
+
+    @pytest.mark.asyncio
+    async def test_unlocks_only_what_the_module_can_affect(self, db_session):
+        db_session.add_all([
+            _achievement("first_word", "count", 1, "vocabulary"),
+            _achievement("first_grammar", "count", 1, "grammar"),
+            _achievement("grammar_ace", "score", 90, "grammar"),
+        ])
+        user = await _user_with_progress(db_session, vocabulary=3, grammar=3)
+
+        unlocked = await check_and_unlock_achievements(user.id, db_session, module="vocabulary")
+
+        assert [a["code"] for a in unlocked] == ["first_word"]
+        assert user.total_xp == 10
+
+    @pytest.mark.asyncio
+    async def test_without_module_checks_everything(self, db_session):
+        db_session.add_all([
+            _achievement("first_word", "count", 1, "vocabulary"),
+            _achievement("first_grammar", "count", 1, "grammar"),
+        ])
+        user = await _user_with_progress(db_session, vocabulary=1, grammar=1)
+
+        unlocked = await check_and_unlock_achievements(user.id, db_session)
+
+        assert sorted(a["code"] for a in unlocked) == ["first_grammar", "first_word"]
+
+    @pytest.mark.asyncio
+    async def test_xp_rewards_cascade(self, db_session):
+        db_session.add_all([
+            _achievement("first_word", "count", 1, "vocabulary", xp=100),
+            _achievement("xp_100", "total_xp", 100, xp=50),
+            _achievement("xp_150", "total_xp", 150, xp=0),
+        ])
+        user = await _user_with_progress(db_session, vocabulary=1)
+
+        unlocked = await check_and_unlock_achievements(user.id, db_session, module="vocabulary")
+
+        assert [a["code"] for a in unlocked] == ["first_word", "xp_100", "xp_150"]
+        assert user.total_xp == 150
+
+    @pytest.mark.asyncio
+    async def test_second_check_unlocks_nothing(self, db_session):
+        db_session.add(_achievement("first_word", "count", 1, "vocabulary"))
+        user = await _user_with_progress(db_session, vocabulary=1)
+
+        await check_and_unlock_achievements(user.id, db_session, module="vocabulary")
+        again = await check_and_unlock_achievements(user.id, db_session, module="vocabulary")
+
+        assert again == []
+        assert user.total_xp == 10
+        count = await db_session.scalar(select(func.count()).select_from(UserAchievement))
+        assert count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_unlock_is_skipped_without_xp(self, db_session):
+        achievement = _achievement("first_word", "count", 1, "vocabulary")
+        db_session.add(achievement)
+        user = await _user_with_progress(db_session, vocabulary=1)
+        db_session.add(UserAchievement(user_id=user.id, achievement_id=achievement.id))
+        await db_session.commit()
+
+        assert await _unlock(user, {"id": achievement.id, "xp_reward": 10}, db_session) is False
+        assert user.total_xp == 0
+
+    def test_init_db_removes_duplicate_unlocks_before_the_unique_index(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            # A database from before the index, with a double unlock
+            connection.execute(text("DROP INDEX uq_user_achievement"))
+            connection.execute(text(
+                "INSERT INTO user_achievements (id, user_id, achievement_id) VALUES (1, 'u', 1), (2, 'u', 1), (3, 'u', 2)"
+            ))
+
+        init_db(bind=engine)
+
+        with engine.begin() as connection:
+            assert connection.execute(text("SELECT id FROM user_achievements ORDER BY id")).scalars().all() == [1, 3]
+        assert "uq_user_achievement" in {index["name"] for index in inspect(engine).get_indexes("user_achievements")}
+        with pytest.raises(IntegrityError):
+            with engine.begin() as connection:
+                connection.execute(text("INSERT INTO user_achievements (user_id, achievement_id) VALUES ('u', 1)"))
+        engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_query_count_does_not_grow_with_catalog(self, db_session):
+        user = await _user_with_progress(db_session, vocabulary=1)
+
+        async def queries_for_check():
+            get_achievement_catalog().invalidate()
+            await check_and_unlock_achievements(user.id, db_session, module="vocabulary")
+            with CountStatements(db_session) as statements:
+                await check_and_unlock_achievements(user.id, db_session, module="vocabulary")
+            return len(statements)
+
+        db_session.add(_achievement("first_word", "count", 1, "vocabulary"))
+        await db_session.commit()
+        small = await queries_for_check()
+
+        db_session.add_all([
+            _achievement(f"{module}_{n}", "count", n, module)
+            for module in ["vocabulary", "grammar", "writing"] for n in range(2, 20)
+        ])
+        await db_session.commit()
+        large = await queries_for_check()
+
+        assert large == small
+
+class TestListing:
+    """Test GET /achievements/ data."""
+
+    @pytest.mark.asyncio
+    async def test_progress_for_every_criteria_type(self, db_session):
+        db_session.add_all([
+            _achievement("first_word", "count", 1, "vocabulary"),
+            _achievement("word_explorer", "count", 10, "vocabulary"),
+            _achievement("grammar_ace", "score", 100, "grammar"),
+            _achievement("dedicated", "count", 100, "all"),
+            _achievement("level_up", "level_advance", 1),
+            _achievement("xp", "total_xp", 100),
+        ])
+        user = await _user_with_progress(db_session, vocabulary=4, grammar=2)
+        await check_and_unlock_achievements(user.id, db_session, module="vocabulary")
+
+        listing = await get_user_achievements(user.id, db_session)
+
+        assert [a["code"] for a in listing["unlocked"]] == ["first_word"]
+        assert listing["new_count"] == 1
+        progress = {a["code"]: a["progress"] for a in listing["locked"]}
+        assert progress == {"word_explorer": 40, "grammar_ace": 80, "dedicated": 0, "level_up": 0, "xp": 10}
+
+    @pytest.mark.asyncio
+    async def test_queries_do_not_grow_with_catalog(self, db_session):
+        user = await _user_with_progress(db_session, vocabulary=4)
+        db_session.add_all([
+            _achievement(f"{module}_{criteria_type}_{n}", criteria_type, n, module)
+            for module in ["vocabulary", "grammar", "writing", "phonetics"]
+            for criteria_type in ["count", "score"]
+            for n in range(5, 50, 5)
+        ])
+        await db_session.commit()
+        await get_achievement_catalog().ensure_loaded(db_session)
+        db_session.expunge_all()
+
+        with CountStatements(db_session) as statements:
+            listing = await get_user_achievements(user.id, db_session)
+
+        assert len(listing["locked"]) == 72
+        # user, unlocked rows, metrics
+        assert len(statements) == 3
+
+    @pytest.mark.asyncio
+    async def test_cached_until_a_write_for_that_user(self, db_session):
+        db_session.add(_achievement("word_explorer", "count", 10, "vocabulary"))
+        user = await _user_with_progress(db_session, vocabulary=4)
+        other = User(username="other", hashed_password="hash")
+        db_session.add(other)
+        await db_session.commit()
+        await get_user_achievements(user.id, db_session)
+
+        with CountStatements(db_session) as statements:
+            await get_user_achievements(user.id, db_session)
+        assert statements == []
+
+        other.total_xp = 5
+        await db_session.commit()
+        with CountStatements(db_session) as statements:
+            await get_user_achievements(user.id, db_session)
+        assert statements == []
+
+        progress = await db_session.scalar(select(UserProgress).where(UserProgress.user_id == user.id))
+        progress.total_attempts = 5
+        await db_session.commit()
+        listing = await get_user_achievements(user.id, db_session)
+        assert listing["locked"][0]["progress"] == 50
+
+
+class SharedRedis:
+    """In-memory stand-in for the Redis CacheClient, shared by several workers."""
+
+    enabled = True
+
+    def __init__(self):
+        self.values = {}
+        self.delete_threads = []
+
+    def get_with_ttl(self, key):
+        return self.values.get(key), None
+
+    def set(self, key, value, ttl_seconds=None):
+        self.values[key] = value
+        return True
+
+    def delete(self, key):
+        self.delete_threads.append(threading.get_ident())
+        return self.values.pop(key, None) is not None
+
+    def clear_pattern(self, pattern):
+        self.delete_threads.append(threading.get_ident())
+        prefix = pattern.rstrip("*")
+        for key in [key for key in self.values if key.startswith(prefix)]:
+            del self.values[key]
+        return 0
+
+
+class TestListingCacheAcrossWorkers:
+    """Test that a worker's invalidation reaches every worker when Redis is enabled."""
+
+    @pytest.mark.asyncio
+    async def test_delete_is_seen_by_another_worker(self, monkeypatch):
+        monkeypatch.setattr("app.services.achievements_service.cache", SharedRedis())
+        reset_achievement_listing_cache()
+        worker_a = get_achievement_listing_cache()
+        reset_achievement_listing_cache()
+        worker_b = get_achievement_listing_cache()
+        key = _listing_cache_key("user-1")
+
+        await worker_a.set(key, '{"new_count": 1}', 300)
+        assert await worker_b.get(key) == '{"new_count": 1}'
+        await worker_a.delete(key)
+
+        assert await worker_b.get(key) is None
+
+    @pytest.mark.asyncio
+    async def test_commits_delete_from_redis_off_the_event_loop(self, db_session, monkeypatch):
+        redis = SharedRedis()
+        monkeypatch.setattr("app.services.achievements_service.cache", redis)
+        reset_achievement_listing_cache()
+        listing_cache = get_achievement_listing_cache()
+        user = await _user_with_progress(db_session, vocabulary=4)
+        await wait_for_listing_invalidations()
+        redis.delete_threads.clear()
+        await listing_cache.set(_listing_cache_key(user.id), "{}", 300)
+        await listing_cache.set(_listing_cache_key("other"), "{}", 300)
+
+        user.total_xp = 5
+        await db_session.commit()
+        await wait_for_listing_invalidations()
+        assert set(redis.values) == {_listing_cache_key("other")}
+
+        db_session.add(_achievement("first_word", "count", 1, "vocabulary"))
+        await db_session.commit()
+        await wait_for_listing_invalidations()
+        assert redis.values == {}
+
+        assert len(redis.delete_threads) == 2
+        assert threading.get_ident() not in redis.delete_threads
+
+
+class TestCatalog:
+    """Test caching and invalidation of the achievement catalog."""
+
+    @pytest.mark.asyncio
+    async def test_indexed_by_criteria_and_module(self, db_session):
+        db_session.add_all([
+            _achievement("b", "count", 10, "vocabulary"),
+            _achievement("a", "count", 1, "vocabulary"),
+            _achievement("c", "score", 90, "grammar"),
+            _achievement("d", "level_advance", 1),
+        ])
+        await db_session.commit()
+        catalog = AchievementCatalog()
+        await catalog.ensure_loaded(db_session)
+
+        assert [a["code"] for a in catalog.for_criteria("count", "vocabulary")] == ["a", "b"]
+        assert {a["code"] for a in catalog.relevant_to("grammar")} == {"c", "d"}
+
+    @pytest.mark.asyncio
+    async def test_reloaded_after_orm_change_and_ttl(self, db_session):
+        now = [0.0]
+        catalog = AchievementCatalog(clock=lambda: now[0])
+        await catalog.ensure_loaded(db_session)
+        assert catalog.relevant_to(None) == []
+
+        catalog.invalidate()
+        db_session.add(_achievement("first_word", "count", 1, "vocabulary"))
+        await db_session.commit()
+        await catalog.ensure_loaded(db_session)
+        assert len(catalog.relevant_to(None)) == 1
+
+        # Rows written outside the ORM show up once the TTL has passed
+        await db_session.execute(Achievement.__table__.delete())
+        await db_session.commit()
+        await catalog.ensure_loaded(db_session)
+        assert len(catalog.relevant_to(None)) == 1
+        now[0] = 301.0
+        await catalog.ensure_loaded(db_session)
+        assert catalog.relevant_to(None) == []
+
+    @pytest.mark.asyncio
+    async def test_orm_writes_invalidate_the_global_catalog(self, db_session):
+        catalog = get_achievement_catalog()
+        await catalog.ensure_loaded(db_session)
+
+        db_session.add(_achievement("first_word", "count", 1, "vocabulary"))
+        await db_session.commit()
+        await catalog.ensure_loaded(db_session)
+
+        assert len(catalog.relevant_to("vocabulary")) == 1
@@ -0,0 +1,161 @@
+"""
+Unit tests for the daily activity rollup.
+
+Tests:
+- Content logs are counted per user, day and module as they are written
+- The backfill rebuilds the rollup from existing logs
+- Chart ranges and bucketing
+- GET /progress/charts reads the rollup
+"""
+
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+
+from app.db.models import ContentLog, DailyActivity, User
+from app.services.activity_rollup import backfill_daily_activity, get_activity_chart
+
+
+async def _user(db_session):
+    user = User(username="testuser", hashed_password="hash", target_language="Spanish", level="A1")
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+def _log(user_id, module, created_at=None):
+    return ContentLog(
+        user_id=user_id, module=module, input_payload={}, generated_content={"image_data": "x" * 1000},
+        created_at=created_at
+    )
+
+
+async def _rollup(db_session):
+    rows = (await db_session.execute(
+        select(DailyActivity.activity_date, DailyActivity.module, DailyActivity.activity_count)
+        .order_by(DailyActivity.activity_date, DailyActivity.module)
+    )).all()
+    return [tuple(row) for row in rows]
+
+
+class TestMaintainedOnWrite:
+    """Test counting logs as they are inserted."""
+
+    @pytest.mark.asyncio
+    async def test_logs_are_counted_per_day_and_module(self, db_session):
+        user = await _user(db_session)
+        yesterday = datetime.utcnow() - timedelta(days=1)
+
+        db_session.add_all([_log(user.id, "grammar"), _log(user.id, "grammar"), _log(user.id, "writing")])
+        await db_session.commit()
+        db_session.add_all([_log(user.id, "grammar"), _log(user.id, "grammar", created_at=yesterday)])
+        await db_session.commit()
+
+        today = datetime.utcnow().date()
+        assert await _rollup(db_session) == [
+            (yesterday.date(), "grammar", 1), (today, "grammar", 3), (today, "writing", 1)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_logs_without_user_are_not_counted(self, db_session):
+        db_session.add(_log(None, "vocabulary"))
+        await db_session.commit()
+
+        assert await _rollup(db_session) == []
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_logs_are_not_counted(self, db_session):
+        user = await _user(db_session)
+
+        db_session.add(_log(user.id, "grammar"))
+        await db_session.flush()
+        await db_session.rollback()
+
+        assert await _rollup(db_session) == []
+
+
+class TestBackfill:
+    """Test rebuilding the rollup from content logs."""
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_from_logs(self, db_session):
+        user = await _user(db_session)
+        db_session.add_all([
+            _log(user.id, "grammar", datetime(2026, 3, 1, 9)),
+            _log(user.id, "grammar", datetime(2026, 3, 1, 23)),
+            _log(user.id, "phonetics", datetime(2026, 3, 2, 8)),
+        ])
+        await db_session.commit()
+        # Drift: a stale row the backfill replaces
+        db_session.add(DailyActivity(user_id=user.id, activity_date=date(2026, 1, 1), module="grammar", activity_count=9))
+        await db_session.commit()
+
+        written = await backfill_daily_activity(db_session)
+
+        assert written == 2
+        assert await _rollup(db_session) == [(date(2026, 3, 1), "grammar", 2), (date(2026, 3, 2), "phonetics", 1)]
+
+
+class TestActivityChart:
+    """Test chart ranges and buckets."""
+
+    async def _activity(self, db_session, user, counts):
+        db_session.add_all([
+            DailyActivity(user_id=user.id, activity_date=day, module=module, activity_count=count)
+            for day, module, count in counts
+        ])
+        await db_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_daily_points_within_range(self, db_session):
+        user = await _user(db_session)
+        await self._activity(db_session, user, [
+            (date(2026, 6, 30), "grammar", 2),
+            (date(2026, 6, 24), "grammar", 1),
+            (date(2026, 6, 24), "conversation", 4),
+            (date(2026, 6, 23), "writing", 7),  # outside the 7-day range
+        ])
+
+        chart = await get_activity_chart(user.id, db_session, days=7, today=date(2026, 6, 30))
+
+        assert chart["dates"] == ["2026-06-24", "2026-06-30"]
+        assert chart["grammar"] == [1, 2]
+        assert chart["conversation"] == [4, 0]
+        assert chart["writing"] == [0, 0]
+        assert chart["bucket_days"] == 1
+
+    @pytest.mark.asyncio
+    async def test_long_ranges_are_bucketed(self, db_session):
+        user = await _user(db_session)
+        today = date(2026, 6, 30)
+        start = today - timedelta(days=89)
+        await self._activity(db_session, user, [
+            (start, "vocabulary", 1),
+            (start + timedelta(days=6), "vocabulary", 2),
+            (start + timedelta(days=7), "vocabulary", 4),
+        ])
+
+        chart = await get_activity_chart(user.id, db_session, days=90, today=today)
+
+        assert chart["bucket_days"] == 7
+        assert chart["dates"] == [start.isoformat(), (start + timedelta(days=7)).isoformat()]
+        assert chart["vocabulary"] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_unsupported_range(self, db_session):
+        user = await _user(db_session)
+
+        with pytest.raises(ValueError):
+            await get_activity_chart(user.id, db_session, days=12)
+
+
+class TestChartsEndpoint:
+    """Test GET /progress/charts."""
+
+    def test_charts_range_parameter(self, authenticated_client):
+        response = authenticated_client.get("/api/v1/progress/charts", params={"days": 365})
+        assert response.status_code == 200
+        assert response.json()["activity_over_time"]["bucket_days"] == 30
+
+        response = authenticated_client.get("/api/v1/progress/charts", params={"days": 12})
+        assert response.status_code == 400
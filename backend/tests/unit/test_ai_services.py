@@ -7,8 +7,11 @@ These tests use mocking to avoid making actual API calls to Gemini.
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import httpx
+import json
 
-from app.services.ai_services import LLMClient, CheckerService, LLMError
+from app.services.ai_services import LLMClient, CheckerService, LLMError, LLMOutputError
+from app.schemas.llm_outputs import CheckerOutput, SecondaryValidationOutput, gemini_response_schema
+from app.core.cache import LRUCache, TieredCache
 
 
 class TestLLMClient:
@@ -403,13 +406,148 @@ class TestLLMClientConfiguration:
         await llm.close()
 
 
+class TestLLMResponseCache:
+    """Test the opt-in response cache in LLMClient.generate."""
+
+    def _mock_response(self, text):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": text}]}}]
+        }
+        mock_response.raise_for_status = MagicMock()
+        return mock_response
+
+    @pytest.mark.asyncio
+    async def test_cached_call_skips_second_request(self):
+        """Test that an identical cached call is served without hitting the API."""
+        llm = LLMClient(
+            api_key="test_key",
+            base_url="https://test.api.com",
+            model="test-model",
+            response_cache=TieredCache(local=LRUCache(max_bytes=1024 * 1024))
+        )
+        mock_post = AsyncMock(return_value=self._mock_response("cached answer"))
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            first = await llm.generate(system_prompt="S", user_prompt="U", temperature=0.1, cache_module="checker")
+            second = await llm.generate(system_prompt="S", user_prompt="U", temperature=0.1, cache_module="checker")
+
+        assert first == second == "cached answer"
+        assert mock_post.call_count == 1
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_uncached_call_always_hits_api(self):
+        """Test that calls without cache_module bypass the cache."""
+        llm = LLMClient(
+            api_key="test_key",
+            base_url="https://test.api.com",
+            model="test-model",
+            response_cache=TieredCache(local=LRUCache(max_bytes=1024 * 1024))
+        )
+        mock_post = AsyncMock(return_value=self._mock_response("fresh"))
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            await llm.generate(system_prompt="S", user_prompt="U")
+            await llm.generate(system_prompt="S", user_prompt="U")
+
+        assert mock_post.call_count == 2
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """Test that a failed call is retried on the next request."""
+        llm = LLMClient(
+            api_key="test_key",
+            base_url="https://test.api.com",
+            model="test-model",
+            response_cache=TieredCache(local=LRUCache(max_bytes=1024 * 1024))
+        )
+        mock_post = AsyncMock(side_effect=[httpx.HTTPError("down"), self._mock_response("ok")])
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            with pytest.raises(LLMError):
+                await llm.generate(system_prompt="S", user_prompt="U", cache_module="checker")
+            result = await llm.generate(system_prompt="S", user_prompt="U", cache_module="checker")
+
+        assert result == "ok"
+        assert mock_post.call_count == 2
+
+        await llm.close()
+
+
+class TestLLMStreaming:
+    """Test LLMClient.generate_stream for both provider families."""
+
+    def _streaming_client(self, llm, body: str, status_code: int = 200):
+        captured = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            captured["url"] = str(request.url)
+            captured["json"] = json.loads(request.content)
+            return httpx.Response(status_code, text=body, headers={"content-type": "text/event-stream"})
+
+        llm.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return captured
+
+    @pytest.mark.asyncio
+    async def test_gemini_stream_yields_chunks(self):
+        """Test that Gemini SSE chunks are yielded in order."""
+        llm = LLMClient(api_key="k", base_url="https://test.api.com", model="gemini-test")
+        body = (
+            'data: {"candidates": [{"content": {"parts": [{"text": "Hola"}]}}]}\n\n'
+            'data: {"candidates": [{"content": {"parts": [{"text": ", amigo"}]}}]}\n\n'
+        )
+        captured = self._streaming_client(llm, body)
+
+        chunks = [c async for c in llm.generate_stream(system_prompt="S", user_prompt="U")]
+
+        assert chunks == ["Hola", ", amigo"]
+        assert ":streamGenerateContent?alt=sse" in captured["url"]
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_openai_stream_yields_deltas_and_stops_at_done(self):
+        """Test that OpenAI-compatible deltas are yielded and [DONE] is ignored."""
+        llm = LLMClient(api_key="k", base_url="https://test.api.com", model="gpt-test", provider="openai")
+        body = (
+            'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+            'data: {"choices": [{"delta": {"content": "Bon"}}]}\n\n'
+            'data: {"choices": [{"delta": {"content": "jour"}}]}\n\n'
+            'data: [DONE]\n\n'
+        )
+        captured = self._streaming_client(llm, body)
+
+        chunks = [c async for c in llm.generate_stream(system_prompt="S", user_prompt="U")]
+
+        assert chunks == ["Bon", "jour"]
+        assert captured["json"]["stream"] is True
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_stream_http_error_raises_llm_error(self):
+        """Test that a failed streaming request raises LLMError."""
+        llm = LLMClient(api_key="k", base_url="https://test.api.com", model="gemini-test")
+        self._streaming_client(llm, "", status_code=503)
+
+        with pytest.raises(LLMError, match="HTTP error"):
+            async for _ in llm.generate_stream(system_prompt="S", user_prompt="U"):
+                pass
+
+        await llm.close()
+
+
 class TestCheckerJSONParsing:
     """Test checker service JSON parsing edge cases."""
     
     @pytest.mark.asyncio
-    async def test_checker_strips_json_backticks(self):
+    async def test_checker_strips_json_backticks(self, mock_llm_client):
         """Test that checker service strips JSON markdown formatting."""
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         mock_llm.generate = AsyncMock(return_value='```json\n{"is_valid": true, "issues": []}\n```')
         mock_llm.close = AsyncMock()
         
@@ -425,9 +563,9 @@ class TestCheckerJSONParsing:
         assert result["issues"] == []
     
     @pytest.mark.asyncio
-    async def test_checker_handles_missing_fields(self):
+    async def test_checker_handles_missing_fields(self, mock_llm_client):
         """Test that checker adds missing fields to response."""
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         # Response missing suggested_fix field
         mock_llm.generate = AsyncMock(return_value='{"is_valid": false, "issues": ["test"]}')
         mock_llm.close = AsyncMock()
@@ -444,9 +582,9 @@ class TestCheckerJSONParsing:
         assert result["suggested_fix"] is None
     
     @pytest.mark.asyncio
-    async def test_checker_handles_invalid_json(self):
+    async def test_checker_handles_invalid_json(self, mock_llm_client):
         """Test that checker handles invalid JSON gracefully."""
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         mock_llm.generate = AsyncMock(return_value='Not valid JSON at all!')
         mock_llm.close = AsyncMock()
         
@@ -464,9 +602,9 @@ class TestCheckerJSONParsing:
         assert "invalid JSON" in result["issues"][0]
 
     @pytest.mark.asyncio
-    async def test_checker_strips_plain_backticks(self):
+    async def test_checker_strips_plain_backticks(self, mock_llm_client):
         """Test that checker strips plain ``` without json marker."""
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         mock_llm.generate = AsyncMock(return_value='```\n{"is_valid": true, "issues": [], "suggested_fix": null}\n```')
         mock_llm.close = AsyncMock()
         
@@ -482,9 +620,9 @@ class TestCheckerJSONParsing:
         assert result["issues"] == []
 
     @pytest.mark.asyncio
-    async def test_checker_handles_missing_is_valid(self):
+    async def test_checker_handles_missing_is_valid(self, mock_llm_client):
         """Test that checker adds is_valid if missing."""
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         # Response missing is_valid field
         mock_llm.generate = AsyncMock(return_value='{"issues": [], "suggested_fix": null}')
         mock_llm.close = AsyncMock()
@@ -501,9 +639,9 @@ class TestCheckerJSONParsing:
         assert result["is_valid"] == True
 
     @pytest.mark.asyncio
-    async def test_checker_handles_missing_issues(self):
+    async def test_checker_handles_missing_issues(self, mock_llm_client):
         """Test that checker adds issues if missing."""
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         # Response missing issues field
         mock_llm.generate = AsyncMock(return_value='{"is_valid": true, "suggested_fix": null}')
         mock_llm.close = AsyncMock()
@@ -520,9 +658,9 @@ class TestCheckerJSONParsing:
         assert result["issues"] == []
 
     @pytest.mark.asyncio
-    async def test_checker_handles_generic_exception(self):
+    async def test_checker_handles_generic_exception(self, mock_llm_client):
         """Test that checker handles unexpected exceptions gracefully."""
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         # Simulate a generic exception
         mock_llm.generate = AsyncMock(side_effect=RuntimeError("API timeout"))
         mock_llm.close = AsyncMock()
@@ -540,3 +678,156 @@ class TestCheckerJSONParsing:
         assert len(result["issues"]) > 0
         assert "Checker error" in result["issues"][0]
         assert "API timeout" in result["issues"][0]
+
+
+class TestStructuredOutput:
+    """Test LLMClient.generate_json and the provider structured-output payloads."""
+
+    def _gemini_response(self, text):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": text}]}}]
+        }
+        mock_response.raise_for_status = MagicMock()
+        return mock_response
+
+    def _openai_response(self, text):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"choices": [{"message": {"content": text}}]}
+        mock_response.raise_for_status = MagicMock()
+        return mock_response
+
+    @pytest.mark.asyncio
+    async def test_gemini_sends_response_schema(self):
+        """Test that Gemini requests JSON mode with the converted schema."""
+        llm = LLMClient(api_key="test_key", base_url="https://test.api.com", model="test-model")
+        mock_post = AsyncMock(return_value=self._gemini_response('{"is_valid": false, "issues": ["typo"]}'))
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            result = await llm.generate_json(schema=CheckerOutput, system_prompt="S", user_prompt="U")
+
+        assert isinstance(result, CheckerOutput)
+        assert result.is_valid is False
+        assert result.issues == ["typo"]
+        config = mock_post.call_args.kwargs["json"]["generationConfig"]
+        assert config["responseMimeType"] == "application/json"
+        assert config["responseSchema"] == gemini_response_schema(CheckerOutput)
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("provider, format_type", [("openai", "json_schema"), ("groq", "json_object")])
+    async def test_openai_compatible_sends_response_format(self, provider, format_type):
+        """Test that OpenAI-compatible providers get response_format."""
+        llm = LLMClient(api_key="test_key", base_url="https://test.api.com", model="test-model", provider=provider)
+        mock_post = AsyncMock(return_value=self._openai_response('{"is_valid": true, "issues": []}'))
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            await llm.generate_json(schema=CheckerOutput, system_prompt="S", user_prompt="U")
+
+        response_format = mock_post.call_args.kwargs["json"]["response_format"]
+        assert response_format["type"] == format_type
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_plain_generate_sends_no_schema(self):
+        """Test that free-text calls are unchanged."""
+        llm = LLMClient(api_key="test_key", base_url="https://test.api.com", model="test-model")
+        mock_post = AsyncMock(return_value=self._gemini_response("Hallo!"))
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            await llm.generate(system_prompt="S", user_prompt="U")
+
+        assert "responseSchema" not in mock_post.call_args.kwargs["json"]["generationConfig"]
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_invalid_output_is_asked_again(self):
+        """Test that a response failing validation triggers one re-ask."""
+        llm = LLMClient(api_key="test_key", base_url="https://test.api.com", model="test-model")
+        mock_post = AsyncMock(side_effect=[
+            self._gemini_response('{"is_valid": "maybe"}'),
+            self._gemini_response('```json\n{"is_valid": true}\n```')
+        ])
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            result = await llm.generate_json(schema=CheckerOutput, system_prompt="S", user_prompt="U")
+
+        assert result.is_valid is True
+        assert mock_post.call_count == 2
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_retries(self, monkeypatch):
+        """Test that LLMOutputError is raised once the re-asks are used up."""
+        monkeypatch.setattr("app.services.ai_services.settings.LLM_JSON_RETRIES", 1)
+        llm = LLMClient(api_key="test_key", base_url="https://test.api.com", model="test-model")
+        mock_post = AsyncMock(return_value=self._gemini_response("not json"))
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            with pytest.raises(LLMOutputError):
+                await llm.generate_json(schema=CheckerOutput, system_prompt="S", user_prompt="U")
+
+        assert mock_post.call_count == 2
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_invalid_output_is_not_cached(self):
+        """Test that a malformed structured answer is not served from the cache."""
+        llm = LLMClient(
+            api_key="test_key",
+            base_url="https://test.api.com",
+            model="test-model",
+            response_cache=TieredCache(local=LRUCache(max_bytes=1024 * 1024))
+        )
+        mock_post = AsyncMock(side_effect=[
+            self._gemini_response("not json"),
+            self._gemini_response('{"is_valid": true}'),
+            self._gemini_response('{"is_valid": false}')
+        ])
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            first = await llm.generate_json(
+                schema=CheckerOutput, system_prompt="S", user_prompt="U", cache_module="checker"
+            )
+            second = await llm.generate_json(
+                schema=CheckerOutput, system_prompt="S", user_prompt="U", cache_module="checker"
+            )
+
+        # The re-ask bypasses the cache, so the second call asks the provider again
+        assert first.is_valid is True
+        assert second.is_valid is False
+        assert mock_post.call_count == 3
+
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_pronunciation_analysis_omits_missing_fields(self):
+        """Test that fields the model left out don't override the phonetics defaults."""
+        from app.services.stt_client import STTClient
+
+        stt = STTClient(api_key="test_key", base_url="https://test.api.com", model="test-model", provider="gemini")
+        mock_post = AsyncMock(return_value=self._gemini_response('{"transcript": "Guten Morgen", "confidence": 0.9}'))
+
+        with patch.object(stt.client, 'post', new=mock_post):
+            result = await stt.analyze_audio(b"audio", target_language="German", target_phrase="Guten Morgen")
+
+        assert result["transcript"] == "Guten Morgen"
+        assert "score" not in result
+        assert "feedback" not in result
+
+        await stt.close()
+
+    def test_gemini_schema_inlines_refs_and_nullables(self):
+        """Test conversion of pydantic JSON schema to Gemini's OpenAPI subset."""
+        schema = gemini_response_schema(SecondaryValidationOutput)
+
+        assert schema["type"] == "OBJECT"
+        assert schema["properties"]["validation_details"]["type"] == "OBJECT"
+        assert schema["properties"]["improved_version"] == {"type": "STRING", "nullable": True}
+        assert schema["properties"]["critical_issues"]["items"] == {"type": "STRING"}
+        assert "$defs" not in schema
@@ -0,0 +1,136 @@
+"""
+Unit tests for the post-answer pipeline.
+
+Tests:
+- Events for one user run in order, one at a time, with queued events folded together
+- Different users are processed concurrently and failures don't stop the worker
+- Answer submission returns before achievements and eligibility are evaluated
+- settle_answer_events makes the next read see the worker's changes
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.config import settings
+from app.db.models import User
+from app.schemas.grammar import GrammarAnswerRequest
+from app.services import answer_events
+from app.services.answer_events import (
+    AnswerEventWorker,
+    AnswerRecorded,
+    get_answer_event_worker,
+    record_answer,
+    settle_answer_events,
+)
+from app.services.grammar import submit_grammar_answer
+
+
+class GatedProcessor:
+    """Stand-in for process_answer_recorded that blocks until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = asyncio.Event()
+
+    async def __call__(self, event, db):
+        self.calls.append(event)
+        await self.gate.wait()
+        return []
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    processor = GatedProcessor()
+    monkeypatch.setattr(answer_events, "process_answer_recorded", processor)
+    return processor
+
+
+class TestAnswerEventWorker:
+    """Test ordering and batching in the worker."""
+
+    @pytest.mark.asyncio
+    async def test_queued_events_for_a_user_are_folded_into_one_run(self, gated, async_session_factory):
+        worker = AnswerEventWorker(session_factory=async_session_factory)
+        first, second, third = (AnswerRecorded("u1", module) for module in ["vocabulary", "grammar", "writing"])
+
+        worker.publish(first)
+        await asyncio.sleep(0)
+        worker.publish(second)
+        worker.publish(third)
+        gated.gate.set()
+        await worker.drain()
+
+        assert gated.calls[0] is first
+        assert (gated.calls[1].user_id, gated.calls[1].module) == ("u1", None)
+        assert worker.processed == 3
+        assert await worker.wait_for_user("u1") is False
+
+    @pytest.mark.asyncio
+    async def test_users_are_processed_concurrently(self, gated, async_session_factory):
+        worker = AnswerEventWorker(session_factory=async_session_factory)
+
+        worker.publish(AnswerRecorded("u1", "grammar"))
+        worker.publish(AnswerRecorded("u2", "grammar"))
+        await asyncio.sleep(0.01)
+
+        assert [event.user_id for event in gated.calls] == ["u1", "u2"]
+        gated.gate.set()
+        await worker.drain()
+
+    @pytest.mark.asyncio
+    async def test_failure_is_logged_and_later_events_still_run(self, monkeypatch, async_session_factory):
+        process = AsyncMock(side_effect=[RuntimeError("db down"), []])
+        monkeypatch.setattr(answer_events, "process_answer_recorded", process)
+        worker = AnswerEventWorker(session_factory=async_session_factory)
+
+        worker.publish(AnswerRecorded("u1", "grammar"))
+        await worker.drain()
+        worker.publish(AnswerRecorded("u1", "grammar"))
+        await worker.drain()
+
+        assert process.await_count == 2
+        assert worker.processed == 1
+
+
+async def _eligible_user(db_session):
+    user = User(username="testuser", hashed_password="hash", target_language="Spanish", level="A1")
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+class TestRecordAnswer:
+    """Test publishing from the answer handlers."""
+
+    @pytest.mark.asyncio
+    async def test_submit_returns_before_eligibility_is_evaluated(self, db_session):
+        user = await _eligible_user(db_session)
+        request = GrammarAnswerRequest(question_id="q1", selected_option_index=0, correct_option_index=0)
+
+        with patch(
+            "app.services.progress_service.calculate_advancement_eligibility",
+            new=AsyncMock(return_value={"eligible": True})
+        ):
+            await submit_grammar_answer(request, user, db_session)
+            assert user.can_advance is False
+
+            await settle_answer_events(user, db_session)
+
+        assert user.can_advance is True
+        assert user.advancement_notified_at is not None
+        assert get_answer_event_worker().processed == 1
+
+    @pytest.mark.asyncio
+    async def test_inline_when_background_is_off(self, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "ANSWER_EVENTS_BACKGROUND", False)
+        user = await _eligible_user(db_session)
+
+        with patch(
+            "app.services.progress_service.calculate_advancement_eligibility",
+            new=AsyncMock(return_value={"eligible": True})
+        ):
+            await record_answer(user.id, "grammar", db_session)
+
+        assert user.can_advance is True
+        assert get_answer_event_worker().processed == 0
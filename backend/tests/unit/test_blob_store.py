@@ -0,0 +1,161 @@
+"""
+Unit tests for the content-addressed blob store.
+
+Tests:
+- Blobs are stored once under their digest and read back
+- Invalid digests and base64 are rejected
+- GET /media/{digest} serves blobs with immutable caching and conditional GET
+- Inline images in stored cards are moved into the store
+"""
+
+import base64
+import pytest
+from sqlalchemy import select
+
+from app.core.blob_store import (
+    BlobStore,
+    FilesystemBlobStore,
+    blob_digest,
+    guess_media_type,
+    is_blob_digest,
+    media_url,
+    store_base64,
+)
+from app.db.models import ContentLog, FlashcardPoolEntry
+from app.services.vocabulary import externalize_card_image, migrate_inline_images
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+
+
+class TestFilesystemBlobStore:
+    """Test storing and reading blobs."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, tmp_path):
+        store = FilesystemBlobStore(str(tmp_path))
+
+        digest = await store.put(PNG)
+
+        assert digest == blob_digest(PNG)
+        assert await store.get(digest) == PNG
+        assert await store.exists(digest)
+
+    @pytest.mark.asyncio
+    async def test_same_bytes_are_stored_once(self, tmp_path):
+        store = FilesystemBlobStore(str(tmp_path))
+
+        assert await store.put(PNG) == await store.put(PNG)
+        assert len([path for path in tmp_path.rglob("*") if path.is_file()]) == 1
+
+    @pytest.mark.asyncio
+    async def test_unknown_and_malformed_digests(self, tmp_path):
+        store = FilesystemBlobStore(str(tmp_path))
+
+        assert await store.get(blob_digest(b"missing")) is None
+        assert await store.get("../../etc/passwd") is None
+        assert not await store.exists(blob_digest(b"missing"))
+        assert not await store.exists("../../etc/passwd")
+        assert not is_blob_digest("ABC")
+
+    def test_incomplete_backend_cannot_be_created(self):
+        class WriteOnlyStore(BlobStore):
+            async def put(self, data):
+                return blob_digest(data)
+
+        with pytest.raises(TypeError):
+            WriteOnlyStore()
+
+    def test_media_type_from_leading_bytes(self):
+        assert guess_media_type(PNG) == "image/png"
+        assert guess_media_type(b"\xff\xd8\xff\xe0") == "image/jpeg"
+        assert guess_media_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+        assert guess_media_type(b"plain") == "application/octet-stream"
+
+
+class TestStoreBase64:
+    """Test storing the image clients' base64 output."""
+
+    @pytest.mark.asyncio
+    async def test_stores_decoded_bytes(self, fresh_blob_store):
+        digest = await store_base64(base64.b64encode(PNG).decode())
+
+        assert await fresh_blob_store.get(digest) == PNG
+
+    @pytest.mark.asyncio
+    async def test_missing_or_invalid_data(self):
+        assert await store_base64(None) is None
+        assert await store_base64("not base64!") is None
+
+
+class TestMediaEndpoint:
+    """Test GET /media/{digest}."""
+
+    @pytest.mark.asyncio
+    async def test_serves_blob_with_immutable_caching(self, client):
+        digest = await store_base64(base64.b64encode(PNG).decode())
+
+        response = client.get(media_url(digest))
+
+        assert response.status_code == 200
+        assert response.content == PNG
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["etag"] == f'"{digest}"'
+        assert "immutable" in response.headers["cache-control"]
+
+    @pytest.mark.asyncio
+    async def test_matching_etag_is_not_modified(self, client):
+        digest = await store_base64(base64.b64encode(PNG).decode())
+
+        response = client.get(media_url(digest), headers={"If-None-Match": f'W/"{digest}"'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_unknown_or_malformed_digest(self, client):
+        assert client.get(media_url(blob_digest(b"missing"))).status_code == 404
+        assert client.get("/api/v1/media/not-a-digest").status_code == 404
+
+    def test_conditional_get_for_unknown_digest_is_not_found(self, client):
+        digest = blob_digest(b"missing")
+
+        response = client.get(media_url(digest), headers={"If-None-Match": f'"{digest}"'})
+
+        assert response.status_code == 404
+        assert "immutable" not in response.headers.get("cache-control", "")
+
+
+class TestInlineImages:
+    """Test moving base64 images out of stored cards."""
+
+    @pytest.mark.asyncio
+    async def test_externalize_card_image(self, fresh_blob_store):
+        card = await externalize_card_image({"word": "Buch", "image_data": base64.b64encode(PNG).decode()})
+
+        assert card == {"word": "Buch", "image_digest": blob_digest(PNG)}
+        assert await fresh_blob_store.get(card["image_digest"]) == PNG
+
+    @pytest.mark.asyncio
+    async def test_migrate_inline_images(self, db_session):
+        inline = {"word": "Buch", "image_data": base64.b64encode(PNG).decode()}
+        db_session.add_all([
+            ContentLog(module="vocabulary", input_payload={}, generated_content=dict(inline)),
+            ContentLog(module="vocabulary", input_payload={}, generated_content={"word": "Haus"}),
+            ContentLog(module="grammar", input_payload={}, generated_content={"image_data": "kept"}),
+            FlashcardPoolEntry(
+                target_language="German", level="A1", word="Buch", card=dict(inline),
+                checker_result={}, secondary_validation={}
+            ),
+        ])
+        await db_session.commit()
+
+        assert await migrate_inline_images(db_session, batch_size=1) == 2
+        assert await migrate_inline_images(db_session) == 0
+
+        contents = (await db_session.execute(
+            select(ContentLog.module, ContentLog.generated_content).order_by(ContentLog.id)
+        )).all()
+        cards = (await db_session.execute(select(FlashcardPoolEntry.card))).scalars().all()
+        migrated = {"word": "Buch", "image_digest": blob_digest(PNG)}
+        assert {"image_data": "kept"} in [content for _, content in contents]
+        assert migrated in [content for _, content in contents]
+        assert cards == [migrated]
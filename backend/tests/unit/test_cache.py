@@ -0,0 +1,160 @@
+"""
+Unit tests for the LLM response cache tiers.
+
+Tests:
+- Byte-size LRU eviction and TTL expiry
+- Local/remote tier promotion
+- Pattern deletes scan Redis in batches
+- Cache key normalization
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.core.cache import CacheClient, LRUCache, TieredCache, make_llm_cache_key, get_llm_cache_ttl
+
+
+class TestLRUCache:
+    """Test the in-process byte-bounded LRU."""
+
+    def test_get_returns_stored_value(self):
+        """Test basic set/get round trip."""
+        lru = LRUCache(max_bytes=1024)
+        lru.set("k", "value")
+
+        assert lru.get("k") == "value"
+        assert lru.current_bytes == len("k") + len("value")
+
+    def test_evicts_least_recently_used_when_over_budget(self):
+        """Test that the oldest untouched entry is evicted first."""
+        lru = LRUCache(max_bytes=25)
+        lru.set("a", "x" * 9)
+        lru.set("b", "x" * 9)
+        lru.get("a")  # a is now most recently used
+        lru.set("c", "x" * 9)
+
+        assert lru.get("a") is not None
+        assert lru.get("b") is None
+        assert lru.get("c") is not None
+        assert lru.current_bytes <= 25
+
+    def test_oversized_value_is_not_stored(self):
+        """Test that a value larger than the whole budget is rejected."""
+        lru = LRUCache(max_bytes=10)
+
+        assert lru.set("k", "x" * 100) is False
+        assert len(lru) == 0
+
+    def test_expired_entry_is_dropped(self):
+        """Test that entries past their TTL are not returned."""
+        lru = LRUCache(max_bytes=1024)
+        with patch("app.core.cache.time.monotonic", return_value=100.0):
+            lru.set("k", "value", ttl_seconds=10)
+        with patch("app.core.cache.time.monotonic", return_value=111.0):
+            assert lru.get("k") is None
+        assert lru.current_bytes == 0
+
+
+class TestTieredCache:
+    """Test the local + Redis tiers."""
+
+    @pytest.mark.asyncio
+    async def test_remote_hit_is_promoted_to_local(self):
+        """Test that a Redis hit is copied into the local LRU."""
+        remote = MagicMock()
+        remote.get_with_ttl.return_value = ("from redis", None)
+        tiered = TieredCache(local=LRUCache(max_bytes=1024), remote=remote)
+
+        assert await tiered.get("k") == "from redis"
+        assert await tiered.get("k") == "from redis"
+
+        remote.get_with_ttl.assert_called_once_with("k")
+        assert tiered.stats["remote_hits"] == 1
+        assert tiered.stats["local_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_promoted_copy_expires_with_the_remote_entry(self):
+        """Test that the local copy keeps the TTL left on the Redis entry."""
+        remote = MagicMock()
+        remote.get_with_ttl.return_value = ("from redis", 5.0)
+        tiered = TieredCache(local=LRUCache(max_bytes=1024), remote=remote)
+
+        with patch("app.core.cache.time.monotonic", return_value=100.0):
+            await tiered.get("k")
+        with patch("app.core.cache.time.monotonic", return_value=104.0):
+            assert tiered.local.get("k") == "from redis"
+        with patch("app.core.cache.time.monotonic", return_value=106.0):
+            assert tiered.local.get("k") is None
+
+    @pytest.mark.asyncio
+    async def test_set_writes_both_tiers(self):
+        """Test that set writes through to Redis with the TTL."""
+        remote = MagicMock()
+        tiered = TieredCache(local=LRUCache(max_bytes=1024), remote=remote)
+
+        await tiered.set("k", "v", ttl_seconds=60)
+
+        assert tiered.local.get("k") == "v"
+        remote.set.assert_called_once_with("k", "v", 60)
+
+    @pytest.mark.asyncio
+    async def test_miss_without_remote(self):
+        """Test that a miss is counted when Redis is unavailable."""
+        tiered = TieredCache(local=LRUCache(max_bytes=1024), remote=None)
+
+        assert await tiered.get("missing") is None
+        assert tiered.stats["misses"] == 1
+
+
+class TestCacheClient:
+    """Test the Redis client wrapper."""
+
+    def test_clear_pattern_scans_in_batches(self):
+        """Test that clear_pattern uses SCAN rather than a blocking KEYS."""
+        client = CacheClient.__new__(CacheClient)
+        client.enabled = True
+        client.redis_client = MagicMock()
+        client.redis_client.scan_iter.return_value = iter(["a:1", "a:2", "a:3"])
+        client.redis_client.delete.side_effect = lambda *keys: len(keys)
+
+        assert client.clear_pattern("a:*", batch_size=2) == 3
+
+        client.redis_client.keys.assert_not_called()
+        client.redis_client.scan_iter.assert_called_once_with(match="a:*", count=2)
+        assert [call.args for call in client.redis_client.delete.call_args_list] == [("a:1", "a:2"), ("a:3",)]
+
+
+class TestLLMCacheKeys:
+    """Test LLM cache key generation and TTL lookup."""
+
+    def _key(self, **overrides):
+        params = dict(
+            provider="gemini",
+            model="gemini-2.5-flash",
+            temperature=0.1,
+            max_tokens=1024,
+            system_prompt="You are a validator.",
+            user_prompt="Check this content"
+        )
+        params.update(overrides)
+        return make_llm_cache_key("checker", **params)
+
+    def test_whitespace_differences_share_a_key(self):
+        """Test that prompts are normalized before hashing."""
+        assert self._key() == self._key(user_prompt="  Check   this\n content ")
+
+    def test_model_and_temperature_change_the_key(self):
+        """Test that provider settings are part of the key."""
+        assert self._key() != self._key(model="other-model")
+        assert self._key() != self._key(temperature=0.7)
+
+    def test_ttl_override_and_defaults(self):
+        """Test per-module TTL overrides and validation defaults."""
+        with patch("app.core.cache.settings") as mock_settings:
+            mock_settings.LLM_CACHE_TTL_SECONDS = {"checker": 42}
+            mock_settings.VALIDATION_CACHE_TTL_MINUTES = 60
+            mock_settings.CACHE_TTL_HOURS = 24
+
+            assert get_llm_cache_ttl("checker") == 42
+            assert get_llm_cache_ttl("secondary") == 3600
+            assert get_llm_cache_ttl("anything_else") == 24 * 3600
@@ -0,0 +1,204 @@
+"""
+Unit tests for provider circuit breakers and the LLM fallback chain.
+
+Tests:
+- Breaker opens on error rate and on slow calls
+- Open breakers reject, then half-open probes close or reopen them
+- LLMClient reroutes to fallback providers and skips open circuits
+- Governor saturation and 4xx responses don't count against a provider
+- Streaming falls back before the first chunk
+"""
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, get_circuit_breaker
+from app.core.fake_provider import FakeProviderTransport
+from app.core.hedging import reset_request_hedgers
+from app.core.rate_governor import RateGovernor, reset_rate_governors
+from app.services.ai_services import LLMClient, LLMError, LLMProviderError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(clock, **kwargs) -> CircuitBreaker:
+    options = {"window_size": 4, "min_calls": 4, "failure_rate_threshold": 0.5, "open_seconds": 30.0,
+               "half_open_max_calls": 1, "slow_call_seconds": 5.0, "slow_call_rate_threshold": 0.75}
+    options.update(kwargs)
+    return CircuitBreaker("gemini", clock=clock, **options)
+
+
+class TestCircuitBreaker:
+    """Test state transitions."""
+
+    def test_opens_on_failure_rate_and_rejects(self):
+        breaker = _breaker(FakeClock())
+
+        for ok in (True, False, True, False):
+            breaker.record_success() if ok else breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert breaker.allow_request() is False
+        assert breaker.stats["rejected"] == 1
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = _breaker(FakeClock())
+
+        for _ in range(3):
+            breaker.record_failure()
+
+        assert breaker.state == CLOSED
+        assert breaker.allow_request() is True
+
+    def test_slow_calls_open_the_circuit(self):
+        breaker = _breaker(FakeClock())
+
+        for latency in (6.0, 7.0, 1.0, 8.0):
+            breaker.record_success(latency)
+
+        assert breaker.state == OPEN
+
+    def test_half_open_probe_closes_or_reopens(self):
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        for _ in range(4):
+            breaker.record_failure()
+
+        clock.now = 31.0
+        assert breaker.allow_request() is True
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow_request() is False  # only one probe at a time
+        breaker.record_failure()
+        assert breaker.state == OPEN
+
+        clock.now = 62.0
+        assert breaker.allow_request() is True
+        breaker.record_success(0.1)
+        assert breaker.state == CLOSED
+
+    def test_lost_probe_does_not_wedge_half_open(self):
+        clock = FakeClock()
+        breaker = _breaker(clock)
+        for _ in range(4):
+            breaker.record_failure()
+
+        clock.now = 31.0
+        assert breaker.allow_request() is True  # probe never reports back
+        clock.now = 62.0
+        assert breaker.allow_request() is True
+
+
+def _gemini_response(text):
+    response = MagicMock()
+    response.json.return_value = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    response.raise_for_status = MagicMock()
+    return response
+
+
+def _server_error(status_code=503):
+    request = httpx.Request("POST", "https://test.api.com")
+    return httpx.HTTPStatusError("boom", request=request, response=httpx.Response(status_code, request=request))
+
+
+async def _no_sleep(seconds):
+    return None
+
+
+@pytest.fixture
+def fallback_chain(monkeypatch):
+    """Gemini primary with mocked HTTP and a zero-latency fake provider as fallback."""
+    monkeypatch.setattr("app.services.ai_services.settings.LLM_RETRY_ATTEMPTS", 0)
+    monkeypatch.setattr("app.core.llm_usage.settings.LLM_USAGE_ENABLED", False)
+    monkeypatch.setattr(
+        "app.core.fake_provider._transport",
+        FakeProviderTransport(latency_ms=0, distribution="fixed", sleep=_no_sleep)
+    )
+    fallback = LLMClient(api_key="unused", base_url="http://fake-provider.local/v1", model="fake-model", provider="fake")
+    primary = LLMClient(api_key="test_key", base_url="https://test.api.com", model="m", fallbacks=[fallback])
+    primary.client.post = AsyncMock(side_effect=_server_error())
+    yield primary
+    reset_rate_governors()
+    reset_request_hedgers()
+
+
+class TestFallbackChain:
+    """Test rerouting between providers."""
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_falls_back(self, fallback_chain):
+        text = await fallback_chain.generate(system_prompt="S", user_prompt="U")
+
+        assert text
+        assert get_circuit_breaker("gemini").stats["failures"] == 1
+        assert get_circuit_breaker("fake").stats["successes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_governor_saturation_does_not_open_the_breaker(self, fallback_chain, monkeypatch):
+        saturated = RateGovernor("gemini", max_concurrency=1, max_wait_seconds=0)
+        saturated.in_flight = 1
+        monkeypatch.setattr(
+            "app.services.ai_services.get_rate_governor",
+            lambda provider: saturated if provider == "gemini" else RateGovernor(provider, max_concurrency=10)
+        )
+        breaker = get_circuit_breaker("gemini")
+
+        for i in range(breaker.min_calls * 2):
+            assert await fallback_chain.generate(system_prompt="S", user_prompt=f"U{i}")
+
+        assert saturated.stats["timeouts"] == breaker.min_calls * 2
+        assert breaker.state == CLOSED
+        assert breaker.stats["failures"] == 0
+        fallback_chain.client.post.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_open_the_breaker(self, fallback_chain):
+        fallback_chain.client.post = AsyncMock(side_effect=_server_error(400))
+        breaker = get_circuit_breaker("gemini")
+
+        for i in range(breaker.min_calls * 2):
+            assert await fallback_chain.generate(system_prompt="S", user_prompt=f"U{i}")
+
+        assert breaker.state == CLOSED
+        assert breaker.stats["failures"] == 0
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_is_skipped_without_a_request(self, fallback_chain):
+        breaker = get_circuit_breaker("gemini")
+        for _ in range(breaker.min_calls):
+            breaker.record_failure()
+
+        await fallback_chain.generate(system_prompt="S", user_prompt="U")
+
+        fallback_chain.client.post.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_without_fallback_fails_fast(self, monkeypatch):
+        llm = LLMClient(api_key="test_key", base_url="https://test.api.com", model="m")
+        llm.client.post = AsyncMock(return_value=_gemini_response("never"))
+        breaker = get_circuit_breaker("gemini")
+        for _ in range(breaker.min_calls):
+            breaker.record_failure()
+
+        with pytest.raises(LLMError, match="circuit open"):
+            await llm.generate(system_prompt="S", user_prompt="U")
+        llm.client.post.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stream_falls_back_before_first_chunk(self, fallback_chain):
+        async def failing_stream(**kwargs):
+            raise LLMProviderError("HTTP error during LLM API call: 503")
+            yield  # pragma: no cover
+
+        fallback_chain._stream_single = failing_stream
+
+        chunks = [chunk async for chunk in fallback_chain.generate_stream(system_prompt="S", user_prompt="U")]
+
+        assert "".join(chunks)
+        assert get_circuit_breaker("gemini").stats["failures"] == 1
@@ -0,0 +1,164 @@
+"""
+Unit tests for conversation context-window management.
+
+Tests:
+- Recent turns stay verbatim, older ones are folded in batches
+- The token budget trims old messages and the summary
+- Summaries are applied only if no other turn moved them on
+- Long sessions send the summary instead of the full history
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.db.models import User, ConversationMessage, ConversationSession
+from app.schemas.conversation import ConversationMessageRequest
+from app.services.ai_services import LLMError
+from app.services.conversation import send_message
+from app.services.conversation_context import apply_summary, build_context_window, fold_summary
+
+
+def _history(count, start=0):
+    return [
+        {"seq": i, "role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+        for i in range(start, count)
+    ]
+
+
+@pytest.fixture
+def small_window(monkeypatch):
+    monkeypatch.setattr(settings, "CONVERSATION_VERBATIM_TURNS", 2)
+    monkeypatch.setattr(settings, "CONVERSATION_SUMMARY_MIN_MESSAGES", 2)
+    monkeypatch.setattr(settings, "CONVERSATION_CONTEXT_TOKEN_BUDGET", 1500)
+
+
+class TestContextWindow:
+    """Test selection of verbatim messages and the fold."""
+
+    def test_short_history_is_kept_verbatim(self, small_window):
+        window = build_context_window({}, _history(2), "new")
+
+        assert [m["content"] for m in window.messages] == ["message 0", "message 1", "new"]
+        assert window.fold == []
+
+    def test_older_messages_are_folded_in_batches(self, small_window):
+        # 5 + new = 6 unsummarized, 4 kept verbatim: 2 older, enough to fold
+        window = build_context_window({}, _history(5), "new")
+        assert [m["content"] for m in window.fold] == ["message 0", "message 1"]
+        assert window.fold_end == 2
+
+        # A single older message waits for the next batch
+        assert build_context_window({}, _history(4), "new").fold == []
+
+    def test_summarized_messages_are_replaced_by_summary(self, small_window):
+        context = {"summary": "Talked about pets.", "summarized_count": 4}
+
+        window = build_context_window(context, _history(6), "new")
+
+        assert window.summary == "Talked about pets."
+        assert [m["content"] for m in window.messages] == ["message 4", "message 5", "new"]
+        assert window.fold == []
+
+    def test_unfolded_messages_before_the_loaded_window_are_skipped(self, small_window):
+        context = {"summary": "Talked about pets.", "summarized_count": 2}
+
+        window = build_context_window(context, _history(12, start=6), "new")
+
+        assert [m["seq"] for m in window.fold] == [6, 7, 8]
+        assert window.fold_end == 9
+
+    def test_budget_drops_oldest_messages_then_trims_summary(self, monkeypatch, small_window):
+        monkeypatch.setattr(settings, "CONVERSATION_CONTEXT_TOKEN_BUDGET", 5)
+        context = {"summary": "x" * 400, "summarized_count": 0}
+
+        window = build_context_window(context, _history(3), "the newest message")
+
+        assert [m["content"] for m in window.messages] == ["the newest message"]
+        assert window.tokens <= 5
+
+
+class TestSummaryFold:
+    """Test folding and applying summaries."""
+
+    @pytest.mark.asyncio
+    async def test_fold_failure_leaves_messages_unsummarized(self, small_window, mock_llm_client):
+        llm = mock_llm_client
+        llm.generate.side_effect = LLMError("down")
+        window = build_context_window({}, _history(5), "new")
+
+        assert await fold_summary(llm, "Spanish", window) is None
+
+    def test_apply_summary_is_compare_and_set(self, small_window):
+        window = build_context_window({}, _history(5), "new")
+
+        stale = {"summary": "other", "summarized_count": 2}
+        apply_summary(stale, window, "Greetings.")
+        assert stale["summary"] == "other"
+
+        context = {"summarized_count": 0}
+        apply_summary(context, window, "Greetings.")
+        assert (context["summary"], context["summarized_count"]) == ("Greetings.", 2)
+
+
+class TestLongConversation:
+    """Test send_message on a session with a long history."""
+
+    @pytest.mark.asyncio
+    async def test_send_message_uses_and_stores_summary(self, db_session, small_window, mock_llm_client):
+        user = User(username="testuser", hashed_password="hash", target_language="Spanish")
+        db_session.add(user)
+        await db_session.commit()
+        # Transcript stored the pre-table way, migrated on first use
+        session = ConversationSession(
+            id=str(uuid4()),
+            user_id=user.id,
+            target_language="Spanish",
+            context_json={"messages": _history(9), "summary": "Met the student.", "summarized_count": 2}
+        )
+        db_session.add(session)
+        await db_session.commit()
+        session_id = session.id
+
+        prompts = []
+
+        async def generate(system_prompt, user_prompt, **kwargs):
+            prompts.append(user_prompt)
+            if "running summary" in system_prompt:
+                return "Met the student and talked about food."
+            if "corrected_message" in user_prompt:
+                return '{"corrected_message": null, "tips": null}'
+            return "¡Qué bien!"
+
+        with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
+             patch('app.services.conversation.get_checker_service') as mock_get_checker:
+            llm = mock_llm_client
+            llm.generate.side_effect = generate
+            mock_get_llm.return_value = llm
+            mock_checker = AsyncMock()
+            mock_checker.check_content = AsyncMock(return_value={"is_valid": True, "suggested_fix": None})
+            mock_get_checker.return_value = mock_checker
+
+            await send_message(
+                session_id=session_id,
+                user=user,
+                request=ConversationMessageRequest(message="Me gusta la paella"),
+                db=db_session
+            )
+
+        reply_prompt = next(p for p in prompts if "<conversation_history>" in p)
+        assert "Met the student." in reply_prompt
+        assert "message 1" not in reply_prompt
+
+        db_session.expire_all()
+        context = (await db_session.scalar(select(ConversationSession).filter_by(id=session_id))).context_json
+        assert context["summary"] == "Met the student and talked about food."
+        # 9 stored + new = 10 messages, 2 already summarized, last 4 kept verbatim
+        assert context["summarized_count"] == 6
+        assert "messages" not in context
+        stored = await db_session.scalar(
+            select(func.count()).select_from(ConversationMessage).where(ConversationMessage.session_id == session_id)
+        )
+        assert stored == 11
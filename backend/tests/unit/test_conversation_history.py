@@ -0,0 +1,186 @@
+"""
+Unit tests for append-only conversation storage.
+
+Tests:
+- Appends are numbered by seq and checked against the expected position
+- The recent window is loaded newest-first and stops at the summary
+- Persisting a turn doesn't rewrite the session, and a concurrent turn is kept
+- Transcripts in context_json are migrated once
+"""
+
+import pytest
+from sqlalchemy import event, select
+from uuid import uuid4
+
+from app.db.models import ConversationMessage, ConversationSession, User
+from app.schemas.conversation import ConversationMessageRequest
+from app.services.conversation import _record_turn
+from app.services.conversation_history import (
+    SequenceConflict,
+    append_messages,
+    load_recent_messages,
+    migrate_conversation_sessions,
+    migrate_session,
+)
+
+
+def _messages(count, start=0):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+        for i in range(start, start + count)
+    ]
+
+
+async def _session(db_session, context=None):
+    user = User(username=f"user-{uuid4()}", hashed_password="hash", target_language="Spanish", level="A1")
+    db_session.add(user)
+    await db_session.commit()
+    session = ConversationSession(id=str(uuid4()), user_id=user.id, target_language="Spanish", context_json=context or {})
+    db_session.add(session)
+    await db_session.commit()
+    return session
+
+
+async def _stored(db_session, session_id):
+    return (await db_session.execute(
+        select(ConversationMessage.seq, ConversationMessage.content)
+        .where(ConversationMessage.session_id == session_id)
+        .order_by(ConversationMessage.seq)
+    )).all()
+
+
+class TestAppend:
+    """Test sequence numbering and the optimistic check."""
+
+    @pytest.mark.asyncio
+    async def test_appends_continue_the_sequence(self, db_session):
+        session = await _session(db_session)
+
+        assert await append_messages(session.id, _messages(2), db_session, expected_seq=0) == 2
+        assert await append_messages(session.id, _messages(1, start=2), db_session) == 3
+        await db_session.commit()
+
+        assert [seq for seq, _ in await _stored(db_session, session.id)] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_taken_position_raises_and_stores_nothing(self, db_session):
+        session = await _session(db_session)
+        await append_messages(session.id, _messages(2), db_session, expected_seq=0)
+
+        with pytest.raises(SequenceConflict):
+            await append_messages(session.id, _messages(2, start=5), db_session, expected_seq=1)
+        await db_session.commit()
+
+        assert [content for _, content in await _stored(db_session, session.id)] == ["message 0", "message 1"]
+
+    @pytest.mark.asyncio
+    async def test_token_estimate_is_stored(self, db_session):
+        session = await _session(db_session)
+        await append_messages(session.id, [{"role": "user", "content": "x" * 40}], db_session)
+        await db_session.commit()
+
+        assert await db_session.scalar(select(ConversationMessage.token_estimate)) == 11
+
+
+class TestRecentWindow:
+    """Test keyset loading of the window."""
+
+    @pytest.mark.asyncio
+    async def test_newest_messages_oldest_first(self, db_session):
+        session = await _session(db_session)
+        await append_messages(session.id, _messages(30), db_session)
+        await db_session.commit()
+
+        messages, next_seq = await load_recent_messages(session.id, db_session, since_seq=0, limit=4)
+
+        assert [m["seq"] for m in messages] == [26, 27, 28, 29]
+        assert next_seq == 30
+
+    @pytest.mark.asyncio
+    async def test_summarized_messages_are_not_loaded(self, db_session):
+        session = await _session(db_session)
+        await append_messages(session.id, _messages(6), db_session)
+        await db_session.commit()
+
+        messages, next_seq = await load_recent_messages(session.id, db_session, since_seq=4, limit=40)
+
+        assert [m["content"] for m in messages] == ["message 4", "message 5"]
+        assert next_seq == 6
+
+    @pytest.mark.asyncio
+    async def test_empty_session(self, db_session):
+        session = await _session(db_session)
+
+        assert await load_recent_messages(session.id, db_session, since_seq=0, limit=40) == ([], 0)
+
+
+class TestRecordTurn:
+    """Test persisting a conversation turn."""
+
+    @pytest.mark.asyncio
+    async def test_turn_is_two_inserts_without_rewriting_the_session(self, db_session):
+        session = await _session(db_session, {"system_prompt": "Tutor"})
+        await append_messages(session.id, _messages(200), db_session)
+        await db_session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            await _record_turn(
+                session.id, session.user_id, ConversationMessageRequest(message="Hola"), "¡Hola!",
+                None, None, {"is_valid": True}, db_session, expected_seq=200
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        assert not [s for s in statements if s.startswith("UPDATE conversation_sessions")]
+        assert [s for s in statements if s.startswith("INSERT INTO conversation_messages")]
+        assert (await _stored(db_session, session.id))[-2:] == [(200, "Hola"), (201, "¡Hola!")]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_turn_is_kept_and_this_one_goes_last(self, db_session):
+        session = await _session(db_session)
+        await append_messages(session.id, _messages(1), db_session)
+        # Both turns loaded the window when the next seq was 1; the other one was stored first
+        await append_messages(session.id, _messages(2, start=1), db_session, expected_seq=1)
+        await db_session.commit()
+
+        await _record_turn(
+            session.id, session.user_id, ConversationMessageRequest(message="Hola"), "¡Hola!",
+            None, None, {"is_valid": True}, db_session, expected_seq=1
+        )
+
+        assert [content for _, content in await _stored(db_session, session.id)] == [
+            "message 0", "message 1", "message 2", "Hola", "¡Hola!"
+        ]
+
+
+class TestMigration:
+    """Test moving transcripts out of context_json."""
+
+    @pytest.mark.asyncio
+    async def test_migrate_session_moves_messages_once(self, db_session):
+        session = await _session(db_session, {"system_prompt": "Tutor", "messages": _messages(3), "summarized_count": 2})
+
+        assert await migrate_session(session, db_session) is True
+        await db_session.commit()
+        assert await migrate_session(session, db_session) is False
+
+        assert session.context_json == {"system_prompt": "Tutor", "summarized_count": 2}
+        assert [seq for seq, _ in await _stored(db_session, session.id)] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_migrate_all_sessions(self, db_session):
+        legacy = [await _session(db_session, {"messages": _messages(2)}) for _ in range(3)]
+        await _session(db_session, {"system_prompt": "Tutor"})
+
+        assert await migrate_conversation_sessions(db_session, batch_size=2) == 3
+        assert await migrate_conversation_sessions(db_session) == 0
+
+        for session in legacy:
+            assert len(await _stored(db_session, session.id)) == 2
@@ -11,11 +11,13 @@ Tests:
 import pytest
 from unittest.mock import AsyncMock, patch
 from uuid import uuid4
+from sqlalchemy import func, select
 from app.services.conversation import (
     start_conversation,
-    send_message
+    send_message,
+    stream_message
 )
-from app.db.models import User, ConversationSession
+from app.db.models import User, ConversationMessage, ConversationSession, ContentLog
 from app.schemas.conversation import (
     ConversationStartRequest,
     ConversationMessageRequest
@@ -26,7 +28,7 @@ class TestConversationStarting:
     """Test conversation session creation."""
     
     @pytest.mark.asyncio
-    async def test_start_conversation_creates_session(self, db_session):
+    async def test_start_conversation_creates_session(self, db_session, mock_llm_client):
         """Test that starting a conversation creates a session."""
         user = User(
             username="testuser",
@@ -35,14 +37,14 @@ class TestConversationStarting:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
-        initial_session_count = db_session.query(ConversationSession).count()
+        initial_session_count = await db_session.scalar(select(func.count()).select_from(ConversationSession))
         
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="Bonjour! Comment ça va?")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -59,11 +61,11 @@ class TestConversationStarting:
         
         assert result is not None
         assert result.opening_message is not None
-        final_session_count = db_session.query(ConversationSession).count()
+        final_session_count = await db_session.scalar(select(func.count()).select_from(ConversationSession))
         assert final_session_count > initial_session_count
     
     @pytest.mark.asyncio
-    async def test_start_conversation_returns_session_id(self, db_session):
+    async def test_start_conversation_returns_session_id(self, db_session, mock_llm_client):
         """Test that starting conversation returns session ID."""
         user = User(
             username="testuser",
@@ -72,12 +74,12 @@ class TestConversationStarting:
             level="B1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="Hallo! Wie geht's?")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -96,7 +98,7 @@ class TestConversationStarting:
         assert len(result.session_id) > 0
     
     @pytest.mark.asyncio
-    async def test_start_conversation_without_topic(self, db_session):
+    async def test_start_conversation_without_topic(self, db_session, mock_llm_client):
         """Test starting conversation without specific topic."""
         user = User(
             username="testuser",
@@ -105,12 +107,12 @@ class TestConversationStarting:
             level="A2"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="¡Hola! ¿Cómo estás?")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -129,7 +131,7 @@ class TestConversationStarting:
         assert result.opening_message is not None
 
     @pytest.mark.asyncio
-    async def test_start_conversation_uses_suggested_fix_when_invalid(self, db_session):
+    async def test_start_conversation_uses_suggested_fix_when_invalid(self, db_session, mock_llm_client):
         """Test that conversation uses suggested_fix when checker finds issues."""
         user = User(
             username="testuser",
@@ -138,12 +140,12 @@ class TestConversationStarting:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="This is invalid content")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -170,7 +172,7 @@ class TestConversationMessageHandling:
     """Test conversation message sending and receiving."""
     
     @pytest.mark.asyncio
-    async def test_send_message_returns_response(self, db_session):
+    async def test_send_message_returns_response(self, db_session, mock_llm_client):
         """Test that sending a message returns AI response."""
         user = User(
             username="testuser",
@@ -179,13 +181,13 @@ class TestConversationMessageHandling:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # First start a conversation
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="Ciao!")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -205,7 +207,7 @@ class TestConversationMessageHandling:
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(side_effect=["Come stai?", '{"corrected_message": null, "tips": null}'])
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -225,7 +227,7 @@ class TestConversationMessageHandling:
         assert result.reply is not None
     
     @pytest.mark.asyncio
-    async def test_send_message_with_corrections(self, db_session):
+    async def test_send_message_with_corrections(self, db_session, mock_llm_client):
         """Test that conversation provides corrections when needed."""
         user = User(
             username="testuser",
@@ -234,13 +236,13 @@ class TestConversationMessageHandling:
             level="A2"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Start conversation
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="Привет!")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -260,7 +262,7 @@ class TestConversationMessageHandling:
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             correction_json = '{"corrected_message": "Я хорошо", "tips": "Use \'я\' for I"}'
             mock_llm.generate = AsyncMock(side_effect=["Отлично!", correction_json])
             mock_llm.close = AsyncMock()
@@ -295,7 +297,7 @@ class TestConversationEdgeCases:
             level="B1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         with pytest.raises(ValueError):
             await send_message(
@@ -306,7 +308,7 @@ class TestConversationEdgeCases:
             )
     
     @pytest.mark.asyncio
-    async def test_send_message_wrong_user(self, db_session):
+    async def test_send_message_wrong_user(self, db_session, mock_llm_client):
         """Test sending message to another user's session."""
         user1 = User(
             username="testuser1",
@@ -321,13 +323,13 @@ class TestConversationEdgeCases:
             level="A1"
         )
         db_session.add_all([user1, user2])
-        db_session.commit()
+        await db_session.commit()
         
         # Start conversation as user1
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="你好!")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -353,7 +355,7 @@ class TestConversationEdgeCases:
             )
     
     @pytest.mark.asyncio
-    async def test_checker_suggests_fix(self, db_session):
+    async def test_checker_suggests_fix(self, db_session, mock_llm_client):
         """Test that checker's suggested fix is used when content is invalid."""
         user = User(
             username="testuser",
@@ -362,13 +364,13 @@ class TestConversationEdgeCases:
             level="B1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Start conversation
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="مرحبا!")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -388,7 +390,7 @@ class TestConversationEdgeCases:
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(side_effect=["Bad content", '{"corrected_message": null, "tips": null}'])
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -414,7 +416,7 @@ class TestConversationProgressTracking:
     """Test progress tracking in conversations."""
     
     @pytest.mark.asyncio
-    async def test_send_message_creates_progress_record(self, db_session):
+    async def test_send_message_creates_progress_record(self, db_session, mock_llm_client):
         """Test that sending messages creates progress record."""
         user = User(
             username="testuser",
@@ -423,13 +425,13 @@ class TestConversationProgressTracking:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Start conversation
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="Merhaba!")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -449,7 +451,7 @@ class TestConversationProgressTracking:
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(side_effect=["Nasılsın?", '{"corrected_message": null, "tips": null}'])
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -467,20 +469,24 @@ class TestConversationProgressTracking:
         
         # Check progress record exists
         from app.db.models import UserProgress
-        progress = db_session.query(UserProgress).filter(
+        progress = await db_session.scalar(select(UserProgress).where(
             UserProgress.user_id == user.id,
             UserProgress.module == "conversation"
-        ).first()
+        ))
         
         assert progress is not None
         assert progress.total_attempts >= 1
+        
+        # The user's message is counted towards the current level
+        from app.services.progress_service import get_conversation_message_count
+        assert await get_conversation_message_count(user.id, "A1", db_session) == 1
 
 
 class TestConversationJSONParsing:
     """Test JSON parsing edge cases in conversation service."""
     
     @pytest.mark.asyncio
-    async def test_correction_json_with_backticks_stripped(self, db_session):
+    async def test_correction_json_with_backticks_stripped(self, db_session, mock_llm_client):
         """Test that backticks are properly stripped from correction JSON."""
         user = User(
             username="testuser",
@@ -488,7 +494,7 @@ class TestConversationJSONParsing:
             target_language="German"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Create session first
         session = ConversationSession(
@@ -498,13 +504,13 @@ class TestConversationJSONParsing:
             context_json={"messages": []}
         )
         db_session.add(session)
-        db_session.commit()
+        await db_session.commit()
         session_id = session.id
         
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(side_effect=[
                 "Hallo!",
                 '```json\n{"corrected_message": "Ich bin gut", "tips": "Great job!"}\n```'
@@ -527,7 +533,7 @@ class TestConversationJSONParsing:
             assert result.tips == "Great job!"
     
     @pytest.mark.asyncio
-    async def test_correction_invalid_json_handled(self, db_session):
+    async def test_correction_invalid_json_handled(self, db_session, mock_llm_client):
         """Test that invalid correction JSON doesn't crash."""
         user = User(
             username="testuser",
@@ -535,7 +541,7 @@ class TestConversationJSONParsing:
             target_language="Spanish"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Create session first
         session = ConversationSession(
@@ -545,16 +551,17 @@ class TestConversationJSONParsing:
             context_json={"messages": []}
         )
         db_session.add(session)
-        db_session.commit()
+        await db_session.commit()
         session_id = session.id
         
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(side_effect=[
                 "¡Hola!",
-                "This is not valid JSON at all"
+                "This is not valid JSON at all",
+                "Still not valid JSON"  # structured-output re-ask
             ])
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -573,9 +580,10 @@ class TestConversationJSONParsing:
             # Should not crash, correction should be None
             assert result.corrected_user_message is None
             assert result.tips is None
+            assert mock_llm.generate.call_count == 3
     
     @pytest.mark.asyncio
-    async def test_correction_null_string_handled(self, db_session):
+    async def test_correction_null_string_handled(self, db_session, mock_llm_client):
         """Test that string 'null' in correction JSON is handled correctly."""
         user = User(
             username="testuser",
@@ -583,7 +591,7 @@ class TestConversationJSONParsing:
             target_language="French"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Create session first
         session = ConversationSession(
@@ -593,13 +601,13 @@ class TestConversationJSONParsing:
             context_json={"messages": []}
         )
         db_session.add(session)
-        db_session.commit()
+        await db_session.commit()
         session_id = session.id
         
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(side_effect=[
                 "Bonjour!",
                 '{"corrected_message": "null", "tips": "null"}'
@@ -623,7 +631,7 @@ class TestConversationJSONParsing:
             assert result.tips is None
 
     @pytest.mark.asyncio
-    async def test_send_message_creates_user_progress_if_not_exists(self, db_session):
+    async def test_send_message_creates_user_progress_if_not_exists(self, db_session, mock_llm_client):
         """Test that sending a message creates UserProgress if it doesn't exist."""
         user = User(
             username="newconvouser",
@@ -632,13 +640,13 @@ class TestConversationJSONParsing:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Start conversation
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="¡Hola! ¿Cómo estás?")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -656,17 +664,17 @@ class TestConversationJSONParsing:
         
         # Verify no UserProgress exists yet
         from app.db.models import UserProgress
-        progress = db_session.query(UserProgress).filter(
+        progress = await db_session.scalar(select(UserProgress).where(
             UserProgress.user_id == user.id,
             UserProgress.module == "conversation"
-        ).first()
+        ))
         assert progress is None
         
         # Send message - this should create UserProgress
         with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
              patch('app.services.conversation.get_checker_service') as mock_get_checker:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(side_effect=["Muy bien!", '{"corrected_message": null, "tips": null}'])
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -683,10 +691,130 @@ class TestConversationJSONParsing:
             )
         
         # Verify UserProgress was created
-        progress = db_session.query(UserProgress).filter(
+        progress = await db_session.scalar(select(UserProgress).where(
             UserProgress.user_id == user.id,
             UserProgress.module == "conversation"
-        ).first()
+        ))
         assert progress is not None
         assert progress.total_attempts == 1
         assert result.reply is not None
+
+
+class TestConversationStreaming:
+    """Test the streaming variant of send_message."""
+
+    async def _make_session(self, db_session):
+        user = User(
+            username="streamuser",
+            hashed_password="hash",
+            target_language="Spanish",
+            level="A1"
+        )
+        db_session.add(user)
+        await db_session.commit()
+
+        session = ConversationSession(
+            id=str(uuid4()),
+            user_id=user.id,
+            target_language="Spanish",
+            context_json={"system_prompt": "Tutor", "messages": [{"role": "assistant", "content": "Hola"}]}
+        )
+        db_session.add(session)
+        await db_session.commit()
+        return user, session.id
+
+    @pytest.mark.asyncio
+    async def test_stream_emits_tokens_then_reply_corrections_and_done(self, db_session, async_session_factory, mock_llm_client):
+        """Test event order and that the turn is persisted after streaming."""
+        user, session_id = await self._make_session(db_session)
+        opened = []
+
+        def counting_factory():
+            opened.append(True)
+            return async_session_factory()
+
+        async def fake_stream(**kwargs):
+            for chunk in ["Muy ", "bien", "!"]:
+                yield chunk
+
+        with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
+             patch('app.services.conversation.get_checker_service') as mock_get_checker:
+
+            mock_llm = mock_llm_client
+            mock_llm.generate_stream = fake_stream
+            mock_llm.generate = AsyncMock(return_value='{"corrected_message": "Estoy bien", "tips": "Use estar"}')
+            mock_get_llm.return_value = mock_llm
+
+            mock_checker = AsyncMock()
+            mock_checker.check_content = AsyncMock(return_value={"is_valid": True, "suggested_fix": None})
+            mock_get_checker.return_value = mock_checker
+
+            events = await stream_message(
+                session_id=session_id,
+                user=user,
+                request=ConversationMessageRequest(message="Soy bien"),
+                db=db_session,
+                session_factory=counting_factory
+            )
+            # The request's session is closed before the body is streamed
+            await db_session.close()
+            collected = [event async for event in events]
+
+        names = [name for name, _ in collected]
+        assert names == ["token", "token", "token", "reply", "corrections", "done"]
+        assert collected[3][1] == {"reply": "Muy bien!", "replaced": False}
+        assert collected[4][1]["corrected_user_message"] == "Estoy bien"
+
+        stored = (await db_session.execute(
+            select(ConversationMessage.seq, ConversationMessage.role, ConversationMessage.content)
+            .where(ConversationMessage.session_id == session_id)
+            .order_by(ConversationMessage.seq)
+        )).all()
+        assert stored[-2:] == [(1, "user", "Soy bien"), (2, "assistant", "Muy bien!")]
+        assert len(opened) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_error_emits_error_event_and_persists_nothing(self, db_session, mock_llm_client):
+        """Test that a provider failure becomes an error event."""
+        user, session_id = await self._make_session(db_session)
+
+        async def failing_stream(**kwargs):
+            raise RuntimeError("provider down")
+            yield  # pragma: no cover
+
+        with patch('app.services.conversation.get_llm_client') as mock_get_llm, \
+             patch('app.services.conversation.get_checker_service') as mock_get_checker:
+
+            mock_llm = mock_llm_client
+            mock_llm.generate_stream = failing_stream
+            mock_llm.generate = AsyncMock(return_value='{"corrected_message": null, "tips": null}')
+            mock_get_llm.return_value = mock_llm
+            mock_get_checker.return_value = AsyncMock()
+
+            events = await stream_message(
+                session_id=session_id,
+                user=user,
+                request=ConversationMessageRequest(message="Hola"),
+                db=db_session
+            )
+            collected = [event async for event in events]
+
+        assert collected == [("error", {"detail": "provider down"})]
+        assert await db_session.scalar(select(func.count()).select_from(ContentLog)) == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_invalid_session_raises_before_streaming(self, db_session):
+        """Test that ownership/lookup errors surface before any event."""
+        user = User(username="nosession", hashed_password="hash", target_language="Spanish")
+        db_session.add(user)
+        await db_session.commit()
+
+        with patch('app.services.conversation.get_llm_client'), \
+             patch('app.services.conversation.get_checker_service'):
+            with pytest.raises(ValueError):
+                await stream_message(
+                    session_id="missing",
+                    user=user,
+                    request=ConversationMessageRequest(message="Hola"),
+                    db=db_session
+                )
@@ -0,0 +1,185 @@
+"""
+Unit tests for the offline fake AI provider.
+
+Tests:
+- Structured-output calls get schema-valid, deterministic JSON
+- Streaming, STT and image requests are answered locally
+- 429 and 5xx injection goes through the governor and retry paths
+- Latency is sampled from the configured, seeded distribution
+- The vocabulary pipeline runs end to end on the fake provider
+"""
+
+import base64
+import httpx
+import pytest
+
+from app.core.blob_store import blob_digest
+from app.core.config import settings
+from app.core.fake_provider import FAKE_IMAGE_B64, FakeProviderTransport, fake_completion_text
+from app.core.hedging import reset_request_hedgers
+from app.core.rate_governor import get_rate_governor, reset_rate_governors
+from app.schemas.llm_outputs import (
+    CheckerOutput,
+    ConversationCorrectionOutput,
+    FlashcardBatchOutput,
+    GrammarQuestionOutput,
+    PronunciationAnalysisOutput,
+    SecondaryValidationOutput,
+    WritingFeedbackOutput,
+)
+from app.services.ai_services import LLMClient, LLMError
+from app.services.image_client import ImageGenClient, reset_image_client
+from app.services.stt_client import STTClient
+
+
+async def _no_sleep(seconds):
+    return None
+
+
+@pytest.fixture
+def fake_transport(monkeypatch):
+    """Zero-latency fake transport installed as the process-wide one."""
+    transport = FakeProviderTransport(latency_ms=0, distribution="fixed", sleep=_no_sleep)
+    monkeypatch.setattr("app.core.fake_provider._transport", transport)
+    monkeypatch.setattr("app.core.llm_usage.settings.LLM_USAGE_ENABLED", False)
+    yield transport
+    reset_rate_governors()
+    reset_request_hedgers()
+
+
+def _fake_llm() -> LLMClient:
+    return LLMClient(api_key="unused", base_url="http://fake-provider.local/v1", model="fake-model", provider="fake")
+
+
+class TestFakeCompletions:
+    """Test generated content."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("schema", [
+        CheckerOutput,
+        SecondaryValidationOutput,
+        GrammarQuestionOutput,
+        WritingFeedbackOutput,
+        ConversationCorrectionOutput,
+        PronunciationAnalysisOutput,
+    ])
+    async def test_structured_outputs_are_schema_valid(self, fake_transport, schema):
+        result = await _fake_llm().generate_json(schema=schema, system_prompt="S", user_prompt="U")
+
+        assert isinstance(result, schema)
+        assert fake_transport.stats["requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_flashcard_batch_has_requested_count(self, fake_transport):
+        prompt = "Generate 5 different vocabulary flashcards for learning German at A1 level"
+
+        batch = await _fake_llm().generate_json(schema=FlashcardBatchOutput, system_prompt="S", user_prompt=prompt)
+
+        words = [card.word for card in batch.flashcards]
+        assert len(set(words)) == 5
+        assert all(card.options[card.correct_option_index] == card.definition for card in batch.flashcards)
+
+    def test_same_prompt_gives_same_answer(self):
+        messages = [{"role": "user", "content": "Generate 2 flashcards for learning Spanish"}]
+        response_format = {"type": "json_schema", "json_schema": {"name": "FlashcardBatchOutput"}}
+
+        first = fake_completion_text(messages, response_format)
+        assert fake_completion_text(messages, response_format) == first
+        assert fake_completion_text([{"role": "user", "content": "other"}], response_format) != first
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_reply_in_chunks(self, fake_transport):
+        chunks = [chunk async for chunk in _fake_llm().generate_stream(system_prompt="S", user_prompt="Hi")]
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == fake_completion_text([
+            {"role": "system", "content": "S"},
+            {"role": "user", "content": "Hi"}
+        ])
+
+    @pytest.mark.asyncio
+    async def test_stt_and_image_are_answered_locally(self, fake_transport, monkeypatch):
+        monkeypatch.setattr("app.services.stt_client.get_llm_client", _fake_llm)
+        stt = STTClient(api_key="unused", base_url="http://fake-provider.local/v1", model="fake-model", provider="fake")
+        images = ImageGenClient(api_key="unused", base_url="http://fake-provider.local/v1", model="fake-model", provider="fake")
+
+        analysis = await stt.analyze_audio(b"audio", target_language="German", target_phrase="Guten Morgen")
+        image = await images.generate_safe_image("a red apple")
+
+        assert analysis["transcript"] == "Guten Morgen"
+        assert 60 <= analysis["score"] <= 100
+        assert image == FAKE_IMAGE_B64
+
+
+class TestFaultInjection:
+    """Test injected errors and latency."""
+
+    @pytest.mark.asyncio
+    async def test_rate_limits_feed_the_governor(self, fake_transport, monkeypatch):
+        monkeypatch.setattr("app.services.ai_services.settings.LLM_RATE_LIMIT_RETRIES", 1)
+        fake_transport.rate_limit_rate = 1.0
+        fake_transport.retry_after_seconds = 0.01
+
+        with pytest.raises(LLMError):
+            await _fake_llm().generate(system_prompt="S", user_prompt="U")
+
+        assert fake_transport.stats["rate_limited"] == 2
+        assert get_rate_governor("fake").stats["rate_limited"] == 2
+
+    @pytest.mark.asyncio
+    async def test_server_errors_are_retried(self, fake_transport, monkeypatch):
+        monkeypatch.setattr("app.services.ai_services.settings.LLM_RETRY_BASE_DELAY_SECONDS", 0.0)
+        fake_transport.error_rate = 1.0
+
+        with pytest.raises(LLMError):
+            await _fake_llm().generate(system_prompt="S", user_prompt="U")
+
+        assert fake_transport.stats["errors"] == 1 + settings.LLM_RETRY_ATTEMPTS
+
+    @pytest.mark.asyncio
+    async def test_latency_is_seeded_and_slept(self):
+        slept = []
+
+        async def record_sleep(seconds):
+            slept.append(seconds)
+
+        def samples(seed):
+            transport = FakeProviderTransport(latency_ms=200, distribution="lognormal", spread=0.5, seed=seed)
+            return [transport.sample_latency() for _ in range(5)]
+
+        assert samples(7) == samples(7)
+        assert samples(7) != samples(8)
+        assert FakeProviderTransport(latency_ms=250, distribution="fixed").sample_latency() == 0.25
+
+        transport = FakeProviderTransport(latency_ms=100, distribution="uniform", spread=0.2, sleep=record_sleep)
+        await transport.handle_async_request(httpx.Request("GET", "http://fake-provider.local/v1/models"))
+        assert 0.08 <= slept[0] <= 0.12
+
+    def test_unknown_distribution_is_rejected(self):
+        with pytest.raises(ValueError):
+            FakeProviderTransport(distribution="pareto")
+
+
+class TestFakePipeline:
+    """Test a full service pipeline against the fake provider."""
+
+    @pytest.mark.asyncio
+    async def test_flashcard_batch_end_to_end(self, fake_transport, monkeypatch):
+        from app.services import ai_services
+        from app.services.vocabulary import generate_flashcard_batch
+
+        monkeypatch.setattr(settings, "LLM_PROVIDER", "fake")
+        monkeypatch.setattr(settings, "LLM_IMAGE_PROVIDER", "fake")
+        monkeypatch.setattr(settings, "USE_VERTEX_AI", False)
+        monkeypatch.setattr(ai_services, "_llm_client", None)
+        reset_image_client()
+        try:
+            result = await generate_flashcard_batch("German", "A1", 3, [])
+        finally:
+            monkeypatch.setattr(ai_services, "_llm_client", None)
+            reset_image_client()
+
+        assert len(result["cards"]) == 3
+        assert all(card["validation"]["is_validated"] for card in result["cards"])
+        image_digest = blob_digest(base64.b64decode(FAKE_IMAGE_B64))
+        assert all(card["image_digest"] == image_digest for card in result["cards"])
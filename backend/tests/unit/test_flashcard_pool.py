@@ -0,0 +1,165 @@
+"""
+Unit tests for the pre-generated flashcard pool.
+
+Tests:
+- Popping skips seen words and removes the served card
+- Replenishing tops up to the target size with validated cards only
+- The refill loop survives a failed cycle
+- get_next_flashcard serves pooled cards without calling the LLM
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy import func, select
+from app.core.blob_store import blob_digest, media_url
+from app.db.models import ContentLog, FlashcardPoolEntry, User
+from app.services.flashcard_pool import FlashcardPoolReplenisher, pool_size, pop_flashcard, replenish_pool
+
+
+IMAGE_DIGEST = blob_digest(b"img")
+
+VALIDATION = {
+    "is_validated": True,
+    "confidence_score": 0.9,
+    "primary_check_passed": True,
+    "secondary_check_passed": True
+}
+
+
+def _card(word, is_validated=True):
+    return {
+        "word": word,
+        "definition": f"meaning of {word}",
+        "example_sentence": f"Ein Satz mit {word}",
+        "options": [f"meaning of {word}", "b", "c", "d"],
+        "correct_option_index": 0,
+        "image_digest": IMAGE_DIGEST,
+        "validation": {**VALIDATION, "is_validated": is_validated}
+    }
+
+
+def _pool_entry(word):
+    return FlashcardPoolEntry(
+        target_language="German",
+        level="A1",
+        word=word,
+        card=_card(word),
+        checker_result={"is_valid": True},
+        secondary_validation={"is_approved": True, "confidence_score": 0.9},
+        is_validated=True
+    )
+
+
+class TestPopFlashcard:
+    """Test taking cards out of the pool."""
+
+    @pytest.mark.asyncio
+    async def test_pop_skips_seen_words_and_removes_card(self, db_session):
+        db_session.add_all([_pool_entry("Buch"), _pool_entry("Haus")])
+        await db_session.commit()
+
+        pooled = await pop_flashcard("German", "A1", ["buch"], db_session)
+
+        assert pooled["card"]["word"] == "Haus"
+        assert await pool_size("German", "A1", db_session) == 1
+
+    @pytest.mark.asyncio
+    async def test_pop_from_empty_pool_returns_none(self, db_session):
+        assert await pop_flashcard("German", "A1", [], db_session) is None
+
+    @pytest.mark.asyncio
+    async def test_pools_are_separated_by_level(self, db_session):
+        db_session.add(_pool_entry("Buch"))
+        await db_session.commit()
+
+        assert await pop_flashcard("German", "B2", [], db_session) is None
+
+
+class TestReplenishPool:
+    """Test background top-ups."""
+
+    @pytest.mark.asyncio
+    async def test_refills_to_target_with_validated_cards(self, db_session, monkeypatch):
+        monkeypatch.setattr("app.services.flashcard_pool.settings.FLASHCARD_POOL_LOW_WATER", 2)
+        monkeypatch.setattr("app.services.flashcard_pool.settings.FLASHCARD_POOL_TARGET_SIZE", 3)
+
+        batch = {
+            "cards": [_card("Buch"), _card("Haus"), _card("Tisch"), _card("Stuhl", is_validated=False)],
+            "checker_result": {"is_valid": True},
+            "secondary_validation": {"is_approved": True}
+        }
+        with patch("app.services.vocabulary.generate_flashcard_batch", AsyncMock(return_value=batch)) as mock_generate:
+            added = await replenish_pool("German", "A1", db_session)
+
+        assert added == 3
+        assert await pool_size("German", "A1", db_session) == 3
+        mock_generate.assert_awaited_once_with("German", "A1", 3, [], db_session)
+
+    @pytest.mark.asyncio
+    async def test_skips_pool_above_low_water(self, db_session, monkeypatch):
+        monkeypatch.setattr("app.services.flashcard_pool.settings.FLASHCARD_POOL_LOW_WATER", 1)
+        db_session.add(_pool_entry("Buch"))
+        await db_session.commit()
+
+        with patch("app.services.vocabulary.generate_flashcard_batch", AsyncMock()) as mock_generate:
+            added = await replenish_pool("German", "A1", db_session)
+
+        assert added == 0
+        mock_generate.assert_not_called()
+
+
+class TestReplenisherLoop:
+    """Test the periodic refill loop."""
+
+    @pytest.mark.asyncio
+    async def test_loop_survives_a_failed_cycle(self, async_session_factory, monkeypatch):
+        monkeypatch.setattr("app.services.flashcard_pool.settings.FLASHCARD_POOL_REFILL_INTERVAL_SECONDS", 0)
+        monkeypatch.setattr("app.services.flashcard_pool.AsyncSessionLocal", async_session_factory)
+        replenisher = FlashcardPoolReplenisher()
+        replenisher.schedule = MagicMock()
+        keys = AsyncMock(side_effect=[RuntimeError("database is locked"), [("German", "A1")]])
+
+        with patch("app.services.flashcard_pool.get_active_pool_keys", keys):
+            replenisher.start()
+            try:
+                for _ in range(100):
+                    if replenisher.schedule.called:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await replenisher.stop()
+
+        replenisher.schedule.assert_called_with("German", "A1")
+
+
+class TestPooledNextFlashcard:
+    """Test get_next_flashcard with the pool enabled."""
+
+    @pytest.mark.asyncio
+    async def test_serves_pooled_card_without_llm(self, db_session, monkeypatch):
+        from app.services.vocabulary import get_next_flashcard
+
+        monkeypatch.setattr("app.services.vocabulary.settings.FLASHCARD_POOL_ENABLED", True)
+        user = User(username="pooluser", hashed_password="hash", target_language="German", level="A1")
+        db_session.add_all([user, _pool_entry("Buch")])
+        await db_session.commit()
+
+        replenisher = MagicMock()
+        with patch("app.services.vocabulary.get_llm_client") as mock_get_llm, \
+             patch("app.services.vocabulary.get_checker_service"), \
+             patch("app.services.vocabulary.get_secondary_validator"), \
+             patch("app.services.vocabulary.get_image_client"), \
+             patch("app.services.vocabulary.get_flashcard_replenisher", return_value=replenisher):
+            mock_llm = AsyncMock()
+            mock_get_llm.return_value = mock_llm
+
+            result = await get_next_flashcard(user.id, "German", "A1", db_session)
+
+        assert result.word == "Buch"
+        assert result.image_url == media_url(IMAGE_DIGEST)
+        mock_llm.generate.assert_not_called()
+        replenisher.schedule.assert_called_once_with("German", "A1")
+        assert await db_session.scalar(select(func.count()).select_from(ContentLog).where(ContentLog.user_id == user.id)) == 1
+        assert await pool_size("German", "A1", db_session) == 0
@@ -9,6 +9,7 @@ Tests:
 
 import pytest
 from unittest.mock import AsyncMock, patch
+from sqlalchemy import select
 from app.services.grammar import (
     get_grammar_question,
     submit_grammar_answer
@@ -21,7 +22,7 @@ class TestGrammarQuestionGeneration:
     """Test grammar question generation."""
     
     @pytest.mark.asyncio
-    async def test_generate_grammar_question_returns_valid_structure(self, db_session):
+    async def test_generate_grammar_question_returns_valid_structure(self, db_session, mock_llm_client):
         """Test that grammar question has correct structure."""
         user = User(
             username="testuser",
@@ -30,7 +31,7 @@ class TestGrammarQuestionGeneration:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         question_json = {
             "question_text": "Choose the correct verb form",
@@ -44,7 +45,7 @@ class TestGrammarQuestionGeneration:
              patch('app.services.grammar.get_checker_service') as mock_get_checker, \
              patch('app.services.grammar.get_secondary_validator') as mock_get_validator:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value=f"```json\n{json.dumps(question_json)}\n```")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -75,7 +76,7 @@ class TestGrammarQuestionGeneration:
         assert result.correct_option_index is not None
     
     @pytest.mark.asyncio
-    async def test_grammar_question_with_specific_topic(self, db_session):
+    async def test_grammar_question_with_specific_topic(self, db_session, mock_llm_client):
         """Test generating question for specific grammar topic."""
         user = User(
             username="testuser",
@@ -84,7 +85,7 @@ class TestGrammarQuestionGeneration:
             level="B1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         question_json = {
             "question_text": "Select the correct past tense",
@@ -98,7 +99,7 @@ class TestGrammarQuestionGeneration:
              patch('app.services.grammar.get_checker_service') as mock_get_checker, \
              patch('app.services.grammar.get_secondary_validator') as mock_get_validator:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value=f"```json\n{json.dumps(question_json)}\n```")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -140,7 +141,7 @@ class TestGrammarAnswerSubmission:
             level="A2"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         request = GrammarAnswerRequest(
             question_id="test-123",
@@ -158,10 +159,10 @@ class TestGrammarAnswerSubmission:
         assert result.is_correct is True
         
         # Check progress was created
-        progress = db_session.query(UserProgress).filter(
+        progress = await db_session.scalar(select(UserProgress).where(
             UserProgress.user_id == user.id,
             UserProgress.module == "grammar"
-        ).first()
+        ))
         
         assert progress is not None
         assert progress.correct_attempts == 1
@@ -176,7 +177,7 @@ class TestGrammarAnswerSubmission:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         request = GrammarAnswerRequest(
             question_id="test-456",
@@ -193,10 +194,10 @@ class TestGrammarAnswerSubmission:
         
         assert result.is_correct is False
         
-        progress = db_session.query(UserProgress).filter(
+        progress = await db_session.scalar(select(UserProgress).where(
             UserProgress.user_id == user.id,
             UserProgress.module == "grammar"
-        ).first()
+        ))
         
         assert progress is not None
         assert progress.total_attempts == 1
@@ -212,7 +213,7 @@ class TestGrammarAnswerSubmission:
             level="B2"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Submit 3 correct, 2 incorrect
         for i in range(5):
@@ -230,10 +231,10 @@ class TestGrammarAnswerSubmission:
                 db=db_session
             )
         
-        progress = db_session.query(UserProgress).filter(
+        progress = await db_session.scalar(select(UserProgress).where(
             UserProgress.user_id == user.id,
             UserProgress.module == "grammar"
-        ).first()
+        ))
         
         assert progress.total_attempts == 5
         assert progress.correct_attempts == 3
@@ -244,7 +245,7 @@ class TestGrammarServiceEdgeCases:
     """Test edge cases in grammar service."""
     
     @pytest.mark.asyncio
-    async def test_question_without_level_uses_default(self, db_session):
+    async def test_question_without_level_uses_default(self, db_session, mock_llm_client):
         """Test question generation without level."""
         user = User(
             username="testuser",
@@ -253,7 +254,7 @@ class TestGrammarServiceEdgeCases:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         question_json = {
             "question_text": "Test question",
@@ -267,7 +268,7 @@ class TestGrammarServiceEdgeCases:
              patch('app.services.grammar.get_checker_service') as mock_get_checker, \
              patch('app.services.grammar.get_secondary_validator') as mock_get_validator:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value=f"```json\n{json.dumps(question_json)}\n```")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -295,7 +296,7 @@ class TestGrammarServiceEdgeCases:
         assert result is not None
     
     @pytest.mark.asyncio
-    async def test_invalid_json_raises_error(self, db_session):
+    async def test_invalid_json_raises_error(self, db_session, mock_llm_client):
         """Test handling of invalid JSON from LLM."""
         user = User(
             username="testuser",
@@ -303,13 +304,13 @@ class TestGrammarServiceEdgeCases:
             target_language="German"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         with patch('app.services.grammar.get_llm_client') as mock_get_llm, \
              patch('app.services.grammar.get_checker_service') as mock_get_checker, \
              patch('app.services.grammar.get_secondary_validator') as mock_get_validator:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="Invalid JSON {not:valid}")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -332,7 +333,7 @@ class TestGrammarServiceEdgeCases:
                 )
     
     @pytest.mark.asyncio
-    async def test_checker_suggested_fix_applied(self, db_session):
+    async def test_checker_suggested_fix_applied(self, db_session, mock_llm_client):
         """Test that checker suggested fix is applied."""
         user = User(
             username="testuser",
@@ -340,7 +341,7 @@ class TestGrammarServiceEdgeCases:
             target_language="German"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         original_json = {
             "question_text": "Bad question",
@@ -361,7 +362,7 @@ class TestGrammarServiceEdgeCases:
              patch('app.services.grammar.get_checker_service') as mock_get_checker, \
              patch('app.services.grammar.get_secondary_validator') as mock_get_validator:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value=f"```json\n{json.dumps(original_json)}\n```")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -392,7 +393,7 @@ class TestGrammarServiceEdgeCases:
             assert result.question_text == "Good question"
     
     @pytest.mark.asyncio
-    async def test_secondary_validator_improvement_applied(self, db_session):
+    async def test_secondary_validator_improvement_applied(self, db_session, mock_llm_client):
         """Test that secondary validator improvement is applied."""
         user = User(
             username="testuser",
@@ -400,7 +401,7 @@ class TestGrammarServiceEdgeCases:
             target_language="German"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         original_json = {
             "question_text": "Original question",
@@ -421,7 +422,7 @@ class TestGrammarServiceEdgeCases:
              patch('app.services.grammar.get_checker_service') as mock_get_checker, \
              patch('app.services.grammar.get_secondary_validator') as mock_get_validator:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value=f"```json\n{json.dumps(original_json)}\n```")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -452,7 +453,7 @@ class TestGrammarServiceEdgeCases:
             assert result.question_text == "Improved question"
     
     @pytest.mark.asyncio
-    async def test_json_with_backticks_stripped(self, db_session):
+    async def test_json_with_backticks_stripped(self, db_session, mock_llm_client):
         """Test that backticks are properly stripped from JSON."""
         user = User(
             username="testuser",
@@ -460,7 +461,7 @@ class TestGrammarServiceEdgeCases:
             target_language="German"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         question_json = {
             "question_text": "Test question",
@@ -474,7 +475,7 @@ class TestGrammarServiceEdgeCases:
              patch('app.services.grammar.get_checker_service') as mock_get_checker, \
              patch('app.services.grammar.get_secondary_validator') as mock_get_validator:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             # Test with ``` format (no json tag)
             mock_llm.generate = AsyncMock(return_value=f"```\n{json.dumps(question_json)}\n```")
             mock_llm.close = AsyncMock()
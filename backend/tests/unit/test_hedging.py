@@ -0,0 +1,183 @@
+"""
+Unit tests for hedged requests and jittered retries.
+
+Tests:
+- Rolling percentile
+- Slow primary triggers a hedge that wins
+- Hedge rate cap
+- Transient errors are retried, others are not
+- LLMClient retries 5xx responses
+"""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.hedging import LatencyWindow, RequestHedger, reset_request_hedgers, retry_with_jitter
+from app.services.ai_services import LLMClient, LLMError
+
+
+def _trained_hedger(**kwargs) -> RequestHedger:
+    hedger = RequestHedger("test", enabled=True, min_samples=5, min_delay_seconds=0.01, **kwargs)
+    for _ in range(5):
+        hedger.latencies.record(0.01)
+    return hedger
+
+
+class TestLatencyWindow:
+    """Test the rolling latency window."""
+
+    def test_percentile(self):
+        window = LatencyWindow(size=100)
+        for value in range(1, 101):
+            window.record(value / 100)
+        assert window.percentile(50) == pytest.approx(0.5)
+        assert window.percentile(95) == pytest.approx(0.95)
+
+    def test_window_is_bounded(self):
+        window = LatencyWindow(size=3)
+        for value in [10, 1, 1, 1]:
+            window.record(value)
+        assert len(window) == 3
+        assert window.percentile(100) == 1
+
+
+class TestRequestHedger:
+    """Test hedging decisions."""
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_until_trained(self):
+        """Test that an untrained or disabled hedger makes a single call."""
+        hedger = RequestHedger("test", enabled=True, min_samples=5)
+        func = AsyncMock(return_value="ok")
+
+        assert await hedger.run(func) == "ok"
+        assert func.call_count == 1
+        assert hedger.hedge_delay() is None
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged(self):
+        """Test that a duplicate fires after the threshold and the faster one wins."""
+        hedger = _trained_hedger()
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(1)
+                return "slow"
+            return "fast"
+
+        assert await hedger.run(upstream) == "fast"
+        assert hedger.stats["hedged"] == 1
+        assert hedger.stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_hedge_rate_is_capped(self):
+        """Test that the hedge budget stops duplicating every slow request."""
+        hedger = _trained_hedger(max_rate=0.1)
+
+        async def slowish():
+            await asyncio.sleep(0.03)
+            return "ok"
+
+        for _ in range(5):
+            await hedger.run(slowish)
+
+        assert hedger.stats["hedged"] == 1
+
+    @pytest.mark.asyncio
+    async def test_primary_error_waits_for_hedge(self):
+        """Test that a failing primary does not discard a successful hedge."""
+        hedger = _trained_hedger()
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(0.05)
+                raise RuntimeError("primary failed")
+            await asyncio.sleep(0.1)
+            return "hedge"
+
+        assert await hedger.run(upstream) == "hedge"
+
+
+class TestRetryWithJitter:
+    """Test bounded retries."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        func = AsyncMock(side_effect=[ConnectionError(), ConnectionError(), "ok"])
+        result = await retry_with_jitter(
+            func, retries=2, base_delay=0.001, max_delay=0.01,
+            is_retryable=lambda e: isinstance(e, ConnectionError)
+        )
+        assert result == "ok"
+        assert func.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_retries(self):
+        func = AsyncMock(side_effect=ConnectionError())
+        with pytest.raises(ConnectionError):
+            await retry_with_jitter(
+                func, retries=1, base_delay=0.001, max_delay=0.01,
+                is_retryable=lambda e: True
+            )
+        assert func.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_raises_immediately(self):
+        func = AsyncMock(side_effect=ValueError())
+        with pytest.raises(ValueError):
+            await retry_with_jitter(
+                func, retries=3, base_delay=0.001, max_delay=0.01,
+                is_retryable=lambda e: False
+            )
+        assert func.call_count == 1
+
+
+class TestLLMClientRetries:
+    """Test transient error retries in LLMClient."""
+
+    def teardown_method(self):
+        reset_request_hedgers()
+
+    @staticmethod
+    def _status_response(status_code: int):
+        request = httpx.Request("POST", "https://api.example.com")
+        response = httpx.Response(status_code, request=request)
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock(
+            side_effect=httpx.HTTPStatusError(str(status_code), request=request, response=response)
+        )
+        return mock_response
+
+    @pytest.mark.asyncio
+    async def test_503_is_retried(self, monkeypatch):
+        """Test that a 5xx response is retried and the retry's result returned."""
+        monkeypatch.setattr("app.services.ai_services.settings.LLM_RETRY_BASE_DELAY_SECONDS", 0.001)
+        ok = MagicMock()
+        ok.json.return_value = {"candidates": [{"content": {"parts": [{"text": "ok"}]}}]}
+        ok.raise_for_status = MagicMock()
+
+        llm = LLMClient(api_key="key", base_url="https://api.example.com", provider="gemini")
+        llm.client.post = AsyncMock(side_effect=[self._status_response(503), ok])
+
+        assert await llm.generate(system_prompt="s", user_prompt="u") == "ok"
+        assert llm.client.post.call_count == 2
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_4xx_is_not_retried(self):
+        """Test that client errors fail on the first attempt."""
+        llm = LLMClient(api_key="key", base_url="https://api.example.com", provider="gemini")
+        llm.client.post = AsyncMock(return_value=self._status_response(400))
+
+        with pytest.raises(LLMError):
+            await llm.generate(system_prompt="s", user_prompt="u")
+        assert llm.client.post.call_count == 1
+        await llm.close()
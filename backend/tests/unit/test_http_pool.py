@@ -0,0 +1,124 @@
+"""
+Unit tests for the shared outbound HTTP pool.
+
+Tests:
+- Clients created from the pool share its transport
+- Closing a client leaves the pool open
+- Per-host concurrency cap, released on errors and cancellation
+- Reset closes the replaced service client
+"""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.http_pool import OutboundPool, close_client_soon
+
+
+def _pool_with_handler(handler, **kwargs) -> OutboundPool:
+    pool = OutboundPool(**kwargs)
+    pool.transport = httpx.MockTransport(handler)
+    return pool
+
+
+class TestOutboundPool:
+    """Test request routing through the shared pool."""
+
+    @pytest.mark.asyncio
+    async def test_clients_share_pool(self):
+        """Test that requests from different clients go through one pool."""
+        pool = _pool_with_handler(lambda request: httpx.Response(200, json={"ok": True}))
+        first, second = pool.client(), pool.client()
+
+        assert (await first.get("https://api.example.com/a")).json() == {"ok": True}
+        assert (await second.get("https://api.example.com/b")).status_code == 200
+        assert pool.stats["requests"] == 2
+
+    @pytest.mark.asyncio
+    async def test_closing_client_keeps_pool_open(self):
+        """Test that a client's aclose does not tear down pooled connections."""
+        pool = _pool_with_handler(lambda request: httpx.Response(200))
+        client = pool.client()
+        await client.aclose()
+
+        assert pool.closed is False
+        assert (await pool.client().get("https://api.example.com")).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_per_host_cap(self):
+        """Test that no more than max_connections_per_host requests run per host."""
+        running = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return httpx.Response(200, text="ok")
+
+        pool = _pool_with_handler(handler, max_connections_per_host=2)
+        client = pool.client()
+
+        responses = await asyncio.gather(*(client.get("https://api.example.com") for _ in range(6)))
+
+        assert all(response.text == "ok" for response in responses)
+        assert peak == 2
+        assert pool.snapshot()["hosts_in_flight"] == {}
+
+    @pytest.mark.asyncio
+    async def test_errors_release_host_slot(self):
+        """Test that a failed request does not leak a per-host slot."""
+        def handler(request):
+            raise httpx.ConnectError("down")
+
+        pool = _pool_with_handler(handler, max_connections_per_host=1)
+        client = pool.client()
+
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await client.get("https://api.example.com")
+
+        assert pool.stats["errors"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_requests_release_host_slot(self):
+        """Test that cancelling in-flight requests frees their slots for later calls."""
+        started = asyncio.Event()
+
+        async def handler(request):
+            if request.url.path == "/slow":
+                started.set()
+                await asyncio.sleep(60)
+            return httpx.Response(200, text="ok")
+
+        pool = _pool_with_handler(handler, max_connections_per_host=2)
+        client = pool.client()
+
+        slow = [asyncio.create_task(client.get("https://api.example.com/slow")) for _ in range(2)]
+        await started.wait()
+        await asyncio.sleep(0)
+        for task in slow:
+            task.cancel()
+        await asyncio.gather(*slow, return_exceptions=True)
+
+        assert pool.snapshot()["hosts_in_flight"] == {}
+        response = await asyncio.wait_for(client.get("https://api.example.com/fast"), timeout=1)
+        assert response.text == "ok"
+        assert pool.stats["errors"] == 0
+
+
+class TestCloseClientSoon:
+    """Test closing replaced service clients."""
+
+    @pytest.mark.asyncio
+    async def test_schedules_close_on_running_loop(self):
+        service_client = AsyncMock()
+        close_client_soon(service_client)
+        await asyncio.sleep(0)
+        service_client.close.assert_awaited_once()
+
+    def test_no_loop_is_noop(self):
+        close_client_soon(None)
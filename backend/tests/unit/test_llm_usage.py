@@ -0,0 +1,179 @@
+"""
+Unit tests for LLM usage accounting.
+
+Tests:
+- Usage scopes tag calls and are inherited by tasks
+- LLMClient records provider token counts, retries and cache hits
+- Recorder batches rows into the llm_usage table
+- Usage report aggregates by module and stage
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.cache import LRUCache, TieredCache
+from app.core.llm_usage import AICall, UsageRecorder, estimate_cost, llm_usage_scope, reset_usage_recorder
+from app.core.rate_governor import reset_rate_governors
+from app.core.hedging import reset_request_hedgers
+from app.db.models import LLMUsageRecord
+from app.services.ai_services import LLMClient
+from app.services.llm_usage_service import get_llm_usage_report
+
+
+@pytest.fixture
+def recorder(async_session_factory):
+    """Global recorder that only writes to the test database when flushed."""
+    recorder = UsageRecorder(flush_size=1000, flush_interval_seconds=3600, session_factory=async_session_factory)
+    reset_usage_recorder(recorder)
+    yield recorder
+    reset_rate_governors()
+    reset_request_hedgers()
+
+
+def _gemini_response(text, prompt_tokens=12, completion_tokens=5):
+    mock_response = MagicMock()
+    mock_response.json.return_value = {
+        "candidates": [{"content": {"parts": [{"text": text}]}}],
+        "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": completion_tokens}
+    }
+    mock_response.raise_for_status = MagicMock()
+    return mock_response
+
+
+class TestUsageScope:
+    """Test call tagging."""
+
+    def test_nested_scopes_override_and_reset(self):
+        with llm_usage_scope(module="vocabulary", user_id="u1"):
+            with llm_usage_scope(stage="checker"):
+                call = AICall("llm", "gemini", "m")
+                assert (call.module, call.stage, call.user_id) == ("vocabulary", "checker", "u1")
+            assert AICall("llm", "gemini", "m").stage == "generate"
+        assert AICall("llm", "gemini", "m").module is None
+
+    @pytest.mark.asyncio
+    async def test_tasks_inherit_scope(self):
+        async def make_call():
+            return AICall("llm", "gemini", "m")
+
+        with llm_usage_scope(module="grammar"):
+            task = asyncio.create_task(make_call())
+        assert (await task).module == "grammar"
+
+
+class TestLLMClientAccounting:
+    """Test that LLMClient calls are measured."""
+
+    @pytest.mark.asyncio
+    async def test_records_tokens_and_tags(self, recorder, sync_db_session):
+        llm = LLMClient(api_key="test_key", base_url="https://test.api.com", model="test-model")
+        llm.client.post = AsyncMock(return_value=_gemini_response("Hallo"))
+
+        with llm_usage_scope(module="conversation", stage="correction", user_id="user-1"):
+            await llm.generate(system_prompt="S", user_prompt="U")
+        assert await recorder.flush() == 1
+
+        row = sync_db_session.query(LLMUsageRecord).one()
+        assert (row.service, row.module, row.stage, row.user_id) == ("llm", "conversation", "correction", "user-1")
+        assert (row.prompt_tokens, row.completion_tokens) == (12, 5)
+        assert row.success is True
+        assert row.latency_ms >= 0
+
+    @pytest.mark.asyncio
+    async def test_counts_retries_and_failures(self, recorder, sync_db_session, monkeypatch):
+        monkeypatch.setattr("app.services.ai_services.settings.LLM_RETRY_BASE_DELAY_SECONDS", 0.0)
+        llm = LLMClient(api_key="test_key", base_url="https://test.api.com", model="test-model")
+        request = httpx.Request("POST", "https://test.api.com")
+        server_error = httpx.HTTPStatusError("boom", request=request, response=httpx.Response(503, request=request))
+        llm.client.post = AsyncMock(side_effect=[server_error, _gemini_response("ok")])
+
+        await llm.generate(system_prompt="S", user_prompt="U")
+        await recorder.flush()
+
+        row = sync_db_session.query(LLMUsageRecord).one()
+        assert row.retries == 1
+        assert row.success is True
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_are_marked(self, recorder, sync_db_session):
+        llm = LLMClient(
+            api_key="test_key",
+            base_url="https://test.api.com",
+            model="test-model",
+            response_cache=TieredCache(local=LRUCache(max_bytes=1024 * 1024))
+        )
+        llm.client.post = AsyncMock(return_value=_gemini_response("cached"))
+
+        for _ in range(2):
+            await llm.generate(system_prompt="S", user_prompt="U", cache_module="checker")
+        await recorder.flush()
+
+        cached = [row.cached for row in sync_db_session.query(LLMUsageRecord).order_by(LLMUsageRecord.id)]
+        assert cached == [False, True]
+
+
+class TestUsageRecorder:
+    """Test batching and cost."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_in_background_when_batch_is_full(self, async_session_factory, sync_db_session, monkeypatch):
+        monkeypatch.setattr("app.core.llm_usage.settings.LLM_PRICING", {"m": {"input_per_million": 1.0}})
+        recorder = UsageRecorder(flush_size=2, flush_interval_seconds=3600, session_factory=async_session_factory)
+
+        def record():
+            call = AICall("llm", "gemini", "m")
+            call.add_usage(1_000_000, 0)
+            recorder.record(call)
+
+        record()
+        record()
+        # record() only schedules the write
+        assert sync_db_session.query(LLMUsageRecord).count() == 0
+        await recorder.drain()
+        record()
+
+        assert sync_db_session.query(LLMUsageRecord).count() == 2
+        assert recorder.pending == 1
+        assert sync_db_session.query(LLMUsageRecord).first().cost_usd == pytest.approx(1.0)
+
+    def test_estimate_cost_for_unknown_model_is_zero(self):
+        assert estimate_cost("unknown", 1000, 1000) == 0.0
+
+
+class TestUsageReport:
+    """Test report aggregation."""
+
+    @pytest.mark.asyncio
+    async def test_groups_by_module_and_stage(self, db_session):
+        now = datetime.utcnow()
+
+        def row(module, stage, latency, **kwargs):
+            return LLMUsageRecord(
+                created_at=now, service="llm", provider="gemini", model="m",
+                module=module, stage=stage, latency_ms=latency, **kwargs
+            )
+
+        db_session.add_all([
+            row("vocabulary", "checker", 300, prompt_tokens=10),
+            row("vocabulary", "checker", 500, prompt_tokens=20, success=False),
+            row("vocabulary", "generate", 200),
+            row("grammar", "generate", 100),
+        ])
+        await db_session.commit()
+
+        report = await get_llm_usage_report(db_session, since=now - timedelta(hours=1), group_by=["module", "stage"])
+
+        assert report.totals.calls == 4
+        top = report.groups[0]
+        assert top.keys == {"module": "vocabulary", "stage": "checker"}
+        assert (top.calls, top.errors, top.prompt_tokens) == (2, 1, 30)
+        assert top.avg_latency_ms == 400
+
+    @pytest.mark.asyncio
+    async def test_unknown_group_is_rejected(self, db_session):
+        with pytest.raises(ValueError):
+            await get_llm_usage_report(db_session, since=datetime.utcnow(), group_by=["colour"])
@@ -0,0 +1,99 @@
+"""
+Unit tests for the load-test harness (load_test.py).
+
+Tests:
+- Percentiles and per-endpoint reports
+- Regression comparison between runs
+- A full learner journey against the app in-process on the fake provider
+"""
+
+import httpx
+import pytest
+
+from app.api.deps import get_db
+from app.core.config import settings
+from app.core.fake_provider import FakeProviderTransport
+from app.core.hedging import reset_request_hedgers
+from app.core.rate_governor import reset_rate_governors
+from app.main import app
+from app.services.image_client import reset_image_client
+from load_test import LoadStats, compare_reports, percentile, run_load_test
+
+
+class TestReport:
+    """Test latency aggregation."""
+
+    def test_percentile_interpolates(self):
+        values = [0.1, 0.2, 0.3, 0.4, 0.5]
+
+        assert percentile(values, 50) == pytest.approx(0.3)
+        assert percentile(values, 95) == pytest.approx(0.48)
+        assert percentile([], 99) == 0.0
+
+    def test_report_counts_errors_per_endpoint(self):
+        stats = LoadStats()
+        stats.record("GET /vocabulary/next", 0.2, 200)
+        stats.record("GET /vocabulary/next", 0.4, 500)
+        stats.record("GET /grammar/question", 0.1, None)
+
+        report = stats.report(elapsed=2.0, config={})
+
+        vocabulary = report["endpoints"]["GET /vocabulary/next"]
+        assert (vocabulary["requests"], vocabulary["errors"]) == (2, 1)
+        assert vocabulary["status_codes"] == {"200": 1, "500": 1}
+        assert report["endpoints"]["GET /grammar/question"]["status_codes"] == {"exception": 1}
+        assert report["totals"]["throughput_rps"] == pytest.approx(1.5)
+
+    def test_compare_flags_p95_and_error_regressions(self):
+        def report(p95, error_rate):
+            return {"endpoints": {"GET /grammar/question": {"requests": 10, "p95_ms": p95, "error_rate": error_rate}}}
+
+        assert compare_reports(report(100, 0.0), report(115, 0.0)) == []
+        assert len(compare_reports(report(100, 0.0), report(150, 0.0))) == 1
+        assert len(compare_reports(report(100, 0.0), report(100, 0.2))) == 1
+
+
+class TestInProcessRun:
+    """Test a learner journey end to end."""
+
+    @pytest.mark.asyncio
+    async def test_learner_journey_on_fake_provider(self, db_session, monkeypatch):
+        from app.services import ai_services
+
+        async def no_sleep(seconds):
+            return None
+
+        monkeypatch.setattr(
+            "app.core.fake_provider._transport",
+            FakeProviderTransport(latency_ms=0, distribution="fixed", sleep=no_sleep)
+        )
+        monkeypatch.setattr(settings, "LLM_PROVIDER", "fake")
+        monkeypatch.setattr(settings, "LLM_IMAGE_PROVIDER", "fake")
+        monkeypatch.setattr(settings, "USE_VERTEX_AI", False)
+        monkeypatch.setattr(settings, "LLM_USAGE_ENABLED", False)
+        monkeypatch.setattr(ai_services, "_llm_client", None)
+        reset_image_client()
+        app.dependency_overrides[get_db] = lambda: db_session
+        try:
+            report = await run_load_test(
+                base_url="http://testserver/api/v1",
+                learners=1,
+                ramp_up_seconds=0,
+                think_time_seconds=0,
+                max_activities=10,
+                seed=5,
+                transport=httpx.ASGITransport(app=app)
+            )
+        finally:
+            app.dependency_overrides.clear()
+            monkeypatch.setattr(ai_services, "_llm_client", None)
+            reset_image_client()
+            reset_rate_governors()
+            reset_request_hedgers()
+
+        assert report["learners"] == {"started": 1, "failed": 0}
+        assert report["endpoints"]["POST /placement-test/{id}/complete"]["requests"] == 1
+        # With this seed the learner visits every activity, streamed replies included
+        assert {"POST /vocabulary/answer", "POST /grammar/answer", "POST /conversation/{id}/message/stream",
+                "POST /writing/feedback", "GET /progress/charts"} <= set(report["endpoints"])
+        assert report["totals"]["errors"] == 0, report["endpoints"]
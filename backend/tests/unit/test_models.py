@@ -22,7 +22,7 @@ from app.core.security import get_password_hash
 class TestUserModel:
     """Test cases for User model."""
     
-    def test_create_user_with_all_fields(self, db_session):
+    def test_create_user_with_all_fields(self, sync_db_session):
         """Test creating a user with all fields populated."""
         # Arrange & Act
         user = User(
@@ -36,9 +36,9 @@ class TestUserModel:
             placement_test_score=85.5,
             total_xp=1000
         )
-        db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
+        sync_db_session.add(user)
+        sync_db_session.commit()
+        sync_db_session.refresh(user)
         
         # Assert
         assert user.id is not None
@@ -52,16 +52,16 @@ class TestUserModel:
         assert user.total_xp == 1000
         assert user.created_at is not None
     
-    def test_create_user_with_minimal_fields(self, db_session):
+    def test_create_user_with_minimal_fields(self, sync_db_session):
         """Test creating a user with only required fields."""
         # Arrange & Act
         user = User(
             username="minimaluser",
             hashed_password="hashed_password"
         )
-        db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
+        sync_db_session.add(user)
+        sync_db_session.commit()
+        sync_db_session.refresh(user)
         
         # Assert
         assert user.id is not None
@@ -70,39 +70,39 @@ class TestUserModel:
         assert user.placement_test_completed is False  # Default value
         assert user.total_xp == 0  # Default value
     
-    def test_user_unique_username_constraint(self, db_session):
+    def test_user_unique_username_constraint(self, sync_db_session):
         """Test that duplicate usernames raise an integrity error."""
         # Arrange
         user1 = User(username="duplicate", hashed_password="hash1")
-        db_session.add(user1)
-        db_session.commit()
+        sync_db_session.add(user1)
+        sync_db_session.commit()
         
         # Act & Assert
         user2 = User(username="duplicate", hashed_password="hash2")
-        db_session.add(user2)
+        sync_db_session.add(user2)
         
         with pytest.raises(IntegrityError):
-            db_session.commit()
+            sync_db_session.commit()
     
-    def test_user_auto_generates_id(self, db_session):
+    def test_user_auto_generates_id(self, sync_db_session):
         """Test that user ID is automatically generated."""
         # Arrange & Act
         user = User(username="autoid", hashed_password="hash")
-        db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
+        sync_db_session.add(user)
+        sync_db_session.commit()
+        sync_db_session.refresh(user)
         
         # Assert
         assert user.id is not None
         assert len(user.id) > 0  # UUID string
     
-    def test_user_timestamps(self, db_session):
+    def test_user_timestamps(self, sync_db_session):
         """Test that created_at timestamp is automatically set."""
         # Arrange & Act
         user = User(username="timestamps", hashed_password="hash")
-        db_session.add(user)
-        db_session.commit()
-        db_session.refresh(user)
+        sync_db_session.add(user)
+        sync_db_session.commit()
+        sync_db_session.refresh(user)
         
         # Assert
         assert user.created_at is not None
@@ -112,7 +112,7 @@ class TestUserModel:
 class TestUserProgressModel:
     """Test cases for UserProgress model."""
     
-    def test_create_user_progress(self, db_session, sample_user):
+    def test_create_user_progress(self, sync_db_session, sample_user):
         """Test creating a user progress entry."""
         # Arrange & Act
         progress = UserProgress(
@@ -122,9 +122,9 @@ class TestUserProgressModel:
             total_attempts=10,
             correct_attempts=8
         )
-        db_session.add(progress)
-        db_session.commit()
-        db_session.refresh(progress)
+        sync_db_session.add(progress)
+        sync_db_session.commit()
+        sync_db_session.refresh(progress)
         
         # Assert
         assert progress.id is not None
@@ -135,23 +135,23 @@ class TestUserProgressModel:
         assert progress.correct_attempts == 8
         assert progress.last_activity_at is not None
     
-    def test_user_progress_default_values(self, db_session, sample_user):
+    def test_user_progress_default_values(self, sync_db_session, sample_user):
         """Test user progress default values."""
         # Arrange & Act
         progress = UserProgress(
             user_id=sample_user.id,
             module="grammar"
         )
-        db_session.add(progress)
-        db_session.commit()
-        db_session.refresh(progress)
+        sync_db_session.add(progress)
+        sync_db_session.commit()
+        sync_db_session.refresh(progress)
         
         # Assert
         assert progress.total_attempts == 0
         assert progress.correct_attempts == 0
         assert progress.last_activity_at is not None
     
-    def test_multiple_progress_entries_per_user(self, db_session, sample_user):
+    def test_multiple_progress_entries_per_user(self, sync_db_session, sample_user):
         """Test that a user can have multiple progress entries."""
         # Arrange & Act
         modules = ["vocabulary", "grammar", "conversation", "writing"]
@@ -161,11 +161,11 @@ class TestUserProgressModel:
                 module=module,
                 total_attempts=5
             )
-            db_session.add(progress)
-        db_session.commit()
+            sync_db_session.add(progress)
+        sync_db_session.commit()
         
         # Assert
-        user_progress = db_session.query(UserProgress).filter_by(
+        user_progress = sync_db_session.query(UserProgress).filter_by(
             user_id=sample_user.id
         ).all()
         assert len(user_progress) == 4
@@ -178,7 +178,7 @@ class TestUserProgressModel:
 class TestConversationSessionModel:
     """Test cases for ConversationSession model."""
     
-    def test_create_conversation_session(self, db_session, sample_user):
+    def test_create_conversation_session(self, sync_db_session, sample_user):
         """Test creating a conversation session."""
         # Arrange & Act
         session = ConversationSession(
@@ -190,9 +190,9 @@ class TestConversationSessionModel:
             },
             is_active=True
         )
-        db_session.add(session)
-        db_session.commit()
-        db_session.refresh(session)
+        sync_db_session.add(session)
+        sync_db_session.commit()
+        sync_db_session.refresh(session)
         
         # Assert
         assert session.id is not None
@@ -202,21 +202,21 @@ class TestConversationSessionModel:
         assert session.is_active is True
         assert session.created_at is not None
     
-    def test_conversation_session_default_context(self, db_session, sample_user):
+    def test_conversation_session_default_context(self, sync_db_session, sample_user):
         """Test conversation session with default empty context."""
         # Arrange & Act
         session = ConversationSession(
             user_id=sample_user.id
         )
-        db_session.add(session)
-        db_session.commit()
-        db_session.refresh(session)
+        sync_db_session.add(session)
+        sync_db_session.commit()
+        sync_db_session.refresh(session)
         
         # Assert
         assert session.context_json == {} or session.context_json is not None
         assert session.is_active is True
     
-    def test_conversation_session_json_storage(self, db_session, sample_user):
+    def test_conversation_session_json_storage(self, sync_db_session, sample_user):
         """Test that JSON data is stored and retrieved correctly."""
         # Arrange
         conversation_data = {
@@ -233,9 +233,9 @@ class TestConversationSessionModel:
             user_id=sample_user.id,
             context_json=conversation_data
         )
-        db_session.add(session)
-        db_session.commit()
-        db_session.refresh(session)
+        sync_db_session.add(session)
+        sync_db_session.commit()
+        sync_db_session.refresh(session)
         
         # Assert
         assert session.context_json == conversation_data
@@ -245,7 +245,7 @@ class TestConversationSessionModel:
 class TestPlacementTestModel:
     """Test cases for PlacementTest model."""
     
-    def test_create_placement_test(self, db_session, sample_user):
+    def test_create_placement_test(self, sync_db_session, sample_user):
         """Test creating a placement test."""
         # Arrange & Act
         test = PlacementTest(
@@ -255,9 +255,9 @@ class TestPlacementTestModel:
             questions_data={"questions": []},
             answers_data={}
         )
-        db_session.add(test)
-        db_session.commit()
-        db_session.refresh(test)
+        sync_db_session.add(test)
+        sync_db_session.commit()
+        sync_db_session.refresh(test)
         
         # Assert
         assert test.id is not None
@@ -266,7 +266,7 @@ class TestPlacementTestModel:
         assert test.completed is False
         assert test.test_date is not None
     
-    def test_placement_test_with_scores(self, db_session, sample_user):
+    def test_placement_test_with_scores(self, sync_db_session, sample_user):
         """Test placement test with all score fields."""
         # Arrange & Act
         test = PlacementTest(
@@ -281,9 +281,9 @@ class TestPlacementTestModel:
             overall_score=81.8,
             determined_level="B1"
         )
-        db_session.add(test)
-        db_session.commit()
-        db_session.refresh(test)
+        sync_db_session.add(test)
+        sync_db_session.commit()
+        sync_db_session.refresh(test)
         
         # Assert
         assert test.vocabulary_score == 85.0
@@ -292,7 +292,7 @@ class TestPlacementTestModel:
         assert test.overall_score == 81.8
         assert test.determined_level == "B1"
     
-    def test_placement_test_json_data(self, db_session, sample_user):
+    def test_placement_test_json_data(self, sync_db_session, sample_user):
         """Test placement test JSON data storage."""
         # Arrange
         questions = {
@@ -315,9 +315,9 @@ class TestPlacementTestModel:
             questions_data=questions,
             answers_data=answers
         )
-        db_session.add(test)
-        db_session.commit()
-        db_session.refresh(test)
+        sync_db_session.add(test)
+        sync_db_session.commit()
+        sync_db_session.refresh(test)
         
         # Assert
         assert len(test.questions_data["questions"]) == 2
@@ -327,7 +327,7 @@ class TestPlacementTestModel:
 class TestContentLogModel:
     """Test cases for ContentLog model."""
     
-    def test_create_content_log(self, db_session, sample_user):
+    def test_create_content_log(self, sync_db_session, sample_user):
         """Test creating a content log entry."""
         # Arrange & Act
         log = ContentLog(
@@ -337,9 +337,9 @@ class TestContentLogModel:
             generated_content={"word": "Haus", "meaning": "house"},
             is_validated=False
         )
-        db_session.add(log)
-        db_session.commit()
-        db_session.refresh(log)
+        sync_db_session.add(log)
+        sync_db_session.commit()
+        sync_db_session.refresh(log)
         
         # Assert
         assert log.id is not None
@@ -350,7 +350,7 @@ class TestContentLogModel:
         assert log.is_validated is False
         assert log.created_at is not None
     
-    def test_content_log_with_validation(self, db_session, sample_user):
+    def test_content_log_with_validation(self, sync_db_session, sample_user):
         """Test content log with checker and validation results."""
         # Arrange & Act
         log = ContentLog(
@@ -362,9 +362,9 @@ class TestContentLogModel:
             secondary_validation={"human_verified": True},
             is_validated=True
         )
-        db_session.add(log)
-        db_session.commit()
-        db_session.refresh(log)
+        sync_db_session.add(log)
+        sync_db_session.commit()
+        sync_db_session.refresh(log)
         
         # Assert
         assert log.checker_result["is_valid"] is True
@@ -375,7 +375,7 @@ class TestContentLogModel:
 class TestLevelHistoryModel:
     """Test cases for LevelHistory model."""
     
-    def test_create_level_history(self, db_session, sample_user):
+    def test_create_level_history(self, sync_db_session, sample_user):
         """Test creating a level history entry."""
         # Arrange
         started_at = datetime.utcnow()
@@ -397,9 +397,9 @@ class TestLevelHistoryModel:
             days_at_level=45,
             weighted_score=81.25
         )
-        db_session.add(history)
-        db_session.commit()
-        db_session.refresh(history)
+        sync_db_session.add(history)
+        sync_db_session.commit()
+        sync_db_session.refresh(history)
         
         # Assert
         assert history.id is not None
@@ -410,7 +410,7 @@ class TestLevelHistoryModel:
         assert history.weighted_score == 81.25
         assert history.completed_at is not None
     
-    def test_level_history_default_values(self, db_session, sample_user):
+    def test_level_history_default_values(self, sync_db_session, sample_user):
         """Test level history default values."""
         # Arrange & Act
         history = LevelHistory(
@@ -419,16 +419,16 @@ class TestLevelHistoryModel:
             started_at=datetime.utcnow(),
             weighted_score=75.0
         )
-        db_session.add(history)
-        db_session.commit()
-        db_session.refresh(history)
+        sync_db_session.add(history)
+        sync_db_session.commit()
+        sync_db_session.refresh(history)
         
         # Assert
         assert history.conversation_messages == 0
         assert history.vocabulary_attempts == 0
         assert history.grammar_attempts == 0
     
-    def test_multiple_level_history_entries(self, db_session, sample_user):
+    def test_multiple_level_history_entries(self, sync_db_session, sample_user):
         """Test tracking progression through multiple levels."""
         # Arrange
         levels = ["A1", "A2", "B1"]
@@ -441,11 +441,11 @@ class TestLevelHistoryModel:
                 started_at=datetime.utcnow(),
                 weighted_score=80.0
             )
-            db_session.add(history)
-        db_session.commit()
+            sync_db_session.add(history)
+        sync_db_session.commit()
         
         # Assert
-        user_history = db_session.query(LevelHistory).filter_by(
+        user_history = sync_db_session.query(LevelHistory).filter_by(
             user_id=sample_user.id
         ).all()
         assert len(user_history) == 3
@@ -458,30 +458,30 @@ class TestLevelHistoryModel:
 class TestModelRelationships:
     """Test relationships between models."""
     
-    def test_user_has_multiple_progress_entries(self, db_session, sample_user):
+    def test_user_has_multiple_progress_entries(self, sync_db_session, sample_user):
         """Test that a user can have multiple progress entries."""
         # Arrange & Act
         progress1 = UserProgress(user_id=sample_user.id, module="vocabulary")
         progress2 = UserProgress(user_id=sample_user.id, module="grammar")
-        db_session.add_all([progress1, progress2])
-        db_session.commit()
+        sync_db_session.add_all([progress1, progress2])
+        sync_db_session.commit()
         
         # Assert
-        progress_count = db_session.query(UserProgress).filter_by(
+        progress_count = sync_db_session.query(UserProgress).filter_by(
             user_id=sample_user.id
         ).count()
         assert progress_count == 2
     
-    def test_user_has_multiple_conversation_sessions(self, db_session, sample_user):
+    def test_user_has_multiple_conversation_sessions(self, sync_db_session, sample_user):
         """Test that a user can have multiple conversation sessions."""
         # Arrange & Act
         session1 = ConversationSession(user_id=sample_user.id)
         session2 = ConversationSession(user_id=sample_user.id)
-        db_session.add_all([session1, session2])
-        db_session.commit()
+        sync_db_session.add_all([session1, session2])
+        sync_db_session.commit()
         
         # Assert
-        session_count = db_session.query(ConversationSession).filter_by(
+        session_count = sync_db_session.query(ConversationSession).filter_by(
             user_id=sample_user.id
         ).count()
         assert session_count == 2
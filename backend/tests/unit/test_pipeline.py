@@ -0,0 +1,143 @@
+"""
+Unit tests for the dependency-graph pipeline executor.
+
+Tests:
+- Dependency ordering
+- Concurrent execution of independent stages
+- Per-stage timings
+- Error propagation and graph validation
+"""
+
+import asyncio
+import pytest
+
+from app.core.pipeline import Pipeline, PipelineError
+
+
+class TestPipelineExecution:
+    """Test stage scheduling and results."""
+
+    @pytest.mark.asyncio
+    async def test_stages_receive_dependency_results(self):
+        """Test that a stage sees the outputs of the stages it depends on."""
+        async def first(ctx):
+            return ctx["seed"] + 1
+
+        async def second(ctx):
+            return ctx["first"] * 10
+
+        result = await Pipeline("test") \
+            .add_stage("first", first) \
+            .add_stage("second", second, depends_on=["first"]) \
+            .run({"seed": 1})
+
+        assert result["first"] == 2
+        assert result["second"] == 20
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_run_concurrently(self):
+        """Test that sibling stages overlap instead of running back to back."""
+        events = []
+
+        async def root(ctx):
+            return "root"
+
+        async def branch_a(ctx):
+            events.append("a_start")
+            await asyncio.sleep(0.05)
+            events.append("a_end")
+
+        async def branch_b(ctx):
+            events.append("b_start")
+            await asyncio.sleep(0.05)
+            events.append("b_end")
+
+        result = await Pipeline("test") \
+            .add_stage("root", root) \
+            .add_stage("a", branch_a, depends_on=["root"]) \
+            .add_stage("b", branch_b, depends_on=["root"]) \
+            .run()
+
+        # Both branches started before either finished
+        assert events.index("b_start") < events.index("a_end")
+        assert events.index("a_start") < events.index("b_end")
+        assert result.total_seconds < 0.1
+
+    @pytest.mark.asyncio
+    async def test_timings_recorded_for_every_stage(self):
+        """Test that per-stage timings are reported."""
+        async def slow(ctx):
+            await asyncio.sleep(0.02)
+
+        async def fast(ctx):
+            return None
+
+        result = await Pipeline("test") \
+            .add_stage("slow", slow) \
+            .add_stage("fast", fast, depends_on=["slow"]) \
+            .run()
+
+        assert set(result.timings) == {"slow", "fast"}
+        assert result.timings["slow"] >= 0.02
+
+
+class TestPipelineErrors:
+    """Test failure handling and graph validation."""
+
+    @pytest.mark.asyncio
+    async def test_stage_exception_propagates_and_cancels_siblings(self):
+        """Test that the first failure is raised and running stages are cancelled."""
+        cancelled = asyncio.Event()
+
+        async def failing(ctx):
+            raise ValueError("boom")
+
+        async def long_running(ctx):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        pipeline = Pipeline("test") \
+            .add_stage("failing", failing) \
+            .add_stage("long", long_running)
+
+        with pytest.raises(ValueError, match="boom"):
+            await pipeline.run()
+
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_unknown_dependency_rejected(self):
+        """Test that depending on a missing stage fails fast."""
+        async def stage(ctx):
+            return None
+
+        pipeline = Pipeline("test").add_stage("a", stage, depends_on=["missing"])
+
+        with pytest.raises(PipelineError, match="unknown stage"):
+            await pipeline.run()
+
+    @pytest.mark.asyncio
+    async def test_cycle_rejected(self):
+        """Test that cyclic graphs are rejected."""
+        async def stage(ctx):
+            return None
+
+        pipeline = Pipeline("test") \
+            .add_stage("a", stage, depends_on=["b"]) \
+            .add_stage("b", stage, depends_on=["a"])
+
+        with pytest.raises(PipelineError, match="Cycle"):
+            await pipeline.run()
+
+    def test_duplicate_stage_rejected(self):
+        """Test that stage names must be unique."""
+        async def stage(ctx):
+            return None
+
+        pipeline = Pipeline("test").add_stage("a", stage)
+
+        with pytest.raises(PipelineError, match="Duplicate"):
+            pipeline.add_stage("a", stage)
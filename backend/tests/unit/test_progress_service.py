@@ -5,25 +5,33 @@ Tests:
 - Level progression logic
 - Advancement eligibility
 - Progress summary generation
+- Conversation message counter
+- Progress snapshot (one query, reused until the next write)
 - Constants validation
 """
 
 import pytest
 from uuid import uuid4
+from sqlalchemy import event, func, select
 from app.services.progress_service import (
     get_next_level,
     calculate_advancement_eligibility,
     get_user_progress_summary,
     advance_user_level,
     get_level_history,
+    get_conversation_message_count,
+    record_conversation_messages,
+    backfill_conversation_message_counts,
+    load_progress_snapshot,
     LEVEL_ORDER,
     SCORE_THRESHOLD,
     MINIMUM_ATTEMPTS,
     CONVERSATION_MINIMUM,
     XP_REWARDS
 )
-from app.db.models import User, UserProgress, ConversationSession
-from datetime import datetime
+from app.db.models import User, UserProgress, ConversationSession, ConversationMessage, ConversationMessageCount, LevelHistory
+from app.services.conversation_history import append_messages
+from datetime import datetime, timedelta
 
 
 class TestLevelProgression:
@@ -55,15 +63,17 @@ class TestLevelProgression:
 class TestAdvancementEligibility:
     """Test advancement eligibility checks."""
     
-    def test_user_not_found(self, db_session):
+    @pytest.mark.asyncio
+    async def test_user_not_found(self, db_session):
         """Test advancement check for non-existent user."""
-        result = calculate_advancement_eligibility(
+        result = await calculate_advancement_eligibility(
             user_id="nonexistent",
             db=db_session
         )
         assert result["eligible"] is False
     
-    def test_user_without_level(self, db_session):
+    @pytest.mark.asyncio
+    async def test_user_without_level(self, db_session):
         """Test user without assigned level."""
         user = User(
             username="testuser",
@@ -71,15 +81,16 @@ class TestAdvancementEligibility:
             target_language="German"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
-        result = calculate_advancement_eligibility(
+        result = await calculate_advancement_eligibility(
             user_id=user.id,
             db=db_session
         )
         assert result["eligible"] is False
     
-    def test_user_at_maximum_level(self, db_session):
+    @pytest.mark.asyncio
+    async def test_user_at_maximum_level(self, db_session):
         """Test user at C2 level cannot advance."""
         user = User(
             username="testuser",
@@ -88,15 +99,16 @@ class TestAdvancementEligibility:
             level="C2"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
-        result = calculate_advancement_eligibility(
+        result = await calculate_advancement_eligibility(
             user_id=user.id,
             db=db_session
         )
         assert result["eligible"] is False
     
-    def test_user_without_progress(self, db_session):
+    @pytest.mark.asyncio
+    async def test_user_without_progress(self, db_session):
         """Test user without any module progress."""
         user = User(
             username="testuser",
@@ -105,15 +117,16 @@ class TestAdvancementEligibility:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
-        result = calculate_advancement_eligibility(
+        result = await calculate_advancement_eligibility(
             user_id=user.id,
             db=db_session
         )
         assert result["eligible"] is False
     
-    def test_user_with_low_scores(self, db_session):
+    @pytest.mark.asyncio
+    async def test_user_with_low_scores(self, db_session):
         """Test user with scores below threshold."""
         user = User(
             username="testuser",
@@ -122,7 +135,7 @@ class TestAdvancementEligibility:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Add progress with low score
         progress = UserProgress(
@@ -132,15 +145,16 @@ class TestAdvancementEligibility:
             correct_attempts=8  # 40% score
         )
         db_session.add(progress)
-        db_session.commit()
+        await db_session.commit()
         
-        result = calculate_advancement_eligibility(
+        result = await calculate_advancement_eligibility(
             user_id=user.id,
             db=db_session
         )
         assert result["eligible"] is False
     
-    def test_user_with_insufficient_attempts(self, db_session):
+    @pytest.mark.asyncio
+    async def test_user_with_insufficient_attempts(self, db_session):
         """Test user with not enough attempts."""
         user = User(
             username="testuser",
@@ -149,7 +163,7 @@ class TestAdvancementEligibility:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Add progress with good score but few attempts
         progress = UserProgress(
@@ -159,15 +173,16 @@ class TestAdvancementEligibility:
             correct_attempts=5  # 100% score but only 5 attempts
         )
         db_session.add(progress)
-        db_session.commit()
+        await db_session.commit()
         
-        result = calculate_advancement_eligibility(
+        result = await calculate_advancement_eligibility(
             user_id=user.id,
             db=db_session
         )
         assert result["eligible"] is False
     
-    def test_user_without_enough_conversation(self, db_session):
+    @pytest.mark.asyncio
+    async def test_user_without_enough_conversation(self, db_session):
         """Test user without enough conversation messages."""
         user = User(
             username="testuser",
@@ -176,7 +191,7 @@ class TestAdvancementEligibility:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Add excellent progress in all modules
         for module in ["vocabulary", "grammar", "writing", "phonetics"]:
@@ -187,10 +202,10 @@ class TestAdvancementEligibility:
                 correct_attempts=18  # 90% score
             )
             db_session.add(progress)
-        db_session.commit()
+        await db_session.commit()
         
         # But no conversation messages
-        result = calculate_advancement_eligibility(
+        result = await calculate_advancement_eligibility(
             user_id=user.id,
             db=db_session
         )
@@ -200,7 +215,8 @@ class TestAdvancementEligibility:
 class TestProgressSummary:
     """Test progress summary generation."""
     
-    def test_progress_summary_for_new_user(self, db_session):
+    @pytest.mark.asyncio
+    async def test_progress_summary_for_new_user(self, db_session):
         """Test progress summary for user with no progress."""
         user = User(
             username="testuser",
@@ -209,15 +225,16 @@ class TestProgressSummary:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
-        summary = get_user_progress_summary(user_id=user.id, db=db_session)
+        summary = await get_user_progress_summary(user_id=user.id, db=db_session)
         
         assert summary is not None
         assert summary.current_level == "A1"
         assert summary.can_advance is False
     
-    def test_progress_summary_with_progress(self, db_session):
+    @pytest.mark.asyncio
+    async def test_progress_summary_with_progress(self, db_session):
         """Test progress summary with some module progress."""
         user = User(
             username="testuser",
@@ -226,7 +243,7 @@ class TestProgressSummary:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Add progress
         progress = UserProgress(
@@ -237,18 +254,19 @@ class TestProgressSummary:
             last_activity_at=datetime.utcnow()
         )
         db_session.add(progress)
-        db_session.commit()
+        await db_session.commit()
         
-        summary = get_user_progress_summary(user_id=user.id, db=db_session)
+        summary = await get_user_progress_summary(user_id=user.id, db=db_session)
         
         assert summary is not None
         # Should have progress for all modules (some might be empty)
         assert len(summary.modules) >= 1
     
-    def test_progress_summary_nonexistent_user_raises_error(self, db_session):
+    @pytest.mark.asyncio
+    async def test_progress_summary_nonexistent_user_raises_error(self, db_session):
         """Test that non-existent user raises error."""
         with pytest.raises(Exception):
-            get_user_progress_summary(user_id="nonexistent", db=db_session)
+            await get_user_progress_summary(user_id="nonexistent", db=db_session)
 
 
 class TestConstants:
@@ -289,7 +307,8 @@ class TestConstants:
 class TestAdvanceUserLevel:
     """Test the advance_user_level function."""
     
-    def test_successful_advancement_from_a1_to_a2(self, db_session):
+    @pytest.mark.asyncio
+    async def test_successful_advancement_from_a1_to_a2(self, db_session):
         """Test successful level advancement."""
         from datetime import datetime, timedelta
         
@@ -303,7 +322,7 @@ class TestAdvanceUserLevel:
             total_xp=0
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Create progress for all modules with good scores
         for module in ["vocabulary", "grammar", "writing", "phonetics"]:
@@ -317,24 +336,12 @@ class TestAdvanceUserLevel:
             )
             db_session.add(progress)
         
-        # Create conversation sessions with messages
-        for i in range(6):
-            session = ConversationSession(
-                id=str(uuid4()),
-                user_id=user.id,
-                target_language="German",
-                context_json={
-                    "messages": [
-                        {"role": "user", "content": f"Message {j}"}
-                        for j in range(5)  # 5 messages per session = 30 total
-                    ]
-                }
-            )
-            db_session.add(session)
+        # Conversation messages sent at this level
+        db_session.add(ConversationMessageCount(user_id=user.id, level="A1", user_messages=30))
         
-        db_session.commit()
+        await db_session.commit()
         
-        result = advance_user_level(user.id, db_session)
+        result = await advance_user_level(user.id, db_session)
         
         # Check result
         assert result.old_level == "A1"
@@ -342,19 +349,20 @@ class TestAdvanceUserLevel:
         assert result.xp_earned == XP_REWARDS["A1"]
         
         # Check user updated
-        db_session.refresh(user)
+        await db_session.refresh(user)
         assert user.level == "A2"
         assert user.total_xp == XP_REWARDS["A1"]
         
         # Check level history created
         from app.db.models import LevelHistory
-        history = db_session.query(LevelHistory).filter(
+        history = await db_session.scalar(select(LevelHistory).where(
             LevelHistory.user_id == user.id
-        ).first()
+        ))
         assert history is not None
         assert history.level == "A1"
     
-    def test_advancement_not_eligible_raises_error(self, db_session):
+    @pytest.mark.asyncio
+    async def test_advancement_not_eligible_raises_error(self, db_session):
         """Test that advancement fails if user not eligible."""
         user = User(
             username="testuser",
@@ -364,13 +372,14 @@ class TestAdvanceUserLevel:
             total_xp=0
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # No progress created - user not eligible
         with pytest.raises(ValueError, match="Not eligible to advance"):
-            advance_user_level(user.id, db_session)
+            await advance_user_level(user.id, db_session)
     
-    def test_advancement_at_max_level_raises_error(self, db_session):
+    @pytest.mark.asyncio
+    async def test_advancement_at_max_level_raises_error(self, db_session):
         """Test that advancement fails at maximum level."""
         user = User(
             username="testuser",
@@ -380,12 +389,13 @@ class TestAdvanceUserLevel:
             total_xp=1000
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         with pytest.raises(ValueError, match="Already at maximum level"):
-            advance_user_level(user.id, db_session)
+            await advance_user_level(user.id, db_session)
     
-    def test_advancement_resets_progress(self, db_session):
+    @pytest.mark.asyncio
+    async def test_advancement_resets_progress(self, db_session):
         """Test that advancement resets module progress."""
         from datetime import datetime
         
@@ -398,7 +408,7 @@ class TestAdvanceUserLevel:
             total_xp=0
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Create progress
         for module in ["vocabulary", "grammar", "writing", "phonetics"]:
@@ -418,40 +428,215 @@ class TestAdvanceUserLevel:
                 id=str(uuid4()),
                 user_id=user.id,
                 target_language="German",
-                context_json={
-                    "messages": [
-                        {"role": "user", "content": f"Message {j}"}
-                        for j in range(5)  # 5 messages per session = 30 total
-                    ]
-                }
+                context_json={}
             )
             db_session.add(session)
+            await db_session.flush()
+            await append_messages(session.id, [
+                {"role": "user", "content": f"Message {j}"}
+                for j in range(5)  # 5 messages per session = 30 total
+            ], db_session)
+        db_session.add(ConversationMessageCount(user_id=user.id, level="A1", user_messages=30))
         
-        db_session.commit()
+        await db_session.commit()
         
-        advance_user_level(user.id, db_session)
+        await advance_user_level(user.id, db_session)
         
         # Check all progress reset
         for module in ["vocabulary", "grammar", "writing", "phonetics"]:
-            progress = db_session.query(UserProgress).filter(
+            progress = await db_session.scalar(select(UserProgress).where(
                 UserProgress.user_id == user.id,
                 UserProgress.module == module
-            ).first()
+            ))
             assert progress.score == 0.0
             assert progress.total_attempts == 0
             assert progress.correct_attempts == 0
         
         # Check conversations deleted
-        sessions = db_session.query(ConversationSession).filter(
+        sessions = (await db_session.scalars(select(ConversationSession).where(
             ConversationSession.user_id == user.id
-        ).all()
+        ))).all()
         assert len(sessions) == 0
+        assert await db_session.scalar(select(func.count()).select_from(ConversationMessage)) == 0
+        assert await get_conversation_message_count(user.id, "A1", db_session) == 0
+
+
+class TestConversationMessageCounter:
+    """Test the maintained per-level conversation message counter."""
+    
+    async def _user(self, db_session, level="A1"):
+        user = User(username="testuser", hashed_password="hash", target_language="German", level=level)
+        db_session.add(user)
+        await db_session.commit()
+        return user
+    
+    @pytest.mark.asyncio
+    async def test_messages_are_counted_per_level(self, db_session):
+        """Test that increments go to the user's current level."""
+        user = await self._user(db_session)
+        
+        await record_conversation_messages(user.id, db_session)
+        await record_conversation_messages(user.id, db_session, count=2)
+        user.level = "A2"
+        await db_session.commit()
+        await record_conversation_messages(user.id, db_session)
+        await db_session.commit()
+        
+        assert await get_conversation_message_count(user.id, "A1", db_session) == 3
+        assert await get_conversation_message_count(user.id, "A2", db_session) == 1
+    
+    @pytest.mark.asyncio
+    async def test_user_without_level_is_not_counted(self, db_session):
+        """Test that no counter row is created without a level."""
+        user = await self._user(db_session, level=None)
+        
+        await record_conversation_messages(user.id, db_session)
+        await db_session.commit()
+        
+        rows = (await db_session.scalars(select(ConversationMessageCount))).all()
+        assert rows == []
+    
+    @pytest.mark.asyncio
+    async def test_eligibility_reads_the_counter(self, db_session):
+        """Test that eligibility uses the counter, not stored sessions."""
+        user = await self._user(db_session)
+        db_session.add(ConversationMessageCount(user_id=user.id, level="A1", user_messages=CONVERSATION_MINIMUM))
+        await db_session.commit()
+        
+        result = await calculate_advancement_eligibility(user.id, db_session)
+        
+        assert result["conversation_messages"] == CONVERSATION_MINIMUM
+        assert result["conversation_ready"] is True
+    
+    @pytest.mark.asyncio
+    async def test_backfill_counts_user_messages_in_sessions(self, db_session):
+        """Test that the backfill sets the counter from stored conversations."""
+        user = await self._user(db_session)
+        for _ in range(2):
+            session = ConversationSession(
+                id=str(uuid4()),
+                user_id=user.id,
+                target_language="German",
+                context_json={}
+            )
+            db_session.add(session)
+            await db_session.flush()
+            await append_messages(session.id, [
+                {"role": "assistant", "content": "Hallo"},
+                {"role": "user", "content": "Hi"},
+                {"role": "assistant", "content": "Wie geht's?"},
+                {"role": "user", "content": "Gut"}
+            ], db_session)
+        db_session.add(ConversationMessageCount(user_id=user.id, level="A1", user_messages=99))
+        await db_session.commit()
+        
+        written = await backfill_conversation_message_counts(db_session)
+        
+        assert written == 1
+        assert await get_conversation_message_count(user.id, "A1", db_session) == 4
+
+
+class TestProgressSnapshot:
+    """Test the shared progress snapshot."""
+    
+    async def _user(self, db_session, scores, messages=0, level="A1"):
+        user = User(username="testuser", hashed_password="hash", target_language="German", level=level)
+        db_session.add(user)
+        await db_session.commit()
+        for module, score in scores.items():
+            db_session.add(UserProgress(user_id=user.id, module=module, score=score, total_attempts=12))
+        if messages:
+            db_session.add(ConversationMessageCount(user_id=user.id, level=level, user_messages=messages))
+        await db_session.commit()
+        return user
+    
+    def _count_statements(self, db_session):
+        statements = []
+        
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        engine = db_session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        return statements, lambda: event.remove(engine, "before_cursor_execute", record)
+    
+    @pytest.mark.asyncio
+    async def test_summary_is_built_from_one_query(self, db_session):
+        """Test that the summary reads progress and the conversation count together."""
+        user = await self._user(
+            db_session, {"vocabulary": 90.0, "grammar": 80.0, "writing": 90.0, "phonetics": 90.0}, messages=25
+        )
+        
+        statements, stop = self._count_statements(db_session)
+        try:
+            summary = await get_user_progress_summary(user.id, db_session)
+        finally:
+            stop()
+        
+        assert len(statements) == 1
+        assert summary.weighted_score == pytest.approx(87.0)
+        assert summary.overall_progress == 80.0
+        assert summary.conversation_engagement.total_messages == 25
+        assert "Grammar: Score too low (80.0%)" in summary.advancement_reason
+    
+    @pytest.mark.asyncio
+    async def test_summary_for_user_at_max_level(self, db_session):
+        """Test that the summary does not depend on the eligibility details."""
+        user = await self._user(db_session, {"vocabulary": 90.0}, messages=5, level="C2")
+        
+        summary = await get_user_progress_summary(user.id, db_session)
+        
+        assert summary.next_level is None
+        assert summary.conversation_engagement.total_messages == 5
+        assert summary.advancement_reason == "Already at maximum level (C2)"
+    
+    @pytest.mark.asyncio
+    async def test_reused_until_the_next_write(self, db_session):
+        """Test that the snapshot is read once per session until something is written."""
+        user = await self._user(db_session, {"vocabulary": 50.0})
+        await load_progress_snapshot(user.id, db_session)
+        
+        statements, stop = self._count_statements(db_session)
+        try:
+            eligibility = await calculate_advancement_eligibility(user.id, db_session)
+        finally:
+            stop()
+        assert statements == []
+        assert eligibility["modules"]["vocabulary"]["score"] == 50.0
+        
+        await record_conversation_messages(user.id, db_session, count=3)
+        await db_session.commit()
+        snapshot = await load_progress_snapshot(user.id, db_session)
+        assert snapshot.conversation_messages == 3
+    
+    @pytest.mark.asyncio
+    async def test_level_history_in_completion_order(self, db_session):
+        """Test loading level history with the progress rows."""
+        user = await self._user(db_session, {"vocabulary": 70.0, "grammar": 60.0}, level="B1")
+        now = datetime.utcnow()
+        for level, days_ago in [("A2", 10), ("A1", 30)]:
+            db_session.add(LevelHistory(
+                user_id=user.id, level=level, weighted_score=85.0,
+                started_at=now - timedelta(days=days_ago + 10), completed_at=now - timedelta(days=days_ago)
+            ))
+        await db_session.commit()
+        
+        statements, stop = self._count_statements(db_session)
+        try:
+            snapshot = await load_progress_snapshot(user.id, db_session, with_history=True)
+        finally:
+            stop()
+        
+        assert len(statements) == 1
+        assert [record.level for record in snapshot.level_history] == ["A1", "A2"]
+        assert sorted(snapshot.progress) == ["grammar", "vocabulary"]
 
 
 class TestLevelHistory:
     """Test level history tracking."""
     
-    def test_get_level_history_for_new_user(self, db_session):
+    @pytest.mark.asyncio
+    async def test_get_level_history_for_new_user(self, db_session):
         """Test getting history for user with no history."""
         user = User(
             username="testuser",
@@ -460,12 +645,13 @@ class TestLevelHistory:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
-        history = get_level_history(user.id, db_session)
+        history = await get_level_history(user.id, db_session)
         assert history == []
     
-    def test_get_level_history_returns_sorted(self, db_session):
+    @pytest.mark.asyncio
+    async def test_get_level_history_returns_sorted(self, db_session):
         """Test that history is returned in descending order by completion date."""
         from datetime import datetime, timedelta
         
@@ -476,7 +662,7 @@ class TestLevelHistory:
             level="A2"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Create history entries
         from app.db.models import LevelHistory
@@ -496,9 +682,9 @@ class TestLevelHistory:
             completed_at=datetime.utcnow() - timedelta(days=10)
         )
         db_session.add(history1)
-        db_session.commit()
+        await db_session.commit()
         
-        result = get_level_history(user.id, db_session)
+        result = await get_level_history(user.id, db_session)
         
         assert len(result) == 1
         assert result[0].level == "A1"
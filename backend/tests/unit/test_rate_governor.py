@@ -0,0 +1,212 @@
+"""
+Unit tests for the provider rate governor.
+
+Tests:
+- Concurrency limit queues excess callers
+- A woken waiter that is cancelled passes the wakeup on
+- Token bucket delays requests over the RPM budget
+- AIMD: limit halves on 429 and recovers on success
+- Retry-After parsing
+- LLMClient retries a 429 through the governor
+"""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.rate_governor import (
+    RateGovernor,
+    RateGovernorTimeout,
+    TokenBucket,
+    parse_retry_after,
+    reset_rate_governors,
+)
+from app.services.ai_services import LLMClient, LLMError
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateGovernor:
+    """Test admission control."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_queues_excess_callers(self):
+        """Test that no more than max_concurrency requests run at once."""
+        governor = RateGovernor("test", max_concurrency=2)
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            await governor.acquire()
+            try:
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+            finally:
+                governor.release()
+
+        await asyncio.gather(*(call() for _ in range(6)))
+
+        assert peak == 2
+        assert governor.stats["admitted"] == 6
+        assert governor.in_flight == 0
+        assert governor.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_reported_while_waiting(self):
+        """Test that waiting callers show up in the snapshot."""
+        governor = RateGovernor("test", max_concurrency=1)
+        await governor.acquire()
+
+        waiter = asyncio.create_task(governor.acquire())
+        await asyncio.sleep(0)
+        assert governor.snapshot()["queue_depth"] == 1
+
+        governor.release()
+        await waiter
+        assert governor.snapshot()["queue_depth"] == 0
+        assert governor.in_flight == 1
+        governor.release()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_passes_the_wakeup_on(self):
+        """Test that a waiter woken and cancelled in the same tick doesn't strand the next one."""
+        governor = RateGovernor("test", max_concurrency=1, max_wait_seconds=5)
+        await governor.acquire()
+        first = asyncio.create_task(governor.acquire())
+        second = asyncio.create_task(governor.acquire())
+        await asyncio.sleep(0)
+
+        first.cancel()
+        governor.release()
+
+        await asyncio.wait_for(second, timeout=1)
+        assert first.cancelled()
+        assert governor.in_flight == 1
+        assert governor.stats["timeouts"] == 0
+        governor.release()
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out(self):
+        """Test that callers give up after max_wait_seconds."""
+        governor = RateGovernor("test", max_concurrency=1, max_wait_seconds=0.02)
+        await governor.acquire()
+
+        with pytest.raises(RateGovernorTimeout):
+            await governor.acquire()
+
+        assert governor.stats["timeouts"] == 1
+        governor.release()
+
+    def test_token_bucket_wait_time(self):
+        """Test that an empty bucket reports how long until it refills."""
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)  # one token per second
+
+        for _ in range(60):
+            assert bucket.wait_time(1) == 0
+            bucket.consume(1)
+
+        assert bucket.wait_time(1) == pytest.approx(1.0)
+        clock.now += 0.5
+        assert bucket.wait_time(1) == pytest.approx(0.5)
+
+    def test_rate_limited_halves_limit_and_success_recovers(self):
+        """Test AIMD adjustments of the concurrency limit."""
+        clock = FakeClock()
+        governor = RateGovernor("test", max_concurrency=8, clock=clock)
+
+        governor.record_rate_limited(retry_after=3)
+        assert governor.limit == 4
+        assert governor.snapshot()["paused_for_seconds"] == pytest.approx(3)
+
+        governor.record_rate_limited()
+        assert governor.limit == 2
+
+        for _ in range(20):
+            governor.record_success()
+        assert 2 < governor.limit <= 8
+
+    def test_limit_never_drops_below_minimum(self):
+        """Test that repeated 429s keep at least one slot open."""
+        governor = RateGovernor("test", max_concurrency=4)
+        for _ in range(10):
+            governor.record_rate_limited(retry_after=0)
+        assert governor.limit == 1
+
+
+class TestParseRetryAfter:
+    """Test Retry-After header parsing."""
+
+    def test_seconds(self):
+        assert parse_retry_after("7") == 7.0
+
+    def test_missing_or_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+    def test_http_date_in_past_is_zero(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+class TestLLMClientGovernor:
+    """Test 429 handling in LLMClient."""
+
+    def teardown_method(self):
+        reset_rate_governors()
+
+    @staticmethod
+    def _rate_limited_response():
+        request = httpx.Request("POST", "https://api.example.com")
+        response = httpx.Response(429, headers={"Retry-After": "0"}, request=request)
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock(
+            side_effect=httpx.HTTPStatusError("429", request=request, response=response)
+        )
+        return mock_response
+
+    @staticmethod
+    def _ok_response():
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": "ok"}]}}]
+        }
+        mock_response.raise_for_status = MagicMock()
+        return mock_response
+
+    @pytest.mark.asyncio
+    async def test_429_is_retried_after_backoff(self):
+        """Test that a rate-limited call is retried and succeeds."""
+        reset_rate_governors()
+        llm = LLMClient(api_key="key", base_url="https://api.example.com", provider="gemini")
+        llm.client.post = AsyncMock(side_effect=[self._rate_limited_response(), self._ok_response()])
+
+        result = await llm.generate(system_prompt="s", user_prompt="u")
+
+        assert result == "ok"
+        assert llm.client.post.call_count == 2
+        await llm.close()
+
+    @pytest.mark.asyncio
+    async def test_persistent_429_raises_llm_error(self):
+        """Test that retries are bounded."""
+        reset_rate_governors()
+        llm = LLMClient(api_key="key", base_url="https://api.example.com", provider="gemini")
+        llm.client.post = AsyncMock(side_effect=lambda *a, **k: self._rate_limited_response())
+
+        with pytest.raises(LLMError):
+            await llm.generate(system_prompt="s", user_prompt="u")
+
+        assert llm.client.post.call_count == 3  # initial call + LLM_RATE_LIMIT_RETRIES
+        await llm.close()
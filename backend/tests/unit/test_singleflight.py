@@ -0,0 +1,108 @@
+"""
+Unit tests for single-flight request coalescing.
+
+Tests:
+- Concurrent identical calls share one upstream request
+- Distinct keys and sequential calls are not coalesced
+- Errors reach every waiter
+- LLMClient coalesces identical in-flight prompts
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.singleflight import SingleFlight
+from app.services.ai_services import LLMClient
+
+
+class TestSingleFlight:
+    """Test the coalescing primitive."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_request(self):
+        """Test that N concurrent callers with one key trigger one call."""
+        group = SingleFlight("test")
+        calls = 0
+
+        async def upstream():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.02)
+            return "result"
+
+        results = await asyncio.gather(*[group.do("same", upstream) for _ in range(5)])
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert group.stats["coalesced"] == 4
+        assert group.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_are_not_coalesced(self):
+        """Test that distinct keys run independently."""
+        group = SingleFlight("test")
+        upstream = AsyncMock(side_effect=["a", "b"])
+
+        results = await asyncio.gather(group.do("k1", upstream), group.do("k2", upstream))
+
+        assert sorted(results) == ["a", "b"]
+        assert upstream.call_count == 2
+        assert group.stats["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_sequential_calls_start_new_requests(self):
+        """Test that a finished request is not reused."""
+        group = SingleFlight("test")
+        upstream = AsyncMock(side_effect=["first", "second"])
+
+        assert await group.do("k", upstream) == "first"
+        assert await group.do("k", upstream) == "second"
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_to_all_waiters(self):
+        """Test that a failed request fails every coalesced caller."""
+        group = SingleFlight("test")
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            *[group.do("k", failing) for _ in range(3)],
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert group.in_flight == 0
+
+
+class TestLLMClientCoalescing:
+    """Test that LLMClient routes calls through the single-flight layer."""
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_prompts_hit_api_once(self):
+        """Test that a classroom burst of identical prompts becomes one request."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": "Hola"}]}}]
+        }
+        mock_response.raise_for_status = MagicMock()
+
+        async def slow_post(*args, **kwargs):
+            await asyncio.sleep(0.02)
+            return mock_response
+
+        llm = LLMClient(api_key="test_key", base_url="https://test.api.com", model="test-model")
+        mock_post = AsyncMock(side_effect=slow_post)
+
+        with patch.object(llm.client, 'post', new=mock_post):
+            results = await asyncio.gather(*[
+                llm.generate(system_prompt="Teacher", user_prompt="Give a phrase")
+                for _ in range(4)
+            ])
+
+        assert results == ["Hola"] * 4
+        assert mock_post.call_count == 1
+
+        await llm.close()
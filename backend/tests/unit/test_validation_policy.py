@@ -0,0 +1,247 @@
+"""
+Unit tests for adaptive validation sampling.
+
+Tests:
+- New segments are always validated, stable ones sampled, failing ones fully checked
+- Content rejected by the checker always gets the secondary validator
+- Fallback results from failing checks are not counted as passes
+- Pass-rate history is seeded from ContentLog
+- Grammar questions skip sampled-out checks
+"""
+
+import asyncio
+import json
+import random
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.models import ContentLog, User
+from app.services import validation_policy
+from app.services.ai_services import CheckerService, LLMError, SecondaryValidatorService
+from app.services.grammar import get_grammar_question
+from app.services.validation_policy import (
+    PRIMARY,
+    SECONDARY,
+    ValidationPolicy,
+    sampled_check,
+    sampled_validation,
+    segment_key,
+)
+
+
+class AlwaysHigh(random.Random):
+    """Draws that lose against every sample rate below 1."""
+
+    def random(self):
+        return 0.999
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    monkeypatch.setattr(settings, "VALIDATION_MIN_SAMPLES", 10)
+    monkeypatch.setattr(settings, "VALIDATION_MIN_SAMPLE_RATE", 0.1)
+    monkeypatch.setattr(settings, "VALIDATION_SAMPLING_GAIN", 10.0)
+    policy = ValidationPolicy(rng=AlwaysHigh())
+    monkeypatch.setattr(validation_policy, "_policy", policy)
+    return policy
+
+
+SEGMENT = segment_key("grammar", "Spanish", "A1", "m")
+
+
+class TestSampleRate:
+    """Test how sample rates follow the observed failure rate."""
+
+    def test_new_segment_is_always_validated(self, policy):
+        for _ in range(9):
+            policy.record(PRIMARY, SEGMENT, True)
+
+        assert policy.sample_rate(PRIMARY, SEGMENT) == 1.0
+        assert policy.should_run(PRIMARY, SEGMENT) is True
+
+    def test_stable_segment_is_sampled_at_the_floor(self, policy):
+        for _ in range(20):
+            policy.record(PRIMARY, SEGMENT, True)
+
+        assert policy.sample_rate(PRIMARY, SEGMENT) == pytest.approx(0.1)
+        assert policy.should_run(PRIMARY, SEGMENT) is False
+        assert policy.stats[PRIMARY] == {"run": 0, "skipped": 1}
+
+    def test_failures_raise_the_sample_rate(self, policy):
+        for passed in [True] * 18 + [False] * 2:
+            policy.record(SECONDARY, SEGMENT, passed)
+        assert policy.sample_rate(SECONDARY, SEGMENT) == pytest.approx(1.0)
+
+        for _ in range(20):
+            policy.record(SECONDARY, SEGMENT, True)
+        assert policy.sample_rate(SECONDARY, SEGMENT) == pytest.approx(0.5)
+
+    def test_disabled_policy_always_runs(self, policy, monkeypatch):
+        monkeypatch.setattr(settings, "VALIDATION_SAMPLING_ENABLED", False)
+        for _ in range(20):
+            policy.record(PRIMARY, SEGMENT, True)
+
+        assert policy.should_run(PRIMARY, SEGMENT) is True
+
+
+class TestSampledChecks:
+    """Test the wrappers around the checker and secondary validator."""
+
+    @pytest.mark.asyncio
+    async def test_skipped_checks_return_marked_stand_ins(self, policy):
+        for _ in range(20):
+            policy.record(PRIMARY, SEGMENT, True)
+            policy.record(SECONDARY, SEGMENT, True)
+        checker, validator = AsyncMock(), AsyncMock()
+
+        check = await sampled_check(checker, SEGMENT, module="grammar")
+        validation = await sampled_validation(validator, SEGMENT, check, module="grammar")
+
+        assert check["sampled_out"] and validation["sampled_out"]
+        checker.check_content.assert_not_called()
+        validator.deep_validate.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rejected_content_is_always_deep_validated(self, policy):
+        for _ in range(20):
+            policy.record(SECONDARY, SEGMENT, True)
+        validator = AsyncMock()
+        validator.deep_validate = AsyncMock(return_value={"is_approved": False})
+
+        await sampled_validation(validator, SEGMENT, {"is_valid": False}, module="grammar")
+
+        validator.deep_validate.assert_awaited_once()
+        assert policy.stats[SECONDARY]["run"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failing_checks_do_not_move_the_window(self, policy):
+        for _ in range(10):
+            policy.record(PRIMARY, SEGMENT, False)
+            policy.record(SECONDARY, SEGMENT, False)
+        llm = AsyncMock()
+        llm.generate_json = AsyncMock(side_effect=LLMError("provider down"))
+        inputs = {"module": "grammar", "user_input": {}, "generated_content": "{}"}
+
+        check = await sampled_check(CheckerService(llm), SEGMENT, original_instruction="", **inputs)
+        validation = await sampled_validation(SecondaryValidatorService(llm), SEGMENT, check, **inputs)
+
+        assert check["is_valid"] and check["error"]
+        assert validation["is_approved"] and validation["error"]
+        assert list(policy._outcomes[(PRIMARY, SEGMENT)]) == [False] * 10
+        assert list(policy._outcomes[(SECONDARY, SEGMENT)]) == [False] * 10
+        assert policy.sample_rate(PRIMARY, SEGMENT) == 1.0
+
+
+class TestHistory:
+    """Test seeding the stats from ContentLog."""
+
+    @pytest.mark.asyncio
+    async def test_history_skips_pooled_sampled_out_and_failed_rows(self, policy, db_session, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_MODEL", "m")
+        rows = [
+            ({"target_language": "Spanish", "level": "A1"}, {"is_valid": True}, {"is_approved": False}),
+            ({"target_language": "Spanish", "level": "A1", "model": "m"}, {"is_valid": False}, {"is_approved": True}),
+            ({"target_language": "Spanish", "level": "A1", "model": "m"},
+             {"is_valid": True, "sampled_out": True}, {"is_approved": True, "sampled_out": True}),
+            ({"target_language": "Spanish", "level": "A1", "model": "m"},
+             {"is_valid": True, "error": True}, {"is_approved": True, "error": True}),
+            ({"target_language": "Spanish", "level": "A1", "pooled": True}, {"is_valid": True}, {"is_approved": True}),
+            ({"target_language": "Spanish", "level": "A1", "model": "other"}, {"is_valid": True}, {"is_approved": True}),
+        ]
+        for payload, checker_result, secondary_validation in rows:
+            db_session.add(ContentLog(
+                module="grammar", input_payload=payload, generated_content={},
+                checker_result=checker_result, secondary_validation=secondary_validation
+            ))
+        await db_session.commit()
+
+        await policy.ensure_history("grammar", db_session)
+
+        assert sorted(policy._outcomes[(PRIMARY, SEGMENT)]) == [False, True]
+        assert sorted(policy._outcomes[(SECONDARY, SEGMENT)]) == [False, True]
+        assert len(policy._outcomes[(PRIMARY, segment_key("grammar", "Spanish", "A1", "other"))]) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_load_is_retried(self, policy, db_session):
+        db_session.add(ContentLog(
+            module="grammar", input_payload={"target_language": "Spanish", "level": "A1", "model": "m"},
+            generated_content={}, checker_result={"is_valid": True}, secondary_validation={"is_approved": True}
+        ))
+        await db_session.commit()
+
+        failing = AsyncMock()
+        failing.execute = AsyncMock(side_effect=RuntimeError("database is locked"))
+        with pytest.raises(RuntimeError):
+            await policy.ensure_history("grammar", failing)
+        await policy.ensure_history("grammar", db_session)
+
+        assert list(policy._outcomes[(PRIMARY, SEGMENT)]) == [True]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_calls_load_once(self, policy, db_session):
+        db_session.add(ContentLog(
+            module="grammar", input_payload={"target_language": "Spanish", "level": "A1", "model": "m"},
+            generated_content={}, checker_result={"is_valid": True}, secondary_validation={"is_approved": True}
+        ))
+        await db_session.commit()
+        execute = db_session.execute
+
+        async def slow_execute(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return await execute(*args, **kwargs)
+
+        async def seeded_window():
+            await policy.ensure_history("grammar", db_session)
+            return list(policy._outcomes.get((PRIMARY, SEGMENT), []))
+
+        with patch.object(db_session, "execute", side_effect=slow_execute) as mock_execute:
+            windows = await asyncio.gather(*(seeded_window() for _ in range(3)))
+
+        # Every caller returns with the history loaded, and it is loaded once
+        assert windows == [[True]] * 3
+        assert mock_execute.call_count == 1
+
+
+class TestGrammarSampling:
+    """Test a stable grammar segment end to end."""
+
+    @pytest.mark.asyncio
+    async def test_stable_segment_skips_both_checks(self, policy, db_session, mock_llm_client):
+        user = User(username="testuser", hashed_password="hash", target_language="Spanish", level="A1")
+        db_session.add(user)
+        await db_session.commit()
+        segment = segment_key("grammar", "Spanish", "A1")
+        for _ in range(20):
+            policy.record(PRIMARY, segment, True)
+            policy.record(SECONDARY, segment, True)
+
+        question_json = {
+            "question_text": "Choose the correct verb form",
+            "options": ["es", "son", "está", "están"],
+            "correct_option_index": 0,
+            "explanation": "Use 'es' for singular"
+        }
+        with patch('app.services.grammar.get_llm_client') as mock_get_llm, \
+             patch('app.services.grammar.get_checker_service') as mock_get_checker, \
+             patch('app.services.grammar.get_secondary_validator') as mock_get_validator:
+            mock_llm = mock_llm_client
+            mock_llm.generate = AsyncMock(return_value=json.dumps(question_json))
+            mock_get_llm.return_value = mock_llm
+            mock_checker, mock_validator = AsyncMock(), AsyncMock()
+            mock_get_checker.return_value = mock_checker
+            mock_get_validator.return_value = mock_validator
+
+            result = await get_grammar_question(
+                user_id=user.id, target_language="Spanish", level="A1", topic=None, db=db_session
+            )
+
+        mock_checker.check_content.assert_not_called()
+        mock_validator.deep_validate.assert_not_called()
+        assert result.validation.primary_check_passed is None
+        assert result.validation.secondary_check_passed is None
+
+        log = await db_session.scalar(select(ContentLog).where(ContentLog.module == "grammar"))
+        assert log.checker_result["sampled_out"] is True
+        assert log.input_payload["model"] == settings.LLM_MODEL
@@ -8,12 +8,15 @@ Tests:
 - Progress tracking
 """
 
+import base64
 import pytest
 from unittest.mock import AsyncMock, patch
+from sqlalchemy import func, select
 from app.services.vocabulary import (
     get_next_flashcard,
     submit_vocabulary_answer
 )
+from app.core.blob_store import blob_digest, media_url
 from app.db.models import User, UserProgress
 from app.schemas.vocabulary import VocabularyAnswerRequest
 
@@ -22,7 +25,7 @@ class TestFlashcardGeneration:
     """Test flashcard generation."""
     
     @pytest.mark.asyncio
-    async def test_generate_flashcard_returns_valid_data(self, db_session):
+    async def test_generate_flashcard_returns_valid_data(self, db_session, mock_llm_client):
         """Test that flashcard has correct structure."""
         user = User(
             username="testuser",
@@ -31,7 +34,7 @@ class TestFlashcardGeneration:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         flashcard_json = {
             "word": "Buch",
@@ -46,7 +49,7 @@ class TestFlashcardGeneration:
              patch('app.services.vocabulary.get_checker_service') as mock_get_checker, \
              patch('app.services.vocabulary.get_secondary_validator') as mock_get_validator:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value=f"```json\n{json.dumps(flashcard_json)}\n```")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -89,7 +92,7 @@ class TestAnswerSubmission:
             level="A2"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         request = VocabularyAnswerRequest(
             flashcard_id="test-id",
@@ -107,10 +110,10 @@ class TestAnswerSubmission:
         assert result.is_correct is True
         
         # Check progress
-        progress = db_session.query(UserProgress).filter(
+        progress = await db_session.scalar(select(UserProgress).where(
             UserProgress.user_id == user.id,
             UserProgress.module == "vocabulary"
-        ).first()
+        ))
         
         assert progress is not None
         assert progress.correct_attempts == 1
@@ -125,7 +128,7 @@ class TestAnswerSubmission:
             level="B1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         request = VocabularyAnswerRequest(
             flashcard_id="test-id-2",
@@ -142,10 +145,10 @@ class TestAnswerSubmission:
         
         assert result.is_correct is False
         
-        progress = db_session.query(UserProgress).filter(
+        progress = await db_session.scalar(select(UserProgress).where(
             UserProgress.user_id == user.id,
             UserProgress.module == "vocabulary"
-        ).first()
+        ))
         
         assert progress is not None
         assert progress.total_attempts == 1
@@ -161,7 +164,7 @@ class TestAnswerSubmission:
             level="A1"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         # Submit 4 correct, 1 incorrect
         for i in range(5):
@@ -179,10 +182,10 @@ class TestAnswerSubmission:
                 db=db_session
             )
         
-        progress = db_session.query(UserProgress).filter(
+        progress = await db_session.scalar(select(UserProgress).where(
             UserProgress.user_id == user.id,
             UserProgress.module == "vocabulary"
-        ).first()
+        ))
         
         assert progress.total_attempts == 5
         assert progress.correct_attempts == 4
@@ -193,12 +196,12 @@ class TestImageDescriptionGeneration:
     """Test image description prompt generation."""
     
     @pytest.mark.asyncio
-    async def test_generate_image_description_prompt(self, db_session):
+    async def test_generate_image_description_prompt(self, db_session, mock_llm_client):
         """Test image description generation."""
         from app.services.vocabulary import _generate_image_description_prompt
         
         with patch('app.services.vocabulary.get_llm_client') as mock_get_llm:
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value="a red apple on a white table")
             
             result = await _generate_image_description_prompt(
@@ -217,7 +220,7 @@ class TestVocabularyServiceEdgeCases:
     """Test edge cases in vocabulary service."""
     
     @pytest.mark.asyncio
-    async def test_flashcard_without_topic(self, db_session):
+    async def test_flashcard_without_topic(self, db_session, mock_llm_client):
         """Test flashcard generation without specific topic."""
         user = User(
             username="testuser",
@@ -226,7 +229,7 @@ class TestVocabularyServiceEdgeCases:
             level="B2"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         flashcard_json = {
             "word": "livro",
@@ -241,7 +244,7 @@ class TestVocabularyServiceEdgeCases:
              patch('app.services.vocabulary.get_checker_service') as mock_get_checker, \
              patch('app.services.vocabulary.get_secondary_validator') as mock_get_validator:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(return_value=f"```json\n{json.dumps(flashcard_json)}\n```")
             mock_llm.close = AsyncMock()
             mock_get_llm.return_value = mock_llm
@@ -272,7 +275,7 @@ class TestVocabularyErrorHandling:
     """Test vocabulary error handling and edge cases."""
     
     @pytest.mark.asyncio
-    async def test_checker_suggested_fix_applied(self, db_session):
+    async def test_checker_suggested_fix_applied(self, db_session, mock_llm_client):
         """Test that checker suggested fix is applied."""
         user = User(
             username="testuser",
@@ -280,7 +283,7 @@ class TestVocabularyErrorHandling:
             target_language="German"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         original_json = {
             "word": "Bad",
@@ -304,7 +307,7 @@ class TestVocabularyErrorHandling:
              patch('app.services.vocabulary.get_secondary_validator') as mock_get_validator, \
              patch('app.services.vocabulary.get_image_client') as mock_get_image:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(side_effect=[
                 f"```json\n{json.dumps(original_json)}\n```",
                 "a good visual description"
@@ -341,7 +344,7 @@ class TestVocabularyErrorHandling:
             assert result.word == "Good"
     
     @pytest.mark.asyncio
-    async def test_secondary_validator_improvement_applied(self, db_session):
+    async def test_secondary_validator_improvement_applied(self, db_session, mock_llm_client):
         """Test that secondary validator improvement is applied."""
         user = User(
             username="testuser",
@@ -349,7 +352,7 @@ class TestVocabularyErrorHandling:
             target_language="German"
         )
         db_session.add(user)
-        db_session.commit()
+        await db_session.commit()
         
         original_json = {
             "word": "Original",
@@ -373,7 +376,7 @@ class TestVocabularyErrorHandling:
              patch('app.services.vocabulary.get_secondary_validator') as mock_get_validator, \
              patch('app.services.vocabulary.get_image_client') as mock_get_image:
             
-            mock_llm = AsyncMock()
+            mock_llm = mock_llm_client
             mock_llm.generate = AsyncMock(side_effect=[
                 f"```json\n{json.dumps(original_json)}\n```",
                 "visual description"
@@ -410,11 +413,11 @@ class TestVocabularyErrorHandling:
             assert result.word == "Improved"
     
     @pytest.mark.asyncio
-    async def test_image_description_fallback_for_short_response(self):
+    async def test_image_description_fallback_for_short_response(self, mock_llm_client):
         """Test fallback when LLM response is too short."""
         from app.services.vocabulary import _generate_image_description_prompt
         
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         mock_llm.generate = AsyncMock(return_value="book")  # Too short
         
         result = await _generate_image_description_prompt(
@@ -429,11 +432,11 @@ class TestVocabularyErrorHandling:
         assert "clear and simple composition" in result
     
     @pytest.mark.asyncio
-    async def test_image_description_fallback_on_exception(self):
+    async def test_image_description_fallback_on_exception(self, mock_llm_client):
         """Test fallback when LLM raises exception."""
         from app.services.vocabulary import _generate_image_description_prompt
         
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         mock_llm.generate = AsyncMock(side_effect=Exception("API Error"))
         
         result = await _generate_image_description_prompt(
@@ -448,11 +451,11 @@ class TestVocabularyErrorHandling:
         assert "clear and simple composition" in result
 
     @pytest.mark.asyncio
-    async def test_image_description_strips_prefixes(self):
+    async def test_image_description_strips_prefixes(self, mock_llm_client):
         """Test that image description strips common prefixes from definition."""
         from app.services.vocabulary import _generate_image_description_prompt
         
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         mock_llm.generate = AsyncMock(return_value="x")  # Too short (< 5 chars), will use fallback
         
         result = await _generate_image_description_prompt(
@@ -467,11 +470,11 @@ class TestVocabularyErrorHandling:
         assert "run, clear and simple composition" in result
         
     @pytest.mark.asyncio
-    async def test_image_description_strips_article_prefixes(self):
+    async def test_image_description_strips_article_prefixes(self, mock_llm_client):
         """Test that image description strips article prefixes."""
         from app.services.vocabulary import _generate_image_description_prompt
         
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         mock_llm.generate = AsyncMock(return_value="x")  # Too short
         
         result = await _generate_image_description_prompt(
@@ -486,11 +489,11 @@ class TestVocabularyErrorHandling:
         assert "apple, clear and simple composition" in result
     
     @pytest.mark.asyncio
-    async def test_image_description_with_the_prefix(self):
+    async def test_image_description_with_the_prefix(self, mock_llm_client):
         """Test stripping 'the' prefix from definition."""
         from app.services.vocabulary import _generate_image_description_prompt
         
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         mock_llm.generate = AsyncMock(return_value="ab")  # Too short
         
         result = await _generate_image_description_prompt(
@@ -504,11 +507,11 @@ class TestVocabularyErrorHandling:
         assert "car, clear and simple composition" in result
     
     @pytest.mark.asyncio
-    async def test_image_description_successful_generation(self):
+    async def test_image_description_successful_generation(self, mock_llm_client):
         """Test successful LLM generation of description."""
         from app.services.vocabulary import _generate_image_description_prompt
         
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         mock_llm.generate = AsyncMock(return_value="A friendly golden retriever playing in a park")
         
         result = await _generate_image_description_prompt(
@@ -524,11 +527,11 @@ class TestVocabularyErrorHandling:
         assert "park" in result
     
     @pytest.mark.asyncio
-    async def test_image_description_too_long_uses_fallback(self):
+    async def test_image_description_too_long_uses_fallback(self, mock_llm_client):
         """Test that very long descriptions use fallback."""
         from app.services.vocabulary import _generate_image_description_prompt
         
-        mock_llm = AsyncMock()
+        mock_llm = mock_llm_client
         long_description = "a" * 150  # More than 120 chars
         mock_llm.generate = AsyncMock(return_value=long_description)
         
@@ -543,3 +546,117 @@ class TestVocabularyErrorHandling:
         # Should use fallback
         assert "large mammal" in result
         assert "clear and simple composition" in result
+
+
+class TestFlashcardBatch:
+    """Test batch flashcard generation."""
+
+    @staticmethod
+    def _card(word, definition, options=None):
+        return {
+            "word": word,
+            "definition": definition,
+            "example_sentence": f"Ein Satz mit {word}",
+            "options": options if options is not None else [definition, "pen", "table", "chair"],
+            "correct_option_index": 0,
+            "image_prompt": f"a simple picture of a {definition}"
+        }
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_one_generation_and_one_check(self, db_session, mock_llm_client):
+        """Test that N cards come from one LLM call and one checker call, stored in bulk."""
+        import json
+        from app.services.vocabulary import get_flashcard_batch
+        from app.db.models import ContentLog, VocabularyReview
+
+        user = User(username="batchuser", hashed_password="hash", target_language="German", level="A1")
+        db_session.add(user)
+        await db_session.commit()
+
+        batch_json = {"flashcards": [
+            self._card("Buch", "book"),
+            self._card("Haus", "house"),
+            self._card("buch", "book"),  # duplicate word
+            self._card("Tisch", "table", options=["table"]),  # malformed options
+        ]}
+
+        with patch('app.services.vocabulary.get_llm_client') as mock_get_llm, \
+             patch('app.services.vocabulary.get_checker_service') as mock_get_checker, \
+             patch('app.services.vocabulary.get_secondary_validator') as mock_get_validator, \
+             patch('app.services.vocabulary.get_image_client') as mock_get_image:
+
+            mock_llm = mock_llm_client
+            mock_llm.generate = AsyncMock(return_value=json.dumps(batch_json))
+            mock_get_llm.return_value = mock_llm
+
+            mock_checker = AsyncMock()
+            mock_checker.check_content = AsyncMock(return_value={"is_valid": True, "suggested_fix": None})
+            mock_get_checker.return_value = mock_checker
+
+            mock_validator = AsyncMock()
+            mock_validator.deep_validate = AsyncMock(return_value={
+                "is_approved": True,
+                "confidence_score": 0.9,
+                "improved_version": None
+            })
+            mock_get_validator.return_value = mock_validator
+
+            mock_image = AsyncMock()
+            mock_image.generate_safe_image = AsyncMock(return_value=base64.b64encode(b"img").decode())
+            mock_get_image.return_value = mock_image
+
+            result = await get_flashcard_batch(
+                user_id=user.id,
+                target_language="German",
+                level="A1",
+                count=3,
+                db=db_session
+            )
+
+        assert [card.word for card in result.flashcards] == ["Buch", "Haus"]
+        assert all(card.image_url == media_url(blob_digest(b"img")) for card in result.flashcards)
+        assert mock_llm.generate.call_count == 1
+        assert mock_checker.check_content.call_count == 1
+        assert mock_validator.deep_validate.call_count == 1
+        assert mock_image.generate_safe_image.call_count == 2
+        assert await db_session.scalar(select(func.count()).select_from(ContentLog).where(ContentLog.user_id == user.id)) == 2
+        assert await db_session.scalar(select(func.count()).select_from(VocabularyReview).where(VocabularyReview.user_id == user.id)) == 2
+
+    @pytest.mark.asyncio
+    async def test_due_reviews_fill_batch_first(self, db_session, mock_llm_client):
+        """Test that due SRS reviews are served without calling the LLM."""
+        from datetime import datetime, timedelta
+        from app.services.vocabulary import get_flashcard_batch
+        from app.db.models import VocabularyReview
+
+        user = User(username="reviewuser", hashed_password="hash", target_language="German", level="A1")
+        db_session.add(user)
+        await db_session.commit()
+        db_session.add(VocabularyReview(
+            user_id=user.id,
+            word="Katze",
+            definition="cat",
+            target_language="German",
+            next_review_date=datetime.now() - timedelta(days=1)
+        ))
+        await db_session.commit()
+
+        with patch('app.services.vocabulary.get_llm_client') as mock_get_llm, \
+             patch('app.services.vocabulary.get_checker_service'), \
+             patch('app.services.vocabulary.get_secondary_validator'), \
+             patch('app.services.vocabulary.get_image_client'):
+            mock_llm = mock_llm_client
+            mock_get_llm.return_value = mock_llm
+
+            result = await get_flashcard_batch(
+                user_id=user.id,
+                target_language="German",
+                level="A1",
+                count=1,
+                db=db_session
+            )
+
+        assert len(result.flashcards) == 1
+        assert result.flashcards[0].is_review is True
+        assert result.flashcards[0].word == "Katze"
+        mock_llm.generate.assert_not_called()
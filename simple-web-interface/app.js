@@ -955,11 +955,15 @@ function displayFlashcard() {
     console.log('Displaying flashcard:', currentFlashcard.word);
 
     let imageHtml = '';
-    if (currentFlashcard.image_data) {
+    if (currentFlashcard.image_url) {
+        // Relative media URLs are served by the API host
+        const imageSrc = currentFlashcard.image_url.startsWith('http')
+            ? currentFlashcard.image_url
+            : API_BASE_URL.replace(/\/api\/v1$/, '') + currentFlashcard.image_url;
         imageHtml = `
             <div class="flashcard-image" style="margin-top: 20px; text-align: center;">
                 <img
-                    src="data:image/jpeg;base64,${currentFlashcard.image_data}"
+                    src="${imageSrc}"
                     alt="${currentFlashcard.word}"
                     style="max-width: 100%; max-height: 300px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);"
                 >